@@ -0,0 +1,15 @@
+"""
+Caching module.
+
+Contiene caches de respuestas y resultados intermedios del sistema RAG.
+"""
+
+from .exact_cache import ExactCache, ExactCacheLayer, normalize_question
+from .semantic_cache import SemanticAnswerCache
+
+__all__ = [
+    "ExactCache",
+    "ExactCacheLayer",
+    "SemanticAnswerCache",
+    "normalize_question",
+]
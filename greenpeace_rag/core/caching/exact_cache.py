@@ -0,0 +1,206 @@
+"""
+Cache exacto por clave para el sistema RAG.
+
+Evita recalcular búsquedas en Chroma, veredictos del filtro LLM y respuestas
+para entradas que no cambiaron. Cada cache tiene un tier en memoria acotado
+(LRU) y un tier opcional en SQLite que sobrevive entre procesos, por ejemplo
+entre corridas de evaluación sobre el mismo evaluation_context.pkl.
+"""
+
+import asyncio
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from greenpeace_rag.utils.config import EXACT_CACHE_CONFIG
+
+
+def normalize_question(question: str) -> str:
+    """Normaliza una pregunta para usarla como clave (minúsculas, espacios colapsados)."""
+    return " ".join(question.lower().split())
+
+
+class ExactCache:
+    """
+    Cache clave -> valor con LRU en memoria y tier SQLite opcional.
+
+    Los valores se guardan tal cual en memoria y serializados con pickle en
+    SQLite. Lleva contadores de hits (por tier) y misses.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 2048, sqlite_path: Optional[str] = None):
+        """
+        Inicializa el cache.
+
+        Args:
+            namespace: Nombre del cache (separa las claves dentro del archivo SQLite)
+            max_entries: Máximo de entradas en memoria antes de desalojar por LRU
+            sqlite_path: Archivo SQLite para el tier en disco (None = solo memoria)
+        """
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._db = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Construye una clave estable a partir de sus componentes.
+
+        Args:
+            *parts: Componentes serializables a JSON
+
+        Returns:
+            Hash hexadecimal de la clave
+        """
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Obtiene un valor del cache.
+
+        Args:
+            key: Clave (ver make_key)
+            default: Valor a devolver si la clave no está
+
+        Returns:
+            Valor cacheado o default
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+                ).fetchone()
+                if row is not None:
+                    value = pickle.loads(row[0])
+                    self._store_in_memory(key, value)
+                    self.stats["disk_hits"] += 1
+                    return value
+
+            self.stats["misses"] += 1
+            return default
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Guarda un valor en el cache (memoria y, si está habilitado, SQLite).
+
+        Args:
+            key: Clave (ver make_key)
+            value: Valor a cachear (debe ser serializable con pickle si hay tier SQLite)
+        """
+        with self._lock:
+            self._store_in_memory(key, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, created_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, pickle.dumps(value), time.time()),
+                )
+                self._db.commit()
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """Versión async de get: con tier SQLite la consulta corre en un hilo para no bloquear el event loop."""
+        if self._db is None:
+            return self.get(key, default)
+        return await asyncio.to_thread(self.get, key, default)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """Versión async de set: con tier SQLite la escritura corre en un hilo para no bloquear el event loop."""
+        if self._db is None:
+            self.set(key, value)
+            return
+        await asyncio.to_thread(self.set, key, value)
+
+    def _store_in_memory(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Elimina todas las entradas del cache (memoria y SQLite)."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+                self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de hits/misses y tasa de aciertos."""
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return {**self.stats, "entries": len(self), "hit_rate": hits / total if total else 0.0}
+
+
+class ExactCacheLayer:
+    """
+    Conjunto de caches exactos usados por DocumentRetriever y GreenpeaceRAG.
+
+    - retrieval: (pregunta normalizada, k, modo de recuperación, versión del índice) -> documentos candidatos
+    - filter_verdicts: (pregunta normalizada, id de chunk, modelo del filtro) -> (es_relevante, explicación)
+    - answers: (pregunta normalizada, k, modo, versión del índice, LLM) -> (respuesta, contexto, documentos)
+
+    Las claves de retrieval y answers incluyen la versión del índice; al
+    cambiar de versión esos caches se vacían. Los veredictos dependen solo del
+    contenido del chunk, por lo que se conservan.
+    """
+
+    def __init__(self, cache_config: Optional[Dict[str, Any]] = None, sqlite_path: Optional[str] = None):
+        """
+        Inicializa los caches.
+
+        Args:
+            cache_config: Configuración (ver EXACT_CACHE_CONFIG)
+            sqlite_path: Archivo SQLite compartido por los tres caches (None = solo memoria)
+        """
+        config = {**EXACT_CACHE_CONFIG, **(cache_config or {})}
+        self.retrieval = ExactCache("retrieval", config["retrieval_max_entries"], sqlite_path)
+        self.filter_verdicts = ExactCache("filter_verdicts", config["filter_max_entries"], sqlite_path)
+        self.answers = ExactCache("answers", config["answer_max_entries"], sqlite_path)
+        self.index_version: Optional[str] = None
+
+    def set_index_version(self, index_version: Optional[str]) -> None:
+        """
+        Actualiza la versión del índice, vaciando los caches que dependen de ella.
+
+        Args:
+            index_version: Versión actual de la colección indexada
+        """
+        if self.index_version is not None and index_version != self.index_version:
+            print(f"♻️  Índice reindexado ({self.index_version} -> {index_version}): invalidando caches exactos")
+            self.retrieval.clear()
+            self.answers.clear()
+        self.index_version = index_version
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Contadores de cada cache."""
+        return {
+            "retrieval": self.retrieval.get_stats(),
+            "filter_verdicts": self.filter_verdicts.get_stats(),
+            "answers": self.answers.get_stats(),
+        }
@@ -0,0 +1,363 @@
+"""
+Cache semántico de respuestas para el sistema RAG.
+
+Guarda los embeddings de las preguntas ya respondidas en un índice vectorial
+en memoria. Una pregunta nueva cuya similitud coseno con una pregunta
+cacheada supera el umbral reutiliza la respuesta, el contexto y los
+documentos de esa entrada sin pasar por recuperación, filtrado y generación.
+"""
+
+import atexit
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from greenpeace_rag.utils.config import SEMANTIC_CACHE_CONFIG
+from greenpeace_rag.utils.file_handlers import load_pickle, save_pickle
+
+
+def _flush_on_exit(cache_ref: "weakref.ref[SemanticAnswerCache]") -> None:
+    """Guarda las entradas pendientes de un cache al terminar el proceso (si sigue vivo)."""
+    cache = cache_ref()
+    if cache is not None:
+        cache.flush()
+
+
+class SemanticAnswerCache:
+    """
+    Cache de respuestas indexado por similitud de preguntas.
+
+    Las entradas se desalojan por LRU (max_entries) y por TTL, y se invalidan
+    en bloque cuando cambia la versión del índice (colección reindexada).
+    Cada entrada pertenece a un scope (p.ej. "k=3|mode=dense") y solo se
+    compara contra preguntas del mismo scope. Es thread-safe: los caminos
+    async lo consultan desde hilos del executor.
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        similarity_threshold: float = SEMANTIC_CACHE_CONFIG["similarity_threshold"],
+        max_entries: int = SEMANTIC_CACHE_CONFIG["max_entries"],
+        ttl_seconds: Optional[float] = SEMANTIC_CACHE_CONFIG["ttl_seconds"],
+        persist_path: Optional[str] = None,
+        save_every: int = SEMANTIC_CACHE_CONFIG["save_every"],
+    ):
+        """
+        Inicializa el cache.
+
+        Args:
+            embeddings: Función de embeddings compatible con LangChain (embed_query/embed_documents)
+            similarity_threshold: Similitud coseno mínima para considerar un hit
+            max_entries: Máximo de entradas antes de desalojar por LRU
+            ttl_seconds: Vida máxima de una entrada en segundos (None = sin TTL)
+            persist_path: Archivo pickle para persistir el cache (opcional)
+            save_every: Con persist_path, guardar cada save_every entradas nuevas
+                (las pendientes se guardan al terminar el proceso)
+        """
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self.save_every = max(1, save_every)
+        self._unsaved = 0
+        self.index_version: Optional[str] = None
+        # Reentrante: put/put_many guardan a disco (save) con el lock tomado
+        self._lock = threading.RLock()
+
+        self._vectors: Optional[np.ndarray] = None
+        # slot -> entrada, en orden LRU (el más reciente al final)
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._free_slots: List[int] = []
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+        if persist_path:
+            self.load(persist_path)
+            atexit.register(_flush_on_exit, weakref.ref(self))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embeddings normalizados (float32) para similitud coseno por producto punto."""
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def ensure_index_version(self, index_version: Optional[str]) -> None:
+        """
+        Invalida todas las entradas si la versión del índice cambió.
+
+        Args:
+            index_version: Versión actual de la colección indexada
+        """
+        with self._lock:
+            if self.index_version is not None and index_version != self.index_version and self._entries:
+                print(f"♻️  Índice reindexado ({self.index_version} -> {index_version}): invalidando cache semántico")
+                self.clear()
+                self.stats["invalidations"] += 1
+            self.index_version = index_version
+
+    def clear(self) -> None:
+        """Elimina todas las entradas."""
+        with self._lock:
+            self._entries.clear()
+            self._free_slots = list(range(self._vectors.shape[0])) if self._vectors is not None else []
+
+    def _remove(self, slot: int) -> None:
+        self._entries.pop(slot, None)
+        self._free_slots.append(slot)
+
+    def _expire(self) -> None:
+        """Elimina entradas vencidas por TTL."""
+        if self.ttl_seconds is None:
+            return
+        now = time.time()
+        expired = [slot for slot, entry in self._entries.items() if now - entry["created_at"] > self.ttl_seconds]
+        for slot in expired:
+            self._remove(slot)
+        self.stats["expirations"] += len(expired)
+
+    def _best_match(self, vector: np.ndarray, scope: str) -> Optional[tuple]:
+        slots = np.fromiter(
+            (slot for slot, entry in self._entries.items() if entry["scope"] == scope),
+            dtype=np.int64,
+        )
+        if slots.size == 0:
+            return None
+        similarities = self._vectors[slots] @ vector
+        best = int(np.argmax(similarities))
+        return int(slots[best]), float(similarities[best])
+
+    def lookup(self, question: str, scope: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Busca una respuesta cacheada para una pregunta semánticamente equivalente.
+
+        Args:
+            question: Pregunta a responder
+            scope: Scope de la consulta (parámetros que deben coincidir)
+
+        Returns:
+            Entrada cacheada (answer, context, docs_with_scores, question, similarity) o None
+        """
+        return self.lookup_many([question], scope=scope)[0]
+
+    def lookup_many(self, questions: List[str], scope: str = "") -> List[Optional[Dict[str, Any]]]:
+        """
+        Busca respuestas cacheadas para varias preguntas con un único encode.
+
+        Args:
+            questions: Preguntas a responder
+            scope: Scope de las consultas (parámetros que deben coincidir)
+
+        Returns:
+            Una entrada cacheada (o None) por pregunta, en el mismo orden
+        """
+        with self._lock:
+            self._expire()
+            if not self._entries:
+                self.stats["misses"] += len(questions)
+                return [None] * len(questions)
+
+        # El encode corre fuera del lock: es lo más lento y no toca el estado del cache
+        vectors = self._embed(list(questions))
+        results = []
+        with self._lock:
+            for vector in vectors:
+                match = self._best_match(vector, scope)
+                if match is None or match[1] < self.similarity_threshold:
+                    self.stats["misses"] += 1
+                    results.append(None)
+                    continue
+
+                slot, similarity = match
+                self._entries.move_to_end(slot)
+                self.stats["hits"] += 1
+                results.append({**self._entries[slot], "similarity": similarity})
+        return results
+
+    def put(
+        self,
+        question: str,
+        answer: str,
+        context: str,
+        docs_with_scores: List[Any],
+        scope: str = "",
+        vector: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Agrega (o reemplaza) una respuesta en el cache.
+
+        Args:
+            question: Pregunta respondida
+            answer: Respuesta generada
+            context: Contexto usado para generar la respuesta
+            docs_with_scores: Documentos recuperados con sus scores
+            scope: Scope de la consulta
+            vector: Embedding normalizado de la pregunta (se calcula si es None)
+        """
+        if vector is None:
+            vector = self._embed([question])[0]
+        with self._lock:
+            self._put(question, answer, context, docs_with_scores, scope, vector)
+            self._mark_unsaved(1)
+
+    def _put(
+        self,
+        question: str,
+        answer: str,
+        context: str,
+        docs_with_scores: List[Any],
+        scope: str,
+        vector: np.ndarray,
+    ) -> None:
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            self._free_slots = list(range(self.max_entries))
+
+        # Reemplazar una entrada prácticamente idéntica en lugar de duplicarla
+        match = self._best_match(vector, scope) if self._entries else None
+        if match is not None and match[1] >= 0.999:
+            self._remove(match[0])
+
+        if not self._free_slots:
+            slot, _ = self._entries.popitem(last=False)
+            self._free_slots.append(slot)
+            self.stats["evictions"] += 1
+
+        slot = self._free_slots.pop()
+        self._vectors[slot] = vector
+        self._entries[slot] = {
+            "question": question,
+            "answer": answer,
+            "context": context,
+            "docs_with_scores": docs_with_scores,
+            "scope": scope,
+            "created_at": time.time(),
+        }
+
+    def prefill(self, items: Iterable[Dict[str, Any]], scope: str = "") -> int:
+        """
+        Precarga el cache offline con preguntas ya respondidas.
+
+        Los embeddings de todas las preguntas se calculan en un único encode.
+
+        Args:
+            items: Diccionarios con question, answer, context y docs_with_scores
+            scope: Scope de las entradas
+
+        Returns:
+            Cantidad de entradas cargadas
+        """
+        loaded = self.put_many(items, scope=scope)
+        if loaded:
+            print(f"✅ Cache semántico precargado con {loaded} preguntas")
+        return loaded
+
+    def put_many(self, items: Iterable[Dict[str, Any]], scope: str = "") -> int:
+        """
+        Agrega varias respuestas al cache calculando los embeddings en un único encode.
+
+        Args:
+            items: Diccionarios con question, answer, context y docs_with_scores
+            scope: Scope de las entradas
+
+        Returns:
+            Cantidad de entradas agregadas
+        """
+        items = [item for item in items if item.get("answer")]
+        if not items:
+            return 0
+
+        vectors = self._embed([item["question"] for item in items])
+        with self._lock:
+            for item, vector in zip(items, vectors):
+                self._put(
+                    item["question"],
+                    item["answer"],
+                    item.get("context", ""),
+                    item.get("docs_with_scores", []),
+                    scope,
+                    vector,
+                )
+            self._mark_unsaved(len(items))
+        return len(items)
+
+    def _mark_unsaved(self, count: int) -> None:
+        """Cuenta entradas nuevas y guarda el cache cada save_every (si se persiste)."""
+        if not self.persist_path:
+            return
+        self._unsaved += count
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def flush(self) -> bool:
+        """
+        Guarda el cache si tiene entradas nuevas sin persistir.
+
+        Returns:
+            True si se guardó
+        """
+        with self._lock:
+            return self._unsaved > 0 and self.save()
+
+    def save(self, path: Optional[str] = None) -> bool:
+        """
+        Persiste el cache en disco (pickle).
+
+        Args:
+            path: Archivo destino (por defecto persist_path)
+
+        Returns:
+            True si se guardó correctamente
+        """
+        path = path or self.persist_path
+        if not path:
+            return False
+        with self._lock:
+            slots = list(self._entries.keys())
+            data = {
+                "index_version": self.index_version,
+                "vectors": self._vectors[slots] if slots else None,
+                "entries": [self._entries[slot] for slot in slots],
+            }
+            saved = save_pickle(data, path)
+            if saved and path == self.persist_path:
+                self._unsaved = 0
+            return saved
+
+    def load(self, path: str) -> None:
+        """
+        Carga un cache persistido con save (si el archivo existe).
+
+        Args:
+            path: Archivo pickle del cache
+        """
+        import os
+
+        if not os.path.exists(path):
+            return
+        data = load_pickle(path)
+        if not data:
+            return
+
+        with self._lock:
+            self.clear()
+            self.index_version = data["index_version"]
+            if data["vectors"] is None:
+                return
+            for entry, vector in zip(data["entries"], data["vectors"]):
+                if self._vectors is None:
+                    self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                    self._free_slots = list(range(self.max_entries))
+                if not self._free_slots:
+                    break
+                slot = self._free_slots.pop()
+                self._vectors[slot] = vector
+                self._entries[slot] = entry
@@ -4,13 +4,16 @@ Chunking strategies module.
 Contiene diferentes estrategias para fragmentar documentos de texto.
 """
 
-from .chunkers import (BaseChunker, CharacterChunker, ChunkerFactory,
-                       DocumentTypeChunker, RecursiveCharacterChunker)
+from .chunkers import (CHUNK_METADATA_VERSION, BaseChunker, CharacterChunker,
+                       ChunkerFactory, DocumentTypeChunker,
+                       RecursiveCharacterChunker, add_chunk_positions)
 
 __all__ = [
     "BaseChunker",
     "CharacterChunker", 
     "RecursiveCharacterChunker",
     "SemanticDocumentChunker",
-    "ChunkerFactory"
+    "ChunkerFactory",
+    "CHUNK_METADATA_VERSION",
+    "add_chunk_positions",
 ]
@@ -5,28 +5,163 @@ Este módulo contiene diferentes estrategias de fragmentación de documentos
 para optimizar la recuperación de información en el sistema RAG.
 """
 
+import os
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from langchain_core.documents import Document
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_text_splitters import (CharacterTextSplitter,
                                       RecursiveCharacterTextSplitter)
 
+from greenpeace_rag.utils.config import CHUNKING_CONFIG
+
+# Versión de la metadata que agregan los chunkers (origin_file, start_index, chunk_index);
+# forma parte de la clave de los chunks persistidos y de la configuración del índice
+CHUNK_METADATA_VERSION = 2
+
+
+def add_chunk_positions(content: str, chunks: List[Document]) -> List[Document]:
+    """
+    Agrega a los chunks de un archivo su posición en el archivo.
+
+    Args:
+        content: Texto del archivo
+        chunks: Chunks del texto, en orden
+
+    Returns:
+        Los mismos chunks con metadata["start_index"] (offset en caracteres
+        del chunk en el archivo, -1 si no se encuentra),
+        metadata["chunk_index"] (número de secuencia dentro del archivo) y
+        metadata["origin_file"] (el archivo de esas posiciones, que no cambia
+        aunque la deduplicación cambie el file_name dueño del chunk)
+    """
+    search_from = 0
+    for chunk_index, chunk in enumerate(chunks):
+        start_index = chunk.metadata.get("start_index")
+        if start_index is None:
+            start_index = content.find(chunk.page_content, search_from)
+            if start_index == -1:
+                start_index = content.find(chunk.page_content)
+        if start_index >= 0:
+            search_from = start_index + 1
+        chunk.metadata["start_index"] = start_index
+        chunk.metadata["chunk_index"] = chunk_index
+        if chunk.metadata.get("file_name"):
+            chunk.metadata["origin_file"] = chunk.metadata["file_name"]
+    return chunks
+
+
+def _chunk_file_safe(chunker: "BaseChunker", file_path: Path) -> Tuple[List[Document], Optional[str]]:
+    """Fragmenta un archivo capturando el error (se ejecuta en los procesos del pool)."""
+    try:
+        return chunker.chunk_file(file_path), None
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
+
 
 class BaseChunker(ABC):
     """Clase base abstracta para todos los chunkers."""
 
-    def __init__(self, chunk_params: Dict[str, Any]):
+    def __init__(self, chunk_params: Dict[str, Any], workers: Optional[int] = CHUNKING_CONFIG["workers"]):
         """
         Inicializa el chunker con parámetros específicos.
 
         Args:
             chunk_params: Parámetros de configuración para el chunking
+            workers: Procesos para fragmentar en paralelo (None = os.cpu_count(), 1 = sin pool)
         """
         self.chunk_params = chunk_params
+        self.workers = workers
+        # Archivos que no se pudieron fragmentar en la última ejecución
+        self.failures: List[Dict[str, str]] = []
 
     @abstractmethod
+    def chunk_text(self, content: str, metadata: Dict[str, Any]) -> List[Document]:
+        """
+        Fragmenta el contenido de un archivo ya leído.
+
+        Args:
+            content: Texto del archivo
+            metadata: Metadata base de los chunks (p.ej. file_name)
+
+        Returns:
+            Chunks del texto, en orden, con metadata["start_index"] y
+            metadata["chunk_index"] (ver add_chunk_positions)
+        """
+        pass
+
+    def chunk_file(self, file_path: Path) -> List[Document]:
+        """
+        Fragmenta un archivo de texto.
+
+        Args:
+            file_path: Archivo a procesar
+
+        Returns:
+            Chunks del archivo, en orden
+        """
+        content, metadata = self.read_file(file_path)
+        return self.chunk_text(content, metadata)
+
+    def iter_chunks(self, txt_files: List[Path], workers: Optional[int] = None) -> Iterator[Document]:
+        """
+        Genera los chunks de los archivos a medida que se producen.
+
+        Los archivos se reparten entre procesos, pero los chunks se emiten en
+        el orden de txt_files. Solo hay unos pocos archivos en vuelo por
+        proceso, de modo que la memoria no crece con el tamaño del corpus.
+        Los archivos que fallan se registran en self.failures y se omiten.
+
+        Args:
+            txt_files: Archivos de texto a procesar
+            workers: Procesos a usar (por defecto self.workers)
+
+        Yields:
+            Chunks (Document) en orden de archivo
+        """
+        self.failures = []
+        txt_files = list(txt_files)
+        workers = workers or self.workers or os.cpu_count() or 1
+        workers = min(workers, len(txt_files))
+
+        if workers <= 1:
+            for file_path in txt_files:
+                chunks, error = _chunk_file_safe(self, file_path)
+                yield from self._handle_result(file_path, chunks, error)
+            self._report_failures()
+            return
+
+        max_pending = workers * CHUNKING_CONFIG["max_pending_per_worker"]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            files = iter(txt_files)
+            for file_path in files:
+                pending.append((file_path, executor.submit(_chunk_file_safe, self, file_path)))
+                if len(pending) >= max_pending:
+                    break
+            while pending:
+                file_path, future = pending.popleft()
+                next_file = next(files, None)
+                if next_file is not None:
+                    pending.append((next_file, executor.submit(_chunk_file_safe, self, next_file)))
+                chunks, error = future.result()
+                yield from self._handle_result(file_path, chunks, error)
+        self._report_failures()
+
+    def _handle_result(self, file_path: Path, chunks: List[Document], error: Optional[str]) -> List[Document]:
+        if error is not None:
+            self.failures.append({"file": str(file_path), "error": error})
+            print(f"❌ No se pudo fragmentar {file_path.name}: {error}")
+        return chunks
+
+    def _report_failures(self) -> None:
+        if self.failures:
+            print(f"⚠️  {len(self.failures)} archivos no se pudieron fragmentar (ver chunker.failures)")
+
     def chunk_files(self, txt_files: List[Path]) -> List[Any]:
         """
         Fragmenta archivos de texto en chunks.
@@ -37,14 +172,20 @@ class BaseChunker(ABC):
         Returns:
             Lista de chunks generados
         """
-        pass
+        return list(self.iter_chunks(txt_files))
+
+    @staticmethod
+    def read_file(file_path: Path) -> Tuple[str, Dict[str, Any]]:
+        """Lee un archivo y arma la metadata base de sus chunks."""
+        with open(file_path, 'rt', encoding='utf-8') as f:
+            return f.read(), {"file_name": str(file_path.name)}
 
 
 class CharacterChunker(BaseChunker):
     """Chunker que divide texto por caracteres."""
 
-    def chunk_files(self, txt_files: List[Path]) -> List[Any]:
-        """Fragmenta archivos usando división por caracteres."""
+    def chunk_text(self, content: str, metadata: Dict[str, Any]) -> List[Document]:
+        """Fragmenta un texto usando división por caracteres."""
         text_splitter = CharacterTextSplitter(
             separator="",
             chunk_size=self.chunk_params['chunk_char_size'],
@@ -52,17 +193,10 @@ class CharacterChunker(BaseChunker):
             length_function=len,
             is_separator_regex=False,
             strip_whitespace=True,
+            add_start_index=True,
         )
 
-        texts = []
-        metadatas = []
-        for file_path in txt_files:
-            with open(file_path, 'rt', encoding='utf-8') as f:
-                content = f.read()
-                texts.append(content)
-                metadatas.append({"file_name": str(file_path.name)})
-
-        return text_splitter.create_documents(texts, metadatas=metadatas)
+        return add_chunk_positions(content, text_splitter.create_documents([content], metadatas=[metadata]))
 
 
 class RecursiveCharacterChunker(BaseChunker):
@@ -70,7 +204,12 @@ class RecursiveCharacterChunker(BaseChunker):
 
     def chunk_files(self, txt_files: List[Path]) -> List[Any]:
         """Fragmenta archivos usando división recursiva por caracteres."""
-        
+        chunk_size, chunk_overlap = self._chunk_sizes()
+        print(f"Chunk size to be used: {chunk_size}")
+        print(f"Chunk overlap to be used: {chunk_overlap}")
+        return super().chunk_files(txt_files)
+
+    def _chunk_sizes(self) -> Tuple[int, int]:
         try:
             chunk_size = self.chunk_params['chunk_char_size']
         except KeyError:
@@ -79,9 +218,11 @@ class RecursiveCharacterChunker(BaseChunker):
             chunk_overlap = self.chunk_params['chunk_overlap']
         except KeyError:
             chunk_overlap = 200
+        return chunk_size, chunk_overlap
 
-        print(f"Chunk size to be used: {chunk_size}")
-        print(f"Chunk overlap to be used: {chunk_overlap}")
+    def chunk_text(self, content: str, metadata: Dict[str, Any]) -> List[Document]:
+        """Fragmenta un texto usando división recursiva por caracteres."""
+        chunk_size, chunk_overlap = self._chunk_sizes()
 
         text_splitter = RecursiveCharacterTextSplitter(
             separators=["\n\n", "\n", " ", ""],
@@ -89,17 +230,10 @@ class RecursiveCharacterChunker(BaseChunker):
             chunk_overlap=chunk_overlap,
             length_function=len,
             is_separator_regex=False,
+            add_start_index=True,
         )
 
-        texts = []
-        metadatas = []
-        for file_path in txt_files:
-            with open(file_path, 'rt', encoding='utf-8') as f:
-                content = f.read()
-                texts.append(content)
-                metadatas.append({"file_name": str(file_path.name)})
-
-        return text_splitter.create_documents(texts, metadatas=metadatas)
+        return add_chunk_positions(content, text_splitter.create_documents([content], metadatas=[metadata]))
 
 
 # class SemanticDocumentChunker(BaseChunker):
@@ -133,15 +267,15 @@ class RecursiveCharacterChunker(BaseChunker):
 class DocumentTypeChunker(BaseChunker):
     """Chunker que adapta la estrategia según el tipo de documento."""
 
-    def chunk_files(self, txt_files: List[Path]) -> List[Any]:
+    def chunk_text(self, content: str, metadata: Dict[str, Any]) -> List[Document]:
         """
-        Fragmenta archivos adaptando la estrategia según el tipo de documento.
+        Fragmenta un texto adaptando la estrategia según el tipo de documento.
 
         TODO: Implementar lógica específica por tipo de documento
         """
         # Por ahora usa chunking recursivo como fallback
-        fallback_chunker = RecursiveCharacterChunker(self.chunk_params)
-        return fallback_chunker.chunk_files(txt_files)
+        fallback_chunker = RecursiveCharacterChunker(self.chunk_params, workers=1)
+        return fallback_chunker.chunk_text(content, metadata)
 
 
 class ChunkerFactory:
@@ -155,13 +289,19 @@ class ChunkerFactory:
     }
 
     @classmethod
-    def create_chunker(cls, strategy: str, chunk_params: Dict[str, Any]) -> BaseChunker:
+    def create_chunker(
+        cls,
+        strategy: str,
+        chunk_params: Dict[str, Any],
+        workers: Optional[int] = CHUNKING_CONFIG["workers"],
+    ) -> BaseChunker:
         """
         Crea un chunker según la estrategia especificada.
 
         Args:
             strategy: Estrategia de chunking a usar
             chunk_params: Parámetros de configuración
+            workers: Procesos para fragmentar en paralelo (None = os.cpu_count(), 1 = sin pool)
 
         Returns:
             Instancia del chunker correspondiente
@@ -173,7 +313,7 @@ class ChunkerFactory:
             raise ValueError(f"Estrategia de chunking no válida: {strategy}")
 
         chunker_class = cls._chunkers[strategy]
-        return chunker_class(chunk_params)
+        return chunker_class(chunk_params, workers=workers)
 
     @classmethod
     def get_available_strategies(cls) -> List[str]:
@@ -0,0 +1,14 @@
+"""
+Generation module.
+
+Contiene utilidades para la generación de respuestas del sistema RAG.
+"""
+
+from .context_packer import ContextPacker
+from .streaming import AnswerStream, AsyncAnswerStream
+
+__all__ = [
+    "AnswerStream",
+    "AsyncAnswerStream",
+    "ContextPacker",
+]
@@ -0,0 +1,220 @@
+"""
+Armado del contexto del prompt dentro del presupuesto de tokens del LLM.
+
+Cuenta tokens con el tokenizer del LLM (o una estimación conservadora por
+caracteres si no se configura) y llena el presupuesto (num_ctx menos
+el prompt, la pregunta y la respuesta) con los documentos en orden de
+relevancia, quitando antes los tramos que ya aportó otro chunk del mismo
+archivo de origen (el overlap del chunking): con metadata["start_index"] por
+intervalos de caracteres del origin_file y, si los chunks no traen offsets, por
+coincidencia de prefijo/sufijo del texto. Así el prompt no excede la
+ventana (Ollama lo truncaría sin avisar) ni repite texto en el prefill.
+"""
+
+import math
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from greenpeace_rag.prompts.rag_prompts import RAG_SYSTEM_PROMPT
+from greenpeace_rag.utils.chunk_ids import get_origin_file
+from greenpeace_rag.utils.config import CONTEXT_PACKING_CONFIG
+
+# Separa los tramos no contiguos que quedan de un chunk al quitar el overlap
+_GAP_MARKER = " […] "
+
+
+def _uncovered_spans(start: int, end: int, covered: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Partes de [start, end) que no cubre ningún intervalo de covered (ordenados)."""
+    spans = []
+    position = start
+    for covered_start, covered_end in covered:
+        if covered_end <= position:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > position:
+            spans.append((position, covered_start))
+        position = max(position, covered_end)
+        if position >= end:
+            break
+    if position < end:
+        spans.append((position, end))
+    return spans
+
+
+def _suffix_prefix_overlap(left: str, right: str, min_length: int) -> int:
+    """Largo del mayor sufijo de left que es prefijo de right (0 si es menor que min_length)."""
+    if min_length <= 0 or len(left) < min_length or len(right) < min_length:
+        return 0
+    probe = right[:min_length]
+    position = left.find(probe, max(0, len(left) - len(right)))
+    while position != -1:
+        if right.startswith(left[position:]):
+            return len(left) - position
+        position = left.find(probe, position + 1)
+    return 0
+
+
+class ContextPacker:
+    """
+    Arma el contexto de una pregunta sin exceder la ventana del LLM.
+
+    Uso típico:
+        packer = ContextPacker()
+        context, report = packer.pack(question, docs_with_scores)
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Inicializa el packer. El tokenizer se carga en el primer armado.
+
+        Args:
+            config: Configuración del armado (ver CONTEXT_PACKING_CONFIG)
+        """
+        self.config = {**CONTEXT_PACKING_CONFIG, **(config or {})}
+        self._counter: Optional[Callable[[str], int]] = None
+        self._separator_tokens = 0
+        self._system_tokens = 0
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens de un texto según el tokenizer configurado (o la estimación por caracteres)."""
+        if self._counter is None:
+            self._counter = self._token_counter()
+            self._separator_tokens = self._counter(self.config["separator"])
+            self._system_tokens = self._counter(RAG_SYSTEM_PROMPT.format(context=""))
+        return self._counter(text)
+
+    def _token_counter(self) -> Callable[[str], int]:
+        """Función de conteo: tokenizer configurado o estimación conservadora por caracteres."""
+        if self.config["tokenizer"]:
+            try:
+                from tokenizers import Tokenizer
+            except ImportError as e:
+                raise ImportError("Contar tokens con 'tokenizer' necesita el paquete tokenizers: "
+                                  "pip install tokenizers") from e
+            tokenizer = Tokenizer.from_pretrained(self.config["tokenizer"])
+            return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids) if text else 0
+
+        tokens_per_char = (1 + self.config["estimate_margin"]) / self.config["chars_per_token"]
+        return lambda text: math.ceil(len(text) * tokens_per_char)
+
+    def budget(self, question: str) -> int:
+        """Tokens disponibles para el contexto de una pregunta."""
+        question_tokens = self.count_tokens(question)
+        used = (self._system_tokens + question_tokens
+                + self.config["template_tokens"] + self.config["answer_tokens"])
+        return max(0, self.config["num_ctx"] - used)
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Prefijo más largo de text (cortado en un espacio) que entra en max_tokens."""
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count_tokens(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        cut = text.rfind(" ", 0, low) if low < len(text) else low
+        return text[:cut if cut > 0 else low].rstrip()
+
+    def _strip_overlap(
+        self,
+        doc: Any,
+        covered: Dict[str, List[Tuple[int, int]]],
+        packed_texts: Dict[str, List[str]],
+    ) -> Tuple[str, Optional[Tuple[int, int]]]:
+        """
+        Texto del documento que no aportó ya otro chunk del mismo archivo de origen.
+
+        Returns:
+            Tupla (texto nuevo, intervalo de caracteres del chunk en su archivo de origen o None)
+        """
+        text = doc.page_content
+        file_name = get_origin_file(doc.metadata)
+        if not file_name:
+            return text, None
+
+        start = doc.metadata.get("start_index")
+        if start is not None and start >= 0:
+            span = (int(start), int(start) + len(text))
+            pieces = _uncovered_spans(*span, sorted(covered[file_name]))
+            return _GAP_MARKER.join(text[s - span[0]:e - span[0]].strip() for s, e in pieces), span
+
+        min_overlap = self.config["min_overlap_chars"]
+        head = tail = 0
+        for packed in packed_texts[file_name]:
+            if text in packed:
+                return "", None
+            head = max(head, _suffix_prefix_overlap(packed, text, min_overlap))
+            tail = max(tail, _suffix_prefix_overlap(text, packed, min_overlap))
+        if head + tail >= len(text):
+            return "", None
+        return text[head:len(text) - tail].strip(), None
+
+    def pack(self, question: str, docs_with_scores: Sequence[Tuple[Any, float]]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Arma el contexto con los documentos en orden de relevancia.
+
+        Cada documento aporta solo el texto que no repite otro ya incluido
+        del mismo archivo. Si un documento no entra, se recorta cuando el
+        resto del presupuesto alcanza min_fragment_tokens (y se termina) o
+        se descarta y se prueba con el siguiente.
+
+        Args:
+            question: Pregunta (cuenta para el presupuesto)
+            docs_with_scores: Documentos recuperados, de más a menos relevante
+
+        Returns:
+            Tupla (contexto, reporte) con docs, packed_docs, duplicate_docs,
+            dropped_docs, truncated, overlap_chars_removed, budget_tokens,
+            naive_tokens (contexto sin armar, uniendo chunks enteros),
+            context_tokens y saved_tokens (naive_tokens - context_tokens)
+        """
+        budget = self.budget(question)
+        separator = self.config["separator"]
+        covered: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        packed_texts: Dict[str, List[str]] = defaultdict(list)
+        blocks: List[str] = []
+        used = naive = 0
+        report = {"docs": len(docs_with_scores), "packed_docs": 0, "duplicate_docs": 0,
+                  "dropped_docs": 0, "truncated": False, "overlap_chars_removed": 0}
+
+        for position, (doc, _) in enumerate(docs_with_scores):
+            naive += self.count_tokens(doc.page_content) + (self._separator_tokens if position else 0)
+            if report["truncated"]:
+                report["dropped_docs"] += 1
+                continue
+
+            text, span = self._strip_overlap(doc, covered, packed_texts)
+            report["overlap_chars_removed"] += max(0, len(doc.page_content) - len(text))
+            if not text:
+                report["duplicate_docs"] += 1
+                continue
+
+            separator_tokens = self._separator_tokens if blocks else 0
+            tokens = self.count_tokens(text) + separator_tokens
+            if used + tokens > budget:
+                remaining = budget - used - separator_tokens
+                if remaining < self.config["min_fragment_tokens"]:
+                    report["dropped_docs"] += 1
+                    continue
+                text = self._truncate(text, remaining)
+                tokens = self.count_tokens(text) + separator_tokens
+                report["truncated"] = True
+
+            blocks.append(text)
+            used += tokens
+            report["packed_docs"] += 1
+            file_name = get_origin_file(doc.metadata)
+            if span is not None:
+                covered[file_name].append(span)
+            elif file_name:
+                packed_texts[file_name].append(doc.page_content)
+
+        report.update({
+            "budget_tokens": budget,
+            "naive_tokens": naive,
+            "context_tokens": used,
+            "saved_tokens": naive - used,
+        })
+        return separator.join(blocks), report
@@ -0,0 +1,137 @@
+"""
+Respuestas en streaming para el sistema RAG.
+
+Envuelve el stream de tokens del LLM y mide time-to-first-token (TTFT) y
+tokens por segundo de cada respuesta.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+# (métricas, respuesta completa) -> None
+OnComplete = Callable[[Dict[str, Any], str], None]
+
+
+class _BaseAnswerStream:
+    """Estado y métricas compartidos por los streams sync y async."""
+
+    def __init__(
+        self,
+        docs_with_scores: List[Tuple[Any, float]],
+        context: str,
+        started_at: float,
+        on_complete: Optional[OnComplete] = None,
+    ):
+        """
+        Inicializa el stream.
+
+        Args:
+            docs_with_scores: Documentos recuperados (disponibles de inmediato)
+            context: Contexto usado en el prompt
+            started_at: time.perf_counter() al comenzar el request (incluye recuperación)
+            on_complete: Callback invocado con (métricas, respuesta) al terminar el stream
+        """
+        self.docs_with_scores = docs_with_scores
+        self.context = context
+        self.answer = ""
+        self.metrics: Dict[str, Any] = {}
+        self._started_at = started_at
+        self._generation_started_at = time.perf_counter()
+        self._first_token_at: Optional[float] = None
+        self._n_chunks = 0
+        self._output_tokens: Optional[int] = None
+        self._parts: List[str] = []
+        self._on_complete = on_complete
+
+    def _consume(self, chunk: Any) -> str:
+        """Registra un chunk del LLM y devuelve su texto."""
+        text = chunk if isinstance(chunk, str) else getattr(chunk, "content", "") or ""
+        usage = getattr(chunk, "usage_metadata", None)
+        if usage and usage.get("output_tokens"):
+            self._output_tokens = usage["output_tokens"]
+        if text:
+            if self._first_token_at is None:
+                self._first_token_at = time.perf_counter()
+            self._n_chunks += 1
+            self._parts.append(text)
+        return text
+
+    def _finish(self) -> None:
+        """Calcula las métricas y dispara el callback de finalización."""
+        finished_at = time.perf_counter()
+        first_token_at = self._first_token_at or finished_at
+        tokens = self._output_tokens or self._n_chunks
+        decode_time = finished_at - first_token_at
+
+        self.answer = "".join(self._parts)
+        self.metrics = {
+            "retrieval_time": self._generation_started_at - self._started_at,
+            "time_to_first_token": first_token_at - self._started_at,
+            "generation_time": finished_at - self._generation_started_at,
+            "total_time": finished_at - self._started_at,
+            "output_tokens": tokens,
+            "tokens_per_second": (tokens - 1) / decode_time if tokens > 1 and decode_time > 0 else 0.0,
+        }
+        print(
+            f"⏱️  TTFT {self.metrics['time_to_first_token']:.2f}s "
+            f"(recuperación {self.metrics['retrieval_time']:.2f}s) | "
+            f"{tokens} tokens a {self.metrics['tokens_per_second']:.1f} tok/s"
+        )
+        if self._on_complete is not None:
+            self._on_complete(self.metrics, self.answer)
+
+
+class AnswerStream(_BaseAnswerStream):
+    """
+    Respuesta en streaming (sync).
+
+    docs_with_scores y context están disponibles apenas se crea el stream;
+    iterarlo produce los fragmentos de texto de la respuesta.
+    """
+
+    def __init__(
+        self,
+        docs_with_scores: List[Tuple[Any, float]],
+        context: str,
+        chunks: Iterator[Any],
+        started_at: float,
+        on_complete: Optional[OnComplete] = None,
+    ):
+        super().__init__(docs_with_scores, context, started_at, on_complete)
+        self._chunks = chunks
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self._chunks:
+            text = self._consume(chunk)
+            if text:
+                yield text
+        self._finish()
+
+
+class AsyncAnswerStream(_BaseAnswerStream):
+    """
+    Respuesta en streaming (async).
+
+    Igual que AnswerStream pero se consume con async for. Al terminar,
+    on_complete corre en un hilo: puede escribir en los caches SQLite sin
+    bloquear el event loop.
+    """
+
+    def __init__(
+        self,
+        docs_with_scores: List[Tuple[Any, float]],
+        context: str,
+        chunks: AsyncIterator[Any],
+        started_at: float,
+        on_complete: Optional[OnComplete] = None,
+    ):
+        super().__init__(docs_with_scores, context, started_at, on_complete)
+        self._chunks = chunks
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        async for chunk in self._chunks:
+            text = self._consume(chunk)
+            if text:
+                yield text
+        await asyncio.to_thread(self._finish)
@@ -0,0 +1,22 @@
+"""
+Indexing module.
+
+Contiene la indexación incremental del corpus en el vector store.
+"""
+
+from .checkpoint import IngestionCheckpoint
+from .chunk_store import ChunkStore
+from .dedup import NearDuplicateIndex
+from .incremental import IncrementalIndexer
+from .manifest import IndexManifest
+from .pipeline import IngestionPipeline, StageCounter
+
+__all__ = [
+    "ChunkStore",
+    "IncrementalIndexer",
+    "IngestionCheckpoint",
+    "IndexManifest",
+    "IngestionPipeline",
+    "NearDuplicateIndex",
+    "StageCounter",
+]
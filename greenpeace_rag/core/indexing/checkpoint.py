@@ -0,0 +1,164 @@
+"""
+Checkpoint de ingesta para retomar indexaciones interrumpidas.
+
+Mientras se escriben chunks en el vector store, cada lote confirmado (upsert
+terminado) se agrega a un log JSONL junto al manifest: qué ids de chunks se
+escribieron de cada archivo y qué archivos quedaron completos. Si la ingesta
+se corta (OOM, proceso terminado, error de Chroma), la siguiente ejecución
+registra directamente los archivos completos y, de los demás, solo embebe y
+escribe los chunks que faltan. Como los ids son determinísticos, repetir un
+lote ya escrito es inocuo.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+class IngestionCheckpoint:
+    """
+    Progreso durable de una ingesta en curso.
+
+    Layout del log (una línea JSON por registro):
+        - cabecera: {"settings", "files": {archivo: hash}} de la ingesta
+        - lotes: {"batch", "chunk_ids": {archivo: [ids]}, "done": [archivos]}
+
+    Una línea final incompleta (corte durante la escritura) se ignora.
+    """
+
+    def __init__(self, path: str, settings: Optional[Dict[str, Any]] = None):
+        """
+        Inicializa el checkpoint (vacío).
+
+        Args:
+            path: Archivo JSONL del checkpoint
+            settings: Configuración del índice que se está construyendo
+        """
+        self.path = path
+        self.settings = settings or {}
+        self.file_hashes: Dict[str, str] = {}
+        self.batches = 0
+        self._chunk_ids: Dict[str, List[str]] = {}
+        self._done: Set[str] = set()
+
+    @classmethod
+    def load(cls, path: str, settings: Dict[str, Any]) -> "IngestionCheckpoint":
+        """
+        Carga el progreso de una ingesta anterior.
+
+        El progreso se descarta si se registró con otra configuración.
+
+        Args:
+            path: Archivo JSONL del checkpoint
+            settings: Configuración actual del índice
+
+        Returns:
+            Checkpoint cargado (vacío si no hay progreso válido)
+        """
+        checkpoint = cls(path, settings)
+        if not os.path.exists(path):
+            return checkpoint
+
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+        if not records:
+            return checkpoint
+
+        header = records[0]
+        if json.dumps(header.get("settings"), sort_keys=True, default=str) != json.dumps(
+            settings, sort_keys=True, default=str
+        ):
+            print("⚠️  Checkpoint de ingesta con otra configuración; se descarta")
+            return checkpoint
+
+        checkpoint.file_hashes = dict(header.get("files", {}))
+        for record in records[1:]:
+            checkpoint._apply(record)
+        return checkpoint
+
+    def __len__(self) -> int:
+        return len(self._chunk_ids)
+
+    @property
+    def in_progress(self) -> bool:
+        """Indica si hay una ingesta sin terminar registrada en disco."""
+        return os.path.exists(self.path)
+
+    def start(self, file_hashes: Dict[str, str]) -> None:
+        """
+        Comienza (o retoma) la ingesta de un conjunto de archivos.
+
+        Conserva el progreso de los archivos cuyo contenido no cambió y
+        reescribe el log compactado con la nueva cabecera.
+
+        Args:
+            file_hashes: Archivo -> hash de contenido de los archivos a ingresar
+        """
+        keep = {name for name, file_hash in file_hashes.items() if self.file_hashes.get(name) == file_hash}
+        self._chunk_ids = {name: ids for name, ids in self._chunk_ids.items() if name in keep}
+        self._done &= keep
+        self.file_hashes = dict(file_hashes)
+
+        resumed = [{"batch": self.batches, "chunk_ids": self._chunk_ids, "done": sorted(self._done)}]
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in [{"settings": self.settings, "files": self.file_hashes}] + resumed:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        if self._chunk_ids:
+            print(
+                f"⏯️  Retomando ingesta interrumpida: {len(self._done)} archivos completos, "
+                f"{sum(len(ids) for ids in self._chunk_ids.values())} chunks ya escritos "
+                f"({self.batches} lotes)"
+            )
+
+    def record_batch(self, chunk_ids_by_file: Dict[str, List[str]], done: Iterable[str] = ()) -> None:
+        """
+        Registra un lote confirmado en el vector store.
+
+        Args:
+            chunk_ids_by_file: Ids escritos en el lote, por archivo
+            done: Archivos cuyos chunks quedaron todos escritos
+        """
+        record = {"batch": self.batches + 1, "chunk_ids": chunk_ids_by_file, "done": sorted(done)}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(record)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        for name, ids in record.get("chunk_ids", {}).items():
+            known = self._chunk_ids.setdefault(name, [])
+            seen = set(known)
+            known.extend(chunk_id for chunk_id in ids if chunk_id not in seen)
+        self._done.update(record.get("done", []))
+        self.batches = max(self.batches, int(record.get("batch", 0)))
+
+    def committed_ids(self, name: str) -> List[str]:
+        """Ids de chunks del archivo ya escritos en el vector store."""
+        return list(self._chunk_ids.get(name, []))
+
+    def is_done(self, name: str) -> bool:
+        """Indica si todos los chunks del archivo ya se escribieron."""
+        return name in self._done
+
+    def clear(self) -> None:
+        """Elimina el checkpoint (la ingesta terminó)."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.file_hashes = {}
+        self.batches = 0
+        self._chunk_ids = {}
+        self._done = set()
@@ -0,0 +1,88 @@
+"""
+Persistencia de chunks generados.
+
+Los chunks del corpus se guardan una sola vez (registros JSONL indexados por
+offsets) bajo una clave derivada de los hashes de los archivos y de la
+configuración de chunking. Mientras el corpus y los parámetros no cambien,
+los chunks se cargan desde disco sin volver a leer ni fragmentar los .txt.
+"""
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.documents import Document
+
+from greenpeace_rag.utils.record_store import RecordStore, write_records
+
+_META_FILE = "chunks_meta.json"
+
+
+class ChunkStore:
+    """Chunks persistidos por clave (corpus + configuración de chunking)."""
+
+    def __init__(self, directory: str):
+        """
+        Inicializa el almacenamiento.
+
+        Args:
+            directory: Directorio base (una subcarpeta por clave)
+        """
+        self.directory = Path(directory)
+
+    @staticmethod
+    def make_key(file_hashes: Dict[str, str], chunk_settings: Dict[str, Any]) -> str:
+        """
+        Clave de los chunks de un corpus.
+
+        Args:
+            file_hashes: Archivo -> hash de contenido
+            chunk_settings: Estrategia y parámetros de chunking
+
+        Returns:
+            Clave hexadecimal
+        """
+        raw = json.dumps({"files": file_hashes, "settings": chunk_settings}, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def exists(self, key: str) -> bool:
+        """Indica si hay chunks persistidos para la clave."""
+        return (self.directory / key / _META_FILE).exists()
+
+    def save(self, key: str, chunks: Sequence[Document]) -> None:
+        """
+        Persiste los chunks bajo la clave, descartando las versiones anteriores.
+
+        Args:
+            key: Clave (ver make_key)
+            chunks: Chunks a guardar
+        """
+        if self.directory.exists():
+            for previous in self.directory.iterdir():
+                if previous.is_dir() and previous.name != key:
+                    shutil.rmtree(previous, ignore_errors=True)
+
+        path = self.directory / key
+        write_records(str(path), ({"text": chunk.page_content, "metadata": chunk.metadata} for chunk in chunks))
+        with open(path / _META_FILE, "w", encoding="utf-8") as f:
+            json.dump({"n_chunks": len(chunks)}, f)
+        print(f"💾 {len(chunks)} chunks guardados en {path}")
+
+    def load(self, key: str) -> List[Document]:
+        """
+        Carga los chunks persistidos bajo la clave.
+
+        Args:
+            key: Clave (ver make_key)
+
+        Returns:
+            Chunks en el orden en que se guardaron
+        """
+        records = RecordStore(str(self.directory / key))
+        try:
+            return [Document(page_content=record["text"], metadata=record.get("metadata") or {})
+                    for record in records]
+        finally:
+            records.close()
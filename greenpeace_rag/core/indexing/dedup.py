@@ -0,0 +1,394 @@
+"""
+Eliminación de chunks casi duplicados en la ingesta (MinHash + LSH).
+
+El corpus tiene comunicados reimpresos y párrafos repetidos entre archivos,
+y el solapamiento del splitter genera vecinos casi idénticos. Cada chunk se
+resume en una firma MinHash de sus shingles de caracteres (calculada con
+NumPy para lotes de chunks) y se busca en un índice LSH por bandas de los
+chunks canónicos ya indexados. Si alguno tiene similitud de Jaccard estimada
+>= threshold, el chunk nuevo se descarta y su archivo se agrega a
+metadata["sources"] del canónico; si no, el chunk pasa a ser canónico.
+
+El índice se guarda junto al manifest. Los buckets LSH de los chunks
+cargados de disco se buscan con arrays ordenados (searchsorted) y los de
+los chunks agregados en la sesión con un diccionario.
+"""
+
+import json
+import os
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from numpy.lib.stride_tricks import sliding_window_view
+
+from greenpeace_rag.utils.config import DEDUP_CONFIG
+
+_SIGNATURES_FILE = "signatures.npy"
+_INDEX_FILE = "index.json"
+# Primo de Mersenne 2^31 - 1 para el hash polinomial de los shingles
+_PRIME = np.uint64((1 << 31) - 1)
+_SHINGLE_BASE = np.uint64(1_000_003)
+# Shingles por bloque de la reducción MinHash (acota la matriz shingles x permutaciones)
+_BLOCK_SHINGLES = 1 << 15
+
+
+@lru_cache(maxsize=8)
+def _shingle_powers(shingle_size: int) -> np.ndarray:
+    return np.array(
+        [pow(int(_SHINGLE_BASE), shingle_size - 1 - j, int(_PRIME)) for j in range(shingle_size)], dtype=np.uint64
+    )
+
+
+def shingle_hashes(text: str, shingle_size: int) -> np.ndarray:
+    """
+    Hashes únicos de los shingles de caracteres del texto normalizado.
+
+    Args:
+        text: Texto del chunk
+        shingle_size: Caracteres por shingle
+
+    Returns:
+        Array uint64 de hashes (< 2^31)
+    """
+    normalized = " ".join(text.lower().split())
+    codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < shingle_size:
+        codes = np.pad(codes, (0, shingle_size - len(codes)))
+    powers = _shingle_powers(shingle_size)
+    # Hash polinomial de cada ventana (códigos < 2^21, potencias < 2^31: sin desborde)
+    return np.unique((sliding_window_view(codes, shingle_size) * powers).sum(axis=1) % _PRIME)
+
+
+class NearDuplicateIndex:
+    """
+    Índice MinHash/LSH de los chunks canónicos del vector store.
+
+    Layout en disco (directorio):
+        - signatures.npy: firmas (n x num_perm, uint32)
+        - index.json: {"config", "ids", "sources": [[archivos]]} en el orden de las firmas
+    """
+
+    def __init__(self, path: str, config: Optional[Dict[str, Any]] = None):
+        """
+        Inicializa el índice (vacío).
+
+        Args:
+            path: Directorio del índice
+            config: num_perm, bands, threshold y shingle_size (ver DEDUP_CONFIG)
+        """
+        self.path = Path(path)
+        self.config = {**DEDUP_CONFIG, **(config or {})}
+        self.num_perm = int(self.config["num_perm"])
+        self.bands = int(self.config["bands"])
+        if self.num_perm % self.bands:
+            raise ValueError(f"num_perm ({self.num_perm}) debe ser múltiplo de bands ({self.bands})")
+        self.rows_per_band = self.num_perm // self.bands
+        self.threshold = float(self.config["threshold"])
+        self.shingle_size = int(self.config["shingle_size"])
+
+        rng = np.random.default_rng(int(self.config["seed"]))
+        # Hash multiply-shift por permutación: ((a * x + b) mod 2^64) >> 32, con a impar
+        self._a = rng.integers(0, 1 << 32, size=self.num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 1 << 32, size=self.num_perm, dtype=np.uint64)
+        self._band_weights = rng.integers(1, 1 << 62, size=self.rows_per_band, dtype=np.uint64)
+
+        self.ids: List[str] = []
+        self.sources: List[List[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._live: List[bool] = []
+        self._signatures = np.empty((0, self.num_perm), dtype=np.uint32)
+        self._pending_signatures: List[np.ndarray] = []
+        # Buckets de las filas cargadas de disco: por banda, claves ordenadas y sus filas
+        self._base_sorted_keys: List[np.ndarray] = []
+        self._base_sorted_rows: List[np.ndarray] = []
+        # Buckets de las filas agregadas en la sesión
+        self._buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        # Canónicos cuyas fuentes cambiaron después de escribirse en el vector store
+        self._dirty: Set[str] = set()
+        self.stats = {"chunks_seen": 0, "duplicates_dropped": 0, "text_bytes_saved": 0}
+
+    @classmethod
+    def load(cls, path: str, config: Optional[Dict[str, Any]] = None) -> "NearDuplicateIndex":
+        """
+        Carga el índice guardado (vacío si no existe o se creó con otra configuración).
+
+        Args:
+            path: Directorio del índice
+            config: Configuración actual (ver DEDUP_CONFIG)
+
+        Returns:
+            Índice cargado
+        """
+        index = cls(path, config)
+        index_path = index.path / _INDEX_FILE
+        if not index_path.exists() or not (index.path / _SIGNATURES_FILE).exists():
+            return index
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if json.dumps(data.get("config"), sort_keys=True) != json.dumps(index.config, sort_keys=True):
+            print("⚠️  Índice de duplicados con otra configuración; se descarta")
+            return index
+        signatures = np.load(index.path / _SIGNATURES_FILE)
+        index.ids = list(data["ids"])
+        index.sources = [list(sources) for sources in data["sources"]]
+        index._rows = {chunk_id: row for row, chunk_id in enumerate(index.ids)}
+        index._live = [True] * len(index.ids)
+        index._signatures = signatures
+        keys = index._band_keys(signatures)
+        for band in range(index.bands):
+            order = np.argsort(keys[:, band], kind="stable")
+            index._base_sorted_keys.append(keys[order, band])
+            index._base_sorted_rows.append(order)
+        return index
+
+    def save(self) -> None:
+        """Guarda los canónicos vigentes de forma atómica."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        live = [row for row, alive in enumerate(self._live) if alive]
+        signatures = self._all_signatures()[live] if live else np.empty((0, self.num_perm), dtype=np.uint32)
+        tmp_signatures = self.path / f"{_SIGNATURES_FILE}.tmp"
+        with open(tmp_signatures, "wb") as f:
+            np.save(f, signatures)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_index = self.path / f"{_INDEX_FILE}.tmp"
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "config": self.config,
+                    "ids": [self.ids[row] for row in live],
+                    "sources": [self.sources[row] for row in live],
+                },
+                f,
+                ensure_ascii=False,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_signatures, self.path / _SIGNATURES_FILE)
+        os.replace(tmp_index, self.path / _INDEX_FILE)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._rows
+
+    # ---------- Firmas ----------
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Firmas MinHash de varios textos.
+
+        Los shingles de todos los textos se concatenan y el mínimo por texto
+        de cada permutación se calcula por bloques con np.minimum.reduceat
+        (permutaciones x shingles, para reducir sobre memoria contigua).
+
+        Args:
+            texts: Textos a firmar
+
+        Returns:
+            Firmas (n x num_perm, uint32)
+        """
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(texts):
+            hashes: List[np.ndarray] = []
+            end = start
+            total = 0
+            while end < len(texts) and (not hashes or total < _BLOCK_SHINGLES):
+                hashes.append(shingle_hashes(texts[end], self.shingle_size))
+                total += len(hashes[-1])
+                end += 1
+            offsets = np.cumsum([0] + [len(block) for block in hashes[:-1]])
+            permuted = (self._a[:, None] * np.concatenate(hashes)[None, :] + self._b[:, None]) >> np.uint64(32)
+            result[start:end] = np.minimum.reduceat(permuted, offsets, axis=1).T
+            start = end
+        return result
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Clave de cada banda (n x bands, uint64; el producto desborda a propósito como hash)."""
+        bands = signatures.astype(np.uint64).reshape(len(signatures), self.bands, self.rows_per_band)
+        with np.errstate(over="ignore"):
+            return (bands * self._band_weights).sum(axis=2)
+
+    def _all_signatures(self) -> np.ndarray:
+        if self._pending_signatures:
+            self._signatures = np.concatenate([self._signatures, np.stack(self._pending_signatures)])
+            self._pending_signatures = []
+        return self._signatures
+
+    def _candidates(self, keys: np.ndarray) -> Set[int]:
+        """Filas vigentes que comparten al menos una banda con las claves."""
+        rows: Set[int] = set()
+        for band, key in enumerate(keys.tolist()):
+            if self._base_sorted_keys:
+                sorted_keys = self._base_sorted_keys[band]
+                low = np.searchsorted(sorted_keys, key, side="left")
+                high = np.searchsorted(sorted_keys, key, side="right")
+                rows.update(self._base_sorted_rows[band][low:high].tolist())
+            rows.update(self._buckets.get((band, key), ()))
+        return {row for row in rows if self._live[row]}
+
+    def _add_canonical(self, chunk_id: str, signature: np.ndarray, keys: np.ndarray, sources: List[str]) -> int:
+        row = len(self.ids)
+        self.ids.append(chunk_id)
+        self.sources.append(list(sources))
+        self._live.append(True)
+        self._rows[chunk_id] = row
+        self._pending_signatures.append(signature)
+        for band, key in enumerate(keys.tolist()):
+            self._buckets[(band, key)].append(row)
+        return row
+
+    # ---------- Deduplicación ----------
+
+    def filter(self, chunks: Sequence[Document]) -> List[int]:
+        """
+        Descarta los chunks casi duplicados de un canónico y registra los nuevos canónicos.
+
+        Los chunks deben tener metadata["chunk_id"] (ver IncrementalIndexer.assign_chunk_ids).
+        Los canónicos nuevos quedan con metadata["sources"]; los que ya
+        estaban escritos y suman una fuente quedan pendientes de actualizar
+        (ver pop_dirty).
+
+        Args:
+            chunks: Chunks en orden de ingesta
+
+        Returns:
+            Posiciones de los chunks a escribir
+        """
+        if not chunks:
+            return []
+        signatures = self.signatures([chunk.page_content for chunk in chunks])
+        keys = self._band_keys(signatures)
+        kept: List[int] = []
+        created: Dict[int, Document] = {}
+        for index, chunk in enumerate(chunks):
+            self.stats["chunks_seen"] += 1
+            chunk_id = chunk.metadata["chunk_id"]
+            file_name = chunk.metadata.get("file_name", "")
+            row = self._rows.get(chunk_id)
+            if row is None:
+                row = self._best_match(signatures[index], keys[index])
+                if row is None:
+                    row = self._add_canonical(chunk_id, signatures[index], keys[index], [file_name])
+                    created[row] = chunk
+                    kept.append(index)
+                    continue
+                self.stats["duplicates_dropped"] += 1
+                self.stats["text_bytes_saved"] += len(chunk.page_content.encode("utf-8"))
+            else:
+                # Mismo id ya canónico (p.ej. una ingesta retomada): se vuelve a escribir
+                kept.append(index)
+            if file_name not in self.sources[row]:
+                self.sources[row].append(file_name)
+                if row not in created:
+                    self._dirty.add(self.ids[row])
+            if row not in created and chunk.metadata.get("chunk_id") == self.ids[row]:
+                chunk.metadata["sources"] = list(self.sources[row])
+                if self.sources[row][0] != file_name:
+                    # Se reescribe desde un archivo que no es el dueño: se corrige al final
+                    self._dirty.add(self.ids[row])
+        for row, chunk in created.items():
+            chunk.metadata["sources"] = list(self.sources[row])
+        return kept
+
+    def _best_match(self, signature: np.ndarray, keys: np.ndarray) -> Optional[int]:
+        """Canónico con mayor Jaccard estimada, si alcanza el umbral."""
+        candidates = sorted(self._candidates(keys))
+        if not candidates:
+            return None
+        similarity = (self._all_signatures()[candidates] == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        return candidates[best] if similarity[best] >= self.threshold else None
+
+    def add_existing(self, documents: Iterable[Document]) -> None:
+        """
+        Registra como canónicos chunks que ya están en el vector store.
+
+        Args:
+            documents: Documentos con id (o metadata["chunk_id"]) y metadata["sources"]
+        """
+        documents = [doc for doc in documents if (doc.id or doc.metadata.get("chunk_id")) not in self._rows]
+        if not documents:
+            return
+        signatures = self.signatures([doc.page_content for doc in documents])
+        keys = self._band_keys(signatures)
+        for doc, signature, doc_keys in zip(documents, signatures, keys):
+            sources = doc.metadata.get("sources") or [doc.metadata.get("file_name", "")]
+            self._add_canonical(doc.id or doc.metadata["chunk_id"], signature, doc_keys, list(sources))
+
+    def retain(self, chunk_ids: Set[str]) -> None:
+        """Descarta los canónicos que no están en chunk_ids (p.ej. los que no llegó a registrar el manifest)."""
+        for chunk_id in [chunk_id for chunk_id in self._rows if chunk_id not in chunk_ids]:
+            self._drop(chunk_id)
+
+    def _drop(self, chunk_id: str) -> None:
+        row = self._rows.pop(chunk_id)
+        self._live[row] = False
+        self._dirty.discard(chunk_id)
+
+    def remove_sources(self, file_names: Iterable[str]) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Quita archivos de las fuentes de los canónicos.
+
+        Args:
+            file_names: Archivos eliminados o a reindexar
+
+        Returns:
+            Tupla (canónicos sin fuentes, que se eliminan; canónico -> nuevo
+            archivo dueño, para los que perdieron su archivo original pero
+            siguen presentes en otros)
+        """
+        removed = set(file_names)
+        if not removed:
+            return [], {}
+        deleted: List[str] = []
+        transferred: Dict[str, str] = {}
+        for chunk_id, row in list(self._rows.items()):
+            sources = self.sources[row]
+            if not removed.intersection(sources):
+                continue
+            owner = sources[0]
+            remaining = [name for name in sources if name not in removed]
+            self.sources[row] = remaining
+            if not remaining:
+                deleted.append(chunk_id)
+                self._drop(chunk_id)
+                continue
+            if owner in removed:
+                transferred[chunk_id] = remaining[0]
+            self._dirty.add(chunk_id)
+        return deleted, transferred
+
+    def pop_dirty(self) -> Dict[str, List[str]]:
+        """Canónicos escritos cuyas fuentes cambiaron -> fuentes actuales (y limpia la lista)."""
+        dirty = {chunk_id: list(self.sources[self._rows[chunk_id]]) for chunk_id in self._dirty if chunk_id in self._rows}
+        self._dirty = set()
+        return dirty
+
+    def report(self, k: int = 3) -> Dict[str, Any]:
+        """
+        Ahorro de la deduplicación en la última ingesta.
+
+        Args:
+            k: Documentos recuperados por consulta (para estimar llamadas al filtro LLM)
+
+        Returns:
+            Chunks vistos y descartados, fracción del índice ahorrada (chunks,
+            embeddings y texto), bytes de texto ahorrados y llamadas al filtro
+            LLM ahorradas por consulta, estimadas suponiendo que los duplicados
+            se habrían recuperado con la misma frecuencia que el resto
+        """
+        seen = self.stats["chunks_seen"]
+        ratio = self.stats["duplicates_dropped"] / seen if seen else 0.0
+        return {
+            **self.stats,
+            "canonical_chunks": len(self),
+            "index_saved_ratio": round(ratio, 4),
+            "filter_calls_saved_per_query": round(k * ratio, 3),
+        }
@@ -0,0 +1,425 @@
+"""
+Indexación incremental del corpus en el vector store.
+
+Compara los archivos del corpus contra el IndexManifest y solo vuelve a
+fragmentar y embeber los archivos nuevos o modificados; los chunks de los
+archivos eliminados (o de versiones anteriores de los modificados) se borran
+del vector store por id.
+
+Los chunks se escriben con upsert y embeddings explícitos: se reutilizan
+vectores ya calculados cuando los hay, y el encode del lote siguiente se
+solapa con el upsert del lote actual. Con un IngestionCheckpoint, cada lote
+confirmado queda registrado y una sincronización interrumpida se retoma
+desde el último lote escrito.
+
+Con un NearDuplicateIndex, los chunks casi duplicados de un chunk ya indexado
+no se escriben: el canónico registra todos sus archivos en metadata["sources"]
+y sobrevive mientras quede alguno de ellos en el corpus.
+"""
+
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from greenpeace_rag.utils.chunk_ids import get_origin_file, make_chunk_id
+
+from ..chunking import BaseChunker
+from .checkpoint import IngestionCheckpoint
+from .dedup import NearDuplicateIndex
+from .manifest import IndexManifest
+
+DEFAULT_MAX_BATCH_SIZE = 5000
+
+
+def get_max_batch_size(vector_store: VectorStore, default: int = DEFAULT_MAX_BATCH_SIZE) -> int:
+    """
+    Tamaño máximo de lote que acepta el vector store.
+
+    Args:
+        vector_store: Backend de vector store (ver core.vectorstores)
+        default: Valor a usar si el backend no lo informa
+
+    Returns:
+        Máximo de registros por upsert/delete
+    """
+    try:
+        return int(vector_store.get_max_batch_size())  # type: ignore[attr-defined]
+    except Exception:
+        return default
+
+
+class IncrementalIndexer:
+    """
+    Sincroniza el vector store con el corpus usando el manifest.
+
+    Los chunks se agregan con ids determinísticos (archivo + contenido), de
+    modo que el manifest puede borrarlos luego sin consultar la colección.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        chunker: BaseChunker,
+        manifest: IndexManifest,
+        batch_size: Optional[int] = None,
+        checkpoint: Optional[IngestionCheckpoint] = None,
+        deduplicator: Optional[NearDuplicateIndex] = None,
+    ):
+        """
+        Inicializa el indexador.
+
+        Args:
+            vector_store: Vector store a sincronizar
+            chunker: Chunker para los archivos nuevos o modificados
+            manifest: Manifest del índice actual
+            batch_size: Tamaño de lote para upsert y delete (por defecto el máximo que informa el backend)
+            checkpoint: Checkpoint de ingesta para retomar sincronizaciones interrumpidas (opcional)
+            deduplicator: Índice de casi duplicados de los chunks indexados (opcional)
+        """
+        self.vector_store = vector_store
+        self.chunker = chunker
+        self.manifest = manifest
+        self._batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.deduplicator = deduplicator
+        self.last_report: Dict[str, int] = {}
+
+    @property
+    def batch_size(self) -> int:
+        """Tamaño de lote para escribir en el vector store."""
+        max_batch_size = get_max_batch_size(self.vector_store)
+        return min(self._batch_size, max_batch_size) if self._batch_size else max_batch_size
+
+    def sync(
+        self,
+        txt_files: Sequence[Path],
+        chunks: Optional[List[Document]] = None,
+        embeddings: Optional[np.ndarray] = None,
+        failed_files: Optional[Set[str]] = None,
+        pipeline: Optional[Any] = None,
+    ) -> Dict[str, int]:
+        """
+        Reindexa solo los archivos nuevos o modificados y borra los eliminados.
+
+        Args:
+            txt_files: Archivos actuales del corpus
+            chunks: Chunks ya generados del corpus completo (opcional; si se
+                pasan se reutilizan en lugar de volver a fragmentar)
+            embeddings: Embeddings precalculados, una fila por chunk de `chunks` (opcional)
+            failed_files: Archivos que no se pudieron fragmentar al generar `chunks`
+            pipeline: IngestionPipeline para ingresar los archivos en streaming
+                (opcional; se usa si no se pasan `chunks`)
+
+        Returns:
+            Reporte con la cantidad de archivos y chunks por categoría
+        """
+        files_by_name = {file_path.name: file_path for file_path in txt_files}
+        # Solo se hashean los archivos cuyo tamaño o fecha de modificación cambió
+        hashes, stats = self.manifest.fingerprint(files_by_name)
+        added, modified, removed, unchanged = self.manifest.diff(hashes)
+
+        print(
+            f"🗂️  Corpus: {len(added)} nuevos, {len(modified)} modificados, "
+            f"{len(removed)} eliminados, {len(unchanged)} sin cambios"
+        )
+
+        if self.deduplicator is not None:
+            self._reconcile_deduplicator(set(self.manifest.chunk_ids()))
+
+        # Borrar chunks de archivos eliminados y de versiones anteriores de los modificados
+        stale_ids = []
+        for name in removed + modified:
+            stale_ids.extend(self.manifest.remove_file(name))
+        if self.deduplicator is not None:
+            # Los canónicos que siguen presentes en otros archivos no se borran: pasan al siguiente archivo
+            _, transferred = self.deduplicator.remove_sources(removed + modified)
+            for chunk_id, owner in transferred.items():
+                self.manifest.add_chunk_ids(owner, [chunk_id])
+            stale_ids = [chunk_id for chunk_id in stale_ids if chunk_id not in self.deduplicator]
+            self.deduplicator.save()
+        self._delete(stale_ids)
+        # Persistir el borrado antes de escribir: si la ingesta se corta, la próxima
+        # sincronización no vuelve a borrar ids que ya se reescribieron
+        self.manifest.save()
+
+        to_index = added + modified
+        to_write = to_index
+        skip_ids: Set[str] = set()
+        if self.checkpoint is not None:
+            self.checkpoint.start({name: hashes[name] for name in to_index})
+            # Archivos ya escritos por completo: solo falta registrarlos en el manifest
+            to_write = [name for name in to_index if not self.checkpoint.is_done(name)]
+            skip_ids = {chunk_id for name in to_write for chunk_id in self.checkpoint.committed_ids(name)}
+            if self.deduplicator is not None:
+                # Los chunks escritos por la ingesta interrumpida también son canónicos
+                committed = {chunk_id for name in to_index for chunk_id in self.checkpoint.committed_ids(name)}
+                self._reconcile_deduplicator(set(self.manifest.chunk_ids()) | committed)
+
+        # Fragmentar y agregar solo los archivos nuevos o modificados
+        if chunks is not None:
+            pending = set(to_write)
+            keep = [index for index, chunk in enumerate(chunks) if chunk.metadata.get("file_name") in pending]
+            new_embeddings = np.asarray(embeddings)[keep] if embeddings is not None else None
+            chunk_ids_by_file = self._add([chunks[index] for index in keep], new_embeddings, skip_ids)
+        elif pipeline is not None:
+            chunk_ids_by_file = (
+                pipeline.run([files_by_name[name] for name in to_write], skip_ids=skip_ids,
+                             on_batch_committed=self._record_batch, deduplicator=self.deduplicator)
+                if to_write else {}
+            )
+            failed_files = pipeline.failed_files
+        else:
+            new_chunks = self.chunker.chunk_files([files_by_name[name] for name in to_write]) if to_write else []
+            failed_files = {Path(failure["file"]).name for failure in self.chunker.failures}
+            chunk_ids_by_file = self._add(new_chunks, skip_ids=skip_ids)
+
+        sources_updated = 0
+        if self.deduplicator is not None:
+            sources_updated = self._update_sources(self.deduplicator.pop_dirty())
+
+        # Reorganizar el almacenamiento del backend tras las escrituras (p.ej. segmentos del backend plano)
+        if stale_ids or chunk_ids_by_file or sources_updated:
+            self.vector_store.compact()  # type: ignore[attr-defined]
+
+        # Los archivos que fallaron no se registran: se reintentan en la próxima sincronización
+        failed_files = failed_files or set()
+        for name in to_index:
+            if name in failed_files:
+                continue
+            chunk_ids = chunk_ids_by_file.get(name, [])
+            if self.checkpoint is not None:
+                # Incluye los chunks escritos por ejecuciones anteriores interrumpidas
+                chunk_ids = self.checkpoint.committed_ids(name)
+            size, mtime_ns = stats[name]
+            self.manifest.set_file(name, hashes[name], size, chunk_ids, mtime_ns=mtime_ns)
+        self.manifest.save()
+        if self.deduplicator is not None:
+            self.deduplicator.save()
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+        self.last_report = {
+            "files_added": len(added),
+            "files_modified": len(modified),
+            "files_removed": len(removed),
+            "files_unchanged": len(unchanged),
+            "files_failed": len(failed_files & set(to_index)),
+            "chunks_added": sum(len(ids) for ids in chunk_ids_by_file.values()),
+            "chunks_deleted": len(stale_ids),
+        }
+        print(
+            f"✅ Índice sincronizado: +{self.last_report['chunks_added']} chunks, "
+            f"-{self.last_report['chunks_deleted']} chunks"
+        )
+        if self.deduplicator is not None:
+            dedup_report = self.deduplicator.report()
+            self.last_report["chunks_deduplicated"] = dedup_report["duplicates_dropped"]
+            self.last_report["sources_updated"] = sources_updated
+            print(
+                f"🧬 Casi duplicados: {dedup_report['duplicates_dropped']} de {dedup_report['chunks_seen']} "
+                f"chunks descartados ({dedup_report['index_saved_ratio']:.1%} menos de índice, "
+                f"{dedup_report['text_bytes_saved'] / 2**20:.1f} MiB de texto; "
+                f"~{dedup_report['filter_calls_saved_per_query']} llamadas al filtro LLM menos por consulta con k=3)"
+            )
+        return self.last_report
+
+    @staticmethod
+    def assign_chunk_ids(chunks: List[Document]) -> List[Document]:
+        """
+        Asigna ids determinísticos (metadata["chunk_id"]) a los chunks.
+
+        Los chunks repetidos dentro de un mismo archivo comparten id; se
+        conserva solo el primero.
+
+        Args:
+            chunks: Chunks a identificar
+
+        Returns:
+            Chunks con id, sin duplicados
+        """
+        return [chunks[index] for index in IncrementalIndexer._unique_chunk_indices(chunks)]
+
+    @staticmethod
+    def _unique_chunk_indices(chunks: List[Document]) -> List[int]:
+        """Asigna metadata["chunk_id"] y devuelve las posiciones de los chunks no repetidos."""
+        seen = set()
+        unique = []
+        for index, chunk in enumerate(chunks):
+            chunk_id = make_chunk_id(chunk.metadata.get("file_name", ""), chunk.page_content)
+            if chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            chunk.metadata["chunk_id"] = chunk_id
+            unique.append(index)
+        return unique
+
+    def _add(
+        self,
+        chunks: List[Document],
+        embeddings: Optional[np.ndarray] = None,
+        skip_ids: Optional[Set[str]] = None,
+    ) -> Dict[str, List[str]]:
+        """
+        Escribe los chunks con upsert y embeddings explícitos.
+
+        Si no hay embeddings precalculados, cada lote se codifica con la
+        función de embeddings del vector store mientras el lote anterior se
+        escribe en el vector store en un hilo aparte.
+
+        Args:
+            chunks: Chunks a escribir
+            embeddings: Embeddings precalculados, una fila por chunk (opcional)
+            skip_ids: Ids ya escritos por una ingesta anterior (se omiten)
+
+        Returns:
+            Ids escritos por archivo
+        """
+        unique = self._unique_chunk_indices(chunks)
+        if self.deduplicator is not None:
+            unique = [unique[index] for index in self.deduplicator.filter([chunks[index] for index in unique])]
+        if skip_ids:
+            unique = [index for index in unique if chunks[index].metadata["chunk_id"] not in skip_ids]
+        chunks = [chunks[index] for index in unique]
+        if embeddings is not None:
+            embeddings = np.asarray(embeddings, dtype=np.float32)[unique]
+
+        chunk_ids_by_file: Dict[str, List[str]] = defaultdict(list)
+        total = len(chunks)
+        if not total:
+            return chunk_ids_by_file
+
+        batch_size = self.batch_size
+        source = "embeddings precalculados" if embeddings is not None else "encode solapado con upsert"
+        print(f"📚 Agregando {total} chunks al vector store en lotes de {batch_size} ({source})...")
+
+        # Posición del último chunk de cada archivo: al confirmarse ese lote el archivo queda completo
+        last_position = {chunk.metadata.get("file_name", ""): index for index, chunk in enumerate(chunks)}
+
+        pending: Optional[Future] = None
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for start in range(0, total, batch_size):
+                end = min(start + batch_size, total)
+                batch = chunks[start:end]
+                if embeddings is not None:
+                    vectors = embeddings[start:end].tolist()
+                else:
+                    vectors = self.vector_store.embeddings.embed_documents([chunk.page_content for chunk in batch])
+
+                # Esperar el upsert del lote anterior antes de encolar el siguiente
+                if pending is not None:
+                    pending.result()
+                done = [name for name, position in last_position.items() if start <= position < end]
+                pending = executor.submit(self._upsert, batch, vectors, start, end, done)
+
+                for chunk in batch:
+                    chunk_ids_by_file[chunk.metadata.get("file_name", "")].append(chunk.metadata["chunk_id"])
+            if pending is not None:
+                pending.result()
+        return chunk_ids_by_file
+
+    def _upsert(
+        self, batch: List[Document], vectors: List[List[float]], start: int, end: int, done: Iterable[str] = ()
+    ) -> None:
+        """Escribe un lote de chunks con sus embeddings y lo registra en el checkpoint."""
+        self.vector_store.upsert_vectors(  # type: ignore[attr-defined]
+            ids=[chunk.metadata["chunk_id"] for chunk in batch],
+            embeddings=vectors,
+            documents=[chunk.page_content for chunk in batch],
+            metadatas=[chunk.metadata for chunk in batch],
+        )
+        self._record_batch(batch, done)
+        print(f"   - Lote agregado: {start}-{end} ({end-start} docs)")
+
+    def _record_batch(self, batch: List[Document], done: Iterable[str] = ()) -> None:
+        """Registra en el checkpoint (si hay) un lote ya confirmado en el vector store."""
+        if self.checkpoint is None:
+            return
+        chunk_ids_by_file: Dict[str, List[str]] = defaultdict(list)
+        for chunk in batch:
+            chunk_ids_by_file[chunk.metadata.get("file_name", "")].append(chunk.metadata["chunk_id"])
+        self.checkpoint.record_batch(chunk_ids_by_file, done)
+
+    def _reconcile_deduplicator(self, chunk_ids: Set[str]) -> None:
+        """
+        Alinea el índice de duplicados con los chunks indexados.
+
+        Descarta los canónicos que no están en chunk_ids y agrega (leyéndolos
+        del vector store) los que falten, p.ej. si la sincronización anterior
+        se cortó antes de guardar el índice.
+        """
+        self.deduplicator.retain(chunk_ids)
+        missing = [chunk_id for chunk_id in chunk_ids if chunk_id not in self.deduplicator]
+        for start in range(0, len(missing), self.batch_size):
+            stored = self.vector_store.get(ids=missing[start:start + self.batch_size],
+                                           include=["documents", "metadatas"])
+            self.deduplicator.add_existing(
+                Document(page_content=text, metadata=metadata or {}, id=doc_id)
+                for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])
+            )
+
+    def _update_sources(self, sources_by_id: Dict[str, List[str]]) -> int:
+        """
+        Actualiza metadata["sources"] (y el archivo dueño) de canónicos ya escritos.
+
+        origin_file no se toca: start_index y chunk_index siguen refiriéndose
+        al archivo del que salió el chunk (ver add_chunk_positions).
+        """
+        ids = list(sources_by_id)
+        updated = 0
+        for start in range(0, len(ids), self.batch_size):
+            stored = self.vector_store.get(ids=ids[start:start + self.batch_size], include=["metadatas"])
+            metadatas = [
+                {**(metadata or {}), "origin_file": get_origin_file(metadata),
+                 "sources": sources_by_id[doc_id], "file_name": sources_by_id[doc_id][0]}
+                for doc_id, metadata in zip(stored["ids"], stored["metadatas"])
+            ]
+            self.vector_store.update_metadata(stored["ids"], metadatas)  # type: ignore[attr-defined]
+            updated += len(metadatas)
+        if updated:
+            print(f"🔗 Fuentes actualizadas en {updated} chunks canónicos")
+        return updated
+
+    def _delete(self, ids: List[str]) -> None:
+        """Borra chunks del vector store por id, en lotes."""
+        if not ids:
+            return
+        print(f"🧹 Eliminando {len(ids)} chunks obsoletos del vector store...")
+        for start in range(0, len(ids), self.batch_size):
+            self.vector_store.delete(ids=ids[start:start + self.batch_size])
+
+    def has_manifest(self) -> bool:
+        """Si el índice tiene manifest (uno sin archivos pero con configuración es el de una ingesta interrumpida)."""
+        return bool(len(self.manifest) or self.manifest.settings)
+
+    def full_rebuild_needed(self, settings: Dict[str, Any], existing_count: int) -> Optional[str]:
+        """
+        Indica si la indexación incremental no es posible y hace falta reconstruir.
+
+        Args:
+            settings: Configuración actual del índice
+            existing_count: Documentos que ya tiene la colección
+
+        Returns:
+            Motivo de la reconstrucción, o None si se puede indexar incrementalmente
+
+        Raises:
+            ValueError: Si la colección existe pero no tiene manifest (no se
+                sabe con qué configuración ni qué archivos se indexó, y no se
+                borra sin pedirlo). Ver has_manifest: GreenpeaceRAG abre esas
+                colecciones tal cual, como index_policy="reuse"
+        """
+        if existing_count == 0:
+            return None
+        if not self.has_manifest():
+            raise ValueError(
+                f"La colección ya tiene {existing_count} documentos pero no tiene manifest de indexación: "
+                "usar index_policy='rebuild' para reindexarla o index_policy='reuse' para usarla tal cual"
+            )
+        if not self.manifest.matches_settings(settings):
+            return "cambió la configuración de chunking o el modelo de embeddings"
+        return None
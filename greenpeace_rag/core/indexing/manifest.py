@@ -0,0 +1,168 @@
+"""
+Manifest del índice para reindexación incremental.
+
+Registra, por cada archivo del corpus, el hash de su contenido y los ids de
+los chunks que generó, junto con la configuración (estrategia y parámetros de
+chunking, modelo de embeddings) con la que se construyó el índice. Se guarda
+como JSON junto al vector store.
+
+El tamaño y la fecha de modificación de cada archivo sirven de huella rápida:
+al arrancar solo se lee y hashea el contenido de los archivos cuya huella
+cambió respecto del manifest.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+class IndexManifest:
+    """
+    Manifest archivo -> hash de contenido -> ids de chunks.
+
+    Layout del JSON:
+        - settings: configuración con la que se indexó el corpus
+        - files: {archivo: {"hash", "size", "mtime_ns", "chunk_ids"}}
+    """
+
+    def __init__(self, path: str, settings: Optional[Dict[str, Any]] = None,
+                 files: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Inicializa el manifest.
+
+        Args:
+            path: Archivo JSON del manifest
+            settings: Configuración con la que se construyó el índice
+            files: Entradas por archivo
+        """
+        self.path = path
+        self.settings = settings or {}
+        self.files: Dict[str, Dict[str, Any]] = files or {}
+
+    @classmethod
+    def load(cls, path: str) -> "IndexManifest":
+        """
+        Carga el manifest (vacío si el archivo no existe o está corrupto).
+
+        Args:
+            path: Archivo JSON del manifest
+
+        Returns:
+            Manifest cargado
+        """
+        if not os.path.exists(path):
+            return cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Manifest ilegible ({e}); se considera vacío")
+            return cls(path)
+        return cls(path, settings=data.get("settings"), files=data.get("files"))
+
+    def save(self) -> None:
+        """Guarda el manifest de forma atómica (archivo temporal + rename)."""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"settings": self.settings, "files": self.files, "updated_at": time.time()},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def hash_file(file_path: Path) -> str:
+        """SHA-256 del contenido del archivo."""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def fingerprint(self, files_by_name: Dict[str, Path]) -> Tuple[Dict[str, str], Dict[str, Tuple[int, int]]]:
+        """
+        Hash de contenido de los archivos, reutilizando el del manifest si la huella no cambió.
+
+        Las entradas cuyo contenido no cambió pero sí su huella la actualizan.
+
+        Args:
+            files_by_name: Archivo -> ruta del corpus actual
+
+        Returns:
+            Tupla (archivo -> hash, archivo -> (tamaño, mtime_ns) tomados antes de hashear)
+        """
+        hashes, stats = {}, {}
+        for name, path in files_by_name.items():
+            stat = path.stat()
+            stats[name] = (stat.st_size, stat.st_mtime_ns)
+            entry = self.files.get(name)
+            if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+                hashes[name] = entry["hash"]
+            else:
+                hashes[name] = self.hash_file(path)
+                if entry and entry["hash"] == hashes[name]:
+                    # Mismo contenido con otra huella (p.ej. touch): se actualiza para no volver a hashearlo
+                    entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        return hashes, stats
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def matches_settings(self, settings: Dict[str, Any]) -> bool:
+        """Indica si el índice se construyó con la misma configuración."""
+        return json.dumps(self.settings, sort_keys=True, default=str) == json.dumps(
+            settings, sort_keys=True, default=str
+        )
+
+    def diff(self, current_hashes: Dict[str, str]) -> Tuple[List[str], List[str], List[str], List[str]]:
+        """
+        Compara el corpus actual contra el manifest.
+
+        Args:
+            current_hashes: Archivo -> hash de contenido del corpus actual
+
+        Returns:
+            Tupla (nuevos, modificados, eliminados, sin cambios)
+        """
+        added = sorted(name for name in current_hashes if name not in self.files)
+        modified = sorted(
+            name for name, file_hash in current_hashes.items()
+            if name in self.files and self.files[name]["hash"] != file_hash
+        )
+        removed = sorted(name for name in self.files if name not in current_hashes)
+        unchanged = sorted(
+            name for name, file_hash in current_hashes.items()
+            if name in self.files and self.files[name]["hash"] == file_hash
+        )
+        return added, modified, removed, unchanged
+
+    def set_file(
+        self, name: str, file_hash: str, size: int, chunk_ids: List[str], mtime_ns: Optional[int] = None
+    ) -> None:
+        """Registra (o reemplaza) la entrada de un archivo."""
+        self.files[name] = {"hash": file_hash, "size": size, "mtime_ns": mtime_ns, "chunk_ids": list(chunk_ids)}
+
+    def add_chunk_ids(self, name: str, chunk_ids: List[str]) -> None:
+        """Agrega ids a la entrada de un archivo ya registrado (p.ej. canónicos heredados al deduplicar)."""
+        entry = self.files[name]
+        entry["chunk_ids"].extend(chunk_id for chunk_id in chunk_ids if chunk_id not in entry["chunk_ids"])
+
+    def remove_file(self, name: str) -> List[str]:
+        """Elimina la entrada de un archivo y devuelve los ids de sus chunks."""
+        entry = self.files.pop(name, None)
+        return list(entry["chunk_ids"]) if entry else []
+
+    def chunk_ids(self) -> List[str]:
+        """Ids de todos los chunks registrados."""
+        return [chunk_id for entry in self.files.values() for chunk_id in entry["chunk_ids"]]
+
+    def clear(self) -> None:
+        """Vacía las entradas (p.ej. antes de reconstruir el índice)."""
+        self.files = {}
@@ -0,0 +1,331 @@
+"""
+Pipeline de ingesta en streaming.
+
+Lectura -> chunking -> embeddings -> upsert, cada etapa en su propio hilo
+(el chunking además reparte archivos en un pool de procesos) y conectadas
+por colas acotadas. Si una etapa se atrasa, las colas se llenan y frenan a
+las anteriores, de modo que la memoria queda acotada por el tamaño de las
+colas y no por el tamaño del corpus.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from greenpeace_rag.utils.config import CHUNKING_CONFIG, INGESTION_CONFIG
+
+from ..chunking import BaseChunker
+from .dedup import NearDuplicateIndex
+from .incremental import IncrementalIndexer, get_max_batch_size
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+
+class _Stopped(Exception):
+    """Otra etapa falló: la etapa actual debe terminar."""
+
+
+def _chunk_text_safe(chunker: BaseChunker, content: str, metadata: Dict[str, Any]) -> Tuple[List[Document], Optional[str]]:
+    """Fragmenta un texto capturando el error (se ejecuta en los procesos del pool)."""
+    try:
+        return chunker.chunk_text(content, metadata), None
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
+
+
+class StageCounter:
+    """Contadores de throughput de una etapa."""
+
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        # Tiempo esperando lugar en la cola siguiente (backpressure)
+        self.blocked_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "unit": self.unit,
+            "items": self.items,
+            "batches": self.batches,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "items_per_second": round(self.items / self.busy_seconds, 1) if self.busy_seconds else None,
+        }
+
+
+class IngestionPipeline:
+    """
+    Ingesta en streaming de archivos de texto en el vector store.
+
+    Los chunks se escriben con ids determinísticos (ver IncrementalIndexer),
+    por lo que volver a ejecutar la ingesta sobre los mismos archivos es
+    idempotente. Tras run(), stats tiene los contadores de cada etapa y
+    failures los archivos que no se pudieron leer o fragmentar. Cada lote
+    confirmado se notifica con on_batch_committed (ver IngestionCheckpoint).
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        chunker: BaseChunker,
+        queue_size: int = INGESTION_CONFIG["queue_size"],
+        embed_batch_size: int = INGESTION_CONFIG["embed_batch_size"],
+        chunk_workers: Optional[int] = None,
+    ):
+        """
+        Inicializa el pipeline.
+
+        Args:
+            vector_store: Vector store destino (se usa su función de embeddings)
+            chunker: Chunker de los archivos
+            queue_size: Elementos en vuelo entre etapas
+            embed_batch_size: Chunks por lote de encode/upsert
+            chunk_workers: Procesos para el chunking (por defecto los del chunker)
+        """
+        self.vector_store = vector_store
+        self.chunker = chunker
+        self.queue_size = queue_size
+        self.embed_batch_size = min(embed_batch_size, get_max_batch_size(vector_store))
+        self.chunk_workers = chunk_workers or chunker.workers or os.cpu_count() or 1
+        self.failures: List[Dict[str, str]] = []
+        self.stats: Dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._skip_ids: Set[str] = set()
+        self._deduplicator: Optional[NearDuplicateIndex] = None
+        self._on_batch_committed: Optional[Callable[[List[Document], Iterable[str]], None]] = None
+
+    @property
+    def failed_files(self) -> Set[str]:
+        """Nombres de los archivos que no se pudieron leer o fragmentar."""
+        return {Path(failure["file"]).name for failure in self.failures}
+
+    def run(
+        self,
+        txt_files: Sequence[Path],
+        skip_ids: Optional[Set[str]] = None,
+        on_batch_committed: Optional[Callable[[List[Document], Iterable[str]], None]] = None,
+        deduplicator: Optional[NearDuplicateIndex] = None,
+    ) -> Dict[str, List[str]]:
+        """
+        Ingresa los archivos en el vector store.
+
+        Args:
+            txt_files: Archivos a ingresar
+            skip_ids: Ids de chunks ya escritos por una ingesta anterior (no se
+                vuelven a embeber)
+            on_batch_committed: Se llama tras cada upsert con el lote y los
+                archivos cuyos chunks quedaron todos escritos
+            deduplicator: Índice de casi duplicados; los chunks duplicados de
+                uno ya indexado no se embeben (ver NearDuplicateIndex)
+
+        Returns:
+            Ids de chunks escritos por archivo
+        """
+        self.failures = []
+        self._skip_ids = skip_ids or set()
+        self._on_batch_committed = on_batch_committed
+        self._deduplicator = deduplicator
+        self._stop.clear()
+        self._errors = []
+        chunk_ids_by_file: Dict[str, List[str]] = defaultdict(list)
+        counters = {
+            "read": StageCounter("read", "files"),
+            "chunk": StageCounter("chunk", "chunks"),
+            "embed": StageCounter("embed", "chunks"),
+            "upsert": StageCounter("upsert", "chunks"),
+        }
+        files_queue: "queue.Queue" = queue.Queue(self.queue_size)
+        chunks_queue: "queue.Queue" = queue.Queue(self.queue_size)
+        vectors_queue: "queue.Queue" = queue.Queue(self.queue_size)
+
+        stages = [
+            (self._read_stage, (list(txt_files), files_queue, counters["read"]), files_queue),
+            (self._chunk_stage, (files_queue, chunks_queue, counters["chunk"]), chunks_queue),
+            (self._embed_stage, (chunks_queue, vectors_queue, counters["embed"]), vectors_queue),
+            (self._upsert_stage, (vectors_queue, chunk_ids_by_file, counters["upsert"]), None),
+        ]
+        print(f"🚰 Ingesta en streaming de {len(txt_files)} archivos "
+              f"(cola={self.queue_size}, lote={self.embed_batch_size}, procesos={self.chunk_workers})...")
+        started_at = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._run_stage, args=(stage, args, downstream), name=f"ingest-{name}", daemon=True)
+            for (stage, args, downstream), name in zip(stages, counters)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - started_at
+        self.stats = {name: counter.as_dict() for name, counter in counters.items()}
+        self.stats["total_seconds"] = round(elapsed, 3)
+        self.stats["failed_files"] = len(self.failures)
+
+        if self._errors:
+            raise self._errors[0]
+
+        print(f"✅ Ingesta completada en {elapsed:.1f}s: " + " | ".join(
+            f"{name} {counter.items} {counter.unit} ({counter.busy_seconds:.1f}s, "
+            f"bloqueado {counter.blocked_seconds:.1f}s)"
+            for name, counter in counters.items()
+        ))
+        if self.failures:
+            print(f"⚠️  {len(self.failures)} archivos no se pudieron ingresar (ver pipeline.failures)")
+        return chunk_ids_by_file
+
+    def _run_stage(self, stage: Any, args: Tuple, downstream: Optional["queue.Queue"]) -> None:
+        """Ejecuta una etapa; si falla, detiene al resto del pipeline."""
+        try:
+            stage(*args)
+            if downstream is not None:
+                self._put(downstream, _END)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def _put(self, target: "queue.Queue", item: Any, counter: Optional[StageCounter] = None) -> None:
+        """Encola respetando el límite de la cola (bloquea mientras esté llena)."""
+        started_at = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        if counter is not None:
+            counter.blocked_seconds += time.perf_counter() - started_at
+
+    def _get(self, source: "queue.Queue") -> Any:
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+    def _read_stage(self, txt_files: List[Path], output: "queue.Queue", counter: StageCounter) -> None:
+        for file_path in txt_files:
+            started_at = time.perf_counter()
+            try:
+                content, metadata = self.chunker.read_file(file_path)
+            except Exception as e:
+                self._record_failure(file_path, f"{type(e).__name__}: {e}")
+                continue
+            counter.items += 1
+            counter.busy_seconds += time.perf_counter() - started_at
+            self._put(output, (file_path, content, metadata), counter)
+
+    def _chunk_stage(self, source: "queue.Queue", output: "queue.Queue", counter: StageCounter) -> None:
+        batch: List[Document] = []
+        # Archivos con todos sus chunks ya encolados: se completan con el próximo lote
+        done: List[str] = []
+
+        def flush() -> None:
+            counter.batches += 1
+            self._put(output, (list(batch), list(done)), counter)
+            batch.clear()
+            done.clear()
+
+        def emit(file_path: Path, chunks: List[Document], error: Optional[str]) -> None:
+            if error is not None:
+                self._record_failure(file_path, error)
+                return
+            # Ids determinísticos; los chunks repetidos dentro del archivo se omiten
+            chunks = IncrementalIndexer.assign_chunk_ids(chunks)
+            if self._deduplicator is not None:
+                chunks = [chunks[index] for index in self._deduplicator.filter(chunks)]
+            chunks = [chunk for chunk in chunks if chunk.metadata["chunk_id"] not in self._skip_ids]
+            counter.items += len(chunks)
+            for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) >= self.embed_batch_size:
+                    flush()
+            done.append(Path(file_path).name)
+
+        if self.chunk_workers <= 1:
+            while (item := self._get(source)) is not _END:
+                file_path, content, metadata = item
+                started_at = time.perf_counter()
+                chunks, error = _chunk_text_safe(self.chunker, content, metadata)
+                counter.busy_seconds += time.perf_counter() - started_at
+                emit(file_path, chunks, error)
+        else:
+            max_pending = self.chunk_workers * CHUNKING_CONFIG["max_pending_per_worker"]
+            with ProcessPoolExecutor(max_workers=self.chunk_workers) as executor:
+                pending: deque = deque()
+                active_since = None
+
+                def drain_one() -> None:
+                    nonlocal active_since
+                    file_path, future = pending.popleft()
+                    chunks, error = future.result()
+                    if not pending and active_since is not None:
+                        counter.busy_seconds += time.perf_counter() - active_since
+                        active_since = None
+                    emit(file_path, chunks, error)
+
+                while (item := self._get(source)) is not _END:
+                    file_path, content, metadata = item
+                    if active_since is None:
+                        active_since = time.perf_counter()
+                    pending.append((file_path, executor.submit(_chunk_text_safe, self.chunker, content, metadata)))
+                    if len(pending) >= max_pending:
+                        drain_one()
+                while pending:
+                    drain_one()
+
+        if batch or done:
+            flush()
+
+    def _embed_stage(self, source: "queue.Queue", output: "queue.Queue", counter: StageCounter) -> None:
+        embeddings = self.vector_store.embeddings
+        while (item := self._get(source)) is not _END:
+            batch, done = item
+            started_at = time.perf_counter()
+            vectors = embeddings.embed_documents([chunk.page_content for chunk in batch]) if batch else []
+            counter.busy_seconds += time.perf_counter() - started_at
+            counter.items += len(batch)
+            counter.batches += 1
+            self._put(output, (batch, vectors, done), counter)
+
+    def _upsert_stage(self, source: "queue.Queue", chunk_ids_by_file: Dict[str, List[str]], counter: StageCounter) -> None:
+        while (item := self._get(source)) is not _END:
+            batch, vectors, done = item
+            started_at = time.perf_counter()
+            ids = [chunk.metadata["chunk_id"] for chunk in batch]
+            if batch:
+                self.vector_store.upsert_vectors(  # type: ignore[attr-defined]
+                    ids=ids,
+                    embeddings=vectors,
+                    documents=[chunk.page_content for chunk in batch],
+                    metadatas=[chunk.metadata for chunk in batch],
+                )
+            if self._on_batch_committed is not None:
+                self._on_batch_committed(batch, done)
+            counter.busy_seconds += time.perf_counter() - started_at
+            counter.items += len(batch)
+            counter.batches += 1
+            for chunk, chunk_id in zip(batch, ids):
+                chunk_ids_by_file[chunk.metadata.get("file_name", "")].append(chunk_id)
+
+    def _record_failure(self, file_path: Path, error: str) -> None:
+        self.failures.append({"file": str(file_path), "error": error})
+        print(f"❌ No se pudo ingresar {Path(file_path).name}: {error}")
@@ -1,15 +1,52 @@
+import asyncio
+import json
+import shutil
+import time
+import uuid
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from langchain_chroma import Chroma
+import numpy as np
+from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 
-from ..models import EmbeddingManager, LLMManager
+from ..models import EmbeddingManager, EmbeddingModelRegistry, LLMManager
 from ..prompts.rag_prompts import get_rag_chat_prompt
-from ..utils.config import get_chunking_params, validate_chunking_strategy
-from .chunking import ChunkerFactory
-from .retrieval import DocumentRetriever
+from ..utils.config import (CONTEXT_PACKING_CONFIG, DEDUP_CONFIG,
+                            DEFAULT_CONFIG, EMBEDDING_CONFIG,
+                            EXACT_CACHE_CONFIG, HNSW_SPACES,
+                            HNSW_TUNING_CONFIG, INDEX_POLICIES,
+                            NEIGHBOR_MODES, PREFILTER_CONFIG, RETRIEVAL_CONFIG,
+                            RETRIEVAL_MODES, SEMANTIC_CACHE_CONFIG,
+                            VECTOR_BENCHMARK_ENGINES,
+                            VECTOR_QUANTIZATIONS, VECTOR_RESCORE_DTYPES,
+                            VECTOR_STORE_BACKENDS, VECTOR_STORE_CONFIG,
+                            get_chunking_params,
+                            get_index_artifact_path,
+                            validate_chunking_strategy)
+from ..utils.file_handlers import load_json, save_json
+from .caching import ExactCacheLayer, SemanticAnswerCache, normalize_question
+from .chunking import CHUNK_METADATA_VERSION, ChunkerFactory
+from .generation import AnswerStream, AsyncAnswerStream, ContextPacker
+from .indexing import (ChunkStore, IncrementalIndexer, IndexManifest,
+                       IngestionCheckpoint, IngestionPipeline,
+                       NearDuplicateIndex)
+from .retrieval import (BM25Index, DocumentRetriever, HybridRetriever,
+                        NeighborIndex, PrefilterIndex)
+from .vectorstores import (ChromaVectorStore, HNSWTuner,
+                           VectorEngineBenchmark, VectorStoreFactory,
+                           stored_embeddings)
+
+
+NO_INFORMATION_ANSWER = "No tengo información suficiente en los documentos para responder eso."
+
+
+async def _aiter_values(values: List[str]) -> AsyncIterator[str]:
+    """Async iterator sobre valores ya disponibles (respuestas cacheadas)."""
+    for value in values:
+        yield value
 
 
 class GreenpeaceRAG:
@@ -22,7 +59,20 @@ class GreenpeaceRAG:
             collection_name: str = "greenpeace_docs",
             embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
             chunk_strategy: str = "recursive_characters",
-            chunk_params: Optional[Dict] = None):
+            chunk_params: Optional[Dict] = None,
+            filter_config: Optional[Dict] = None,
+            retrieval_config: Optional[Dict] = None,
+            rerank_config: Optional[Dict] = None,
+            semantic_cache_config: Optional[Dict] = None,
+            exact_cache_config: Optional[Dict] = None,
+            max_concurrent_queries: int = 8,
+            embedding_config: Optional[Dict] = None,
+            index_policy: str = "incremental",
+            vector_store_config: Optional[Dict] = None,
+            hnsw_config: Optional[Dict] = None,
+            dedup_config: Optional[Dict] = None,
+            prefilter_config: Optional[Dict] = None,
+            context_packing_config: Optional[Dict] = None):
 
         # Configuración básica
         self.txt_dir = txt_dir
@@ -32,6 +82,35 @@ class GreenpeaceRAG:
         self.chunk_strategy = chunk_strategy
         self.llm_provider = llm_provider
         self.llm_model = llm_model
+        self.filter_config = filter_config
+        self.retrieval_config = {**RETRIEVAL_CONFIG, **(retrieval_config or {})}
+        self.retrieval_mode = self.retrieval_config["retrieval_mode"]
+        self.rerank_config = rerank_config
+        self.semantic_cache_config = {**SEMANTIC_CACHE_CONFIG, **(semantic_cache_config or {})}
+        self.exact_cache_config = {**EXACT_CACHE_CONFIG, **(exact_cache_config or {})}
+        self.embedding_config = {**EMBEDDING_CONFIG, **(embedding_config or {})}
+        self.index_policy = index_policy
+        if self.index_policy not in INDEX_POLICIES:
+            raise ValueError(f"Política de indexación no válida: {self.index_policy}")
+        self.vector_store_config = {**VECTOR_STORE_CONFIG, **(vector_store_config or {})}
+        if self.vector_store_config["backend"] not in VECTOR_STORE_BACKENDS:
+            raise ValueError(f"Backend de vector store no válido: {self.vector_store_config['backend']}")
+        if self.vector_store_config["flat_quantization"] not in [None] + VECTOR_QUANTIZATIONS:
+            raise ValueError(f"Cuantización no válida: {self.vector_store_config['flat_quantization']}")
+        if self.vector_store_config["flat_rescore_dtype"] not in VECTOR_RESCORE_DTYPES:
+            raise ValueError(f"Precisión de rescoring no válida: {self.vector_store_config['flat_rescore_dtype']}")
+        # Solo los parámetros HNSW pasados explícitamente pisan los guardados en la colección
+        self.hnsw_overrides = dict(hnsw_config or {})
+        self.hnsw_config = {**DEFAULT_CONFIG["hnsw_config"], **self.hnsw_overrides}
+        self.dedup_config = {**DEDUP_CONFIG, **(dedup_config or {})}
+        self.prefilter_config = {**PREFILTER_CONFIG, **(prefilter_config or {})}
+        self.context_packing_config = {**CONTEXT_PACKING_CONFIG, **(context_packing_config or {})}
+        if self.hnsw_config["space"] not in HNSW_SPACES:
+            raise ValueError(f"Espacio de distancia HNSW no válido: {self.hnsw_config['space']}")
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Modo de recuperación no válido: {self.retrieval_mode}")
+        if self.retrieval_config["neighbor_mode"] not in [None] + NEIGHBOR_MODES:
+            raise ValueError(f"Modo de vecinos no válido: {self.retrieval_config['neighbor_mode']}")
 
         # Configurar parámetros de chunking
         if chunk_params is None:
@@ -48,15 +127,43 @@ class GreenpeaceRAG:
             provider=self.llm_provider,
             model=self.llm_model,
             temperature=0.7,
-            num_ctx=4096,
+            num_ctx=self.context_packing_config["num_ctx"],
         )
+        self.context_packer = ContextPacker(self.context_packing_config)
 
         # Atributos del sistema
-        self.chunks = []
+        self.chunks = []  # Se cargan bajo demanda con get_chunks()
+        self._chunks_key = None  # Clave (corpus + chunking) de los chunks en memoria
+        self.chunk_failures = []  # Archivos que no se pudieron fragmentar en el último chunking
+        self.last_ingestion_stats = {}  # Contadores de la última ingesta en streaming
+        self.last_dedup_report = {}  # Ahorro de la deduplicación en la última indexación
+        self.chunk_store = ChunkStore(get_index_artifact_path(chroma_db_path, collection_name, "chunks"))
         self.embeddings = None
+        self._embedded_chunks = None  # Chunks a los que corresponde self.embeddings
         self.vector_store = None
         self.rag_chain = None
         self.retriever = None  # Se inicializará después de crear el vector_store
+        self.bm25_index = None  # Índice léxico para recuperación híbrida
+        self.prefilter_index = None  # Índice de términos y metadata para acotar la búsqueda
+        self.neighbor_index = None  # Tabla de chunks vecinos (unir/ampliar candidatos)
+        self.metadata_filter = None  # Filtro de metadata de las búsquedas (ver set_metadata_filter)
+        self.answer_cache = None  # Cache semántico de respuestas (si está habilitado)
+        self.index_version = None  # Versión de la colección indexada
+        self.exact_cache = None  # Caches exactos de búsquedas, veredictos y respuestas
+        self.stream_metrics = deque(maxlen=1000)  # Métricas de las últimas respuestas en streaming
+        self.context_reports = deque(maxlen=1000)  # Tokens ahorrados al armar el contexto de cada consulta
+        self.max_concurrent_queries = max_concurrent_queries  # Consultas simultáneas en el camino async
+        self._query_semaphore = None
+        self._query_semaphore_loop = None
+        if self.exact_cache_config["enabled"]:
+            sqlite_path = None
+            if self.exact_cache_config["sqlite"]:
+                Path(self.chroma_db_path).mkdir(parents=True, exist_ok=True)
+                sqlite_path = get_index_artifact_path(self.chroma_db_path, self.collection_name, "cache.sqlite")
+            self.exact_cache = ExactCacheLayer(self.exact_cache_config, sqlite_path=sqlite_path)
+
+        if self.embedding_config["warm_up"]:
+            self.warm_up_embeddings()
 
         # Inicializar evaluadora (se importa aquí para evitar dependencias circulares)
         try:
@@ -70,30 +177,87 @@ class GreenpeaceRAG:
         """
         Genera chunks desde un directorio de archivos de texto.
 
+        Los chunks se persisten junto al vector store con una clave derivada
+        de los hashes de los archivos y de la configuración de chunking; si
+        ya existen para el corpus actual se cargan sin volver a fragmentar.
+
         Returns:
             Lista de chunks generados
         """
-        txt_files = list(Path(self.txt_dir).glob("*.txt"))
+        txt_files = sorted(Path(self.txt_dir).glob("*.txt"))
         if not txt_files:
             print(f"⚠️  No se encontraron archivos TXT en {self.txt_dir}")
             return []
 
+        # Los archivos cuya huella (tamaño, mtime) coincide con el manifest no se vuelven a hashear
+        manifest = IndexManifest.load(
+            get_index_artifact_path(self.chroma_db_path, self.collection_name, "manifest.json")
+        )
+        file_hashes, _ = manifest.fingerprint({file_path.name: file_path for file_path in txt_files})
+        key = ChunkStore.make_key(file_hashes, self._chunk_settings())
+        if self.chunks and key == self._chunks_key:
+            return self.chunks
+        self.chunk_failures = []
+        if self.chunk_store.exists(key):
+            self.chunks = self.chunk_store.load(key)
+            self._chunks_key = key
+            print(f"✅ {len(self.chunks)} chunks cargados desde disco (corpus sin cambios)")
+            return self.chunks
+
         print(f"📄 Procesando {len(txt_files)} archivos con estrategia: {self.chunk_strategy}")
 
         # Crear chunker usando el factory
-        chunker = ChunkerFactory.create_chunker(self.chunk_strategy, self.chunk_params)
+        chunker = self._create_chunker()
 
-        # Generar chunks
+        # Generar chunks (en paralelo por archivo)
         chunks = chunker.chunk_files(txt_files)
+        self.chunk_failures = chunker.failures
+        if not self.chunk_failures:
+            # Solo se persisten corpus completos; con fallas se vuelve a intentar en la próxima ejecución
+            self.chunk_store.save(key, chunks)
 
         self.chunks = chunks
+        self._chunks_key = key
         print(f"✅ Generados {len(chunks)} chunks")
         return chunks
 
+    def get_chunks(self) -> List[Any]:
+        """
+        Devuelve los chunks del corpus, cargándolos solo cuando se necesitan.
+
+        Si el índice tiene manifest y hay chunks persistidos para él, se
+        cargan desde disco sin leer los archivos de texto; si no, se generan
+        con generate_chunks.
+
+        Returns:
+            Lista de chunks
+        """
+        if self.chunks:
+            return self.chunks
+
+        manifest = IndexManifest.load(
+            get_index_artifact_path(self.chroma_db_path, self.collection_name, "manifest.json")
+        )
+        if len(manifest) and manifest.settings.get("chunk_strategy") == self.chunk_strategy \
+                and manifest.settings.get("chunk_params") == self.chunk_params:
+            file_hashes = {name: entry["hash"] for name, entry in manifest.files.items()}
+            key = ChunkStore.make_key(file_hashes, self._chunk_settings())
+            if self.chunk_store.exists(key):
+                self.chunks = self.chunk_store.load(key)
+                self._chunks_key = key
+                print(f"✅ {len(self.chunks)} chunks cargados desde disco")
+                return self.chunks
+
+        return self.generate_chunks()
+
     def generate_embeddings(self, chunks: Optional[List[Any]] = None) -> None:
         """
         Genera embeddings para una lista de chunks.
 
+        Usa la misma función de embeddings que el vector store, de modo que
+        la matriz resultante se puede escribir directamente en el vector store sin
+        volver a codificar (ver generate_vector_store).
+
         Args:
             chunks: Lista de chunks. Si es None, usa self.chunks
         """
@@ -105,72 +269,590 @@ class GreenpeaceRAG:
             return
 
         print(f"🔢 Generando embeddings con {self.embedding_model}...")
-        model = EmbeddingManager.sentence_transformer(self.embedding_model)
+        embedding_function = self.get_embedding_function()
 
         texts = [chunk.page_content for chunk in chunks]
-        self.embeddings = model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
+        self.embeddings = np.asarray(embedding_function.embed_documents(texts), dtype=np.float32)
+        self._embedded_chunks = chunks
         print(f"✅ Embeddings generados: {self.embeddings.shape}")
 
-    def generate_vector_store(self) -> None:
-        """Genera y configura el vector store."""
-        print(f"🗄️  Creando vector store en {self.chroma_db_path}")
-
-        self.vector_store = Chroma(
-            collection_name=self.collection_name,
-            embedding_function=EmbeddingManager.embedding_function(self.embedding_model),
-            persist_directory=self.chroma_db_path,
+    def get_embedding_function(self) -> Any:
+        """Función de embeddings de LangChain sobre el modelo compartido del registro."""
+        return EmbeddingManager.embedding_function(
+            self.embedding_model,
+            device=self.embedding_config["device"],
+            precision=self.embedding_config["precision"],
+            batch_size=self.embedding_config["batch_size"],
+            normalize_embeddings=self.embedding_config["normalize_embeddings"],
         )
 
-        # Si la colección ya tiene datos, consultar si se desea regenerar
+    def warm_up_embeddings(self) -> Dict[str, Any]:
+        """
+        Carga el modelo de embeddings y ejecuta un encode de prueba.
+
+        Returns:
+            Estadísticas del modelo (tiempo de carga, warm-up y memoria residente)
+        """
+        device, precision = self.embedding_config["device"], self.embedding_config["precision"]
+        EmbeddingModelRegistry.warm_up(self.embedding_model, device, precision)
+        return EmbeddingModelRegistry.get_model_stats(self.embedding_model, device, precision)
+
+    def generate_vector_store(self, index_policy: Optional[str] = None, streaming: bool = False) -> None:
+        """
+        Genera y configura el vector store.
+
+        Args:
+            index_policy: Qué hacer si la colección ya tiene documentos (por
+                defecto self.index_policy):
+                - "reuse": usar la colección tal cual, sin leer el corpus
+                - "incremental": reindexar solo los archivos nuevos o modificados
+                  y borrar los chunks de los archivos eliminados (una colección
+                  sin manifest, p.ej. creada antes del manifest, se usa tal cual
+                  como con "reuse"; reconstruirla una vez con "rebuild" habilita
+                  la indexación incremental)
+                - "rebuild": eliminar la colección (y el checkpoint de una ingesta
+                  interrumpida) y reindexar todo el corpus
+            streaming: Si True, los archivos se ingresan con IngestionPipeline
+                (memoria acotada, sin materializar chunks ni embeddings)
+        """
+        index_policy = index_policy or self.index_policy
+        if index_policy not in INDEX_POLICIES:
+            raise ValueError(f"Política de indexación no válida: {index_policy}")
+
+        print(f"🗄️  Creando vector store en {self.chroma_db_path} "
+              f"(backend: {self.vector_store_config['backend']}, política: {index_policy})")
+
+        self.vector_store = self._create_vector_store()
+
         try:
-            existing_count = self.vector_store._collection.count()  # type: ignore[attr-defined]
+            existing_count = self.vector_store.count()
         except Exception:
             existing_count = 0
 
-        if existing_count > 0:
-            answer = input(
-                f"La colección '{self.collection_name}' ya tiene {existing_count} documentos. "
-                "¿Desea REGENERAR el índice (recalcular chunks y reindexar)? [y/N]: "
-            ).strip().lower()
-            if answer in ("y", "yes", "s", "si", "sí"):
-                print("🧹 Regenerando índice: eliminando colección previa...")
-                try:
-                    # Eliminar colección y recrearla limpia
-                    self.vector_store._client.delete_collection(self.collection_name)  # type: ignore[attr-defined]
-                except Exception as e:
-                    print(f"⚠️  No se pudo eliminar la colección existente: {e}. Se continuará recreando.")
-                # Re-crear el vector store limpio
-                self.vector_store = Chroma(
-                    collection_name=self.collection_name,
-                    embedding_function=EmbeddingManager.embedding_function(self.embedding_model),
-                    persist_directory=self.chroma_db_path,
-                )
+        if existing_count > 0 and index_policy == "reuse":
+            print(f"➡️  Usando índice existente ({existing_count} documentos). No se reindexan documentos.")
+            self._finish_vector_store_setup()
+            return
+
+        manifest = IndexManifest.load(
+            get_index_artifact_path(self.chroma_db_path, self.collection_name, "manifest.json")
+        )
+        settings = self._index_settings()
+        checkpoint = IngestionCheckpoint.load(
+            get_index_artifact_path(self.chroma_db_path, self.collection_name, "ingest_checkpoint.jsonl"), settings
+        )
+        indexer = IncrementalIndexer(self.vector_store, self._create_chunker(), manifest, checkpoint=checkpoint)
+
+        if existing_count > 0 and index_policy == "incremental" and not indexer.has_manifest():
+            # Colección sin manifest: no se sabe con qué archivos ni configuración se indexó
+            print(f"⚠️  La colección tiene {existing_count} documentos pero no tiene manifest de indexación: "
+                  "se usa tal cual (como index_policy='reuse'). Reindexar una vez con index_policy='rebuild' "
+                  "para habilitar la indexación incremental.")
+            self._finish_vector_store_setup()
+            return
+
+        if index_policy == "rebuild":
+            # Una reconstrucción pedida explícitamente no retoma ingestas interrumpidas
+            checkpoint.clear()
+            rebuild_reason = "política rebuild"
+        else:
+            # Con "incremental", una ingesta interrumpida se retoma desde el checkpoint
+            rebuild_reason = indexer.full_rebuild_needed(settings, existing_count)
+        if existing_count > 0 and rebuild_reason:
+            print(f"🧹 Regenerando índice ({rebuild_reason}): eliminando colección previa...")
+            try:
+                # Eliminar colección y recrearla limpia
+                self.vector_store.delete_collection()
+            except Exception as e:
+                print(f"⚠️  No se pudo eliminar la colección existente: {e}. Se continuará recreando.")
+            self.vector_store = self._create_vector_store()
+            indexer.vector_store = self.vector_store
+            existing_count = 0
+        if existing_count == 0:
+            manifest.clear()
+        manifest.settings = settings
+        if self.dedup_config["enabled"]:
+            dedup_path = get_index_artifact_path(self.chroma_db_path, self.collection_name, "dedup")
+            # Con la colección vacía el índice de duplicados anterior ya no corresponde
+            indexer.deduplicator = (NearDuplicateIndex(dedup_path, self.dedup_config) if existing_count == 0
+                                    else NearDuplicateIndex.load(dedup_path, self.dedup_config))
+
+        txt_files = sorted(Path(self.txt_dir).glob("*.txt"))
+        if streaming:
+            pipeline = IngestionPipeline(self.vector_store, self._create_chunker())
+            report = indexer.sync(txt_files, pipeline=pipeline)
+            self.last_ingestion_stats = pipeline.stats
+        elif existing_count == 0:
+            # Indexado completo: se fragmenta (o carga de disco) todo el corpus una sola vez
+            chunks = self.generate_chunks()
+            # Reutilizar la matriz de generate_embeddings si corresponde a estos mismos chunks
+            embeddings = self.embeddings if self._embedded_chunks is chunks else None
+            report = indexer.sync(
+                txt_files,
+                chunks=chunks,
+                embeddings=embeddings,
+                failed_files={Path(failure["file"]).name for failure in self.chunk_failures},
+            )
+        else:
+            # Incremental: el indexador fragmenta solo los archivos nuevos o modificados
+            report = indexer.sync(txt_files)
+        if indexer.deduplicator is not None:
+            self.last_dedup_report = indexer.deduplicator.report()
+
+        if report["chunks_added"] or report["chunks_deleted"] or existing_count == 0:
+            if streaming:
+                # El índice BM25 necesita todo el corpus en memoria: se descarta el
+                # anterior y se reconstruye solo si la recuperación híbrida lo requiere
+                for artifact in ("bm25", "prefilter", "neighbors"):
+                    shutil.rmtree(get_index_artifact_path(self.chroma_db_path, self.collection_name, artifact),
+                                  ignore_errors=True)
+                self.bm25_index = None
+                self.prefilter_index = None
+                self.neighbor_index = None
             else:
-                print("➡️  Usando índice existente. No se reindexan documentos.")
-                # Inicializar el retriever incluso cuando se usa el índice existente
-                self.retriever = DocumentRetriever(self.vector_store, self.llm)
-                return
+                # Índice léxico BM25 construido sobre el contenido actual de la colección
+                # (sin los casi duplicados descartados, si la deduplicación está activa)
+                indexed_chunks = (IncrementalIndexer.assign_chunk_ids(list(self.chunks))
+                                  if existing_count == 0 and indexer.deduplicator is None
+                                  else self._load_stored_chunks())
+                self.build_lexical_index(indexed_chunks)
+                if self.prefilter_config["enabled"]:
+                    self.build_prefilter_index(indexed_chunks)
+                else:
+                    shutil.rmtree(get_index_artifact_path(self.chroma_db_path, self.collection_name, "prefilter"),
+                                  ignore_errors=True)
+                if self.retrieval_config["neighbor_mode"]:
+                    self.build_neighbor_index(indexed_chunks)
+                else:
+                    shutil.rmtree(get_index_artifact_path(self.chroma_db_path, self.collection_name, "neighbors"),
+                                  ignore_errors=True)
+            self._bump_index_version()
 
-        # Agregar documentos (indexado inicial o tras regeneración)
-        if self.chunks:
-            total = len(self.chunks)
-            print(f"📚 Agregando {total} chunks al vector store en lotes...")
-            # Límite reportado por Chroma ~5461; usar margen de seguridad
-            batch_size = 5000
-            for start in range(0, total, batch_size):
-                end = min(start + batch_size, total)
-                batch = self.chunks[start:end]
-                self.vector_store.add_documents(batch)
-                print(f"   - Lote agregado: {start}-{end} ({end-start} docs)")
-            print("✅ Todos los chunks fueron agregados al vector store")
-
-        # Inicializar el retriever después de crear el vector store
-        self.retriever = DocumentRetriever(self.vector_store, self.llm)
+        self._finish_vector_store_setup()
+
+    def ingest_corpus(self, index_policy: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Indexa el corpus con el pipeline de ingesta en streaming.
+
+        Lectura, chunking, embeddings y upsert corren como etapas concurrentes
+        conectadas por colas acotadas, por lo que la memoria no crece con el
+        tamaño del corpus. Respeta index_policy igual que generate_vector_store.
+
+        Args:
+            index_policy: "reuse", "incremental" o "rebuild" (por defecto self.index_policy)
+
+        Returns:
+            Contadores por etapa (items, lotes, tiempo ocupado y bloqueado, throughput)
+        """
+        self.last_ingestion_stats = {}
+        self.generate_vector_store(index_policy=index_policy, streaming=True)
+        return self.last_ingestion_stats
+
+    def _finish_vector_store_setup(self) -> None:
+        """Inicializa el retriever y los caches sobre el vector store actual."""
+        self._refresh_index_version()
+        self.retriever = self._build_retriever()
+        self._init_answer_cache()
+
+    def _create_vector_store(self) -> Any:
+        """Vector store del backend configurado (ver VECTOR_STORE_CONFIG)."""
+        vector_store = VectorStoreFactory.create_vector_store(
+            self.get_embedding_function(),
+            self.chroma_db_path,
+            self.collection_name,
+            self.vector_store_config,
+            hnsw_config=self.hnsw_overrides,
+        )
+        if isinstance(vector_store, ChromaVectorStore):
+            # search_ef efectivo: el explícito o el guardado en la colección
+            self.hnsw_config["search_ef"] = vector_store.hnsw_config["search_ef"]
+        return vector_store
+
+    def tune_hnsw(
+        self,
+        questions: Optional[List[str]] = None,
+        grid: Optional[Dict[str, List[int]]] = None,
+        k: int = HNSW_TUNING_CONFIG["k"],
+        n_queries: int = HNSW_TUNING_CONFIG["n_queries"],
+        min_recall: float = 0.95,
+        apply: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Barrido de parámetros HNSW: recall@k contra búsqueda exacta vs. latencia.
+
+        Los embeddings almacenados se indexan en colecciones efímeras con cada
+        combinación de la grilla; la colección propia no se modifica salvo
+        que apply=True.
+
+        Args:
+            questions: Preguntas a usar como consultas (por defecto se
+                muestrean embeddings del índice)
+            grid: Valores de M, construction_ef y search_ef (ver HNSW_TUNING_CONFIG)
+            k: Vecinos por consulta
+            n_queries: Consultas a muestrear si no se pasan preguntas
+            min_recall: Recall@k mínimo para recomendar una combinación
+            apply: Si True, guarda en la colección el search_ef más rápido que
+                alcanza min_recall con su M y construction_ef actuales (ver
+                ChromaVectorStore.set_search_ef)
+
+        Returns:
+            Una fila por combinación (ver HNSWTuner.sweep)
+        """
+        if self.vector_store is None:
+            raise RuntimeError("Primero hay que crear el vector store (generate_vector_store)")
+        if self.vector_store_config["backend"] != "chroma":
+            raise ValueError("El barrido HNSW solo aplica al backend chroma")
+
+        tuner = HNSWTuner.from_vector_store(self.vector_store)
+        queries = (np.asarray(self.vector_store.embeddings.embed_documents(questions), dtype=np.float32)
+                   if questions else None)
+        results = tuner.sweep(queries=queries, grid=grid, k=k, n_queries=n_queries)
+
+        best = tuner.best(min_recall)
+        if best is None:
+            print(f"⚠️  Ninguna combinación alcanza recall@{k} >= {min_recall}")
+        else:
+            print(f"🏁 Recomendado: M={best['M']} construction_ef={best['construction_ef']} "
+                  f"search_ef={best['search_ef']} (recall@{k}={best['recall']:.3f}, p99={best['p99_ms']}ms)")
+
+        if apply:
+            current = self.vector_store.get_hnsw_params()
+            best_current = tuner.best(min_recall, M=current["M"], construction_ef=current["construction_ef"])
+            if best_current is None:
+                print("⚠️  Ningún search_ef alcanza el recall con los parámetros actuales; no se aplica")
+            else:
+                self.vector_store.set_search_ef(best_current["search_ef"])
+                self.hnsw_config["search_ef"] = best_current["search_ef"]
+                print(f"✅ search_ef={best_current['search_ef']} guardado en la colección "
+                      f"(rige al reabrirla en un proceso nuevo)")
+        return results
+
+    def benchmark_vector_engines(
+        self,
+        questions: Optional[List[str]] = None,
+        k: int = HNSW_TUNING_CONFIG["k"],
+        n_queries: int = HNSW_TUNING_CONFIG["n_queries"],
+        engines: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Compara búsqueda exacta, Chroma y hnswlib sobre los embeddings indexados.
+
+        Cada motor se construye desde cero con los embeddings almacenados y los
+        parámetros HNSW configurados (hnsw_config); el vector store propio no
+        se modifica.
+
+        Args:
+            questions: Preguntas a usar como consultas (p.ej. las preguntas
+                sintéticas de evaluación; por defecto se muestrean embeddings del índice)
+            k: Vecinos por consulta
+            n_queries: Consultas a muestrear si no se pasan preguntas
+            engines: Motores a medir (por defecto VECTOR_BENCHMARK_ENGINES)
+
+        Returns:
+            Una fila por motor (ver VectorEngineBenchmark.run)
+        """
+        if self.vector_store is None:
+            raise RuntimeError("Primero hay que crear el vector store (generate_vector_store)")
+
+        _, vectors = stored_embeddings(self.vector_store)
+        queries = (np.asarray(self.vector_store.embeddings.embed_documents(questions), dtype=np.float32)
+                   if questions else None)
+        return VectorEngineBenchmark(vectors).run(
+            queries=queries,
+            k=k,
+            n_queries=n_queries,
+            hnsw_config=self.hnsw_config,
+            num_threads=self.vector_store_config["hnswlib_num_threads"],
+            engines=engines or VECTOR_BENCHMARK_ENGINES,
+        )
+
+    def _create_chunker(self) -> Any:
+        """Chunker según la estrategia y los parámetros configurados."""
+        return ChunkerFactory.create_chunker(self.chunk_strategy, self.chunk_params)
+
+    def _chunk_settings(self) -> Dict[str, Any]:
+        """Configuración de chunking (parte de la clave de los chunks persistidos)."""
+        return {
+            "chunk_strategy": self.chunk_strategy,
+            "chunk_params": self.chunk_params,
+            "chunk_metadata": CHUNK_METADATA_VERSION,
+        }
+
+    def _index_settings(self) -> Dict[str, Any]:
+        """Configuración que, si cambia, obliga a reconstruir el índice."""
+        settings = {
+            **self._chunk_settings(),
+            "embedding_model": self.embedding_model,
+            "normalize_embeddings": self.embedding_config["normalize_embeddings"],
+            "vector_store_backend": self.vector_store_config["backend"],
+        }
+        if self.vector_store_config["backend"] in ("chroma", "hnswlib"):
+            # search_ef se ajusta sobre la colección existente; el resto requiere reconstruir
+            settings["hnsw"] = {name: self.hnsw_config[name] for name in ("space", "M", "construction_ef")}
+        elif self.vector_store_config["backend"] == "flat":
+            settings["flat_quantization"] = self.vector_store_config["flat_quantization"]
+            settings["flat_rescore_dtype"] = self.vector_store_config["flat_rescore_dtype"]
+        else:
+            # nprobe se ajusta en cada consulta; nlist y m definen el entrenamiento del índice
+            settings["ivfpq"] = {name: self.vector_store_config[f"ivfpq_{name}"] for name in ("nlist", "m")}
+        if self.dedup_config["enabled"]:
+            # Qué chunks se descartan depende de la configuración: cambiarla obliga a reindexar
+            settings["dedup"] = self.dedup_config
+        return settings
+
+    def _load_stored_chunks(self) -> List[Document]:
+        """Chunks almacenados en la colección (texto y metadata)."""
+        stored = self.vector_store.get(include=["documents", "metadatas"])
+        return [
+            Document(page_content=text, metadata=metadata or {}, id=doc_id)
+            for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])
+        ]
+
+    def get_index_version(self) -> str:
+        """
+        Obtiene la versión de la colección indexada.
+
+        La versión cambia cada vez que se agregan o eliminan documentos, y se
+        usa para invalidar caches que dependen del contenido del índice.
+
+        Returns:
+            Identificador de versión del índice
+        """
+        path = get_index_artifact_path(self.chroma_db_path, self.collection_name, "version.json")
+        data = load_json(path) if Path(path).exists() else None
+        if not data:
+            return self._bump_index_version()
+        return data["version"]
+
+    def _refresh_index_version(self) -> None:
+        """Lee la versión del índice y la propaga a los caches que dependen de ella."""
+        self.index_version = self.get_index_version()
+        if self.exact_cache is not None:
+            self.exact_cache.set_index_version(self.index_version)
+        if self.answer_cache is not None:
+            self.answer_cache.ensure_index_version(self.index_version)
+
+    def _bump_index_version(self) -> str:
+        """Registra una nueva versión del índice (tras indexar o reindexar)."""
+        Path(self.chroma_db_path).mkdir(parents=True, exist_ok=True)
+        path = get_index_artifact_path(self.chroma_db_path, self.collection_name, "version.json")
+        version = uuid.uuid4().hex
+        save_json({"version": version, "updated_at": time.time()}, path)
+        self.index_version = version
+        return version
+
+    def _init_answer_cache(self) -> None:
+        """Crea el cache semántico de respuestas si está habilitado."""
+        config = self.semantic_cache_config
+        if not config["enabled"] or self.answer_cache is not None:
+            return
+
+        persist_path = (
+            get_index_artifact_path(self.chroma_db_path, self.collection_name, "semantic_cache.pkl")
+            if config["persist"] else None
+        )
+        self.answer_cache = SemanticAnswerCache(
+            self.vector_store.embeddings,
+            similarity_threshold=config["similarity_threshold"],
+            max_entries=config["max_entries"],
+            ttl_seconds=config["ttl_seconds"],
+            persist_path=persist_path,
+            save_every=config["save_every"],
+        )
+        self.answer_cache.ensure_index_version(self.index_version)
+
+    def _answer_cache_scope(self, similarity_score: int) -> str:
+        """Parámetros que deben coincidir para reutilizar una respuesta cacheada."""
+        scope = f"k={similarity_score}|mode={self.retrieval_mode}|llm={self.llm_model}"
+        if self.metadata_filter:
+            scope += f"|where={json.dumps(self.metadata_filter, sort_keys=True)}"
+        return scope
+
+    def warm_answer_cache(self, items: List[Dict[str, Any]], similarity_score: int = 3) -> int:
+        """
+        Precarga el cache semántico con preguntas ya respondidas.
+
+        Args:
+            items: Diccionarios con question, answer, context y docs_with_scores
+            similarity_score: Número de documentos con el que se generaron las respuestas
+
+        Returns:
+            Cantidad de entradas cargadas
+        """
+        if self.answer_cache is None:
+            raise ValueError("Cache semántico no habilitado. Usa semantic_cache_config={'enabled': True}.")
+
+        self.answer_cache.ensure_index_version(self.index_version)
+        loaded = self.answer_cache.prefill(items, scope=self._answer_cache_scope(similarity_score))
+        self.answer_cache.save()
+        return loaded
+
+    def build_lexical_index(self, chunks: Optional[List[Any]] = None) -> BM25Index:
+        """
+        Construye y persiste el índice BM25 junto al vector store.
+
+        Args:
+            chunks: Chunks a indexar. Si es None, usa self.chunks
+
+        Returns:
+            Índice BM25 construido
+        """
+        if chunks is None:
+            chunks = self.chunks
+
+        print(f"🔤 Construyendo índice BM25 sobre {len(chunks)} chunks...")
+        self.bm25_index = BM25Index.build(
+            chunks,
+            k1=self.retrieval_config["bm25_k1"],
+            b=self.retrieval_config["bm25_b"],
+        )
+        self.bm25_index.save(get_index_artifact_path(self.chroma_db_path, self.collection_name, "bm25"))
+        return self.bm25_index
+
+    def load_lexical_index(self) -> BM25Index:
+        """
+        Carga el índice BM25 persistido (memory mapped).
+
+        Si no existe, lo construye a partir de los chunks en memoria o, en su
+        defecto, de los documentos almacenados en la colección.
+
+        Returns:
+            Índice BM25
+        """
+        path = get_index_artifact_path(self.chroma_db_path, self.collection_name, "bm25")
+        if BM25Index.exists(path):
+            print(f"🔤 Cargando índice BM25 desde {path}")
+            self.bm25_index = BM25Index.load(path, mmap=True)
+            return self.bm25_index
+
+        return self.build_lexical_index(self.chunks or self._load_stored_chunks())
+
+    def build_prefilter_index(self, chunks: Optional[List[Any]] = None) -> PrefilterIndex:
+        """
+        Construye y persiste el índice de pre-filtro (términos y metadata) junto al vector store.
+
+        Args:
+            chunks: Chunks a indexar. Si es None, usa self.chunks
+
+        Returns:
+            Índice de pre-filtro construido
+        """
+        if chunks is None:
+            chunks = self.chunks
+
+        print(f"🧮 Construyendo índice de pre-filtro sobre {len(chunks)} chunks...")
+        self.prefilter_index = PrefilterIndex.build(chunks, self.prefilter_config)
+        self.prefilter_index.save(get_index_artifact_path(self.chroma_db_path, self.collection_name, "prefilter"))
+        return self.prefilter_index
+
+    def load_prefilter_index(self) -> PrefilterIndex:
+        """
+        Carga el índice de pre-filtro persistido (memory mapped).
+
+        Si no existe, lo construye a partir de los documentos almacenados en la colección.
+
+        Returns:
+            Índice de pre-filtro
+        """
+        path = get_index_artifact_path(self.chroma_db_path, self.collection_name, "prefilter")
+        if PrefilterIndex.exists(path):
+            print(f"🧮 Cargando índice de pre-filtro desde {path}")
+            self.prefilter_index = PrefilterIndex.load(path, self.prefilter_config, mmap=True)
+            return self.prefilter_index
+
+        return self.build_prefilter_index(self._load_stored_chunks())
+
+    def build_neighbor_index(self, chunks: Optional[List[Any]] = None) -> NeighborIndex:
+        """
+        Construye y persiste la tabla de chunks vecinos junto al vector store.
+
+        Args:
+            chunks: Chunks indexados. Si es None, usa self.chunks
+
+        Returns:
+            Tabla de vecinos construida
+        """
+        if chunks is None:
+            chunks = self.chunks
+
+        print(f"🧩 Construyendo tabla de vecinos sobre {len(chunks)} chunks...")
+        self.neighbor_index = NeighborIndex.build(chunks)
+        self.neighbor_index.save(get_index_artifact_path(self.chroma_db_path, self.collection_name, "neighbors"))
+        return self.neighbor_index
+
+    def load_neighbor_index(self) -> NeighborIndex:
+        """
+        Carga la tabla de vecinos persistida (memory mapped).
+
+        Si no existe, la construye a partir de los documentos almacenados en la colección.
+
+        Returns:
+            Tabla de vecinos
+        """
+        path = get_index_artifact_path(self.chroma_db_path, self.collection_name, "neighbors")
+        if NeighborIndex.exists(path):
+            print(f"🧩 Cargando tabla de vecinos desde {path}")
+            self.neighbor_index = NeighborIndex.load(path, mmap=True)
+            return self.neighbor_index
+
+        return self.build_neighbor_index(self._load_stored_chunks())
+
+    def set_metadata_filter(self, where: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Restringe las búsquedas a los chunks que cumplen un filtro de metadata.
+
+        Args:
+            where: Campo -> valor o lista de valores, p.ej. {"year": [2019, 2020],
+                "doc_type": "informe"} (ver PrefilterIndex.candidate_rows), o
+                None para quitar el filtro
+        """
+        if where and not self.prefilter_config["enabled"]:
+            raise ValueError("El filtro de metadata necesita el pre-filtro habilitado "
+                             "(prefilter_config={'enabled': True})")
+        self.metadata_filter = where or None
+        if self.retriever is not None:
+            self.retriever.set_metadata_filter(self.metadata_filter)
+
+    def _build_retriever(self) -> DocumentRetriever:
+        """Crea el retriever sobre el vector store actual con la configuración del sistema."""
+        if self.prefilter_config["enabled"] and self.prefilter_index is None:
+            self.load_prefilter_index()
+        prefilter_index = self.prefilter_index if self.prefilter_config["enabled"] else None
+        if self.retrieval_config["neighbor_mode"] and self.neighbor_index is None:
+            self.load_neighbor_index()
+        if self.retrieval_mode == "hybrid":
+            if self.bm25_index is None:
+                self.load_lexical_index()
+            retriever = HybridRetriever(
+                self.vector_store,
+                self.llm,
+                self.bm25_index,
+                filter_config=self.filter_config,
+                retrieval_config=self.retrieval_config,
+                rerank_config=self.rerank_config,
+                exact_cache=self.exact_cache,
+                prefilter_index=prefilter_index,
+                neighbor_index=self.neighbor_index,
+            )
+        else:
+            retriever = DocumentRetriever(
+                self.vector_store,
+                self.llm,
+                filter_config=self.filter_config,
+                retrieval_config=self.retrieval_config,
+                rerank_config=self.rerank_config,
+                exact_cache=self.exact_cache,
+                prefilter_index=prefilter_index,
+                neighbor_index=self.neighbor_index,
+            )
+        retriever.set_metadata_filter(self.metadata_filter)
+        return retriever
 
     def generate_answers(
         self,
         question: str,
-        similarity_score: int = 3
+        similarity_score: int = 3,
+        use_cache: bool = True
     ) -> Tuple[str, str, List[Tuple[Any, float]]]:
         """
         Genera una respuesta a una pregunta usando el vector store.
@@ -178,15 +860,17 @@ class GreenpeaceRAG:
         Args:
             question: Pregunta a responder
             similarity_score: Número de documentos a recuperar
+            use_cache: Si True, consulta y actualiza los caches de respuestas habilitados
 
         Returns:
             Tupla (respuesta, contexto, documentos_con_scores)
         """
-        if not self.vector_store:
-            raise ValueError("Vector store no inicializado. Ejecuta rag_setup() primero.")
+        self._check_ready()
 
-        if not self.retriever:
-            raise ValueError("Retriever no inicializado. Ejecuta rag_setup() primero.")
+        if use_cache:
+            cached = self._lookup_cached_answer(question, similarity_score)
+            if cached is not None:
+                return cached
 
         # Obtener documentos relevantes usando el retriever
         docs_with_scores = self.retriever.get_relevant_documents(
@@ -194,30 +878,392 @@ class GreenpeaceRAG:
         )
 
         if not docs_with_scores:
-            return "No tengo información suficiente en los documentos para responder eso.", "", []
+            return NO_INFORMATION_ANSWER, "", []
+
+        # Preparar contexto y cadena RAG
+        context = self._build_context(question, docs_with_scores)
+        self.rag_chain = self._build_rag_chain(context)
+
+        # Generar respuesta
+        response = self.rag_chain.invoke(question)
+
+        if use_cache:
+            self._store_cached_answer(question, similarity_score, response, context, docs_with_scores)
+
+        return response, context, docs_with_scores
+
+    def generate_answers_batch(
+        self,
+        questions: List[str],
+        similarity_score: int = 3,
+        use_cache: bool = True,
+        max_concurrency: Optional[int] = None
+    ) -> List[Tuple[str, str, List[Tuple[Any, float]]]]:
+        """
+        Genera respuestas para varias preguntas a la vez.
+
+        Todas las preguntas se codifican en un único encode y se buscan con
+        una sola consulta multi-embedding; las evaluaciones del filtro y las
+        generaciones finales se envían al LLM en batch con concurrencia acotada.
+
+        Args:
+            questions: Preguntas a responder
+            similarity_score: Número de documentos a recuperar por pregunta
+            use_cache: Si True, consulta y actualiza los caches de respuestas habilitados
+            max_concurrency: Máximo de llamadas simultáneas al LLM (por defecto max_concurrent_queries)
+
+        Returns:
+            Una tupla (respuesta, contexto, documentos_con_scores) por pregunta, en el mismo orden
+        """
+        self._check_ready()
+        questions = list(questions)
+        max_concurrency = max_concurrency or self.max_concurrent_queries
+
+        results: List[Optional[Tuple[str, str, List[Tuple[Any, float]]]]] = [None] * len(questions)
+        if use_cache:
+            results = self._lookup_cached_answers(questions, similarity_score)
+
+        pending = [index for index, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        batch = self.retriever.get_relevant_documents_batch(
+            [questions[index] for index in pending],
+            k=similarity_score,
+            filter_by_relevance=True,
+            max_concurrency=max_concurrency,
+        )
+
+        to_generate = []
+        for index, docs_with_scores in zip(pending, batch):
+            if not docs_with_scores:
+                results[index] = (NO_INFORMATION_ANSWER, "", [])
+                continue
+            to_generate.append((index, self._build_context(questions[index], docs_with_scores), docs_with_scores))
+
+        if to_generate:
+            print(f"🧠 Generando {len(to_generate)} respuestas en batch...")
+            responses = self._build_batch_rag_chain().batch(
+                [{"context": context, "question": questions[index]} for index, context, _ in to_generate],
+                config={"max_concurrency": max(1, int(max_concurrency))},
+            )
+            generated = []
+            for (index, context, docs_with_scores), response in zip(to_generate, responses):
+                results[index] = (response, context, docs_with_scores)
+                generated.append((questions[index], response, context, docs_with_scores))
+            if use_cache:
+                self._store_cached_answers(generated, similarity_score)
+
+        return results
+
+    async def agenerate_answers(
+        self,
+        question: str,
+        similarity_score: int = 3,
+        use_cache: bool = True
+    ) -> Tuple[str, str, List[Tuple[Any, float]]]:
+        """
+        Versión asíncrona de generate_answers.
+
+        Las llamadas al LLM (filtrado y generación) usan los métodos async
+        nativos de LangChain; la búsqueda en Chroma y el encode de la consulta
+        corren en el executor por defecto. Como mucho max_concurrent_queries
+        consultas se procesan a la vez; el resto espera su turno.
+
+        Args:
+            question: Pregunta a responder
+            similarity_score: Número de documentos a recuperar
+            use_cache: Si True, consulta y actualiza los caches de respuestas habilitados
+
+        Returns:
+            Tupla (respuesta, contexto, documentos_con_scores)
+        """
+        self._check_ready()
+
+        async with self._get_query_semaphore():
+            if use_cache:
+                cached = await asyncio.to_thread(self._lookup_cached_answer, question, similarity_score)
+                if cached is not None:
+                    return cached
+
+            docs_with_scores = await self.retriever.aget_relevant_documents(
+                question, k=similarity_score, filter_by_relevance=True, ranking_questions=False
+            )
+
+            if not docs_with_scores:
+                return NO_INFORMATION_ANSWER, "", []
+
+            context = self._build_context(question, docs_with_scores)
+            chain = self._build_rag_chain(context)
+            response = await chain.ainvoke(question)
+
+            if use_cache:
+                await asyncio.to_thread(
+                    self._store_cached_answer, question, similarity_score, response, context, docs_with_scores
+                )
+
+            return response, context, docs_with_scores
+
+    def _get_query_semaphore(self) -> asyncio.Semaphore:
+        """Semáforo que acota las consultas async simultáneas (uno por event loop)."""
+        loop = asyncio.get_running_loop()
+        if self._query_semaphore is None or self._query_semaphore_loop is not loop:
+            self._query_semaphore = asyncio.Semaphore(self.max_concurrent_queries)
+            self._query_semaphore_loop = loop
+        return self._query_semaphore
+
+    def stream_answers(
+        self,
+        question: str,
+        similarity_score: int = 3,
+        use_cache: bool = True
+    ) -> AnswerStream:
+        """
+        Variante en streaming de generate_answers.
+
+        Recupera y filtra los documentos de forma bloqueante y devuelve un
+        AnswerStream con los documentos y el contexto disponibles de inmediato;
+        al iterarlo se obtienen los tokens de la respuesta a medida que el LLM
+        los produce. Al terminar, stream.metrics tiene time-to-first-token y
+        tokens/seg (también se agregan a self.stream_metrics).
+
+        Args:
+            question: Pregunta a responder
+            similarity_score: Número de documentos a recuperar
+            use_cache: Si True, consulta y actualiza los caches de respuestas habilitados
+
+        Returns:
+            AnswerStream iterable de tokens (str)
+        """
+        self._check_ready()
+        started_at = time.perf_counter()
+
+        cached = self._lookup_cached_answer(question, similarity_score) if use_cache else None
+        if cached is not None:
+            answer, context, docs_with_scores = cached
+            return AnswerStream(docs_with_scores, context, iter([answer]), started_at,
+                                on_complete=self._record_stream_metrics)
+
+        docs_with_scores = self.retriever.get_relevant_documents(
+            question, k=similarity_score, filter_by_relevance=True, ranking_questions=False
+        )
+        if not docs_with_scores:
+            return AnswerStream([], "", iter([NO_INFORMATION_ANSWER]), started_at,
+                                on_complete=self._record_stream_metrics)
+
+        context = self._build_context(question, docs_with_scores)
+        chain = self._build_rag_chain(context, parse_output=False)
+
+        def on_complete(metrics: Dict[str, Any], answer: str) -> None:
+            self._record_stream_metrics(metrics, answer)
+            if use_cache:
+                self._store_cached_answer(question, similarity_score, answer, context, docs_with_scores)
 
-        # Preparar contexto
-        docs = [doc for doc, score in docs_with_scores]
-        context = "\n---\n".join([doc.page_content for doc in docs])
+        return AnswerStream(docs_with_scores, context, chain.stream(question), started_at,
+                            on_complete=on_complete)
 
+    async def astream_answers(
+        self,
+        question: str,
+        similarity_score: int = 3,
+        use_cache: bool = True
+    ) -> AsyncAnswerStream:
+        """
+        Variante asíncrona de stream_answers.
+
+        La recuperación usa el camino async del retriever y los tokens se
+        obtienen con el streaming asíncrono nativo de LangChain (astream).
+
+        Args:
+            question: Pregunta a responder
+            similarity_score: Número de documentos a recuperar
+            use_cache: Si True, consulta y actualiza los caches de respuestas habilitados
+
+        Returns:
+            AsyncAnswerStream iterable con async for
+        """
+        self._check_ready()
+        started_at = time.perf_counter()
+
+        cached = None
+        if use_cache:
+            cached = await asyncio.to_thread(self._lookup_cached_answer, question, similarity_score)
+        if cached is not None:
+            answer, context, docs_with_scores = cached
+            return AsyncAnswerStream(docs_with_scores, context, _aiter_values([answer]), started_at,
+                                     on_complete=self._record_stream_metrics)
+
+        docs_with_scores = await self.retriever.aget_relevant_documents(
+            question, k=similarity_score, filter_by_relevance=True, ranking_questions=False
+        )
+        if not docs_with_scores:
+            return AsyncAnswerStream([], "", _aiter_values([NO_INFORMATION_ANSWER]), started_at,
+                                     on_complete=self._record_stream_metrics)
+
+        context = self._build_context(question, docs_with_scores)
+        chain = self._build_rag_chain(context, parse_output=False)
+
+        def on_complete(metrics: Dict[str, Any], answer: str) -> None:
+            self._record_stream_metrics(metrics, answer)
+            if use_cache:
+                self._store_cached_answer(question, similarity_score, answer, context, docs_with_scores)
+
+        return AsyncAnswerStream(docs_with_scores, context, chain.astream(question), started_at,
+                                 on_complete=on_complete)
+
+    def _record_stream_metrics(self, metrics: Dict[str, Any], answer: str) -> None:
+        """Registra las métricas de una respuesta en streaming."""
+        self.stream_metrics.append(metrics)
+
+    def _check_ready(self) -> None:
+        """Verifica que el vector store y el retriever estén inicializados."""
+        if not self.vector_store:
+            raise ValueError("Vector store no inicializado. Ejecuta rag_setup() primero.")
+
+        if not self.retriever:
+            raise ValueError("Retriever no inicializado. Ejecuta rag_setup() primero.")
+
+    def _lookup_cached_answer(
+        self,
+        question: str,
+        similarity_score: int
+    ) -> Optional[Tuple[str, str, List[Tuple[Any, float]]]]:
+        """Busca la respuesta en el cache exacto y luego en el semántico (si están habilitados)."""
+        cache_scope = self._answer_cache_scope(similarity_score)
+
+        if self.exact_cache is not None:
+            cached = self.exact_cache.answers.get(
+                self.exact_cache.answers.make_key(normalize_question(question), cache_scope, self.index_version)
+            )
+            if cached is not None:
+                print("⚡ Respuesta desde cache exacto")
+                return cached
+
+        if self.answer_cache is not None:
+            self.answer_cache.ensure_index_version(self.index_version)
+            cached = self.answer_cache.lookup(question, scope=cache_scope)
+            if cached is not None:
+                print(f"⚡ Respuesta desde cache semántico (similitud {cached['similarity']:.3f}): {cached['question']}")
+                return cached["answer"], cached["context"], cached["docs_with_scores"]
+
+        return None
+
+    def _store_cached_answer(
+        self,
+        question: str,
+        similarity_score: int,
+        response: str,
+        context: str,
+        docs_with_scores: List[Tuple[Any, float]]
+    ) -> None:
+        """Guarda una respuesta generada en los caches de respuestas habilitados."""
+        cache_scope = self._answer_cache_scope(similarity_score)
+
+        if self.exact_cache is not None:
+            self.exact_cache.answers.set(
+                self.exact_cache.answers.make_key(normalize_question(question), cache_scope, self.index_version),
+                (response, context, docs_with_scores),
+            )
+        if self.answer_cache is not None:
+            self.answer_cache.put(question, response, context, docs_with_scores, scope=cache_scope)
+
+    def _lookup_cached_answers(
+        self,
+        questions: List[str],
+        similarity_score: int
+    ) -> List[Optional[Tuple[str, str, List[Tuple[Any, float]]]]]:
+        """Versión por lotes de _lookup_cached_answer (un único encode para el cache semántico)."""
+        cache_scope = self._answer_cache_scope(similarity_score)
+        results: List[Optional[Tuple[str, str, List[Tuple[Any, float]]]]] = [None] * len(questions)
+
+        if self.exact_cache is not None:
+            for index, question in enumerate(questions):
+                results[index] = self.exact_cache.answers.get(
+                    self.exact_cache.answers.make_key(normalize_question(question), cache_scope, self.index_version)
+                )
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        if self.answer_cache is not None and missing:
+            self.answer_cache.ensure_index_version(self.index_version)
+            matches = self.answer_cache.lookup_many([questions[index] for index in missing], scope=cache_scope)
+            for index, cached in zip(missing, matches):
+                if cached is not None:
+                    results[index] = (cached["answer"], cached["context"], cached["docs_with_scores"])
+
+        hits = sum(result is not None for result in results)
+        if hits:
+            print(f"⚡ {hits} de {len(questions)} respuestas desde cache")
+        return results
+
+    def _store_cached_answers(
+        self,
+        generated: List[Tuple[str, str, str, List[Tuple[Any, float]]]],
+        similarity_score: int
+    ) -> None:
+        """Versión por lotes de _store_cached_answer: items (pregunta, respuesta, contexto, documentos)."""
+        cache_scope = self._answer_cache_scope(similarity_score)
+
+        if self.exact_cache is not None:
+            for question, response, context, docs_with_scores in generated:
+                self.exact_cache.answers.set(
+                    self.exact_cache.answers.make_key(normalize_question(question), cache_scope, self.index_version),
+                    (response, context, docs_with_scores),
+                )
+        if self.answer_cache is not None:
+            self.answer_cache.put_many(
+                [
+                    {"question": question, "answer": response, "context": context, "docs_with_scores": docs}
+                    for question, response, context, docs in generated
+                ],
+                scope=cache_scope,
+            )
+
+    def _build_context(self, question: str, docs_with_scores: List[Tuple[Any, float]]) -> str:
+        """
+        Arma el contexto del prompt a partir de los documentos recuperados.
+
+        Respeta el presupuesto de tokens del LLM y quita el overlap entre
+        chunks del mismo archivo (ver ContextPacker); el reporte de cada
+        consulta queda en self.context_reports.
+        """
+        context, report = self.context_packer.pack(question, docs_with_scores)
+        self.context_reports.append({"question": question, **report})
+        print(f"📦 Contexto: {report['packed_docs']}/{report['docs']} chunks, "
+              f"{report['context_tokens']}/{report['budget_tokens']} tokens "
+              f"({report['saved_tokens']} ahorrados, {report['duplicate_docs']} duplicados, "
+              f"{report['dropped_docs']} sin lugar{', recortado' if report['truncated'] else ''})")
+        return context
+
+    def _build_rag_chain(self, context: str, parse_output: bool = True) -> Any:
+        """
+        Crea la cadena RAG (prompt -> LLM) para un contexto fijo.
+
+        Args:
+            context: Contexto a inyectar en el prompt
+            parse_output: Si True agrega StrOutputParser; si False la cadena
+                emite mensajes del LLM (con usage_metadata al hacer streaming)
+
+        Returns:
+            Runnable que recibe la pregunta
+        """
         # Configurar prompt
         prompt = get_rag_chat_prompt()
 
-        # Crear cadena RAG
-        self.rag_chain = (
+        chain = (
             {
                 "context": RunnableLambda(lambda x: context),
                 "question": RunnablePassthrough()
             }
             | prompt
             | self.llm
-            | StrOutputParser()
         )
+        if parse_output:
+            chain = chain | StrOutputParser()
+        return chain
 
-        # Generar respuesta
-        response = self.rag_chain.invoke(question)
-
-        return response, context, docs_with_scores
+    def _build_batch_rag_chain(self) -> Any:
+        """Cadena RAG (prompt -> LLM -> texto) que recibe {"context", "question"} por entrada."""
+        return get_rag_chat_prompt() | self.llm | StrOutputParser()
 
     def filter_documents(self, question: str, context: str) -> Tuple[bool, str]:
         """
@@ -233,7 +1279,7 @@ class GreenpeaceRAG:
         if not self.retriever:
             raise ValueError("Retriever no inicializado. Ejecuta rag_setup() primero.")
 
-        return self.retriever.filter_documents(question, context)
+        return self.retriever.filter_documents_by_LLM_relevance(question, context)
 
     def get_relevant_documents(
         self,
@@ -257,6 +1303,28 @@ class GreenpeaceRAG:
             question, k=similarity_score, filter_by_relevance=True
         )
 
+    async def aget_relevant_documents(
+        self,
+        question: str,
+        similarity_score: int = 3
+    ) -> List[Tuple[Any, float]]:
+        """
+        Versión asíncrona de get_relevant_documents.
+
+        Args:
+            question: Pregunta a responder
+            similarity_score: Número de documentos a recuperar
+
+        Returns:
+            Lista de tuplas (documento, score)
+        """
+        if not self.retriever:
+            raise ValueError("Retriever no inicializado. Ejecuta rag_setup() primero.")
+
+        return await self.retriever.aget_relevant_documents(
+            question, k=similarity_score, filter_by_relevance=True
+        )
+
     def load_documents(self):
         """Carga documentos desde el directorio configurado."""
         pass
@@ -265,14 +1333,13 @@ class GreenpeaceRAG:
         """
         Configura todo el sistema RAG.
 
-        Ejecuta el flujo completo: chunking -> vector store -> retriever
+        Ejecuta el flujo completo: vector store -> retriever. Los chunks se
+        generan solo si hay que indexar archivos (ver index_policy) o cuando se
+        piden con get_chunks(). Para arrancar sin tocar el corpus (solo
+        consultas sobre un índice ya construido) usar index_policy="reuse".
         """
         print("⚙️ Configurando sistema RAG...")
 
-        # Generar chunks
-        self.generate_chunks()
-        print("🔹 Chunks generated successfully")
-
         # Crear vector store
         self.generate_vector_store()
         print("🔹 Vector store generated successfully")
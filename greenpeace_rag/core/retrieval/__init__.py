@@ -4,8 +4,21 @@ Retrieval module.
 Contiene funcionalidades para recuperación y filtrado de documentos.
 """
 
+from .bm25 import BM25Index
+from .fusion import reciprocal_rank_fusion
+from .hybrid_retriever import HybridRetriever
+from .neighbors import NeighborIndex
+from .prefilter import PrefilterIndex
+from .reranker import CrossEncoderReranker, RerankingCascade
 from .retriever import DocumentRetriever
 
 __all__ = [
-    "DocumentRetriever"
+    "DocumentRetriever",
+    "HybridRetriever",
+    "BM25Index",
+    "PrefilterIndex",
+    "NeighborIndex",
+    "CrossEncoderReranker",
+    "RerankingCascade",
+    "reciprocal_rank_fusion",
 ]
\ No newline at end of file
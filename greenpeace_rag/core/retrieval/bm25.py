@@ -0,0 +1,250 @@
+"""
+Índice léxico BM25 para el sistema RAG.
+
+Índice invertido compacto construido a partir de los chunks generados por
+ChunkerFactory. Las postings se guardan en arrays contiguos de NumPy (una
+fila de offsets por término, más ids de documento y frecuencias), se
+persisten junto al vector store y se cargan con memory mapping.
+"""
+
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from greenpeace_rag.utils.chunk_ids import get_chunk_id
+from greenpeace_rag.utils.record_store import RecordStore, write_records
+from greenpeace_rag.utils.text import tokenize
+
+_META_FILE = "bm25_meta.json"
+_VOCAB_FILE = "vocab.json"
+_IDS_FILE = "ids.json"
+_ARRAY_FILES = ("term_offsets", "postings_docs", "postings_tf", "idf", "doc_lengths")
+
+
+class BM25Index:
+    """
+    Índice invertido BM25 con postings respaldadas por arrays.
+
+    Layout:
+        - vocab: término -> id de término
+        - term_offsets[t]:term_offsets[t + 1]: rango de postings del término t
+        - postings_docs / postings_tf: id de documento y frecuencia del término
+        - doc_lengths: cantidad de tokens por documento
+        - records: texto, metadata e id de cada chunk (acceso por offset)
+        - ids: id de chunk de cada documento (para acotar la búsqueda a un conjunto de ids)
+    """
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        arrays: Dict[str, np.ndarray],
+        records: Any,
+        k1: float = 1.5,
+        b: float = 0.75,
+        ids: Optional[List[str]] = None,
+    ):
+        """
+        Inicializa el índice a partir de sus componentes ya construidos.
+
+        Usar BM25Index.build o BM25Index.load en lugar de este constructor.
+        """
+        self.vocab = vocab
+        self.term_offsets = arrays["term_offsets"]
+        self.postings_docs = arrays["postings_docs"]
+        self.postings_tf = arrays["postings_tf"]
+        self.idf = arrays["idf"]
+        self.doc_lengths = arrays["doc_lengths"]
+        self.records = records
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = float(self.doc_lengths.mean()) if len(self.doc_lengths) else 0.0
+        self._ids = ids
+        self._rows_by_id: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return int(self.doc_lengths.shape[0])
+
+    @classmethod
+    def build(cls, chunks: Sequence[Document], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """
+        Construye el índice en memoria a partir de chunks.
+
+        Args:
+            chunks: Chunks (Document) a indexar
+            k1: Parámetro de saturación de frecuencia de BM25
+            b: Parámetro de normalización por longitud de BM25
+
+        Returns:
+            Índice BM25 construido
+        """
+        vocab: Dict[str, int] = {}
+        term_postings: List[List[Tuple[int, int]]] = []
+        doc_lengths = np.zeros(len(chunks), dtype=np.int32)
+        records = []
+
+        for doc_id, chunk in enumerate(chunks):
+            tokens = tokenize(chunk.page_content)
+            doc_lengths[doc_id] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_id = vocab.setdefault(term, len(vocab))
+                if term_id == len(term_postings):
+                    term_postings.append([])
+                term_postings[term_id].append((doc_id, tf))
+            records.append({
+                "id": get_chunk_id(chunk),
+                "text": chunk.page_content,
+                "metadata": chunk.metadata,
+            })
+
+        term_offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        term_offsets[1:] = np.cumsum([len(postings) for postings in term_postings])
+        total = int(term_offsets[-1])
+        postings_docs = np.empty(total, dtype=np.int32)
+        postings_tf = np.empty(total, dtype=np.uint16)
+        for term_id, postings in enumerate(term_postings):
+            start, end = term_offsets[term_id], term_offsets[term_id + 1]
+            postings_docs[start:end] = [doc_id for doc_id, _ in postings]
+            postings_tf[start:end] = [min(tf, np.iinfo(np.uint16).max) for _, tf in postings]
+
+        n_docs = len(chunks)
+        doc_freq = np.diff(term_offsets).astype(np.float32)
+        idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+        arrays = {
+            "term_offsets": term_offsets,
+            "postings_docs": postings_docs,
+            "postings_tf": postings_tf,
+            "idf": idf,
+            "doc_lengths": doc_lengths,
+        }
+        return cls(vocab, arrays, records, k1=k1, b=b, ids=[record["id"] for record in records])
+
+    def save(self, directory: str) -> None:
+        """
+        Persiste el índice en un directorio.
+
+        Args:
+            directory: Directorio destino (se crea si no existe)
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAY_FILES:
+            np.save(path / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        with open(path / _VOCAB_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.vocab, f, ensure_ascii=False)
+        with open(path / _IDS_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        with open(path / _META_FILE, "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "n_docs": len(self)}, f)
+        write_records(str(path), iter(self.records))
+        print(f"✅ Índice BM25 guardado en {directory} ({len(self)} chunks, {len(self.vocab)} términos)")
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "BM25Index":
+        """
+        Carga un índice persistido con save.
+
+        Args:
+            directory: Directorio del índice
+            mmap: Si True, las postings se abren con memory mapping
+
+        Returns:
+            Índice BM25 cargado
+        """
+        path = Path(directory)
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in _ARRAY_FILES}
+        with open(path / _VOCAB_FILE, "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        with open(path / _META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        ids = None
+        if (path / _IDS_FILE).exists():
+            with open(path / _IDS_FILE, "r", encoding="utf-8") as f:
+                ids = json.load(f)
+        return cls(vocab, arrays, RecordStore(str(path)), k1=meta["k1"], b=meta["b"], ids=ids)
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Indica si hay un índice persistido en el directorio."""
+        return (Path(directory) / _META_FILE).exists()
+
+    @property
+    def ids(self) -> List[str]:
+        """Id de chunk de cada documento (índices guardados sin ids.json los leen de los registros)."""
+        if self._ids is None:
+            self._ids = [record["id"] for record in self.records]
+        return self._ids
+
+    def rows_of(self, ids: Collection[str]) -> np.ndarray:
+        """Filas de los ids indexados (los ids desconocidos se ignoran)."""
+        if self._rows_by_id is None:
+            self._rows_by_id = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+        rows = [self._rows_by_id[chunk_id] for chunk_id in ids if chunk_id in self._rows_by_id]
+        return np.unique(np.asarray(rows, dtype=np.int64))
+
+    def get_scores(self, query: str) -> np.ndarray:
+        """
+        Calcula el score BM25 de la consulta contra todos los chunks.
+
+        Args:
+            query: Consulta en texto libre
+
+        Returns:
+            Array float32 con un score por chunk
+        """
+        scores = np.zeros(len(self), dtype=np.float32)
+        if not len(self):
+            return scores
+
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            docs = self.postings_docs[start:end]
+            tf = self.postings_tf[start:end].astype(np.float32)
+            norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[docs] / self.avg_doc_length)
+            scores[docs] += self.idf[term_id] * tf * (self.k1 + 1.0) / (tf + norm)
+        return scores
+
+    def search(
+        self, query: str, k: int = 3, ids: Optional[Collection[str]] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Recupera los k chunks con mayor score BM25.
+
+        Args:
+            query: Consulta en texto libre
+            k: Número de chunks a recuperar
+            ids: Si se pasa, solo se consideran estos ids (p.ej. el filtro de metadata)
+
+        Returns:
+            Lista de tuplas (documento, score_bm25) ordenada por score descendente
+        """
+        scores = self.get_scores(query)
+        if ids is not None:
+            allowed = self.rows_of(ids)
+            candidates = allowed[scores[allowed] > 0]
+        else:
+            candidates = np.flatnonzero(scores > 0)
+        if candidates.size == 0:
+            return []
+        if candidates.size > k:
+            top = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[top]
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        results = []
+        for doc_index in ordered:
+            record = self.records[int(doc_index)]
+            metadata: Optional[Dict[str, Any]] = record.get("metadata") or {}
+            results.append((
+                Document(page_content=record["text"], metadata=metadata, id=record.get("id")),
+                float(scores[doc_index]),
+            ))
+        return results
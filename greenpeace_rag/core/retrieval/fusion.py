@@ -0,0 +1,47 @@
+"""
+Fusión de rankings para el sistema RAG.
+
+Implementa Reciprocal Rank Fusion (RRF) sobre listas de documentos
+recuperadas por distintas consultas o distintos recuperadores.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from greenpeace_rag.utils.chunk_ids import get_chunk_id
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[Tuple[Document, float]]],
+    rrf_k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[Document, float]]:
+    """
+    Fusiona varias listas ordenadas de documentos usando RRF.
+
+    Cada documento recibe sum_i w_i / (rrf_k + rank_i), donde rank_i es su
+    posición (empezando en 1) en la lista i. Solo importa el orden de cada
+    lista, por lo que se pueden mezclar distancias y scores de distinta escala.
+
+    Args:
+        ranked_lists: Listas de tuplas (documento, score), cada una ordenada de mejor a peor
+        rrf_k: Constante de suavizado de RRF
+        weights: Peso de cada lista (por defecto 1.0 para todas)
+
+    Returns:
+        Lista de tuplas (documento, score_rrf) ordenada por score_rrf descendente
+    """
+    if weights is None:
+        weights = [1.0] * len(ranked_lists)
+
+    fused_scores: Dict[str, float] = {}
+    docs_by_id: Dict[str, Document] = {}
+    for ranked, weight in zip(ranked_lists, weights):
+        for rank, (doc, _) in enumerate(ranked, start=1):
+            doc_id = get_chunk_id(doc)
+            docs_by_id.setdefault(doc_id, doc)
+            fused_scores[doc_id] = fused_scores.get(doc_id, 0.0) + weight / (rrf_k + rank)
+
+    ordered_ids = sorted(fused_scores, key=lambda doc_id: fused_scores[doc_id], reverse=True)
+    return [(docs_by_id[doc_id], fused_scores[doc_id]) for doc_id in ordered_ids]
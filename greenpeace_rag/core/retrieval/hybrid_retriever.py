@@ -0,0 +1,120 @@
+"""
+Recuperación híbrida (BM25 + densa) para el sistema RAG.
+
+Combina la búsqueda semántica de ChromaDB con el índice léxico BM25 para no
+perder coincidencias exactas (nombres de especies, tratados, siglas de
+campañas) que los embeddings suelen diluir.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from ..caching.exact_cache import ExactCacheLayer
+from .bm25 import BM25Index
+from .fusion import reciprocal_rank_fusion
+from .neighbors import NeighborIndex
+from .prefilter import PrefilterIndex
+from .retriever import DocumentRetriever
+
+
+class HybridRetriever(DocumentRetriever):
+    """
+    Retriever que fusiona resultados densos y léxicos (BM25).
+
+    Cada recuperador aporta un pool de candidatos más amplio que k; los dos
+    rankings se fusionan con RRF ponderado y se devuelven los k mejores, que
+    luego pasan por el mismo filtrado por LLM que DocumentRetriever.
+    """
+
+    # search() devuelve scores RRF (mayor es mejor)
+    search_returns_distances = False
+
+    def __init__(
+        self,
+        vector_store: Chroma,
+        llm: Any,
+        bm25_index: BM25Index,
+        filter_config: Optional[Dict[str, Any]] = None,
+        retrieval_config: Optional[Dict[str, Any]] = None,
+        rerank_config: Optional[Dict[str, Any]] = None,
+        exact_cache: Optional[ExactCacheLayer] = None,
+        prefilter_index: Optional[PrefilterIndex] = None,
+        neighbor_index: Optional[NeighborIndex] = None,
+    ):
+        """
+        Inicializa el retriever híbrido.
+
+        Args:
+            vector_store: Instancia de ChromaDB para búsqueda semántica
+            llm: Modelo de lenguaje para filtrado de documentos
+            bm25_index: Índice BM25 construido sobre los mismos chunks
+            filter_config: Configuración del filtrado por LLM (ver FILTER_CONFIG)
+            retrieval_config: Configuración de la recuperación (ver RETRIEVAL_CONFIG)
+            rerank_config: Configuración del reranking en cascada (ver RERANK_CONFIG)
+            exact_cache: Caches exactos de búsquedas y veredictos del filtro (opcional)
+            prefilter_index: Índice de términos y metadata que acota los candidatos densos (opcional)
+            neighbor_index: Tabla de chunks vecinos para unir o ampliar los candidatos (opcional)
+        """
+        super().__init__(
+            vector_store,
+            llm,
+            filter_config=filter_config,
+            retrieval_config=retrieval_config,
+            rerank_config=rerank_config,
+            exact_cache=exact_cache,
+            prefilter_index=prefilter_index,
+            neighbor_index=neighbor_index,
+        )
+        self.bm25_index = bm25_index
+
+    def search(self, question: str, k: int = 3) -> List[Tuple[Document, float]]:
+        """
+        Búsqueda híbrida: candidatos densos y BM25 fusionados con RRF.
+
+        Args:
+            question: Pregunta a responder
+            k: Número de documentos a devolver tras la fusión
+
+        Returns:
+            Lista de tuplas (documento, score_rrf) ordenada por score_rrf descendente
+        """
+        n_candidates = max(k, k * self.retrieval_config["hybrid_candidate_multiplier"])
+
+        dense = self._vector_search(question, n_candidates)
+        lexical = self.bm25_index.search(question, k=n_candidates, ids=self._filter_ids)
+
+        fused = reciprocal_rank_fusion(
+            [dense, lexical],
+            rrf_k=self.retrieval_config["rrf_k"],
+            weights=[self.retrieval_config["dense_weight"], self.retrieval_config["lexical_weight"]],
+        )
+        print(f"🔀 Híbrido: {len(dense)} densos + {len(lexical)} BM25 -> {len(fused)} únicos")
+        return fused[:k]
+
+    def search_batch(self, questions: List[str], k: int = 3) -> List[List[Tuple[Document, float]]]:
+        """
+        Búsqueda híbrida de varias preguntas.
+
+        Los candidatos densos de todas las preguntas se obtienen con una sola
+        consulta multi-embedding; BM25 se evalúa por pregunta. Ambos lados
+        respetan el filtro de metadata.
+
+        Args:
+            questions: Preguntas a buscar
+            k: Número de documentos a devolver por pregunta tras la fusión
+
+        Returns:
+            Una lista de tuplas (documento, score_rrf) por pregunta, en el mismo orden
+        """
+        n_candidates = max(k, k * self.retrieval_config["hybrid_candidate_multiplier"])
+        dense_batch = self.similarity_search_batch_with_score(questions, k=n_candidates)
+        weights = [self.retrieval_config["dense_weight"], self.retrieval_config["lexical_weight"]]
+
+        batch = []
+        for question, dense in zip(questions, dense_batch):
+            lexical = self.bm25_index.search(question, k=n_candidates, ids=self._filter_ids)
+            fused = reciprocal_rank_fusion([dense, lexical], rrf_k=self.retrieval_config["rrf_k"], weights=weights)
+            batch.append(fused[:k])
+        return batch
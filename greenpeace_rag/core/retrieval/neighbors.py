@@ -0,0 +1,242 @@
+"""
+Tabla de chunks vecinos para el sistema RAG.
+
+Los chunkers guardan en la metadata el offset de cada chunk en su archivo
+(start_index), su número de secuencia (chunk_index) y el archivo al que se
+refieren (origin_file, que no cambia si la deduplicación transfiere el chunk
+a otro archivo dueño). Con eso se precalcula,
+para cada chunk, el anterior y el siguiente del mismo archivo, de modo que
+los candidatos recuperados consecutivos se unen en ventanas contiguas (sin
+repetir el overlap) o se amplían con ±window vecinos sin otra búsqueda
+vectorial: menos bloques de contexto, más densos, y menos chunks a evaluar.
+"""
+
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from greenpeace_rag.utils.chunk_ids import (get_chunk_id, get_origin_file,
+                                            make_chunk_id)
+from greenpeace_rag.utils.config import NEIGHBOR_MODES
+from greenpeace_rag.utils.record_store import RecordStore, write_records
+
+_META_FILE = "neighbors_meta.json"
+_IDS_FILE = "ids.json"
+_ARRAY_FILES = ("previous", "next", "start_index")
+
+
+class NeighborIndex:
+    """
+    Tabla de vecinos de los chunks indexados.
+
+    Layout:
+        - previous[r] / next[r]: fila del chunk anterior / siguiente del mismo
+          archivo (-1 si no hay o si no es contiguo, p.ej. porque la
+          deduplicación descartó el del medio)
+        - start_index[r]: offset en caracteres del chunk en su archivo (-1 si no se conoce)
+        - ids: id de chunk de cada fila
+        - records: texto, metadata e id de cada chunk (acceso por offset)
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], ids: List[str], records: Any):
+        """
+        Inicializa la tabla a partir de sus componentes ya construidos.
+
+        Usar NeighborIndex.build o NeighborIndex.load en lugar de este constructor.
+        """
+        self.previous = arrays["previous"]
+        self.next = arrays["next"]
+        self.start_index = arrays["start_index"]
+        self.ids = ids
+        self.rows = {chunk_id: row for row, chunk_id in enumerate(ids)}
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, chunks: Sequence[Document]) -> "NeighborIndex":
+        """
+        Construye la tabla en memoria a partir de chunks.
+
+        Args:
+            chunks: Chunks (Document) con metadata origin_file (o file_name), start_index y chunk_index
+
+        Returns:
+            Tabla construida (los chunks sin chunk_index quedan sin vecinos)
+        """
+        n_chunks = len(chunks)
+        previous = np.full(n_chunks, -1, dtype=np.int32)
+        following = np.full(n_chunks, -1, dtype=np.int32)
+        start_index = np.full(n_chunks, -1, dtype=np.int64)
+        by_file: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        records = []
+
+        for row, chunk in enumerate(chunks):
+            metadata = chunk.metadata
+            if metadata.get("start_index") is not None:
+                start_index[row] = int(metadata["start_index"])
+            origin_file = get_origin_file(metadata)
+            if origin_file and metadata.get("chunk_index") is not None:
+                by_file[origin_file].append((int(metadata["chunk_index"]), row))
+            records.append({"id": get_chunk_id(chunk), "text": chunk.page_content, "metadata": metadata})
+
+        for positions in by_file.values():
+            positions.sort()
+            for (index, row), (next_index, next_row) in zip(positions, positions[1:]):
+                if next_index == index + 1:
+                    following[row] = next_row
+                    previous[next_row] = row
+
+        arrays = {"previous": previous, "next": following, "start_index": start_index}
+        return cls(arrays, [record["id"] for record in records], records)
+
+    def save(self, directory: str) -> None:
+        """
+        Persiste la tabla en un directorio.
+
+        Args:
+            directory: Directorio destino (se crea si no existe)
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAY_FILES:
+            np.save(path / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        with open(path / _IDS_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        with open(path / _META_FILE, "w", encoding="utf-8") as f:
+            json.dump({"n_chunks": len(self), "linked": int((self.next >= 0).sum())}, f)
+        write_records(str(path), iter(self.records))
+        print(f"✅ Tabla de vecinos guardada en {directory} "
+              f"({len(self)} chunks, {int((self.next >= 0).sum())} pares consecutivos)")
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "NeighborIndex":
+        """
+        Carga una tabla persistida con save.
+
+        Args:
+            directory: Directorio de la tabla
+            mmap: Si True, los arrays se abren con memory mapping
+
+        Returns:
+            Tabla cargada
+        """
+        path = Path(directory)
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in _ARRAY_FILES}
+        with open(path / _IDS_FILE, "r", encoding="utf-8") as f:
+            ids = json.load(f)
+        return cls(arrays, ids, RecordStore(str(path)))
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Indica si hay una tabla persistida en el directorio."""
+        return (Path(directory) / _META_FILE).exists()
+
+    # ---------- Consultas ----------
+
+    def neighbors(self, row: int, window: int = 1) -> List[int]:
+        """Filas de hasta window chunks anteriores y siguientes del mismo archivo (sin row)."""
+        rows = []
+        for links in (self.previous, self.next):
+            current = row
+            for _ in range(window):
+                current = int(links[current])
+                if current < 0:
+                    break
+                rows.append(current)
+        return rows
+
+    def _document(self, row: int) -> Document:
+        record = self.records[row]
+        return Document(page_content=record["text"], metadata=record.get("metadata") or {}, id=record.get("id"))
+
+    def _merge(self, run: List[int], docs: Dict[int, Document], best: Document) -> Document:
+        """Une los chunks consecutivos de run en un único Document, sin repetir el overlap."""
+        chunks = [docs[row] if row in docs else self._document(row) for row in run]
+        text = chunks[0].page_content
+        start = int(self.start_index[run[0]])
+        end: Optional[int] = start + len(text) if start >= 0 else None
+        for row, chunk in zip(run[1:], chunks[1:]):
+            start = int(self.start_index[row])
+            if end is None or start < 0:
+                # Sin offsets no se puede ubicar el overlap: se concatenan enteros
+                text += "\n" + chunk.page_content
+            elif start < end:
+                text += chunk.page_content[end - start:]
+            else:
+                # Entre chunks sin overlap solo hay separadores (el chunker recorta los espacios)
+                text += "\n" + chunk.page_content
+            end = max(end, start + len(chunk.page_content)) if end is not None and start >= 0 else None
+
+        metadata = {
+            **best.metadata,
+            "start_index": int(self.start_index[run[0]]),
+            "chunk_index": chunks[0].metadata.get("chunk_index"),
+            "chunk_ids": [self.ids[row] for row in run],
+            "chunk_id": make_chunk_id(best.metadata.get("file_name", ""), text),
+        }
+        return Document(page_content=text, metadata=metadata, id=metadata["chunk_id"])
+
+    def apply(
+        self, docs_with_scores: Sequence[Tuple[Document, float]], mode: str = "merge", window: int = 1
+    ) -> List[Tuple[Document, float]]:
+        """
+        Une (y opcionalmente amplía) los candidatos recuperados usando la tabla.
+
+        Args:
+            docs_with_scores: Candidatos, de más a menos relevante
+            mode: "merge" une los candidatos consecutivos del mismo archivo;
+                "expand" además agrega hasta window vecinos a cada lado
+            window: Vecinos por lado en modo "expand"
+
+        Returns:
+            Bloques (documento, score) en el orden de su candidato más
+            relevante, con el score de ese candidato. Los candidatos que no
+            están en la tabla y los que quedan solos se devuelven sin cambios;
+            los bloques unidos llevan metadata["chunk_ids"] con sus chunks
+        """
+        if mode not in NEIGHBOR_MODES:
+            raise ValueError(f"Modo de vecinos no válido: {mode}")
+
+        docs: Dict[int, Document] = {}
+        best: Dict[int, Tuple[int, Document, float]] = {}  # fila -> (rank, doc, score) del candidato
+        selected = set()
+        passthrough = []
+        for rank, (doc, score) in enumerate(docs_with_scores):
+            row = self.rows.get(get_chunk_id(doc))
+            if row is None:
+                passthrough.append((rank, doc, score))
+                continue
+            if row in docs:
+                continue
+            docs[row] = doc
+            best[row] = (rank, doc, score)
+            selected.add(row)
+            if mode == "expand":
+                selected.update(self.neighbors(row, window))
+
+        blocks = []
+        for row in selected:
+            if int(self.previous[row]) in selected:
+                continue
+            run = [row]
+            while int(self.next[run[-1]]) in selected:
+                run.append(int(self.next[run[-1]]))
+            members = [best[member] for member in run if member in best]
+            if not members:
+                continue
+            rank, best_doc, score = min(members, key=lambda member: member[0])
+            block = best_doc if len(run) == 1 else self._merge(run, docs, best_doc)
+            blocks.append((rank, block, score))
+
+        blocks.extend(passthrough)
+        blocks.sort(key=lambda block: block[0])
+        if len(blocks) != len(docs_with_scores) or mode == "expand":
+            print(f"🧩 Vecinos ({mode}): {len(docs_with_scores)} candidatos -> {len(blocks)} bloques")
+        return [(block, score) for _, block, score in blocks]
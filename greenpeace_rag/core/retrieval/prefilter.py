@@ -0,0 +1,293 @@
+"""
+Pre-filtro de candidatos por términos y metadata para el sistema RAG.
+
+Índice invertido (mismo layout de arrays que BM25Index) que asocia a cada
+término de los chunks y a cada valor de metadata (archivo, tipo de
+documento, año) las filas de los chunks que lo contienen. Antes del scoring
+vectorial, la búsqueda se puede acotar al conjunto de ids que cumple un
+filtro de metadata y/o contiene alguna keyword de la pregunta. Las keywords
+se extraen localmente: los términos de la pregunta más selectivos del índice
+(menor frecuencia de documento), sin llamar al LLM.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Union
+
+import numpy as np
+from langchain_core.documents import Document
+
+from greenpeace_rag.utils.chunk_ids import get_chunk_id
+from greenpeace_rag.utils.config import PREFILTER_CONFIG
+from greenpeace_rag.utils.text import normalize_text, tokenize
+
+_META_FILE = "prefilter_meta.json"
+_VOCAB_FILE = "vocab.json"
+_IDS_FILE = "ids.json"
+_ARRAY_FILES = ("term_offsets", "postings_docs")
+_YEAR_PATTERN = re.compile(r"(?<!\d)(19\d{2}|20\d{2})(?!\d)")
+
+# Campos de metadata indexados (ver metadata_values)
+METADATA_FIELDS = ("file_name", "doc_type", "year")
+
+Where = Dict[str, Union[str, int, Sequence[Union[str, int]]]]
+
+
+def _metadata_key(field: str, value: Any) -> str:
+    # "=" no aparece en los tokens de texto: las claves de metadata no chocan con términos
+    return f"{field}={normalize_text(str(value)).strip()}"
+
+
+def metadata_values(chunk: Document, doc_types: Dict[str, List[str]]) -> Dict[str, Set[str]]:
+    """
+    Valores de metadata indexables de un chunk.
+
+    Args:
+        chunk: Chunk con metadata["file_name"] (y opcionalmente sources, doc_type, date)
+        doc_types: Tipo de documento -> fragmentos del nombre de archivo que lo
+            identifican (se usa si la metadata no trae doc_type)
+
+    Returns:
+        Campo -> valores: file_name (el archivo y todas sus fuentes
+        deduplicadas), doc_type y year (años del nombre de archivo, de
+        metadata["date"] o mencionados en el texto)
+    """
+    metadata = chunk.metadata
+    file_names = {name for name in [metadata.get("file_name"), *(metadata.get("sources") or [])] if name}
+    values: Dict[str, Set[str]] = {"file_name": file_names, "doc_type": set(), "year": set()}
+
+    if metadata.get("doc_type"):
+        values["doc_type"].add(str(metadata["doc_type"]))
+    else:
+        normalized_names = [normalize_text(name) for name in file_names]
+        for doc_type, patterns in doc_types.items():
+            if any(normalize_text(pattern) in name for pattern in patterns for name in normalized_names):
+                values["doc_type"].add(doc_type)
+
+    for text in [*file_names, str(metadata.get("date") or ""), chunk.page_content]:
+        values["year"].update(_YEAR_PATTERN.findall(text))
+    return values
+
+
+class PrefilterIndex:
+    """
+    Índice invertido término/metadata -> filas de chunks.
+
+    Layout:
+        - vocab: término o "campo=valor" -> id de clave
+        - term_offsets[t]:term_offsets[t + 1]: rango de postings de la clave t
+        - postings_docs: filas de chunk, ordenadas dentro de cada clave
+        - ids: id de chunk de cada fila
+    """
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        arrays: Dict[str, np.ndarray],
+        ids: List[str],
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Inicializa el índice a partir de sus componentes ya construidos.
+
+        Usar PrefilterIndex.build o PrefilterIndex.load en lugar de este constructor.
+        """
+        self.vocab = vocab
+        self.term_offsets = arrays["term_offsets"]
+        self.postings_docs = arrays["postings_docs"]
+        self.ids = ids
+        self.config = {**PREFILTER_CONFIG, **(config or {})}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, chunks: Sequence[Document], config: Optional[Dict[str, Any]] = None) -> "PrefilterIndex":
+        """
+        Construye el índice en memoria a partir de chunks.
+
+        Args:
+            chunks: Chunks (Document) a indexar
+            config: Configuración del pre-filtro (ver PREFILTER_CONFIG)
+
+        Returns:
+            Índice construido
+        """
+        config = {**PREFILTER_CONFIG, **(config or {})}
+        vocab: Dict[str, int] = {}
+        postings: List[List[int]] = []
+        ids = []
+
+        for row, chunk in enumerate(chunks):
+            keys = set(tokenize(chunk.page_content))
+            for field, values in metadata_values(chunk, config["doc_types"]).items():
+                keys.update(_metadata_key(field, value) for value in values)
+            for key in keys:
+                key_id = vocab.setdefault(key, len(vocab))
+                if key_id == len(postings):
+                    postings.append([])
+                postings[key_id].append(row)
+            ids.append(get_chunk_id(chunk))
+
+        term_offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        term_offsets[1:] = np.cumsum([len(rows) for rows in postings])
+        postings_docs = np.empty(int(term_offsets[-1]), dtype=np.int32)
+        for key_id, rows in enumerate(postings):
+            postings_docs[term_offsets[key_id]:term_offsets[key_id + 1]] = rows
+        return cls(vocab, {"term_offsets": term_offsets, "postings_docs": postings_docs}, ids, config)
+
+    def save(self, directory: str) -> None:
+        """
+        Persiste el índice en un directorio.
+
+        Args:
+            directory: Directorio destino (se crea si no existe)
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAY_FILES:
+            np.save(path / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        with open(path / _VOCAB_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.vocab, f, ensure_ascii=False)
+        with open(path / _IDS_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        with open(path / _META_FILE, "w", encoding="utf-8") as f:
+            json.dump({"n_docs": len(self)}, f)
+        print(f"✅ Índice de pre-filtro guardado en {directory} ({len(self)} chunks, {len(self.vocab)} claves)")
+
+    @classmethod
+    def load(cls, directory: str, config: Optional[Dict[str, Any]] = None, mmap: bool = True) -> "PrefilterIndex":
+        """
+        Carga un índice persistido con save.
+
+        Args:
+            directory: Directorio del índice
+            config: Configuración del pre-filtro (ver PREFILTER_CONFIG)
+            mmap: Si True, las postings se abren con memory mapping
+
+        Returns:
+            Índice cargado
+        """
+        path = Path(directory)
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode) for name in _ARRAY_FILES}
+        with open(path / _VOCAB_FILE, "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        with open(path / _IDS_FILE, "r", encoding="utf-8") as f:
+            ids = json.load(f)
+        return cls(vocab, arrays, ids, config)
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Indica si hay un índice persistido en el directorio."""
+        return (Path(directory) / _META_FILE).exists()
+
+    # ---------- Consultas ----------
+
+    def _rows(self, key: str) -> np.ndarray:
+        key_id = self.vocab.get(key)
+        if key_id is None:
+            return np.empty(0, dtype=np.int32)
+        return np.asarray(self.postings_docs[self.term_offsets[key_id]:self.term_offsets[key_id + 1]])
+
+    def _union(self, keys: Iterable[str]) -> np.ndarray:
+        rows = [self._rows(key) for key in keys]
+        return np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int32)
+
+    def document_frequency(self, term: str) -> int:
+        """Cantidad de chunks que contienen el término (ya normalizado)."""
+        key_id = self.vocab.get(term)
+        return 0 if key_id is None else int(self.term_offsets[key_id + 1] - self.term_offsets[key_id])
+
+    def extract_keywords(self, question: str, max_keywords: Optional[int] = None) -> List[str]:
+        """
+        Keywords de la pregunta, sin LLM: sus términos más selectivos del índice.
+
+        Se descartan los términos que no aparecen en el corpus y los que
+        aparecen en más de max_df_ratio de los chunks (no acotan la búsqueda).
+
+        Args:
+            question: Pregunta en texto libre
+            max_keywords: Máximo de keywords (por defecto el de la configuración)
+
+        Returns:
+            Términos ordenados de más a menos selectivo
+        """
+        max_keywords = max_keywords or self.config["max_keywords"]
+        max_df = self.config["max_df_ratio"] * len(self)
+        frequencies = {term: self.document_frequency(term) for term in dict.fromkeys(tokenize(question))}
+        selective = [term for term, df in frequencies.items() if 0 < df <= max_df]
+        return sorted(selective, key=lambda term: frequencies[term])[:max_keywords]
+
+    def candidate_rows(
+        self, keywords: Optional[Sequence[str]] = None, where: Optional[Where] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Filas que cumplen el filtro de metadata y contienen alguna keyword.
+
+        Args:
+            keywords: Términos normalizados (basta con que el chunk contenga uno)
+            where: Campo -> valor o lista de valores (ver METADATA_FIELDS);
+                los campos se combinan con AND y los valores de un campo con OR
+
+        Returns:
+            Filas ordenadas, o None si no hay ninguna restricción
+        """
+        rows: Optional[np.ndarray] = None
+        for field, values in (where or {}).items():
+            if field not in METADATA_FIELDS:
+                raise ValueError(f"Campo de metadata no indexado: {field} (ver METADATA_FIELDS)")
+            values = [values] if isinstance(values, (str, int)) else list(values)
+            field_rows = self._union(_metadata_key(field, value) for value in values)
+            rows = field_rows if rows is None else np.intersect1d(rows, field_rows, assume_unique=True)
+        if keywords:
+            keyword_rows = self._union(keywords)
+            rows = keyword_rows if rows is None else np.intersect1d(rows, keyword_rows, assume_unique=True)
+        return rows
+
+    def _ids(self, rows: np.ndarray) -> List[str]:
+        return [self.ids[int(row)] for row in rows]
+
+    def metadata_ids(self, where: Optional[Where] = None) -> Optional[List[str]]:
+        """
+        Ids que cumplen un filtro de metadata (filtro estricto).
+
+        Args:
+            where: Filtro de metadata (ver candidate_rows)
+
+        Returns:
+            Ids que cumplen el filtro, o None si no hay filtro
+        """
+        if not where:
+            return None
+        rows = self.candidate_rows(where=where)
+        print(f"🧮 Filtro de metadata {where}: {len(rows)} de {len(self)} chunks")
+        return self._ids(rows)
+
+    def keyword_ids(self, question: str, k: int, where: Optional[Where] = None) -> Optional[List[str]]:
+        """
+        Ids que cumplen el filtro de metadata y contienen alguna keyword de la pregunta.
+
+        Las keywords solo acotan si dejan entre max(k, min_keyword_candidates)
+        candidatos y max_candidate_ratio del corpus: con un conjunto chico es
+        más probable perder chunks relevantes que no comparten términos con
+        la pregunta, así que se prefiere la búsqueda sin acotar.
+
+        Args:
+            question: Pregunta en texto libre
+            k: Documentos a recuperar
+            where: Filtro de metadata (ver candidate_rows)
+
+        Returns:
+            Ids candidatos, o None si las keywords no acotan la búsqueda
+        """
+        keywords = self.extract_keywords(question)
+        if not keywords:
+            return None
+        rows = self.candidate_rows(keywords=keywords, where=where)
+        min_candidates = max(k, self.config["min_keyword_candidates"])
+        if not min_candidates <= len(rows) <= self.config["max_candidate_ratio"] * len(self):
+            return None
+        print(f"🧮 Pre-filtro por keywords ({', '.join(keywords)}): {len(rows)} de {len(self)} chunks candidatos")
+        return self._ids(rows)
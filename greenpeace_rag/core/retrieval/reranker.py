@@ -0,0 +1,245 @@
+"""
+Reranking en cascada para el sistema RAG.
+
+Reduce la cantidad de llamadas al LLM para filtrar documentos aplicando
+etapas de costo creciente:
+
+1. Corte por distancia (gratis, usa el score del vector store)
+2. Cross-encoder local en CPU (una pasada por lotes para todos los candidatos)
+3. LLM (DOCUMENT_FILTER_PROMPT) solo para los candidatos dudosos
+"""
+
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from greenpeace_rag.utils.config import RERANK_CONFIG
+
+# (pregunta, documentos) -> [(documento, score, es_relevante, explicación)]
+LLMGrader = Callable[[str, List[Tuple[Document, float]]], List[Tuple[Document, float, bool, str]]]
+AsyncLLMGrader = Callable[[str, List[Tuple[Document, float]]], Awaitable[List[Tuple[Document, float, bool, str]]]]
+
+
+class CrossEncoderReranker:
+    """Cross-encoder local que puntúa pares (pregunta, chunk) en lotes."""
+
+    def __init__(
+        self,
+        model_name: str = RERANK_CONFIG["cross_encoder_model"],
+        device: str = "cpu",
+        batch_size: int = 32,
+        max_length: int = 512,
+        activation: str = RERANK_CONFIG["activation"],
+    ):
+        """
+        Inicializa el reranker. El modelo se carga de forma perezosa.
+
+        Args:
+            model_name: Modelo de sentence-transformers (CrossEncoder)
+            device: Dispositivo de inferencia
+            batch_size: Tamaño de lote para predict
+            max_length: Longitud máxima (tokens) de cada par
+            activation: Activación aplicada siempre a la salida cruda del
+                modelo ("sigmoid" o "identity", ver RERANK_CONFIG)
+        """
+        if activation not in ("sigmoid", "identity"):
+            raise ValueError(f"Activación de cross-encoder no válida: {activation}")
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.activation = activation
+        self._model = None
+
+    @property
+    def model(self) -> Any:
+        """Instancia de CrossEncoder (se carga en el primer uso)."""
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+
+            print(f"🔁 Cargando cross-encoder {self.model_name} ({self.device})...")
+            self._model = CrossEncoder(self.model_name, device=self.device, max_length=self.max_length)
+        return self._model
+
+    def score(self, question: str, docs: List[Document]) -> np.ndarray:
+        """
+        Puntúa todos los documentos contra la pregunta en una pasada por lotes.
+
+        Args:
+            question: Pregunta original
+            docs: Documentos candidatos
+
+        Returns:
+            Array con un score en [0, 1] por documento
+        """
+        if not docs:
+            return np.zeros(0, dtype=np.float32)
+
+        pairs = [(question, doc.page_content) for doc in docs]
+        scores = np.asarray(
+            self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False, **self._raw_output()),
+            dtype=np.float32,
+        ).reshape(len(docs), -1)[:, -1]
+
+        # Los umbrales de la cascada se expresan en [0, 1]: la activación es
+        # fija por modelo, no depende de los valores del lote
+        if self.activation == "sigmoid":
+            scores = 1.0 / (1.0 + np.exp(-scores))
+        return scores
+
+    def _raw_output(self) -> Dict[str, Any]:
+        """Argumento de predict que desactiva la activación por defecto de sentence-transformers."""
+        from torch.nn import Identity
+
+        # sentence-transformers < 4 lo llama activation_fct; >= 4, activation_fn
+        parameters = inspect.signature(self.model.predict).parameters
+        name = "activation_fn" if "activation_fn" in parameters else "activation_fct"
+        return {name: Identity()}
+
+
+class RerankingCascade:
+    """
+    Cascada distancia -> cross-encoder -> LLM.
+
+    Los candidatos con score del cross-encoder >= accept_threshold se aceptan
+    directamente, los que están por debajo de reject_threshold se descartan y
+    solo los intermedios pasan al LLM. Tras cada ejecución, last_report indica
+    cuántos candidatos eliminó cada etapa.
+    """
+
+    def __init__(
+        self,
+        rerank_config: Optional[Dict[str, Any]] = None,
+        cross_encoder: Optional[CrossEncoderReranker] = None,
+    ):
+        """
+        Inicializa la cascada.
+
+        Args:
+            rerank_config: Configuración de la cascada (ver RERANK_CONFIG)
+            cross_encoder: Reranker a usar (por defecto se crea según la configuración)
+        """
+        self.config = {**RERANK_CONFIG, **(rerank_config or {})}
+        if self.config["reject_threshold"] > self.config["accept_threshold"]:
+            raise ValueError("reject_threshold no puede ser mayor que accept_threshold")
+
+        self.cross_encoder = cross_encoder or CrossEncoderReranker(
+            model_name=self.config["cross_encoder_model"],
+            device=self.config["device"],
+            batch_size=self.config["batch_size"],
+            max_length=self.config["max_length"],
+            activation=self.config["activation"],
+        )
+        self.last_report: Dict[str, int] = {}
+
+    def run(
+        self,
+        question: str,
+        docs_with_scores: List[Tuple[Document, float]],
+        llm_grader: LLMGrader,
+        scores_are_distances: bool = True,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Ejecuta la cascada sobre los candidatos recuperados.
+
+        Args:
+            question: Pregunta original
+            docs_with_scores: Candidatos (documento, score del vector store)
+            llm_grader: Función que evalúa con el LLM los candidatos dudosos
+            scores_are_distances: Si False (p.ej. scores RRF) se omite el corte por distancia
+
+        Returns:
+            Documentos relevantes (documento, score original) ordenados por score del cross-encoder
+        """
+        report, accepted, borderline = self.prefilter(question, docs_with_scores, scores_are_distances)
+        verdicts = llm_grader(question, borderline) if borderline else []
+        return self.finalize(report, accepted, borderline, verdicts)
+
+    async def arun(
+        self,
+        question: str,
+        docs_with_scores: List[Tuple[Document, float]],
+        llm_grader: AsyncLLMGrader,
+        scores_are_distances: bool = True,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Versión asíncrona de run.
+
+        El cross-encoder corre en el executor por defecto para no bloquear el
+        event loop; llm_grader es una corrutina.
+
+        Args:
+            question: Pregunta original
+            docs_with_scores: Candidatos (documento, score del vector store)
+            llm_grader: Corrutina que evalúa con el LLM los candidatos dudosos
+            scores_are_distances: Si False (p.ej. scores RRF) se omite el corte por distancia
+
+        Returns:
+            Documentos relevantes (documento, score original) ordenados por score del cross-encoder
+        """
+        report, accepted, borderline = await asyncio.to_thread(
+            self.prefilter, question, docs_with_scores, scores_are_distances
+        )
+        verdicts = await llm_grader(question, borderline) if borderline else []
+        return self.finalize(report, accepted, borderline, verdicts)
+
+    def prefilter(
+        self,
+        question: str,
+        docs_with_scores: List[Tuple[Document, float]],
+        scores_are_distances: bool,
+    ) -> Tuple[Dict[str, int], List[Tuple[Document, float]], List[Tuple[Document, float]]]:
+        """Etapas 1 y 2: devuelve (reporte parcial, aceptados, dudosos)."""
+        report = {"input": len(docs_with_scores)}
+        candidates = list(docs_with_scores)
+
+        # Etapa 1: corte por distancia
+        max_distance = self.config["max_distance"]
+        if max_distance is not None and scores_are_distances:
+            candidates = [(doc, score) for doc, score in candidates if score <= max_distance]
+        report["removed_by_distance"] = report["input"] - len(candidates)
+
+        # Etapa 2: cross-encoder en una sola pasada por lotes. El score se anota
+        # en una copia: los documentos pueden venir del cache de búsquedas
+        ce_scores = self.cross_encoder.score(question, [doc for doc, _ in candidates])
+        candidates = [
+            (Document(page_content=doc.page_content, metadata={**doc.metadata, "rerank_score": float(ce_score)},
+                      id=doc.id), score)
+            for (doc, score), ce_score in zip(candidates, ce_scores)
+        ]
+
+        accepted, borderline = [], []
+        for candidate, ce_score in zip(candidates, ce_scores):
+            if ce_score >= self.config["accept_threshold"]:
+                accepted.append(candidate)
+            elif ce_score >= self.config["reject_threshold"]:
+                borderline.append(candidate)
+        report["removed_by_cross_encoder"] = len(candidates) - len(accepted) - len(borderline)
+        report["accepted_by_cross_encoder"] = len(accepted)
+        return report, accepted, borderline
+
+    def finalize(
+        self,
+        report: Dict[str, int],
+        accepted: List[Tuple[Document, float]],
+        borderline: List[Tuple[Document, float]],
+        verdicts: List[Tuple[Document, float, bool, str]],
+    ) -> List[Tuple[Document, float]]:
+        """Etapa 3: combina los aceptados con los dudosos que aprobó el LLM."""
+        report["sent_to_llm"] = len(borderline)
+        kept = [(doc, score) for doc, score, is_relevant, _ in verdicts if is_relevant]
+        report["removed_by_llm"] = len(borderline) - len(kept)
+
+        relevant = sorted(accepted + kept, key=lambda item: item[0].metadata["rerank_score"], reverse=True)
+        report["output"] = len(relevant)
+        self.last_report = report
+
+        print(
+            f"🪜 Cascada: {report['input']} candidatos | distancia -{report['removed_by_distance']} | "
+            f"cross-encoder -{report['removed_by_cross_encoder']} (+{report['accepted_by_cross_encoder']} aceptados) | "
+            f"LLM -{report['removed_by_llm']} de {report['sent_to_llm']} | final {report['output']}"
+        )
+        return relevant
@@ -5,16 +5,32 @@ Este módulo contiene la lógica para recuperar y filtrar documentos relevantes
 usando ChromaDB y LLM para evaluación de relevancia.
 """
 
-from typing import Any, List, Optional, Tuple
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
 
 from greenpeace_rag.prompts.rag_prompts import (DOCUMENT_FILTER_PROMPT,
-                                                KEYWORDS_PROMPT,
                                                 RANKING_PROMPT)
 from greenpeace_rag.schemas.pydantic_models import (RankingQuestions,
                                                     RelevanceGrade)
+from greenpeace_rag.utils.async_utils import run_coroutine_sync
+from greenpeace_rag.utils.chunk_ids import get_chunk_id, make_chunk_id
+from greenpeace_rag.utils.config import (FILTER_CONFIG, NEIGHBOR_MODES,
+                                         RETRIEVAL_CONFIG)
+from greenpeace_rag.utils.text import tokenize
+
+from ..caching.exact_cache import ExactCacheLayer, normalize_question
+from .fusion import reciprocal_rank_fusion
+from .neighbors import NeighborIndex
+from .prefilter import PrefilterIndex, Where
+from .reranker import RerankingCascade
+
+FILTER_MODES = ("sequential", "concurrent", "cascade")
 
 
 class DocumentRetriever:
@@ -25,23 +41,77 @@ class DocumentRetriever:
     usando LLM para asegurar relevancia.
     """
 
-    def __init__(self, vector_store: Chroma, llm: Any):
+    # search() devuelve distancias del vector store (menor es mejor)
+    search_returns_distances = True
+
+    def __init__(
+        self,
+        vector_store: Chroma,
+        llm: Any,
+        filter_config: Optional[Dict[str, Any]] = None,
+        retrieval_config: Optional[Dict[str, Any]] = None,
+        rerank_config: Optional[Dict[str, Any]] = None,
+        exact_cache: Optional[ExactCacheLayer] = None,
+        prefilter_index: Optional[PrefilterIndex] = None,
+        neighbor_index: Optional[NeighborIndex] = None,
+    ):
         """
         Inicializa el recuperador de documentos.
 
         Args:
             vector_store: Instancia de ChromaDB para búsqueda semántica
             llm: Modelo de lenguaje para filtrado de documentos
+            filter_config: Configuración del filtrado por LLM (ver FILTER_CONFIG)
+            retrieval_config: Configuración de la recuperación (ver RETRIEVAL_CONFIG)
+            rerank_config: Configuración del reranking en cascada (ver RERANK_CONFIG)
+            exact_cache: Caches exactos de búsquedas y veredictos del filtro (opcional)
+            prefilter_index: Índice de términos y metadata para acotar la búsqueda
+                vectorial a un conjunto de ids candidatos (opcional)
+            neighbor_index: Tabla de chunks vecinos para unir o ampliar los
+                candidatos según retrieval_config["neighbor_mode"] (opcional)
         """
         self.vector_store = vector_store
         self.llm = llm
+        self.retrieval_config = {**RETRIEVAL_CONFIG, **(retrieval_config or {})}
+        if self.retrieval_config["neighbor_mode"] not in [None] + NEIGHBOR_MODES:
+            raise ValueError(f"Modo de vecinos no válido: {self.retrieval_config['neighbor_mode']}")
+        # Cache LRU de preguntas de ranking generadas: pregunta normalizada -> reformulaciones
+        self._ranking_questions_cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self.filter_config = {**FILTER_CONFIG, **(filter_config or {})}
+        if self.filter_config["filter_mode"] not in FILTER_MODES:
+            raise ValueError(f"Modo de filtrado no válido: {self.filter_config['filter_mode']}")
+        self._relevance_grader = None
+        self.rerank_config = rerank_config
+        self._reranking_cascade = None
+        self.exact_cache = exact_cache
+        self.filter_model = getattr(llm, "model", None) or type(llm).__name__
+        self.prefilter_index = prefilter_index
+        # Filtro de metadata de las búsquedas y sus ids (ver set_metadata_filter)
+        self.metadata_filter: Optional[Where] = None
+        self._filter_ids: Optional[List[str]] = None
+        self.neighbor_index = neighbor_index
+
+    @property
+    def relevance_grader(self) -> Any:
+        """Runnable con salida estructurada RelevanceGrade (se construye una sola vez)."""
+        if self._relevance_grader is None:
+            self._relevance_grader = self.llm.with_structured_output(RelevanceGrade)
+        return self._relevance_grader
+
+    @property
+    def reranking_cascade(self) -> RerankingCascade:
+        """Cascada de reranking (el cross-encoder se carga en el primer uso)."""
+        if self._reranking_cascade is None:
+            self._reranking_cascade = RerankingCascade(self.rerank_config)
+        return self._reranking_cascade
 
     def get_relevant_documents(
         self,
         question: str,
         k: int = 3,
         filter_by_relevance: bool = True,
-        ranking_questions: bool = False
+        ranking_questions: bool = False,
+        filter_mode: Optional[str] = None,
     ) -> List[Tuple[Document, float]]:
         """
         Obtiene documentos relevantes para una pregunta.
@@ -50,6 +120,8 @@ class DocumentRetriever:
             question: Pregunta a responder
             k: Número de documentos a recuperar inicialmente
             filter_by_relevance: Si True, filtra documentos usando LLM
+            ranking_questions: Si True, amplía la búsqueda con preguntas generadas
+            filter_mode: "sequential", "concurrent" o "cascade". Si es None usa filter_config
 
         Returns:
             Lista de tuplas (documento, score) con documentos relevantes
@@ -59,101 +131,900 @@ class DocumentRetriever:
 
         print(f'🔍 Buscando documentos relevantes (k={k})...')
 
-        
-        # Obtener keywords para la pregunta
-        # keywords = self.get_keywords(question)
-        keywords = None
-        if keywords:
-            docs_with_scores = self.vector_store.similarity_search_with_score(
-                question, k=k, where_document={"$contains": keywords}
-            )
+        cache_key = self._retrieval_cache_key(question, k, ranking_questions)
+        docs_with_scores = self.exact_cache.retrieval.get(cache_key) if cache_key is not None else None
+
+        if docs_with_scores is not None:
+            print("⚡ Documentos candidatos desde cache")
+            docs_with_scores = list(docs_with_scores)
         else:
-            docs_with_scores = self.vector_store.similarity_search_with_score(
-                question, k=k
-            )
-        
-        
-        if ranking_questions:
-            print(f"🔍 Generando preguntas de ranking...")
-            amount_text = "five" # cantidad de preguntas extra
-            k_ranking = 2 # cantidad de docs por pregunta extra
-            
-            print(f"🔍 Generando preguntas de ranking...")
-            ranking_questions = self.generate_ranking_questions(question, amount_text=amount_text)
-            for question in ranking_questions:
-                docs_with_scores.extend(self.vector_store.similarity_search_with_score(question, k=k_ranking))
-            
-            # Quitar duplicados usando hash del contenido del documento (Document no es hashable)
-            seen = set()
-            unique_docs = []
-            for doc, score in docs_with_scores:
-                # Usar contenido como identificador único
-                doc_id = hash(doc.page_content)
-                if doc_id not in seen:
-                    seen.add(doc_id)
-                    unique_docs.append((doc, score))
-            docs_with_scores = unique_docs
-            # Update the score of the document using the RRF formula: 1 / (rank + k)
-            for doc, score in docs_with_scores:
-                score = 1 / (score + k_ranking)
-            # Ordenar por score
-            docs_with_scores = sorted(docs_with_scores, key=lambda x: x[1], reverse=True)
-            # Tomar los k mejores
-            docs_with_scores = docs_with_scores[:k]
-        
-        
+            if ranking_questions:
+                # Búsqueda multi-consulta (pregunta original + reformulaciones) fusionada con RRF
+                docs_with_scores = self.multi_query_search(question, k=k)
+            else:
+                docs_with_scores = self.search(question, k=k)
+            if cache_key is not None:
+                self.exact_cache.retrieval.set(cache_key, list(docs_with_scores))
+        docs_with_scores = self.apply_neighbors(docs_with_scores)
+
         # Filtrar documentos por relevancia usando LLM si está habilitado
         print(f"🔍 filter_by_relevance: {filter_by_relevance}")
         if filter_by_relevance:
-            print(f"🔍 Filtrando documentos por relevancia usando LLM...")
-            filtered_docs = []
-            for doc, score in docs_with_scores:
-                is_relevant, explanation = self.filter_documents_by_LLM_relevance(question, doc.page_content)
-                if is_relevant:
-                    filtered_docs.append((doc, score))
-                else:
-                    print(f"🚫 Documento filtrado: {doc.metadata.get('filename', 'unknown')}")
-                    print(f" Score: {score}")
-                    print(f" Pregunta: {question}")
-                    print(f" Explicación: {explanation}")
-
-            if not filtered_docs:
-                print(f"⚠️  No se encontraron documentos relevantes para: {question}")
-
-            return filtered_docs
-        
+            return self.filter_relevant_documents(
+                question,
+                docs_with_scores,
+                filter_mode=filter_mode,
+                scores_are_distances=self.search_returns_distances and not ranking_questions,
+            )
+
         return docs_with_scores
 
+    async def aget_relevant_documents(
+        self,
+        question: str,
+        k: int = 3,
+        filter_by_relevance: bool = True,
+        ranking_questions: bool = False,
+        filter_mode: Optional[str] = None,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Versión asíncrona de get_relevant_documents.
+
+        Las búsquedas en el vector store (y el encode de la consulta) corren en
+        el executor por defecto; las llamadas al LLM usan los métodos async
+        nativos de LangChain.
+
+        Args:
+            question: Pregunta a responder
+            k: Número de documentos a recuperar inicialmente
+            filter_by_relevance: Si True, filtra documentos usando LLM
+            ranking_questions: Si True, amplía la búsqueda con preguntas generadas
+            filter_mode: "sequential", "concurrent" o "cascade". Si es None usa filter_config
+
+        Returns:
+            Lista de tuplas (documento, score) con documentos relevantes
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store no inicializado.")
+
+        print(f'🔍 Buscando documentos relevantes (k={k})...')
+
+        cache_key = self._retrieval_cache_key(question, k, ranking_questions)
+        docs_with_scores = await self.exact_cache.retrieval.aget(cache_key) if cache_key is not None else None
+
+        if docs_with_scores is not None:
+            print("⚡ Documentos candidatos desde cache")
+            docs_with_scores = list(docs_with_scores)
+        else:
+            if ranking_questions:
+                docs_with_scores = await self.amulti_query_search(question, k=k)
+            else:
+                docs_with_scores = await asyncio.to_thread(self.search, question, k)
+            if cache_key is not None:
+                await self.exact_cache.retrieval.aset(cache_key, list(docs_with_scores))
+        docs_with_scores = self.apply_neighbors(docs_with_scores)
+
+        if filter_by_relevance:
+            return await self.afilter_relevant_documents(
+                question,
+                docs_with_scores,
+                filter_mode=filter_mode,
+                scores_are_distances=self.search_returns_distances and not ranking_questions,
+            )
+
+        return docs_with_scores
+
+    def get_relevant_documents_batch(
+        self,
+        questions: List[str],
+        k: int = 3,
+        filter_by_relevance: bool = True,
+        filter_mode: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Obtiene documentos relevantes para varias preguntas a la vez.
+
+        Las preguntas se codifican en un único encode y se buscan con una sola
+        consulta multi-embedding; las evaluaciones del filtro de todas las
+        preguntas se envían juntas al LLM (batch con concurrencia acotada).
+        En este camino no se aplica el corte temprano por min_relevant.
+
+        Args:
+            questions: Preguntas a responder
+            k: Número de documentos a recuperar inicialmente por pregunta
+            filter_by_relevance: Si True, filtra documentos usando LLM
+            filter_mode: "sequential", "concurrent" o "cascade". Si es None usa filter_config
+            max_concurrency: Máximo de llamadas simultáneas al LLM (por defecto filter_config)
+
+        Returns:
+            Una lista de tuplas (documento, score) por pregunta, en el mismo orden
+        """
+        if not self.vector_store:
+            raise ValueError("Vector store no inicializado.")
+        if not questions:
+            return []
+
+        print(f'🔍 Buscando documentos relevantes para {len(questions)} preguntas (k={k})...')
+
+        cache_keys = [self._retrieval_cache_key(question, k, False, single_query=False) for question in questions]
+        batch: List[Optional[List[Tuple[Document, float]]]] = [
+            self.exact_cache.retrieval.get(key) if key is not None else None for key in cache_keys
+        ]
+
+        missing = [index for index, docs in enumerate(batch) if docs is None]
+        if missing:
+            searched = self.search_batch([questions[index] for index in missing], k=k)
+            for index, docs_with_scores in zip(missing, searched):
+                batch[index] = docs_with_scores
+                if cache_keys[index] is not None:
+                    self.exact_cache.retrieval.set(cache_keys[index], list(docs_with_scores))
+        if len(missing) < len(questions):
+            print(f"⚡ {len(questions) - len(missing)} búsquedas desde cache")
+
+        batch = [self.apply_neighbors(list(docs_with_scores)) for docs_with_scores in batch]
+        if not filter_by_relevance:
+            return batch
+
+        return self.filter_relevant_documents_batch(
+            questions,
+            batch,
+            filter_mode=filter_mode,
+            scores_are_distances=self.search_returns_distances,
+            max_concurrency=max_concurrency,
+        )
+
+    def search_batch(self, questions: List[str], k: int = 3) -> List[List[Tuple[Document, float]]]:
+        """
+        Búsqueda semántica de varias preguntas en una sola consulta al vector store.
+
+        Args:
+            questions: Preguntas a buscar
+            k: Número de documentos a recuperar por pregunta
+
+        Returns:
+            Una lista de tuplas (documento, distancia) por pregunta, en el mismo orden
+        """
+        return self.similarity_search_batch_with_score(questions, k=k)
+
+    @property
+    def keyword_narrowing(self) -> bool:
+        """Si las búsquedas de una sola pregunta se acotan por keywords (ver PREFILTER_CONFIG)."""
+        return self.prefilter_index is not None and bool(self.prefilter_index.config["keyword_narrowing"])
+
+    def _retrieval_cache_key(
+        self, question: str, k: int, ranking_questions: bool, single_query: bool = True
+    ) -> Optional[str]:
+        """
+        Clave (pregunta, k, modo de recuperación, filtros, versión del índice) del cache de búsquedas.
+
+        single_query indica si la búsqueda es de una sola pregunta (las únicas
+        que se acotan por keywords); el filtro de metadata aplica a todas.
+        """
+        if self.exact_cache is None:
+            return None
+        retrieval_mode = f"{self.retrieval_config['retrieval_mode']}|multi_query={bool(ranking_questions)}"
+        if self.metadata_filter:
+            retrieval_mode += f"|where={json.dumps(self.metadata_filter, sort_keys=True)}"
+        if self.keyword_narrowing and single_query and not ranking_questions:
+            retrieval_mode += "|keywords"
+        return self.exact_cache.retrieval.make_key(
+            normalize_question(question), k, retrieval_mode, self.exact_cache.index_version
+        )
+
+    def search(self, question: str, k: int = 3) -> List[Tuple[Document, float]]:
+        """
+        Búsqueda de candidatos para una pregunta (sin filtrado por LLM).
+
+        Args:
+            question: Pregunta a responder
+            k: Número de documentos a recuperar
+
+        Returns:
+            Lista de tuplas (documento, score)
+        """
+        return self._vector_search(question, k)
+
+    def _vector_search(self, question: str, k: int, narrow: bool = True) -> List[Tuple[Document, float]]:
+        """
+        Búsqueda vectorial de una pregunta, acotada al filtro de metadata.
+
+        Con narrow=True y keyword_narrowing habilitado, se acota además a los
+        chunks que contienen keywords de la pregunta (ver PrefilterIndex.keyword_ids).
+        """
+        candidate_ids = None
+        if narrow and self.keyword_narrowing:
+            candidate_ids = self.prefilter_index.keyword_ids(question, k, where=self.metadata_filter)
+        if candidate_ids is None:
+            candidate_ids = self._filter_ids
+        if candidate_ids is None:
+            return self.vector_store.similarity_search_with_score(question, k=k)
+        if not candidate_ids:
+            return []
+        return self.vector_store.similarity_search_with_score(question, k=k, ids=candidate_ids)
+
+    def apply_neighbors(self, docs_with_scores: List[Tuple[Document, float]]) -> List[Tuple[Document, float]]:
+        """
+        Une o amplía los candidatos con la tabla de vecinos según neighbor_mode.
+
+        Args:
+            docs_with_scores: Candidatos de la búsqueda, en orden de score
+
+        Returns:
+            Bloques (documento, score) a evaluar (ver NeighborIndex.apply), o
+            los mismos candidatos si no hay tabla o neighbor_mode es None
+        """
+        mode = self.retrieval_config["neighbor_mode"]
+        if self.neighbor_index is None or mode is None or not docs_with_scores:
+            return docs_with_scores
+        return self.neighbor_index.apply(docs_with_scores, mode=mode, window=self.retrieval_config["neighbor_window"])
+
+    def set_metadata_filter(self, where: Optional[Where] = None) -> None:
+        """
+        Restringe las búsquedas a los chunks que cumplen un filtro de metadata.
+
+        Args:
+            where: Campo -> valor o lista de valores (file_name, doc_type, year;
+                ver PrefilterIndex.candidate_rows), o None para quitar el filtro
+        """
+        if where and self.prefilter_index is None:
+            raise ValueError("El filtro de metadata necesita un índice de pre-filtro (ver PREFILTER_CONFIG)")
+        self.metadata_filter = where or None
+        # Los ids se resuelven una sola vez y se aplican en todos los caminos de búsqueda
+        self._filter_ids = self.prefilter_index.metadata_ids(self.metadata_filter) if self.metadata_filter else None
+
+    def evaluate_keyword_narrowing(self, questions: List[str], k: int = 3) -> Dict[str, Any]:
+        """
+        Recall@k de la búsqueda densa acotada por keywords frente a la búsqueda sin acotar.
+
+        Sirve para decidir si conviene habilitar keyword_narrowing sobre un
+        corpus (p.ej. con las preguntas sintéticas de evaluación).
+
+        Args:
+            questions: Preguntas de prueba
+            k: Documentos por pregunta
+
+        Returns:
+            n_questions, narrowed_questions (preguntas que las keywords
+            acotaron), recall (sobre todas), recall_narrowed (solo las
+            acotadas) y mean_candidate_ratio (fracción del corpus puntuada
+            en las acotadas)
+        """
+        if self.prefilter_index is None:
+            raise ValueError("Evaluar el pre-filtro por keywords necesita un índice de pre-filtro")
+
+        hits = total = narrowed_hits = narrowed_total = 0
+        ratios = []
+        for question in questions:
+            expected = {get_chunk_id(doc) for doc, _ in self._vector_search(question, k, narrow=False)}
+            total += len(expected)
+            candidate_ids = self.prefilter_index.keyword_ids(question, k, where=self.metadata_filter)
+            if candidate_ids is None:
+                hits += len(expected)
+                continue
+            found = self.vector_store.similarity_search_with_score(question, k=k, ids=candidate_ids)
+            question_hits = len(expected & {get_chunk_id(doc) for doc, _ in found})
+            hits += question_hits
+            narrowed_hits += question_hits
+            narrowed_total += len(expected)
+            ratios.append(len(candidate_ids) / max(1, len(self.prefilter_index)))
+
+        report = {
+            "k": k,
+            "n_questions": len(questions),
+            "narrowed_questions": len(ratios),
+            "recall": round(hits / total, 4) if total else 1.0,
+            "recall_narrowed": round(narrowed_hits / narrowed_total, 4) if narrowed_total else 1.0,
+            "mean_candidate_ratio": round(float(np.mean(ratios)), 4) if ratios else 1.0,
+        }
+        print(f"🧮 Pre-filtro por keywords: recall@{k}={report['recall']:.3f} "
+              f"({report['narrowed_questions']}/{report['n_questions']} preguntas acotadas, "
+              f"recall en ellas {report['recall_narrowed']:.3f}, "
+              f"{report['mean_candidate_ratio']:.1%} del corpus puntuado)")
+        return report
+
+    def filter_relevant_documents(
+        self,
+        question: str,
+        docs_with_scores: List[Tuple[Document, float]],
+        filter_mode: Optional[str] = None,
+        scores_are_distances: bool = True,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Filtra documentos recuperados por relevancia.
+
+        Args:
+            question: Pregunta original
+            docs_with_scores: Documentos recuperados, en orden de score
+            filter_mode: "sequential", "concurrent" o "cascade". Si es None usa filter_config
+            scores_are_distances: Si los scores son distancias (menor es mejor)
+
+        Returns:
+            Lista de tuplas (documento, score) consideradas relevantes
+        """
+        filter_mode = filter_mode or self.filter_config["filter_mode"]
+        if filter_mode not in FILTER_MODES:
+            raise ValueError(f"Modo de filtrado no válido: {filter_mode}")
+
+        if filter_mode == "cascade":
+            print("🔍 Filtrando documentos por relevancia con reranking en cascada...")
+            llm_mode = self.reranking_cascade.config["llm_filter_mode"]
+            filtered_docs = self.reranking_cascade.run(
+                question,
+                docs_with_scores,
+                llm_grader=lambda q, docs: self.grade_documents(q, docs, filter_mode=llm_mode),
+                scores_are_distances=scores_are_distances,
+            )
+        else:
+            print(f"🔍 Filtrando documentos por relevancia usando LLM ({filter_mode})...")
+            verdicts = self.grade_documents(question, docs_with_scores, filter_mode=filter_mode)
+            filtered_docs = [(doc, score) for doc, score, is_relevant, _ in verdicts if is_relevant]
+
+        if not filtered_docs:
+            print(f"⚠️  No se encontraron documentos relevantes para: {question}")
+
+        return filtered_docs
+
+    async def afilter_relevant_documents(
+        self,
+        question: str,
+        docs_with_scores: List[Tuple[Document, float]],
+        filter_mode: Optional[str] = None,
+        scores_are_distances: bool = True,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Versión asíncrona de filter_relevant_documents.
+
+        Args:
+            question: Pregunta original
+            docs_with_scores: Documentos recuperados, en orden de score
+            filter_mode: "sequential", "concurrent" o "cascade". Si es None usa filter_config
+            scores_are_distances: Si los scores son distancias (menor es mejor)
+
+        Returns:
+            Lista de tuplas (documento, score) consideradas relevantes
+        """
+        filter_mode = filter_mode or self.filter_config["filter_mode"]
+        if filter_mode not in FILTER_MODES:
+            raise ValueError(f"Modo de filtrado no válido: {filter_mode}")
+
+        if filter_mode == "cascade":
+            print("🔍 Filtrando documentos por relevancia con reranking en cascada...")
+            llm_mode = self.reranking_cascade.config["llm_filter_mode"]
+
+            async def llm_grader(q: str, docs: List[Tuple[Document, float]]) -> List[Tuple[Document, float, bool, str]]:
+                return await self.agrade_documents(q, docs, filter_mode=llm_mode)
+
+            filtered_docs = await self.reranking_cascade.arun(
+                question,
+                docs_with_scores,
+                llm_grader=llm_grader,
+                scores_are_distances=scores_are_distances,
+            )
+        else:
+            print(f"🔍 Filtrando documentos por relevancia usando LLM ({filter_mode})...")
+            verdicts = await self.agrade_documents(question, docs_with_scores, filter_mode=filter_mode)
+            filtered_docs = [(doc, score) for doc, score, is_relevant, _ in verdicts if is_relevant]
+
+        if not filtered_docs:
+            print(f"⚠️  No se encontraron documentos relevantes para: {question}")
+
+        return filtered_docs
+
+    def filter_relevant_documents_batch(
+        self,
+        questions: List[str],
+        batch: List[List[Tuple[Document, float]]],
+        filter_mode: Optional[str] = None,
+        scores_are_distances: bool = True,
+        max_concurrency: Optional[int] = None,
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Filtra por relevancia los documentos de varias preguntas.
+
+        En modo cascade el cross-encoder se aplica pregunta por pregunta y solo
+        los candidatos dudosos de todas las preguntas van juntos al LLM; en los
+        demás modos se evalúan todos los pares (pregunta, documento) juntos.
+
+        Args:
+            questions: Preguntas originales
+            batch: Documentos recuperados por pregunta, en orden de score
+            filter_mode: "sequential", "concurrent" o "cascade". Si es None usa filter_config
+            scores_are_distances: Si los scores son distancias (menor es mejor)
+            max_concurrency: Máximo de llamadas simultáneas al LLM (por defecto filter_config)
+
+        Returns:
+            Una lista de tuplas (documento, score) relevantes por pregunta, en el mismo orden
+        """
+        filter_mode = filter_mode or self.filter_config["filter_mode"]
+        if filter_mode not in FILTER_MODES:
+            raise ValueError(f"Modo de filtrado no válido: {filter_mode}")
+
+        if filter_mode != "cascade":
+            print(f"🔍 Filtrando documentos de {len(questions)} preguntas por relevancia usando LLM (batch)...")
+            verdicts = self.grade_documents_batch(questions, batch, max_concurrency=max_concurrency)
+            return [[(doc, score) for doc, score, is_relevant, _ in question_verdicts if is_relevant]
+                    for question_verdicts in verdicts]
+
+        print(f"🔍 Filtrando documentos de {len(questions)} preguntas con reranking en cascada (batch)...")
+        cascade = self.reranking_cascade
+        stages = [cascade.prefilter(question, docs_with_scores, scores_are_distances)
+                  for question, docs_with_scores in zip(questions, batch)]
+        verdicts = self.grade_documents_batch(
+            questions, [borderline for _, _, borderline in stages], max_concurrency=max_concurrency
+        )
+        return [
+            cascade.finalize(report, accepted, borderline, question_verdicts)
+            for (report, accepted, borderline), question_verdicts in zip(stages, verdicts)
+        ]
+
+    def grade_documents_batch(
+        self,
+        questions: List[str],
+        batch: List[List[Tuple[Document, float]]],
+        max_concurrency: Optional[int] = None,
+    ) -> List[List[Tuple[Document, float, bool, str]]]:
+        """
+        Evalúa con el LLM todos los pares (pregunta, documento) en un único batch.
+
+        Los veredictos cacheados no se vuelven a pedir. Un error en un par lo
+        marca como no relevante sin afectar al resto.
+
+        Args:
+            questions: Preguntas originales
+            batch: Documentos a evaluar por pregunta
+            max_concurrency: Máximo de llamadas simultáneas al LLM (por defecto filter_config)
+
+        Returns:
+            Una lista de tuplas (documento, score, es_relevante, explicación) por pregunta
+        """
+        max_concurrency = max_concurrency or self.filter_config["max_concurrency"]
+
+        verdicts: List[List[Optional[Tuple[bool, str]]]] = []
+        to_grade = []  # (índice de pregunta, índice de documento, clave de cache, prompt)
+        for q_index, (question, docs_with_scores) in enumerate(zip(questions, batch)):
+            question_verdicts = []
+            for d_index, (doc, _) in enumerate(docs_with_scores):
+                cache_key = self._filter_cache_key(question, doc.page_content, get_chunk_id(doc))
+                cached = self.exact_cache.filter_verdicts.get(cache_key) if cache_key is not None else None
+                question_verdicts.append(cached)
+                if cached is None:
+                    prompt = DOCUMENT_FILTER_PROMPT.format(question=question, context=doc.page_content)
+                    to_grade.append((q_index, d_index, cache_key, prompt))
+            verdicts.append(question_verdicts)
+
+        if to_grade:
+            outputs = self.relevance_grader.batch(
+                [[prompt] for _, _, _, prompt in to_grade],
+                config={"max_concurrency": max(1, int(max_concurrency))},
+                return_exceptions=True,
+            )
+            for (q_index, d_index, cache_key, _), output in zip(to_grade, outputs):
+                if isinstance(output, Exception):
+                    verdicts[q_index][d_index] = (False, f"Error evaluando el documento: {output}")
+                    continue
+                verdict = (output.is_relevant, output.explanation)
+                verdicts[q_index][d_index] = verdict
+                if cache_key is not None:
+                    self.exact_cache.filter_verdicts.set(cache_key, verdict)
+
+        graded = []
+        for question, docs_with_scores, question_verdicts in zip(questions, batch, verdicts):
+            question_graded = [(doc, score, is_relevant, explanation)
+                               for (doc, score), (is_relevant, explanation) in zip(docs_with_scores, question_verdicts)]
+            self._report_rejected(question, question_graded)
+            graded.append(question_graded)
+        return graded
+
+    def grade_documents(
+        self,
+        question: str,
+        docs_with_scores: List[Tuple[Document, float]],
+        filter_mode: str = "sequential",
+    ) -> List[Tuple[Document, float, bool, str]]:
+        """
+        Evalúa con el LLM la relevancia de cada documento.
+
+        Args:
+            question: Pregunta original
+            docs_with_scores: Documentos a evaluar, en orden de score
+            filter_mode: "sequential" o "concurrent"
+
+        Returns:
+            Lista de tuplas (documento, score, es_relevante, explicación)
+        """
+        if filter_mode == "concurrent":
+            verdicts = run_coroutine_sync(
+                self.afilter_documents_concurrently(question, docs_with_scores)
+            )
+        else:
+            verdicts = []
+            for doc, score in docs_with_scores:
+                is_relevant, explanation = self.filter_documents_by_LLM_relevance(
+                    question, doc.page_content, chunk_id=get_chunk_id(doc)
+                )
+                verdicts.append((doc, score, is_relevant, explanation))
+
+        self._report_rejected(question, verdicts)
+        return verdicts
+
+    async def agrade_documents(
+        self,
+        question: str,
+        docs_with_scores: List[Tuple[Document, float]],
+        filter_mode: str = "sequential",
+    ) -> List[Tuple[Document, float, bool, str]]:
+        """
+        Versión asíncrona de grade_documents.
+
+        Args:
+            question: Pregunta original
+            docs_with_scores: Documentos a evaluar, en orden de score
+            filter_mode: "sequential" o "concurrent"
+
+        Returns:
+            Lista de tuplas (documento, score, es_relevante, explicación)
+        """
+        if filter_mode == "concurrent":
+            verdicts = await self.afilter_documents_concurrently(question, docs_with_scores)
+        else:
+            verdicts = []
+            for doc, score in docs_with_scores:
+                is_relevant, explanation = await self.afilter_documents_by_LLM_relevance(
+                    question, doc.page_content, chunk_id=get_chunk_id(doc)
+                )
+                verdicts.append((doc, score, is_relevant, explanation))
+
+        self._report_rejected(question, verdicts)
+        return verdicts
+
+    @staticmethod
+    def _report_rejected(question: str, verdicts: List[Tuple[Document, float, bool, str]]) -> None:
+        """Informa los documentos descartados por el filtro."""
+        for doc, score, is_relevant, explanation in verdicts:
+            if not is_relevant:
+                print(f"🚫 Documento filtrado: {doc.metadata.get('file_name', 'unknown')}")
+                print(f" Score: {score}")
+                print(f" Pregunta: {question}")
+                print(f" Explicación: {explanation}")
+
+    async def afilter_documents_concurrently(
+        self,
+        question: str,
+        docs_with_scores: List[Tuple[Document, float]],
+        max_concurrency: Optional[int] = None,
+        min_relevant: Optional[int] = None,
+        chunk_timeout: Optional[float] = None,
+    ) -> List[Tuple[Document, float, bool, str]]:
+        """
+        Evalúa la relevancia de los documentos en paralelo con el LLM.
+
+        Las evaluaciones se lanzan en orden de score respetando un límite de
+        concurrencia. Cuando los primeros `min_relevant` documentos relevantes
+        quedan confirmados (todos los documentos con mejor score ya fueron
+        evaluados), se cancelan las evaluaciones pendientes.
+
+        Args:
+            question: Pregunta original
+            docs_with_scores: Documentos recuperados, en orden de score
+            max_concurrency: Máximo de llamadas simultáneas al LLM
+            min_relevant: Cantidad de relevantes a partir de la cual se corta (None = todos)
+            chunk_timeout: Timeout en segundos por documento (None = sin timeout)
+
+        Returns:
+            Lista de tuplas (documento, score, es_relevante, explicación) en orden
+            de score, solo para los documentos efectivamente evaluados
+        """
+        if not docs_with_scores:
+            return []
+
+        config = self.filter_config
+        max_concurrency = max_concurrency or config["max_concurrency"]
+        min_relevant = min_relevant if min_relevant is not None else config["min_relevant"]
+        chunk_timeout = chunk_timeout if chunk_timeout is not None else config["chunk_timeout"]
+
+        semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+        async def grade(doc: Document) -> Tuple[bool, str]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.afilter_documents_by_LLM_relevance(
+                            question, doc.page_content, chunk_id=get_chunk_id(doc)
+                        ),
+                        timeout=chunk_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    return False, f"Timeout ({chunk_timeout}s) evaluando el documento"
+                except Exception as e:
+                    return False, f"Error evaluando el documento: {e}"
+
+        tasks = {
+            asyncio.ensure_future(grade(doc)): index
+            for index, (doc, _) in enumerate(docs_with_scores)
+        }
+        results: Dict[int, Tuple[bool, str]] = {}
+        pending = set(tasks)
+        resolved_prefix = 0
+        relevant_in_prefix = 0
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[tasks[task]] = task.result()
+
+                # Avanzar sobre el prefijo (en orden de score) ya evaluado
+                while resolved_prefix in results and not (min_relevant and relevant_in_prefix >= min_relevant):
+                    if results[resolved_prefix][0]:
+                        relevant_in_prefix += 1
+                    resolved_prefix += 1
+
+                if min_relevant and relevant_in_prefix >= min_relevant:
+                    print(f"⏹️  {relevant_in_prefix} documentos relevantes confirmados; "
+                          f"se cancelan {len(pending)} evaluaciones pendientes")
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if min_relevant and relevant_in_prefix >= min_relevant:
+            evaluated = range(resolved_prefix)
+        else:
+            evaluated = sorted(results)
+
+        return [
+            (docs_with_scores[i][0], docs_with_scores[i][1], *results[i])
+            for i in evaluated
+        ]
+
     def get_keywords(self, question: str) -> List[str]:
         """
-        Obtiene keywords para la pregunta.
+        Obtiene keywords para la pregunta sin llamar al LLM.
+
+        Con índice de pre-filtro son los términos más selectivos del corpus
+        (ver PrefilterIndex.extract_keywords); sin índice, los tokens de la
+        pregunta sin stopwords.
         """
-        prompt = KEYWORDS_PROMPT.format(question=question)
-        output = self.llm.invoke([prompt])
-        return output.keywords
+        if self.prefilter_index is not None:
+            return self.prefilter_index.extract_keywords(question)
+        return list(dict.fromkeys(tokenize(question)))
     
-    def filter_documents_by_LLM_relevance(self, question: str, context: str) -> Tuple[bool, str]:
+    def filter_documents_by_LLM_relevance(
+        self,
+        question: str,
+        context: str,
+        chunk_id: Optional[str] = None
+    ) -> Tuple[bool, str]:
         """
         Filtra documentos por relevancia usando LLM.
 
         Args:
             question: Pregunta original
             context: Contenido del documento a evaluar
+            chunk_id: Id estable del chunk (para el cache de veredictos)
 
         Returns:
             Tupla (es_relevante, explicación)
         """
+        cache_key = self._filter_cache_key(question, context, chunk_id)
+        if cache_key is not None:
+            cached = self.exact_cache.filter_verdicts.get(cache_key)
+            if cached is not None:
+                return cached
+
         prompt = DOCUMENT_FILTER_PROMPT.format(question=question, context=context)
-        output = self.llm.with_structured_output(RelevanceGrade).invoke([prompt])
-        return output.is_relevant, output.explanation
+        output = self.relevance_grader.invoke([prompt])
+        verdict = (output.is_relevant, output.explanation)
+
+        if cache_key is not None:
+            self.exact_cache.filter_verdicts.set(cache_key, verdict)
+        return verdict
+
+    async def afilter_documents_by_LLM_relevance(
+        self,
+        question: str,
+        context: str,
+        chunk_id: Optional[str] = None
+    ) -> Tuple[bool, str]:
+        """
+        Versión asíncrona de filter_documents_by_LLM_relevance.
+
+        Args:
+            question: Pregunta original
+            context: Contenido del documento a evaluar
+            chunk_id: Id estable del chunk (para el cache de veredictos)
+
+        Returns:
+            Tupla (es_relevante, explicación)
+        """
+        cache_key = self._filter_cache_key(question, context, chunk_id)
+        if cache_key is not None:
+            cached = await self.exact_cache.filter_verdicts.aget(cache_key)
+            if cached is not None:
+                return cached
+
+        prompt = DOCUMENT_FILTER_PROMPT.format(question=question, context=context)
+        output = await self.relevance_grader.ainvoke([prompt])
+        verdict = (output.is_relevant, output.explanation)
+
+        if cache_key is not None:
+            await self.exact_cache.filter_verdicts.aset(cache_key, verdict)
+        return verdict
+
+    def _filter_cache_key(self, question: str, context: str, chunk_id: Optional[str]) -> Optional[str]:
+        """Clave (pregunta, chunk, modelo del filtro) del cache de veredictos, o None sin cache."""
+        if self.exact_cache is None:
+            return None
+        return self.exact_cache.filter_verdicts.make_key(
+            normalize_question(question), chunk_id or make_chunk_id("", context), self.filter_model
+        )
     
     def generate_ranking_questions(self, question: str, amount_text: str = "5") -> List[str]:
         """
         Genera preguntas de ranking para la pregunta.
+
+        Las reformulaciones se cachean por pregunta (normalizada) y cantidad,
+        de modo que las preguntas repetidas no pagan otra llamada al LLM.
         """
+        cache_key = f"{amount_text}\x00{normalize_question(question)}"
+        cached = self._ranking_questions_cache.get(cache_key)
+        if cached is not None:
+            self._ranking_questions_cache.move_to_end(cache_key)
+            return list(cached)
+
         prompt = RANKING_PROMPT.format(question=question, amount=amount_text)
         output = self.llm.with_structured_output(RankingQuestions).invoke([prompt])
-        return output.questions
+        return self._cache_ranking_questions(cache_key, output)
+
+    async def agenerate_ranking_questions(self, question: str, amount_text: str = "5") -> List[str]:
+        """
+        Versión asíncrona de generate_ranking_questions (comparte el cache).
+        """
+        cache_key = f"{amount_text}\x00{normalize_question(question)}"
+        cached = self._ranking_questions_cache.get(cache_key)
+        if cached is not None:
+            self._ranking_questions_cache.move_to_end(cache_key)
+            return list(cached)
+
+        prompt = RANKING_PROMPT.format(question=question, amount=amount_text)
+        output = await self.llm.with_structured_output(RankingQuestions).ainvoke([prompt])
+        return self._cache_ranking_questions(cache_key, output)
+
+    def _cache_ranking_questions(self, cache_key: str, output: RankingQuestions) -> List[str]:
+        """Normaliza las reformulaciones generadas y las guarda en el cache LRU."""
+        # RankingQuestions.questions es un set: ordenar para que el resultado sea determinístico
+        questions = sorted(q.strip() for q in output.questions if q and q.strip())
+
+        self._ranking_questions_cache[cache_key] = questions
+        max_size = self.retrieval_config["ranking_cache_size"]
+        while len(self._ranking_questions_cache) > max_size:
+            self._ranking_questions_cache.popitem(last=False)
+        return list(questions)
+
+    def similarity_search_batch_with_score(
+        self,
+        queries: List[str],
+        k: int = 3
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Ejecuta varias búsquedas de similitud en una sola consulta al vector store.
+
+        Todas las consultas se codifican en un único encode por lotes y se
+        buscan con una única llamada multi-consulta, acotada al filtro de
+        metadata si hay uno (las keywords no acotan búsquedas por lotes).
+
+        Args:
+            queries: Consultas a buscar
+            k: Número de documentos por consulta
+
+        Returns:
+            Una lista de tuplas (documento, distancia) por consulta, en el mismo orden
+        """
+        if not queries:
+            return []
+        ids = self._filter_ids
+        if ids is not None and not ids:
+            return [[] for _ in queries]
+        ids_filter = {"ids": ids} if ids is not None else {}
+
+        # Backends propios que ya implementan búsqueda por lotes
+        if hasattr(self.vector_store, "similarity_search_batch_with_score"):
+            return self.vector_store.similarity_search_batch_with_score(queries, k=k, **ids_filter)
+
+        if not hasattr(self.vector_store, "_collection"):
+            raise ValueError(f"{type(self.vector_store).__name__} no soporta búsqueda por lotes")
+        query_embeddings = self.vector_store.embeddings.embed_documents(list(queries))
+        results = self.vector_store._collection.query(  # type: ignore[attr-defined]
+            query_embeddings=query_embeddings,
+            n_results=k,
+            include=["documents", "metadatas", "distances"],
+            **ids_filter,
+        )
+
+        batch = []
+        for ids, texts, metadatas, distances in zip(
+            results["ids"], results["documents"], results["metadatas"], results["distances"]
+        ):
+            batch.append([
+                (Document(page_content=text, metadata=metadata or {}, id=doc_id), distance)
+                for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+            ])
+        return batch
+
+    def multi_query_search(
+        self,
+        question: str,
+        k: int = 3,
+        amount_text: Optional[str] = None,
+        k_per_query: Optional[int] = None,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Recupera documentos para la pregunta y sus reformulaciones y fusiona los resultados con RRF.
+
+        Cada consulta se busca con search_batch, así que en modo híbrido las
+        reformulaciones también combinan candidatos densos y BM25.
+
+        Args:
+            question: Pregunta original
+            k: Número de documentos a devolver tras la fusión
+            amount_text: Cantidad de reformulaciones a generar (texto para el prompt)
+            k_per_query: Documentos a recuperar por consulta (por defecto k)
+
+        Returns:
+            Lista de tuplas (documento, score_rrf) ordenada por score_rrf descendente
+        """
+        amount_text = amount_text or self.retrieval_config["ranking_questions_amount"]
+        k_per_query = k_per_query or max(k, self.retrieval_config["k_per_ranking_question"])
+
+        print("🔍 Generando preguntas de ranking...")
+        sub_questions = self.generate_ranking_questions(question, amount_text=amount_text)
+        queries = [question] + [q for q in sub_questions if q != question]
+
+        ranked_lists = self.search_batch(queries, k=k_per_query)
+        return self._fuse_ranked_lists(queries, ranked_lists, k)
+
+    async def amulti_query_search(
+        self,
+        question: str,
+        k: int = 3,
+        amount_text: Optional[str] = None,
+        k_per_query: Optional[int] = None,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Versión asíncrona de multi_query_search.
+
+        Args:
+            question: Pregunta original
+            k: Número de documentos a devolver tras la fusión
+            amount_text: Cantidad de reformulaciones a generar (texto para el prompt)
+            k_per_query: Documentos a recuperar por consulta (por defecto k)
+
+        Returns:
+            Lista de tuplas (documento, score_rrf) ordenada por score_rrf descendente
+        """
+        amount_text = amount_text or self.retrieval_config["ranking_questions_amount"]
+        k_per_query = k_per_query or max(k, self.retrieval_config["k_per_ranking_question"])
+
+        print("🔍 Generando preguntas de ranking...")
+        sub_questions = await self.agenerate_ranking_questions(question, amount_text=amount_text)
+        queries = [question] + [q for q in sub_questions if q != question]
+
+        ranked_lists = await asyncio.to_thread(self.search_batch, queries, k_per_query)
+        return self._fuse_ranked_lists(queries, ranked_lists, k)
+
+    def _fuse_ranked_lists(
+        self,
+        queries: List[str],
+        ranked_lists: List[List[Tuple[Document, float]]],
+        k: int
+    ) -> List[Tuple[Document, float]]:
+        """Fusiona con RRF los resultados de cada consulta y devuelve los k mejores."""
+        fused = reciprocal_rank_fusion(ranked_lists, rrf_k=self.retrieval_config["rrf_k"])
+        print(f"🔀 {len(queries)} consultas fusionadas con RRF: {len(fused)} documentos únicos")
+        return fused[:k]
     
     def get_top_k_documents(
         self,
@@ -175,9 +1046,7 @@ class DocumentRetriever:
         if not self.vector_store:
             raise ValueError("Vector store no inicializado.")
 
-        docs_with_scores = self.vector_store.similarity_search_with_score(
-            question, k=k
-        )
+        docs_with_scores = self._vector_search(question, k, narrow=False)
 
         if score_threshold is not None:
             # Filtrar por umbral de score
@@ -207,4 +1076,4 @@ class DocumentRetriever:
         if not self.vector_store:
             raise ValueError("Vector store no inicializado.")
 
-        return self.vector_store.similarity_search_with_score(question, k=k)
+        return self._vector_search(question, k, narrow=False)
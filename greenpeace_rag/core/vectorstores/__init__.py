@@ -0,0 +1,26 @@
+"""
+Vector stores module.
+
+Contiene los backends de vector store intercambiables (ChromaDB, búsqueda
+exacta sobre NumPy, índice IVF-PQ y grafo HNSW de hnswlib).
+"""
+
+from .benchmark import VectorEngineBenchmark
+from .chroma_store import ChromaVectorStore
+from .factory import VectorStoreFactory
+from .flat_store import FlatVectorStore
+from .hnswlib_store import HNSWLibVectorStore
+from .hnsw_tuning import HNSWTuner, exact_top_k, stored_embeddings
+from .ivfpq_store import IVFPQVectorStore
+
+__all__ = [
+    "ChromaVectorStore",
+    "FlatVectorStore",
+    "HNSWLibVectorStore",
+    "HNSWTuner",
+    "IVFPQVectorStore",
+    "VectorEngineBenchmark",
+    "VectorStoreFactory",
+    "exact_top_k",
+    "stored_embeddings",
+]
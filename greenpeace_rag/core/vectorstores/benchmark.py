@@ -0,0 +1,198 @@
+"""
+Benchmark de motores de búsqueda vectorial sobre los embeddings propios.
+
+Construye, con los mismos embeddings que produjo generate_embeddings, un
+índice de cada motor (búsqueda exacta con NumPy, HNSW de Chroma y HNSW de
+hnswlib) con los mismos parámetros HNSW, y mide tiempo de construcción,
+tamaño en disco, latencia por consulta, tiempo por consulta en lote y
+recall@k contra la búsqueda exacta. Todos los motores comparan similitud
+coseno (vectores normalizados).
+"""
+
+import os
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import chromadb
+import numpy as np
+
+from greenpeace_rag.utils.config import (DEFAULT_CONFIG, HNSW_TUNING_CONFIG,
+                                         VECTOR_BENCHMARK_ENGINES)
+
+from .chroma_store import hnsw_collection_configuration
+from .hnsw_tuning import _percentile_ms, exact_top_k
+from .hnswlib_store import _import_hnswlib
+
+
+def _directory_bytes(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names
+    )
+
+
+class VectorEngineBenchmark:
+    """
+    Comparación de motores vectoriales sobre una matriz de embeddings.
+
+    Uso típico:
+        _, vectors = stored_embeddings(rag.vector_store)
+        results = VectorEngineBenchmark(vectors).run(queries)
+    """
+
+    def __init__(self, vectors: np.ndarray):
+        """
+        Inicializa el benchmark.
+
+        Args:
+            vectors: Embeddings almacenados (n x d)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        self.results: List[Dict[str, Any]] = []
+
+    def sample_queries(self, n_queries: int, seed: int = HNSW_TUNING_CONFIG["seed"]) -> np.ndarray:
+        """Muestra embeddings almacenados para usarlos como consultas."""
+        rng = np.random.default_rng(seed)
+        n_queries = min(n_queries, self.vectors.shape[0])
+        return self.vectors[rng.choice(self.vectors.shape[0], size=n_queries, replace=False)]
+
+    def run(
+        self,
+        queries: Optional[np.ndarray] = None,
+        k: int = HNSW_TUNING_CONFIG["k"],
+        n_queries: int = HNSW_TUNING_CONFIG["n_queries"],
+        hnsw_config: Optional[Dict[str, Any]] = None,
+        num_threads: int = -1,
+        engines: Sequence[str] = VECTOR_BENCHMARK_ENGINES,
+    ) -> List[Dict[str, Any]]:
+        """
+        Mide cada motor con las mismas consultas.
+
+        Args:
+            queries: Embeddings de consulta (p.ej. las preguntas sintéticas de
+                evaluación); por defecto se muestrean del índice
+            k: Vecinos por consulta
+            n_queries: Consultas a muestrear si no se pasan queries
+            hnsw_config: M, construction_ef y search_ef de Chroma y hnswlib
+                (ver DEFAULT_CONFIG["hnsw_config"])
+            num_threads: Hilos de hnswlib para construir y consultar en lote (-1 = todos)
+            engines: Motores a medir (ver VECTOR_BENCHMARK_ENGINES)
+
+        Returns:
+            Una fila por motor con build_seconds, index_bytes, p50_ms, p99_ms
+            (consultas de a una), batch_ms_per_query (todas en una llamada) y
+            recall (recall@k contra la búsqueda exacta)
+        """
+        if not self.vectors.shape[0]:
+            raise ValueError("No hay embeddings para el benchmark")
+        unknown = set(engines) - set(VECTOR_BENCHMARK_ENGINES)
+        if unknown:
+            raise ValueError(f"Motores no válidos: {sorted(unknown)}")
+        hnsw_config = {**DEFAULT_CONFIG["hnsw_config"], **(hnsw_config or {})}
+        if queries is None:
+            queries = self.sample_queries(n_queries)
+        queries = np.asarray(queries, dtype=np.float32)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        k = min(k, self.vectors.shape[0])
+        expected = [set(rows.tolist()) for rows in exact_top_k(self.vectors, queries, k, space="ip")]
+
+        print(f"📏 Benchmark de motores vectoriales: {self.vectors.shape[0]} vectores, "
+              f"{len(queries)} consultas, k={k}, M={hnsw_config['M']}, "
+              f"construction_ef={hnsw_config['construction_ef']}, search_ef={hnsw_config['search_ef']}")
+        runners: Dict[str, Callable[..., Dict[str, Any]]] = {
+            "exact": self._run_exact,
+            "chroma": self._run_chroma,
+            "hnswlib": self._run_hnswlib,
+        }
+        self.results = []
+        for engine in engines:
+            row = runners[engine](queries, k, hnsw_config, num_threads)
+            hits = sum(len(wanted.intersection(found)) for wanted, found in zip(expected, row.pop("rows")))
+            row = {"engine": engine, "k": k, "recall": round(hits / (k * len(queries)), 4), **row}
+            self.results.append(row)
+            print(f"   - {engine}: build={row['build_seconds']}s size={row['index_bytes'] / 2**20:.1f}MiB "
+                  f"p50={row['p50_ms']}ms p99={row['p99_ms']}ms lote={row['batch_ms_per_query']}ms/consulta "
+                  f"recall@{k}={row['recall']:.3f}")
+        return self.results
+
+    @staticmethod
+    def _timed_queries(search: Callable[[np.ndarray], List[List[int]]], queries: np.ndarray) -> Dict[str, Any]:
+        """Latencia de a una consulta y en lote; devuelve también las filas encontradas."""
+        latencies = []
+        for query in queries:
+            started_at = time.perf_counter()
+            search(query[None, :])
+            latencies.append(time.perf_counter() - started_at)
+        started_at = time.perf_counter()
+        rows = search(queries)
+        batch_seconds = time.perf_counter() - started_at
+        return {
+            "p50_ms": _percentile_ms(latencies, 50),
+            "p99_ms": _percentile_ms(latencies, 99),
+            "batch_ms_per_query": round(batch_seconds * 1000 / len(queries), 3),
+            "rows": rows,
+        }
+
+    def _run_exact(self, queries: np.ndarray, k: int, hnsw_config: Dict[str, Any], num_threads: int) -> Dict[str, Any]:
+        return {
+            "build_seconds": 0.0,
+            "index_bytes": self.vectors.nbytes,
+            **self._timed_queries(lambda batch: exact_top_k(self.vectors, batch, k, space="ip").tolist(), queries),
+        }
+
+    def _run_chroma(self, queries: np.ndarray, k: int, hnsw_config: Dict[str, Any], num_threads: int) -> Dict[str, Any]:
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+            client = chromadb.PersistentClient(path=directory)
+            name = f"engine-benchmark-{uuid.uuid4().hex[:12]}"
+            collection = client.create_collection(
+                name, configuration=hnsw_collection_configuration({**hnsw_config, "space": "cosine"})
+            )
+            try:
+                labels = [str(index) for index in range(self.vectors.shape[0])]
+                batch_size = client.get_max_batch_size()
+                started_at = time.perf_counter()
+                for start in range(0, self.vectors.shape[0], batch_size):
+                    collection.add(
+                        ids=labels[start:start + batch_size],
+                        embeddings=self.vectors[start:start + batch_size],
+                    )
+                build_seconds = time.perf_counter() - started_at
+                # Una consulta fuerza que el índice quede escrito antes de medir el directorio
+                collection.query(query_embeddings=queries[:1], n_results=k, include=[])
+                index_bytes = _directory_bytes(directory)
+
+                def search(batch: np.ndarray) -> List[List[int]]:
+                    found = collection.query(query_embeddings=batch, n_results=k, include=[])["ids"]
+                    return [[int(label) for label in labels] for labels in found]
+
+                timed = self._timed_queries(search, queries)
+            finally:
+                client.delete_collection(name)
+        return {"build_seconds": round(build_seconds, 3), "index_bytes": index_bytes, **timed}
+
+    def _run_hnswlib(self, queries: np.ndarray, k: int, hnsw_config: Dict[str, Any], num_threads: int) -> Dict[str, Any]:
+        hnswlib = _import_hnswlib()
+        graph = hnswlib.Index(space="ip", dim=self.vectors.shape[1])
+        started_at = time.perf_counter()
+        graph.init_index(
+            max_elements=self.vectors.shape[0],
+            M=int(hnsw_config["M"]),
+            ef_construction=int(hnsw_config["construction_ef"]),
+        )
+        graph.add_items(self.vectors, np.arange(self.vectors.shape[0]), num_threads=num_threads)
+        build_seconds = time.perf_counter() - started_at
+        graph.set_ef(max(int(hnsw_config["search_ef"]), k))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.bin")
+            graph.save_index(path)
+            index_bytes = os.path.getsize(path)
+
+        def search(batch: np.ndarray) -> List[List[int]]:
+            labels, _ = graph.knn_query(batch, k=k, num_threads=num_threads)
+            return labels.astype(np.int64).tolist()
+
+        return {"build_seconds": round(build_seconds, 3), "index_bytes": index_bytes,
+                **self._timed_queries(search, queries)}
@@ -0,0 +1,182 @@
+"""
+Backend de vector store sobre ChromaDB.
+
+Extiende el vector store de LangChain-Chroma con la interfaz común que usan
+la indexación y GreenpeaceRAG (upsert con embeddings explícitos, conteo,
+búsqueda multi-consulta), de modo que los backends sean intercambiables, y
+permite configurar el índice HNSW de la colección.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from greenpeace_rag.utils.config import DEFAULT_CONFIG, HNSW_SPACES
+
+DEFAULT_MAX_BATCH_SIZE = 5000
+
+
+def hnsw_collection_configuration(hnsw_config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Traduce hnsw_config (ver DEFAULT_CONFIG) a la configuración de colección de Chroma.
+
+    Args:
+        hnsw_config: space, M, construction_ef y search_ef
+
+    Returns:
+        Configuración para create_collection/get_or_create_collection
+    """
+    if hnsw_config["space"] not in HNSW_SPACES:
+        raise ValueError(f"Espacio de distancia HNSW no válido: {hnsw_config['space']}")
+    return {
+        "hnsw": {
+            "space": hnsw_config["space"],
+            "max_neighbors": int(hnsw_config["M"]),
+            "ef_construction": int(hnsw_config["construction_ef"]),
+            "ef_search": int(hnsw_config["search_ef"]),
+        }
+    }
+
+
+class ChromaVectorStore(Chroma):
+    """Vector store de ChromaDB con la interfaz común de los backends."""
+
+    def __init__(self, *args: Any, hnsw_config: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        """
+        Abre (o crea) la colección.
+
+        Args:
+            hnsw_config: Parámetros del índice HNSW (ver DEFAULT_CONFIG["hnsw_config"]).
+                Solo se aplican al crear la colección, salvo search_ef: si se
+                pasa explícitamente se actualiza también sobre una colección
+                existente; si no, rige el guardado en la colección (p.ej. por
+                GreenpeaceRAG.tune_hnsw).
+            *args, **kwargs: Argumentos de langchain_chroma.Chroma
+        """
+        hnsw_config = hnsw_config or {}
+        self.hnsw_config = {**DEFAULT_CONFIG["hnsw_config"], **hnsw_config}
+        kwargs.setdefault("collection_configuration", hnsw_collection_configuration(self.hnsw_config))
+        super().__init__(*args, **kwargs)
+        if "search_ef" in hnsw_config:
+            self.set_search_ef(hnsw_config["search_ef"])
+        else:
+            self.hnsw_config["search_ef"] = self.get_hnsw_params()["search_ef"] or self.hnsw_config["search_ef"]
+
+    def get_hnsw_params(self) -> Dict[str, Any]:
+        """Parámetros HNSW efectivos de la colección (los que se usaron al crearla)."""
+        hnsw = (self._collection.configuration or {}).get("hnsw") or {}
+        return {
+            "space": hnsw.get("space"),
+            "M": hnsw.get("max_neighbors"),
+            "construction_ef": hnsw.get("ef_construction"),
+            "search_ef": hnsw.get("ef_search"),
+        }
+
+    def set_search_ef(self, search_ef: int) -> None:
+        """
+        Ajusta ef de búsqueda (recall vs. latencia) sin reconstruir el índice.
+
+        El valor queda guardado en la configuración de la colección; Chroma
+        mantiene en memoria el índice ya cargado, por lo que rige a partir de
+        la próxima vez que se abra la colección en un proceso nuevo.
+
+        Args:
+            search_ef: Tamaño de la lista de candidatos en cada búsqueda
+        """
+        if self.get_hnsw_params()["search_ef"] == search_ef:
+            return
+        self._collection.modify(configuration={"hnsw": {"ef_search": int(search_ef)}})
+        self.hnsw_config["search_ef"] = search_ef
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # El espacio se define en la configuración de la colección, no en su metadata
+        space = self.get_hnsw_params()["space"] or self.hnsw_config["space"]
+        if space == "cosine":
+            return self._cosine_relevance_score_fn
+        if space == "ip":
+            return self._max_inner_product_relevance_score_fn
+        return self._euclidean_relevance_score_fn
+
+    def count(self) -> int:
+        """Cantidad de documentos en la colección."""
+        return self._collection.count()
+
+    def get_max_batch_size(self) -> int:
+        """Máximo de registros por upsert/delete que acepta el cliente."""
+        try:
+            return int(self._client.get_max_batch_size())
+        except Exception:
+            return DEFAULT_MAX_BATCH_SIZE
+
+    def upsert_vectors(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Optional[Dict[str, Any]]],
+    ) -> None:
+        """
+        Escribe (o reemplaza) documentos con embeddings ya calculados.
+
+        Args:
+            ids: Ids de los documentos
+            embeddings: Un vector por documento
+            documents: Texto de cada documento
+            metadatas: Metadata de cada documento
+        """
+        self._collection.upsert(
+            ids=list(ids),
+            embeddings=embeddings,
+            documents=list(documents),
+            metadatas=[metadata or None for metadata in metadatas],
+        )
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> None:
+        """
+        Reemplaza la metadata de documentos existentes sin volver a embeberlos.
+
+        Args:
+            ids: Ids de los documentos
+            metadatas: Metadata nueva de cada documento
+        """
+        if ids:
+            self._collection.update(ids=list(ids), metadatas=list(metadatas))
+
+    def similarity_search_batch_with_score(
+        self, queries: List[str], k: int = 4, ids: Optional[Sequence[str]] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Búsqueda de varias consultas en una única llamada multi-embedding.
+
+        Args:
+            queries: Consultas a buscar
+            k: Número de documentos por consulta
+            ids: Ids a los que acotar la búsqueda de todas las consultas
+
+        Returns:
+            Una lista de tuplas (documento, distancia) por consulta, en el mismo orden
+        """
+        if not queries:
+            return []
+        if ids is not None and not ids:
+            return [[] for _ in queries]
+        query_embeddings = self.embeddings.embed_documents(list(queries))
+        results = self._collection.query(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            include=["documents", "metadatas", "distances"],
+            **({"ids": list(ids)} if ids is not None else {}),
+        )
+        return [
+            [
+                (Document(page_content=text, metadata=metadata or {}, id=doc_id), distance)
+                for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+            ]
+            for ids, texts, metadatas, distances in zip(
+                results["ids"], results["documents"], results["metadatas"], results["distances"]
+            )
+        ]
+
+    def compact(self) -> None:
+        """Sin efecto: Chroma mantiene su índice HNSW de forma incremental."""
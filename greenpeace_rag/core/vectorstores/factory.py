@@ -0,0 +1,88 @@
+"""
+Factory de backends de vector store.
+"""
+
+from typing import Any, Dict, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from greenpeace_rag.utils.config import (VECTOR_STORE_BACKENDS,
+                                         VECTOR_STORE_CONFIG,
+                                         get_index_artifact_path)
+
+from .chroma_store import ChromaVectorStore
+from .flat_store import FlatVectorStore
+from .hnswlib_store import HNSWLibVectorStore
+from .ivfpq_store import IVFPQVectorStore
+
+
+class VectorStoreFactory:
+    """Factory para crear el vector store según el backend configurado."""
+
+    @staticmethod
+    def create_vector_store(
+        embedding_function: Embeddings,
+        persist_directory: str,
+        collection_name: str,
+        config: Optional[Dict[str, Any]] = None,
+        hnsw_config: Optional[Dict[str, Any]] = None,
+    ) -> VectorStore:
+        """
+        Crea (o abre) el vector store del backend configurado.
+
+        Args:
+            embedding_function: Función de embeddings
+            persist_directory: Directorio de persistencia (el de ChromaDB)
+            collection_name: Nombre de la colección
+            config: Configuración del backend (ver VECTOR_STORE_CONFIG)
+            hnsw_config: Parámetros del índice HNSW de Chroma o hnswlib (ver DEFAULT_CONFIG["hnsw_config"])
+
+        Returns:
+            Vector store con la interfaz común (upsert_vectors, count, compact, ...)
+        """
+        config = {**VECTOR_STORE_CONFIG, **(config or {})}
+        backend = config["backend"]
+        if backend not in VECTOR_STORE_BACKENDS:
+            raise ValueError(f"Backend de vector store no válido: {backend}")
+
+        if backend == "flat":
+            return FlatVectorStore(
+                embedding_function,
+                get_index_artifact_path(persist_directory, collection_name, "flat"),
+                max_segments=config["flat_max_segments"],
+                block_rows=config["flat_block_rows"],
+                quantization=config["flat_quantization"],
+                rescore_dtype=config["flat_rescore_dtype"],
+                rescore_multiplier=config["flat_rescore_multiplier"],
+            )
+        if backend == "ivfpq":
+            return IVFPQVectorStore(
+                embedding_function,
+                get_index_artifact_path(persist_directory, collection_name, "ivfpq"),
+                nlist=config["ivfpq_nlist"],
+                nprobe=config["ivfpq_nprobe"],
+                m=config["ivfpq_m"],
+                train_size=config["ivfpq_train_size"],
+                min_train_size=config["ivfpq_min_train_size"],
+                kmeans_iterations=config["ivfpq_kmeans_iterations"],
+                rescore_dtype=config["ivfpq_rescore_dtype"],
+                rescore_multiplier=config["ivfpq_rescore_multiplier"],
+                max_segments=config["flat_max_segments"],
+                block_rows=config["flat_block_rows"],
+            )
+        if backend == "hnswlib":
+            return HNSWLibVectorStore(
+                embedding_function,
+                get_index_artifact_path(persist_directory, collection_name, "hnswlib"),
+                hnsw_config=hnsw_config,
+                num_threads=config["hnswlib_num_threads"],
+                max_segments=config["flat_max_segments"],
+                block_rows=config["flat_block_rows"],
+            )
+        return ChromaVectorStore(
+            collection_name=collection_name,
+            embedding_function=embedding_function,
+            persist_directory=persist_directory,
+            hnsw_config=hnsw_config,
+        )
@@ -0,0 +1,762 @@
+"""
+Vector store plano (búsqueda exacta) sobre NumPy en memory mapping.
+
+Para corpus de decenas de miles de chunks una búsqueda exacta es más simple y
+rápida de abrir que un índice HNSW: los embeddings normalizados se guardan en
+float32 en archivos .npy que se abren con memory mapping, y el texto y la
+metadata de cada chunk en un RecordStore (JSONL indexado por offsets). El
+top-k sale de un producto matricial por bloques más argpartition, también
+para varias consultas a la vez.
+
+Cada upsert escribe un segmento nuevo (durable apenas termina, lo que permite
+retomar ingestas con IngestionCheckpoint); las versiones anteriores de un id y
+los ids eliminados se enmascaran hasta que compact() reescribe todo en un
+único segmento.
+
+Con quantization="int8" o "binary" la primera pasada recorre códigos
+cuantizados (int8 con escala por fila, o un bit por dimensión comparado por
+distancia de Hamming) y solo una lista corta de candidatos se vuelve a puntuar
+con los vectores completos (float16 o float32), leídos del memory map.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from greenpeace_rag.utils.config import (VECTOR_QUANTIZATIONS,
+                                         VECTOR_RESCORE_DTYPES,
+                                         VECTOR_STORE_CONFIG)
+from greenpeace_rag.utils.record_store import RecordStore, write_records
+
+_STATE_FILE = "segments.json"
+_VECTORS_FILE = "vectors.npy"
+_CODES_FILE = "codes.npy"
+_SCALES_FILE = "scales.npy"
+_IDS_FILE = "ids.json"
+DEFAULT_MAX_BATCH_SIZE = 5000
+# Bits en 1 de cada byte, para la distancia de Hamming con NumPy < 2 (sin np.bitwise_count)
+_POPCOUNT_TABLE = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Normaliza cada fila a norma 1 (las filas nulas quedan en cero)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cuantiza cada fila a int8 con su propia escala.
+
+    Args:
+        vectors: Matriz float (n x d)
+
+    Returns:
+        Tupla (códigos int8 n x d, escalas float32 n) con vector ≈ códigos * escala
+    """
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """
+    Cuantiza cada fila a un bit por dimensión (signo), empaquetado en bytes.
+
+    Args:
+        vectors: Matriz float (n x d)
+
+    Returns:
+        Códigos uint8 (n x ceil(d / 8))
+    """
+    return np.packbits(vectors > 0, axis=1)
+
+
+def _popcount(codes: np.ndarray) -> np.ndarray:
+    """Bits en 1 de cada byte de un array uint8."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(codes)
+    return _POPCOUNT_TABLE[codes]
+
+
+class _Segment:
+    """Segmento inmutable: arrays por fila (.npy) en memory mapping, registros e ids."""
+
+    def __init__(self, directory: Path):
+        self.name = directory.name
+        # Una entrada por .npy del segmento ("vectors", "codes", ...), todas con una fila por id
+        self.arrays = {path.stem: np.load(path, mmap_mode="r") for path in sorted(directory.glob("*.npy"))}
+        self.vectors = self.arrays.get("vectors")
+        self.records = RecordStore(str(directory))
+        with open(directory / _IDS_FILE, "r", encoding="utf-8") as f:
+            self.ids: List[str] = json.load(f)
+        # Filas vigentes (False si el id se eliminó o se reescribió en un segmento posterior)
+        self.live = np.ones(len(self.ids), dtype=bool)
+
+    def close(self) -> None:
+        self.records.close()
+        self.arrays.clear()
+        del self.vectors
+
+
+class FlatVectorStore(VectorStore):
+    """
+    Vector store con búsqueda exacta por producto interno.
+
+    Cumple el contrato de similarity_search_with_score de Chroma: devuelve
+    distancias (menor es mejor), en este caso la distancia L2 al cuadrado
+    entre vectores normalizados (2 - 2 * similitud coseno). Con
+    cuantización, la distancia es la de los vectores completos de la lista
+    corta re-puntuada.
+    """
+
+    def __init__(
+        self,
+        embedding_function: Embeddings,
+        persist_directory: str,
+        max_segments: int = VECTOR_STORE_CONFIG["flat_max_segments"],
+        block_rows: int = VECTOR_STORE_CONFIG["flat_block_rows"],
+        quantization: Optional[str] = VECTOR_STORE_CONFIG["flat_quantization"],
+        rescore_dtype: str = VECTOR_STORE_CONFIG["flat_rescore_dtype"],
+        rescore_multiplier: int = VECTOR_STORE_CONFIG["flat_rescore_multiplier"],
+    ):
+        """
+        Abre (o crea) el vector store.
+
+        Args:
+            embedding_function: Función de embeddings para textos y consultas
+            persist_directory: Directorio del vector store
+            max_segments: Segmentos a partir de los cuales se compacta automáticamente
+            block_rows: Filas por bloque del producto matricial
+            quantization: Primera pasada sobre códigos "int8" o "binary" (None = sin cuantizar)
+            rescore_dtype: Precisión de los vectores completos ("float32" o "float16")
+            rescore_multiplier: Con cuantización, candidatos a re-puntuar = k * multiplicador
+        """
+        if quantization is not None and quantization not in VECTOR_QUANTIZATIONS:
+            raise ValueError(f"Cuantización no válida: {quantization}")
+        if rescore_dtype not in VECTOR_RESCORE_DTYPES:
+            raise ValueError(f"Precisión de rescoring no válida: {rescore_dtype}")
+        self._embedding_function = embedding_function
+        self.directory = Path(persist_directory)
+        self.max_segments = max_segments
+        self.block_rows = block_rows
+        self.quantization = quantization
+        self.rescore_dtype = rescore_dtype
+        self.rescore_multiplier = rescore_multiplier
+        self._requested_format = (quantization, rescore_dtype)
+        self._lock = threading.RLock()
+        self._segments: List[_Segment] = []
+        # id -> (posición del segmento, fila) de la versión vigente
+        self._locations: Dict[str, Tuple[int, int]] = {}
+        self._deleted: set = set()
+        self._next_segment = 0
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding_function
+
+    # ---------- Persistencia ----------
+
+    def _load(self) -> None:
+        """Abre los segmentos registrados y reconstruye las máscaras de filas vigentes."""
+        state_path = self.directory / _STATE_FILE
+        state: Dict[str, Any] = {}
+        if state_path.exists():
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+
+        if state.get("segments"):
+            stored_format = (state.get("quantization"), state.get("rescore_dtype", "float32"))
+            if stored_format != self._requested_format:
+                print(f"⚠️  El vector store se creó con quantization={stored_format[0]}, "
+                      f"rescore_dtype={stored_format[1]}; se usa ese formato hasta reconstruirlo")
+            self.quantization, self.rescore_dtype = stored_format
+        self._segments = [_Segment(self.directory / name) for name in state.get("segments", [])]
+        self._deleted = set(state.get("deleted", []))
+        self._next_segment = int(state.get("next_segment", 0))
+        self._locations = {}
+        for position, segment in enumerate(self._segments):
+            for row, chunk_id in enumerate(segment.ids):
+                previous = self._locations.get(chunk_id)
+                if previous is not None:
+                    self._segments[previous[0]].live[previous[1]] = False
+                self._locations[chunk_id] = (position, row)
+        for chunk_id in self._deleted:
+            location = self._locations.pop(chunk_id, None)
+            if location is not None:
+                self._segments[location[0]].live[location[1]] = False
+
+    def _save_state(self) -> None:
+        """Registra los segmentos vigentes de forma atómica (archivo temporal + rename)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state_path = self.directory / _STATE_FILE
+        tmp_path = state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "segments": [segment.name for segment in self._segments],
+                    "deleted": sorted(self._deleted),
+                    "next_segment": self._next_segment,
+                    "quantization": self.quantization,
+                    "rescore_dtype": self.rescore_dtype,
+                },
+                f,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, state_path)
+
+    def _new_segment_directory(self) -> Path:
+        directory = self.directory / f"segment_{self._next_segment:06d}"
+        self._next_segment += 1
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    def _dimension(self) -> Optional[int]:
+        """Dimensión de los embeddings almacenados (None si el store está vacío)."""
+        return self._segments[0].vectors.shape[1] if self._segments else None
+
+    def _write_arrays(self, directory: Path, vectors: np.ndarray) -> None:
+        """Guarda los vectores normalizados en la precisión de rescoring y sus códigos cuantizados."""
+        np.save(directory / _VECTORS_FILE, vectors.astype(self.rescore_dtype))
+        if self.quantization == "int8":
+            codes, scales = quantize_int8(vectors)
+            np.save(directory / _CODES_FILE, codes)
+            np.save(directory / _SCALES_FILE, scales)
+        elif self.quantization == "binary":
+            np.save(directory / _CODES_FILE, quantize_binary(vectors))
+
+    @staticmethod
+    def _write_segment(directory: Path, ids: List[str], records: Iterable[Dict[str, Any]]) -> _Segment:
+        """Completa un segmento (cuyos vectores ya están escritos) con sus registros e ids."""
+        write_records(str(directory), records)
+        with open(directory / _IDS_FILE, "w", encoding="utf-8") as f:
+            json.dump(ids, f)
+        return _Segment(directory)
+
+    # ---------- Escritura ----------
+
+    def count(self) -> int:
+        """Cantidad de documentos vigentes."""
+        return len(self._locations)
+
+    def get_max_batch_size(self) -> int:
+        """Registros por upsert (cada upsert escribe un segmento)."""
+        return DEFAULT_MAX_BATCH_SIZE
+
+    def upsert_vectors(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Optional[Dict[str, Any]]],
+    ) -> None:
+        """
+        Escribe (o reemplaza) documentos con embeddings ya calculados.
+
+        Args:
+            ids: Ids de los documentos
+            embeddings: Un vector por documento
+            documents: Texto de cada documento
+            metadatas: Metadata de cada documento
+        """
+        if not len(ids):
+            return
+        # Si un id se repite dentro del lote, gana la última aparición
+        last_index = {chunk_id: index for index, chunk_id in enumerate(ids)}
+        keep = sorted(last_index.values())
+        vectors = _normalize_rows(np.asarray(embeddings, dtype=np.float32)[keep])
+        kept_ids = [ids[index] for index in keep]
+        records = [{"text": documents[index], "metadata": metadatas[index] or {}} for index in keep]
+
+        with self._lock:
+            dimension = self._dimension()
+            if dimension is not None and dimension != vectors.shape[1]:
+                raise ValueError(
+                    f"Dimensión de embeddings {vectors.shape[1]} distinta a la del vector store ({dimension})"
+                )
+            directory = self._new_segment_directory()
+            self._write_arrays(directory, vectors)
+            segment = self._write_segment(directory, kept_ids, records)
+            position = len(self._segments)
+            self._segments.append(segment)
+            for row, chunk_id in enumerate(kept_ids):
+                previous = self._locations.get(chunk_id)
+                if previous is not None:
+                    self._segments[previous[0]].live[previous[1]] = False
+                self._locations[chunk_id] = (position, row)
+                self._deleted.discard(chunk_id)
+            self._save_state()
+            if len(self._segments) > self.max_segments:
+                self.compact()
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        self.upsert_vectors(ids, self.embeddings.embed_documents(texts), texts, metadatas)
+        return ids
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        persist_directory: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "FlatVectorStore":
+        if persist_directory is None:
+            raise ValueError("FlatVectorStore necesita persist_directory")
+        store = cls(embedding, persist_directory, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Elimina documentos por id (las filas se descartan al compactar)."""
+        if not ids:
+            return None
+        with self._lock:
+            for chunk_id in ids:
+                location = self._locations.pop(chunk_id, None)
+                if location is None:
+                    continue
+                self._segments[location[0]].live[location[1]] = False
+                self._deleted.add(chunk_id)
+            self._save_state()
+        return True
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> None:
+        """
+        Reemplaza la metadata de documentos existentes sin volver a embeberlos.
+
+        Las filas se copian (con todos sus arrays: vectores, códigos,
+        etiquetas...) a un segmento nuevo por segmento de origen y las
+        anteriores quedan reemplazadas hasta la próxima compactación.
+
+        Args:
+            ids: Ids de los documentos (los que no existen se ignoran)
+            metadatas: Metadata nueva de cada documento
+        """
+        with self._lock:
+            by_segment: Dict[int, List[Tuple[int, str, Dict[str, Any]]]] = defaultdict(list)
+            for chunk_id, metadata in zip(ids, metadatas):
+                location = self._locations.get(chunk_id)
+                if location is not None:
+                    by_segment[location[0]].append((location[1], chunk_id, metadata))
+            if not by_segment:
+                return
+            for position, updates in by_segment.items():
+                segment = self._segments[position]
+                rows = np.asarray([row for row, _, _ in updates], dtype=np.int64)
+                directory = self._new_segment_directory()
+                for name, array in segment.arrays.items():
+                    np.save(directory / f"{name}.npy", np.asarray(array[rows]))
+                records = [
+                    {"text": segment.records[row]["text"], "metadata": metadata} for row, _, metadata in updates
+                ]
+                new_segment = self._write_segment(directory, [chunk_id for _, chunk_id, _ in updates], records)
+                new_position = len(self._segments)
+                self._segments.append(new_segment)
+                for new_row, (row, chunk_id, _) in enumerate(updates):
+                    segment.live[row] = False
+                    self._locations[chunk_id] = (new_position, new_row)
+            self._save_state()
+            if len(self._segments) > self.max_segments:
+                self.compact()
+
+    def delete_collection(self) -> None:
+        """Elimina todos los documentos y los archivos del vector store."""
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
+            self._locations = {}
+            self._deleted = set()
+            self._next_segment = 0
+            self.quantization, self.rescore_dtype = self._requested_format
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def compact(self) -> None:
+        """
+        Reescribe las filas vigentes en un único segmento.
+
+        Descarta las versiones reemplazadas y los ids eliminados. Los vectores
+        (y los códigos cuantizados) se copian por bloques a .npy nuevos
+        abiertos con memory mapping.
+        """
+        with self._lock:
+            if len(self._segments) <= 1 and not self._deleted:
+                return
+            total = len(self._locations)
+            old_segments = self._segments
+            if total == 0:
+                self._segments = []
+            else:
+                directory = self._new_segment_directory()
+                for name, template in old_segments[0].arrays.items():
+                    output = np.lib.format.open_memmap(
+                        directory / f"{name}.npy", mode="w+", dtype=template.dtype,
+                        shape=(total,) + template.shape[1:],
+                    )
+                    start = 0
+                    for segment in old_segments:
+                        rows = np.flatnonzero(segment.live)
+                        for block_start in range(0, len(rows), self.block_rows):
+                            block = rows[block_start:block_start + self.block_rows]
+                            output[start:start + len(block)] = segment.arrays[name][block]
+                            start += len(block)
+                    output.flush()
+                    del output
+                ids: List[str] = [
+                    segment.ids[row] for segment in old_segments for row in np.flatnonzero(segment.live)
+                ]
+
+                def live_records() -> Iterable[Dict[str, Any]]:
+                    for segment in old_segments:
+                        for row in np.flatnonzero(segment.live):
+                            yield segment.records[int(row)]
+
+                self._segments = [self._write_segment(directory, ids, live_records())]
+
+            self._locations = {chunk_id: (0, row) for row, chunk_id in enumerate(self._segments[0].ids)} \
+                if self._segments else {}
+            self._deleted = set()
+            self._save_state()
+            for segment in old_segments:
+                segment.close()
+                shutil.rmtree(self.directory / segment.name, ignore_errors=True)
+            print(f"🗜️  Vector store compactado: {total} documentos en {len(self._segments)} segmento(s)")
+
+    # ---------- Lectura ----------
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        include: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """
+        Documentos vigentes (todos o los ids pedidos), con el layout de Chroma.get.
+
+        Returns:
+            Diccionario con ids, documents y metadatas
+        """
+        with self._lock:
+            wanted = list(self._locations) if ids is None else [i for i in ids if i in self._locations]
+            records = [self._record(*self._locations[chunk_id]) for chunk_id in wanted]
+        return {
+            "ids": wanted,
+            "documents": [record["text"] for record in records],
+            "metadatas": [record["metadata"] for record in records],
+        }
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        found = self.get(ids=list(ids))
+        return [
+            Document(page_content=text, metadata=metadata, id=doc_id)
+            for doc_id, text, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+        ]
+
+    def _record(self, position: int, row: int) -> Dict[str, Any]:
+        return self._segments[position].records[row]
+
+    def _block_scores(self, segment: _Segment, start: int, queries: np.ndarray, exact: bool) -> np.ndarray:
+        """Similitud (mayor es mejor) de las consultas contra un bloque de filas del segmento."""
+        end = start + self.block_rows
+        if exact or self.quantization is None:
+            return queries @ np.asarray(segment.vectors[start:end], dtype=np.float32).T
+        if self.quantization == "int8":
+            # Producto asimétrico: consulta float contra códigos int8 reescalados por fila
+            codes = np.asarray(segment.arrays["codes"][start:end], dtype=np.float32)
+            return (queries @ codes.T) * segment.arrays["scales"][start:end][None, :]
+        # Binario: menos bits distintos (Hamming) es más parecido
+        codes = np.asarray(segment.arrays["codes"][start:end])
+        query_codes = quantize_binary(queries)
+        return -np.stack([
+            _popcount(np.bitwise_xor(codes, query_code)).sum(axis=1, dtype=np.int32)
+            for query_code in query_codes
+        ]).astype(np.float32)
+
+    def _search_refs(
+        self, queries: np.ndarray, k: int, exact: bool = False, rescore: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidatos ordenados por consulta.
+
+        Args:
+            queries: Consultas normalizadas (m x d)
+            k: Número de candidatos por consulta
+            exact: Si True, recorre los vectores completos aunque haya cuantización
+            rescore: Con cuantización, re-puntuar la lista corta con los vectores completos
+
+        Returns:
+            Tupla (similitudes m x c, referencias m x c x 2 con (segmento, fila)),
+            ordenadas de mayor a menor; las posiciones sin candidato valen -inf
+        """
+        n_queries = queries.shape[0]
+        quantized = self.quantization is not None and not exact
+        n_candidates = k * max(1, self.rescore_multiplier) if quantized and rescore else k
+
+        # Candidatos por bloque: (similitud, segmento, fila) de los mejores de cada uno
+        best_scores = np.empty((n_queries, 0), dtype=np.float32)
+        best_refs = np.empty((n_queries, 0, 2), dtype=np.int64)
+        for position, segment in enumerate(self._segments):
+            for start in range(0, len(segment.ids), self.block_rows):
+                live = segment.live[start:start + self.block_rows]
+                if not live.any():
+                    continue
+                scores = self._block_scores(segment, start, queries, exact)
+                scores[:, ~live] = -np.inf
+                top = min(n_candidates, scores.shape[1])
+                rows = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+                refs = np.stack([np.full_like(rows, position), rows + start], axis=2)
+                best_scores = np.concatenate([best_scores, np.take_along_axis(scores, rows, axis=1)], axis=1)
+                best_refs = np.concatenate([best_refs, refs], axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")[:, :n_candidates]
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_refs = np.take_along_axis(best_refs, order[:, :, None], axis=1)
+
+        if quantized and rescore:
+            # Lista corta re-puntuada con los vectores completos del memory map
+            for query_index in range(n_queries):
+                valid = np.isfinite(best_scores[query_index])
+                if not valid.any():
+                    continue
+                candidates = np.stack([
+                    self._segments[position].vectors[row] for position, row in best_refs[query_index][valid]
+                ]).astype(np.float32)
+                rescored = np.full(best_scores.shape[1], -np.inf, dtype=np.float32)
+                rescored[valid] = candidates @ queries[query_index]
+                rescore_order = np.argsort(-rescored, kind="stable")
+                best_scores[query_index] = rescored[rescore_order]
+                best_refs[query_index] = best_refs[query_index][rescore_order]
+        return best_scores[:, :k], best_refs[:, :k]
+
+    def _row_vectors(self, segment: _Segment, rows: np.ndarray) -> np.ndarray:
+        """Vectores (float32) de filas de un segmento, para puntuar un conjunto acotado de ids."""
+        return np.asarray(segment.vectors[rows], dtype=np.float32)
+
+    def _search_ids(self, queries: np.ndarray, k: int, ids: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k restringido a un conjunto de ids: solo se puntúan sus filas.
+
+        Returns:
+            Tupla (similitudes m x k, referencias m x k x 2 con (segmento, fila)),
+            ordenadas de mayor a menor; las posiciones sin candidato valen -inf
+        """
+        n_queries = queries.shape[0]
+        best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        best_refs = np.zeros((n_queries, k, 2), dtype=np.int64)
+        locations = [self._locations[chunk_id] for chunk_id in dict.fromkeys(ids) if chunk_id in self._locations]
+        if not locations:
+            return best_scores, best_refs
+        refs = np.asarray(locations, dtype=np.int64)
+        vectors = np.empty((len(refs), queries.shape[1]), dtype=np.float32)
+        for position in np.unique(refs[:, 0]):
+            selected = np.flatnonzero(refs[:, 0] == position)
+            vectors[selected] = self._row_vectors(self._segments[int(position)], refs[selected, 1])
+        scores = queries @ vectors.T
+        top = min(k, len(refs))
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :top]
+        best_scores[:, :top] = np.take_along_axis(scores, order, axis=1)
+        best_refs[:, :top] = refs[order]
+        return best_scores, best_refs
+
+    def search_vectors(
+        self, query_vectors: np.ndarray, k: int, ids: Optional[Sequence[str]] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Top-k para una matriz de consultas.
+
+        Sin cuantización la búsqueda es exacta; con cuantización, la primera
+        pasada usa los códigos y la lista corta se re-puntúa con los vectores
+        completos.
+
+        Args:
+            query_vectors: Una fila por consulta
+            k: Número de documentos por consulta
+            ids: Si se pasa, solo se puntúan estos ids (p.ej. los candidatos de
+                PrefilterIndex), de forma exacta
+
+        Returns:
+            Una lista de tuplas (documento, distancia) por consulta
+        """
+        queries = _normalize_rows(np.atleast_2d(np.asarray(query_vectors, dtype=np.float32)))
+        n_queries = queries.shape[0]
+        with self._lock:
+            if k <= 0 or not self._locations:
+                return [[] for _ in range(n_queries)]
+            if ids is not None:
+                best_scores, best_refs = self._search_ids(queries, k, ids)
+            else:
+                best_scores, best_refs = self._search_refs(queries, k)
+
+            results = []
+            for query_index in range(n_queries):
+                docs_with_scores = []
+                for similarity, (position, row) in zip(best_scores[query_index], best_refs[query_index]):
+                    if similarity == -np.inf:
+                        break
+                    position, row = int(position), int(row)
+                    record = self._record(position, row)
+                    doc = Document(
+                        page_content=record["text"],
+                        metadata=record["metadata"],
+                        id=self._segments[position].ids[row],
+                    )
+                    docs_with_scores.append((doc, max(0.0, 2.0 - 2.0 * float(similarity))))
+                results.append(docs_with_scores)
+        return results
+
+    # ---------- Cuantización ----------
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """
+        Tamaño de los vectores almacenados frente a float32 sin cuantizar.
+
+        Returns:
+            Diccionario con la cantidad de vectores, bytes de la primera pasada
+            (códigos que se recorren en cada búsqueda), bytes de los vectores de
+            rescoring (solo se leen para la lista corta), el ahorro de la primera
+            pasada frente a float32 y los bytes en disco (códigos más vectores de
+            rescoring) con su diferencia frente a float32: con cuantización los
+            códigos se suman a los vectores, así que en disco suele ocupar más
+        """
+        with self._lock:
+            n_vectors = sum(len(segment.ids) for segment in self._segments)
+            dimension = self._segments[0].vectors.shape[1] if self._segments else 0
+            vector_bytes = sum(segment.vectors.nbytes for segment in self._segments)
+            code_bytes = sum(
+                segment.arrays[name].nbytes
+                for segment in self._segments for name in ("codes", "scales") if name in segment.arrays
+            )
+        float32_bytes = n_vectors * dimension * 4
+        first_pass_bytes = code_bytes if self.quantization else vector_bytes
+        return {
+            "quantization": self.quantization,
+            "rescore_dtype": self.rescore_dtype,
+            "n_vectors": n_vectors,
+            "dimension": dimension,
+            "float32_bytes": float32_bytes,
+            "first_pass_bytes": first_pass_bytes,
+            "rescore_bytes": vector_bytes if self.quantization else 0,
+            "first_pass_saved_ratio": round(1 - first_pass_bytes / float32_bytes, 4) if float32_bytes else 0.0,
+            "disk_bytes": vector_bytes + code_bytes,
+            "disk_extra_bytes": vector_bytes + code_bytes - float32_bytes,
+        }
+
+    def evaluate_quantization(self, query_vectors: np.ndarray, k: int = 10) -> Dict[str, Any]:
+        """
+        Recall@k de la búsqueda cuantizada frente a la búsqueda exacta sin cuantizar.
+
+        Args:
+            query_vectors: Embeddings de las consultas (p.ej. preguntas de evaluación)
+            k: Número de documentos por consulta
+
+        Returns:
+            Estadísticas de memoria más recall@k de la primera pasada sola y con
+            rescoring, y la latencia media por consulta de cada modo (ms)
+        """
+        queries = _normalize_rows(np.atleast_2d(np.asarray(query_vectors, dtype=np.float32)))
+        report: Dict[str, Any] = {"k": k, "n_queries": queries.shape[0], **self.get_memory_stats()}
+        with self._lock:
+            timings = {}
+            refs = {}
+            for mode, kwargs in (
+                ("exact", {"exact": True}),
+                ("first_pass", {"rescore": False}),
+                ("rescored", {}),
+            ):
+                started_at = time.perf_counter()
+                refs[mode] = [
+                    self._search_refs(query[None, :], k, **kwargs)[1][0] for query in queries
+                ]
+                timings[mode] = (time.perf_counter() - started_at) / max(1, queries.shape[0])
+
+        def recall(mode: str) -> float:
+            hits = 0
+            for expected, found in zip(refs["exact"], refs[mode]):
+                hits += len({tuple(ref) for ref in expected.tolist()} & {tuple(ref) for ref in found.tolist()})
+            return round(hits / (k * max(1, queries.shape[0])), 4)
+
+        for mode in ("first_pass", "rescored"):
+            report[f"recall_{mode}"] = recall(mode)
+        for mode, seconds in timings.items():
+            report[f"latency_{mode}_ms"] = round(seconds * 1000, 3)
+        return report
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,  # noqa: A002
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Búsqueda exacta con distancia (menor es mejor), como Chroma.
+
+        Args:
+            query: Texto de la consulta
+            k: Número de documentos a devolver
+            filter: No soportado por este backend
+            ids: Ids a los que acotar la búsqueda (como el parámetro ids de Chroma)
+
+        Returns:
+            Lista de tuplas (documento, distancia)
+        """
+        if filter or kwargs.get("where_document"):
+            raise ValueError("FlatVectorStore no soporta filtros de metadata ni de contenido")
+        return self.search_vectors(np.asarray([self.embeddings.embed_query(query)]), k, ids=kwargs.get("ids"))[0]
+
+    def similarity_search_batch_with_score(
+        self, queries: List[str], k: int = 4, ids: Optional[Sequence[str]] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Búsqueda exacta de varias consultas con un único producto matricial por bloque.
+
+        Args:
+            queries: Consultas a buscar
+            k: Número de documentos por consulta
+            ids: Ids a los que acotar la búsqueda de todas las consultas
+
+        Returns:
+            Una lista de tuplas (documento, distancia) por consulta, en el mismo orden
+        """
+        if not queries:
+            return []
+        return self.search_vectors(np.asarray(self.embeddings.embed_documents(list(queries))), k, ids=ids)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.search_vectors(np.asarray([embedding]), k)[0]]
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Distancia L2 al cuadrado entre vectores normalizados -> similitud coseno
+        return lambda distance: 1.0 - distance / 2.0
@@ -0,0 +1,259 @@
+"""
+Barrido de parámetros HNSW de Chroma.
+
+Compara el top-k del índice HNSW contra el top-k exacto (fuerza bruta con
+NumPy) sobre los embeddings ya almacenados, y reporta recall@k frente a la
+latencia p50/p99 por consulta para una grilla de M, construction_ef y
+search_ef. Cada combinación se construye en una colección efímera en memoria.
+"""
+
+import time
+import uuid
+from itertools import product
+from typing import Any, Dict, List, Optional, Tuple
+
+import chromadb
+import numpy as np
+from langchain_core.vectorstores import VectorStore
+
+from greenpeace_rag.utils.config import HNSW_TUNING_CONFIG
+
+from .chroma_store import ChromaVectorStore, hnsw_collection_configuration
+from .flat_store import FlatVectorStore
+
+
+def stored_embeddings(vector_store: VectorStore, batch_size: int = 5000) -> Tuple[List[str], np.ndarray]:
+    """
+    Ids y embeddings almacenados en un vector store.
+
+    Args:
+        vector_store: Vector store de Chroma o basado en segmentos (flat, hnswlib)
+        batch_size: Registros leídos por llamada a Chroma
+
+    Returns:
+        Tupla (ids, matriz n x d de embeddings)
+    """
+    ids: List[str] = []
+    blocks = []
+    if isinstance(vector_store, FlatVectorStore):
+        for segment in vector_store._segments:
+            if segment.vectors is None:
+                raise ValueError("El vector store no conserva los embeddings completos (IVF-PQ)")
+            rows = np.flatnonzero(segment.live)
+            ids.extend(segment.ids[row] for row in rows)
+            blocks.append(np.asarray(segment.vectors[rows], dtype=np.float32))
+    else:
+        for offset in range(0, vector_store.count(), batch_size):
+            stored = vector_store._collection.get(include=["embeddings"], limit=batch_size, offset=offset)
+            ids.extend(stored["ids"])
+            blocks.append(np.asarray(stored["embeddings"], dtype=np.float32))
+    vectors = np.concatenate(blocks) if blocks else np.empty((0, 0), dtype=np.float32)
+    return ids, vectors
+
+
+def exact_top_k(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    space: str = "l2",
+    block_rows: int = 65536,
+) -> np.ndarray:
+    """
+    Top-k exacto por fuerza bruta en el espacio de distancia de Chroma.
+
+    Args:
+        vectors: Matriz de embeddings almacenados (n x d)
+        queries: Matriz de consultas (m x d)
+        k: Número de vecinos
+        space: "l2", "cosine" o "ip"
+        block_rows: Filas por bloque del producto matricial
+
+    Returns:
+        Posiciones (m x k) de los vecinos más cercanos, ordenados
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    if space == "cosine":
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    k = min(k, vectors.shape[0])
+
+    best_distances = np.empty((queries.shape[0], 0), dtype=np.float32)
+    best_rows = np.empty((queries.shape[0], 0), dtype=np.int64)
+    for start in range(0, vectors.shape[0], block_rows):
+        block = vectors[start:start + block_rows]
+        products = queries @ block.T
+        if space == "l2":
+            # ||q||^2 es constante por consulta: no cambia el orden
+            distances = (block * block).sum(axis=1)[None, :] - 2 * products
+        else:
+            distances = -products
+        top = min(k, block.shape[0])
+        rows = np.argpartition(distances, top - 1, axis=1)[:, :top]
+        best_distances = np.concatenate([best_distances, np.take_along_axis(distances, rows, axis=1)], axis=1)
+        best_rows = np.concatenate([best_rows, rows + start], axis=1)
+
+    order = np.argsort(best_distances, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(best_rows, order, axis=1)
+
+
+def _percentile_ms(latencies: List[float], percentile: float) -> float:
+    return round(float(np.percentile(latencies, percentile)) * 1000, 3)
+
+
+class HNSWTuner:
+    """
+    Barrido de parámetros HNSW sobre los embeddings de un vector store.
+
+    Uso típico:
+        tuner = HNSWTuner.from_vector_store(rag.vector_store)
+        results = tuner.sweep()
+    """
+
+    def __init__(self, vectors: np.ndarray, space: str = "l2", ids: Optional[List[str]] = None):
+        """
+        Inicializa el barrido.
+
+        Args:
+            vectors: Embeddings almacenados (n x d)
+            space: Espacio de distancia del índice ("l2", "cosine" o "ip")
+            ids: Ids de los embeddings (por defecto, su posición)
+        """
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.space = space
+        self.ids = ids or [str(index) for index in range(self.vectors.shape[0])]
+        self.results: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_vector_store(cls, vector_store: ChromaVectorStore, batch_size: int = 5000) -> "HNSWTuner":
+        """
+        Crea el barrido con los embeddings almacenados en una colección de Chroma.
+
+        Args:
+            vector_store: Vector store de Chroma ya indexado
+            batch_size: Registros leídos por llamada
+
+        Returns:
+            HNSWTuner sobre los embeddings de la colección
+        """
+        ids, vectors = stored_embeddings(vector_store, batch_size)
+        space = vector_store.get_hnsw_params()["space"] or vector_store.hnsw_config["space"]
+        return cls(vectors, space=space, ids=ids)
+
+    def sample_queries(self, n_queries: int, seed: int = HNSW_TUNING_CONFIG["seed"]) -> np.ndarray:
+        """Muestra embeddings almacenados para usarlos como consultas."""
+        rng = np.random.default_rng(seed)
+        n_queries = min(n_queries, self.vectors.shape[0])
+        return self.vectors[rng.choice(self.vectors.shape[0], size=n_queries, replace=False)]
+
+    def sweep(
+        self,
+        queries: Optional[np.ndarray] = None,
+        grid: Optional[Dict[str, List[int]]] = None,
+        k: int = HNSW_TUNING_CONFIG["k"],
+        n_queries: int = HNSW_TUNING_CONFIG["n_queries"],
+    ) -> List[Dict[str, Any]]:
+        """
+        Evalúa recall@k y latencia para cada combinación de la grilla.
+
+        Args:
+            queries: Embeddings de consulta (por defecto se muestrean del índice)
+            grid: Valores de M, construction_ef y search_ef (ver HNSW_TUNING_CONFIG)
+            k: Vecinos por consulta
+            n_queries: Consultas a muestrear si no se pasan queries
+
+        Returns:
+            Una fila por combinación con recall (recall@k), latencia p50/p99
+            (ms) y tiempo de construcción, más una fila "exact" de referencia
+        """
+        if not self.vectors.shape[0]:
+            raise ValueError("No hay embeddings para el barrido")
+        grid = {name: grid.get(name, HNSW_TUNING_CONFIG[name]) if grid else HNSW_TUNING_CONFIG[name]
+                for name in ("M", "construction_ef", "search_ef")}
+        queries = self.sample_queries(n_queries) if queries is None else np.asarray(queries, dtype=np.float32)
+        k = min(k, self.vectors.shape[0])
+
+        # Referencia: top-k exacto por consulta (y su latencia)
+        latencies = []
+        exact_rows = []
+        for query in queries:
+            started_at = time.perf_counter()
+            exact_rows.append(exact_top_k(self.vectors, query[None, :], k, self.space)[0])
+            latencies.append(time.perf_counter() - started_at)
+        exact_ids = [{self.ids[row] for row in rows} for rows in exact_rows]
+        self.results = [{
+            "method": "exact", "M": None, "construction_ef": None, "search_ef": None,
+            "k": k, "recall": 1.0,
+            "p50_ms": _percentile_ms(latencies, 50),
+            "p99_ms": _percentile_ms(latencies, 99),
+            "build_seconds": 0.0,
+        }]
+
+        print(f"🎛️  Barrido HNSW: {self.vectors.shape[0]} vectores, {len(queries)} consultas, k={k}, "
+              f"espacio={self.space}")
+        client = chromadb.EphemeralClient()
+        batch_size = client.get_max_batch_size()
+        query_list = queries.tolist()
+        for m, construction_ef, search_ef in product(grid["M"], grid["construction_ef"], grid["search_ef"]):
+            # Chroma no aplica un ef_search modificado a un índice ya cargado en el
+            # proceso: cada combinación se construye en su propia colección
+            name = f"hnsw-tuning-{uuid.uuid4().hex[:12]}"
+            configuration = hnsw_collection_configuration({
+                "space": self.space, "M": m, "construction_ef": construction_ef, "search_ef": search_ef,
+            })
+            collection = client.create_collection(name, configuration=configuration)
+            try:
+                started_at = time.perf_counter()
+                for start in range(0, self.vectors.shape[0], batch_size):
+                    collection.add(
+                        ids=self.ids[start:start + batch_size],
+                        embeddings=self.vectors[start:start + batch_size],
+                    )
+                build_seconds = time.perf_counter() - started_at
+
+                latencies = []
+                hits = 0
+                for query, expected in zip(query_list, exact_ids):
+                    started_at = time.perf_counter()
+                    found = collection.query(query_embeddings=[query], n_results=k, include=[])["ids"][0]
+                    latencies.append(time.perf_counter() - started_at)
+                    hits += len(expected.intersection(found))
+            finally:
+                client.delete_collection(name)
+
+            row = {
+                "method": "hnsw", "M": m, "construction_ef": construction_ef, "search_ef": search_ef,
+                "k": k, "recall": round(hits / (k * len(query_list)), 4),
+                "p50_ms": _percentile_ms(latencies, 50),
+                "p99_ms": _percentile_ms(latencies, 99),
+                "build_seconds": round(build_seconds, 3),
+            }
+            self.results.append(row)
+            print(f"   - M={m} construction_ef={construction_ef} search_ef={search_ef}: "
+                  f"recall@{k}={row['recall']:.3f} p50={row['p50_ms']}ms p99={row['p99_ms']}ms")
+        return self.results
+
+    def best(
+        self,
+        min_recall: float = 0.95,
+        M: Optional[int] = None,
+        construction_ef: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Combinación HNSW más rápida (p99) que alcanza el recall mínimo.
+
+        Args:
+            min_recall: Recall@k mínimo aceptable
+            M: Restringir a este M (p.ej. el de la colección actual)
+            construction_ef: Restringir a este construction_ef
+
+        Returns:
+            Fila del barrido, o None si ninguna combinación alcanza el recall
+        """
+        candidates = [
+            row for row in self.results
+            if row["method"] == "hnsw" and row["recall"] >= min_recall
+            and (M is None or row["M"] == M)
+            and (construction_ef is None or row["construction_ef"] == construction_ef)
+        ]
+        return min(candidates, key=lambda row: (row["p99_ms"], row["p50_ms"])) if candidates else None
@@ -0,0 +1,311 @@
+"""
+Backend de vector store con un grafo HNSW local (hnswlib).
+
+Los vectores, textos y metadata se guardan en los mismos segmentos que
+FlatVectorStore (memory mapping); encima se mantiene un grafo HNSW de
+hnswlib con producto interno sobre los vectores normalizados. Cada fila
+lleva una etiqueta entera estable (labels.npy), de modo que compactar los
+segmentos no obliga a reconstruir el grafo. El grafo se guarda al compactar
+y, al abrir el store, se repara con las filas que falten o sobren.
+
+hnswlib es opcional: solo se importa al usar este backend.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from greenpeace_rag.utils.config import DEFAULT_CONFIG, VECTOR_STORE_CONFIG
+
+from .flat_store import FlatVectorStore
+
+_GRAPH_FILE = "hnswlib.bin"
+_GRAPH_STATE_FILE = "hnswlib.json"
+_LABELS_FILE = "labels.npy"
+
+
+def _import_hnswlib() -> Any:
+    try:
+        import hnswlib
+    except ImportError as e:
+        raise ImportError("El backend 'hnswlib' necesita el paquete hnswlib: pip install hnswlib") from e
+    return hnswlib
+
+
+class HNSWLibVectorStore(FlatVectorStore):
+    """
+    Vector store con búsqueda aproximada sobre un grafo HNSW de hnswlib.
+
+    Cumple el mismo contrato que FlatVectorStore: distancias L2 al cuadrado
+    entre vectores normalizados (2 - 2 * similitud).
+    """
+
+    def __init__(
+        self,
+        embedding_function: Embeddings,
+        persist_directory: str,
+        hnsw_config: Optional[Dict[str, Any]] = None,
+        num_threads: int = VECTOR_STORE_CONFIG["hnswlib_num_threads"],
+        max_segments: int = VECTOR_STORE_CONFIG["flat_max_segments"],
+        block_rows: int = VECTOR_STORE_CONFIG["flat_block_rows"],
+    ):
+        """
+        Abre (o crea) el vector store.
+
+        Args:
+            embedding_function: Función de embeddings para textos y consultas
+            persist_directory: Directorio del vector store
+            hnsw_config: M, construction_ef y search_ef (ver DEFAULT_CONFIG["hnsw_config"]);
+                el espacio es siempre producto interno sobre vectores normalizados
+            num_threads: Hilos para construir el grafo y para consultas en lote (-1 = todos)
+            max_segments: Segmentos a partir de los cuales se compacta automáticamente
+            block_rows: Filas por bloque en la búsqueda exacta y la compactación
+        """
+        self._hnswlib = _import_hnswlib()
+        self.hnsw_config = {**DEFAULT_CONFIG["hnsw_config"], **(hnsw_config or {})}
+        self.num_threads = num_threads
+        self._graph: Any = None
+        self._graph_dirty = False
+        self._next_label = 0
+        # Etiqueta del grafo -> id del documento (solo filas vigentes)
+        self._label_ids: Dict[int, str] = {}
+        super().__init__(embedding_function, persist_directory, max_segments=max_segments, block_rows=block_rows)
+
+    # ---------- Persistencia ----------
+
+    def _load(self) -> None:
+        super()._load()
+        self._graph = None
+        self._graph_dirty = False
+        self._label_ids = {}
+        stored_labels = [-1]
+        for segment in self._segments:
+            labels = segment.arrays["labels"]
+            if len(labels):
+                stored_labels.append(int(labels.max()))
+            for row in np.flatnonzero(segment.live):
+                self._label_ids[int(labels[row])] = segment.ids[row]
+
+        state: Dict[str, Any] = {}
+        state_path = self.directory / _GRAPH_STATE_FILE
+        if state_path.exists():
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        # Las etiquetas nunca se reutilizan (el grafo conserva las eliminadas)
+        self._next_label = max(int(state.get("next_label", 0)), max(stored_labels) + 1)
+
+        dimension = self._dimension()
+        if dimension is None:
+            return
+        graph_path = self.directory / _GRAPH_FILE
+        if graph_path.exists():
+            self._graph = self._hnswlib.Index(space="ip", dim=dimension)
+            self._graph.load_index(str(graph_path))
+            self._graph.set_num_threads(self.num_threads)
+            if state.get("M") not in (None, self.hnsw_config["M"]) or state.get("construction_ef") not in (
+                None, self.hnsw_config["construction_ef"]
+            ):
+                print(f"⚠️  El grafo hnswlib se construyó con M={state.get('M')}, "
+                      f"construction_ef={state.get('construction_ef')}; se usa hasta reconstruirlo")
+            self._repair_graph()
+        else:
+            self._rebuild_graph()
+
+    def _new_graph(self, max_elements: int) -> Any:
+        graph = self._hnswlib.Index(space="ip", dim=self._dimension())
+        graph.init_index(
+            max_elements=max(max_elements, 1),
+            M=int(self.hnsw_config["M"]),
+            ef_construction=int(self.hnsw_config["construction_ef"]),
+        )
+        graph.set_num_threads(self.num_threads)
+        return graph
+
+    def _live_blocks(self) -> Iterable[Tuple[np.ndarray, np.ndarray]]:
+        """(vectores, etiquetas) de las filas vigentes, por bloques."""
+        for segment in self._segments:
+            rows = np.flatnonzero(segment.live)
+            for block_start in range(0, len(rows), self.block_rows):
+                block = rows[block_start:block_start + self.block_rows]
+                yield np.asarray(segment.vectors[block], dtype=np.float32), np.asarray(segment.arrays["labels"][block])
+
+    def _rebuild_graph(self) -> None:
+        """Construye el grafo desde cero con las filas vigentes."""
+        self._graph = self._new_graph(len(self._locations))
+        for vectors, labels in self._live_blocks():
+            self._graph.add_items(vectors, labels)
+        self._graph_dirty = True
+        print(f"🕸️  Grafo hnswlib construido: {len(self._locations)} vectores")
+
+    def _repair_graph(self) -> None:
+        """Agrega al grafo las filas vigentes que falten y marca eliminadas las que sobren."""
+        in_graph = np.asarray(self._graph.get_ids_list(), dtype=np.int64)
+        added = 0
+        for vectors, labels in self._live_blocks():
+            missing = ~np.isin(labels, in_graph)
+            if missing.any():
+                self._add_to_graph(vectors[missing], labels[missing])
+                added += int(missing.sum())
+        self._mark_deleted([label for label in in_graph.tolist() if label not in self._label_ids])
+        if added:
+            print(f"🩹 Grafo hnswlib reparado: {added} vectores agregados")
+
+    def _save_graph(self) -> None:
+        """Guarda el grafo y su estado de forma atómica (archivo temporal + rename)."""
+        if self._graph is None or not self._graph_dirty:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / f"{_GRAPH_FILE}.tmp"
+        self._graph.save_index(str(tmp_path))
+        os.replace(tmp_path, self.directory / _GRAPH_FILE)
+        state_path = self.directory / _GRAPH_STATE_FILE
+        tmp_state_path = state_path.with_suffix(".tmp")
+        with open(tmp_state_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "next_label": self._next_label,
+                "M": self.hnsw_config["M"],
+                "construction_ef": self.hnsw_config["construction_ef"],
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_state_path, state_path)
+        self._graph_dirty = False
+
+    # ---------- Escritura ----------
+
+    def _write_arrays(self, directory: Path, vectors: np.ndarray) -> None:
+        super()._write_arrays(directory, vectors)
+        labels = np.arange(self._next_label, self._next_label + vectors.shape[0], dtype=np.int64)
+        self._next_label += vectors.shape[0]
+        np.save(directory / _LABELS_FILE, labels)
+
+    def _add_to_graph(self, vectors: np.ndarray, labels: np.ndarray) -> None:
+        if self._graph is None:
+            self._graph = self._new_graph(len(labels))
+        needed = self._graph.element_count + len(labels)
+        if needed > self._graph.get_max_elements():
+            self._graph.resize_index(max(needed, 2 * self._graph.get_max_elements()))
+        self._graph.add_items(vectors, labels)
+        self._graph_dirty = True
+
+    def _mark_deleted(self, labels: Iterable[int]) -> None:
+        for label in labels:
+            self._label_ids.pop(int(label), None)
+            if self._graph is None:
+                continue
+            try:
+                self._graph.mark_deleted(int(label))
+                self._graph_dirty = True
+            except RuntimeError:
+                # Ya estaba marcada (p.ej. al reparar un grafo guardado después de la eliminación)
+                pass
+
+    def _labels_of(self, ids: Iterable[str]) -> List[int]:
+        labels = []
+        for chunk_id in ids:
+            location = self._locations.get(chunk_id)
+            if location is not None:
+                labels.append(int(self._segments[location[0]].arrays["labels"][location[1]]))
+        return labels
+
+    def upsert_vectors(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Optional[Dict[str, Any]]],
+    ) -> None:
+        with self._lock:
+            replaced = self._labels_of(set(ids))
+            super().upsert_vectors(ids, embeddings, documents, metadatas)
+            self._mark_deleted(replaced)
+
+            unique_ids = list(dict.fromkeys(ids))
+            locations = [self._locations[chunk_id] for chunk_id in unique_ids]
+            vectors = np.stack([self._segments[position].vectors[row] for position, row in locations])
+            labels = np.asarray([self._segments[position].arrays["labels"][row] for position, row in locations])
+            self._add_to_graph(vectors.astype(np.float32), labels)
+            self._label_ids.update(zip(labels.tolist(), unique_ids))
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return None
+        with self._lock:
+            labels = self._labels_of(ids)
+            result = super().delete(ids, **kwargs)
+            self._mark_deleted(labels)
+        return result
+
+    def delete_collection(self) -> None:
+        with self._lock:
+            super().delete_collection()
+            self._graph = None
+            self._graph_dirty = False
+            self._next_label = 0
+            self._label_ids = {}
+
+    def compact(self) -> None:
+        """
+        Compacta los segmentos y guarda el grafo.
+
+        Si más de la mitad de los nodos del grafo están eliminados, el grafo
+        se reconstruye con las filas vigentes.
+        """
+        with self._lock:
+            super().compact()
+            if self._graph is not None and self._graph.element_count > 2 * max(len(self._locations), 1):
+                self._rebuild_graph()
+            self._save_graph()
+
+    # ---------- Lectura ----------
+
+    def set_search_ef(self, search_ef: int) -> None:
+        """Ajusta ef de búsqueda (recall vs. latencia) sin reconstruir el grafo."""
+        self.hnsw_config["search_ef"] = search_ef
+
+    def _search_refs(
+        self, queries: np.ndarray, k: int, exact: bool = False, rescore: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidatos ordenados por consulta, buscados en el grafo con num_threads hilos.
+
+        Returns:
+            Tupla (similitudes m x k, referencias m x k x 2 con (segmento, fila)),
+            ordenadas de mayor a menor; las posiciones sin candidato valen -inf
+        """
+        if exact or self._graph is None:
+            return super()._search_refs(queries, k, exact=True)
+
+        n_queries = queries.shape[0]
+        best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        best_refs = np.zeros((n_queries, k, 2), dtype=np.int64)
+        found = min(k, len(self._label_ids))
+        if found == 0:
+            return best_scores, best_refs
+        self._graph.set_ef(max(int(self.hnsw_config["search_ef"]), found))
+        labels, distances = self._graph.knn_query(queries, k=found, num_threads=self.num_threads)
+        for query_index in range(n_queries):
+            for position, (label, distance) in enumerate(zip(labels[query_index], distances[query_index])):
+                # Espacio "ip" de hnswlib: distancia = 1 - producto interno
+                best_scores[query_index, position] = 1.0 - distance
+                best_refs[query_index, position] = self._locations[self._label_ids[int(label)]]
+        return best_scores, best_refs
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """
+        Tamaño del grafo y de los vectores frente a float32.
+
+        Returns:
+            Diccionario con vectores, bytes de los vectores en memory mapping y
+            bytes del grafo guardado
+        """
+        with self._lock:
+            stats = super().get_memory_stats()
+            graph_path = self.directory / _GRAPH_FILE
+            stats["graph_bytes"] = graph_path.stat().st_size if graph_path.exists() else 0
+            stats["graph_elements"] = self._graph.element_count if self._graph is not None else 0
+        return stats
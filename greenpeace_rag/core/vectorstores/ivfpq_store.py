@@ -0,0 +1,518 @@
+"""
+Backend de vector store IVF-PQ para corpus de millones de chunks.
+
+Un k-means grueso reparte los vectores en nlist listas invertidas y cada
+vector se guarda como el código de su lista más m bytes de cuantización por
+producto (PQ) del residuo respecto del centroide. Una consulta recorre solo
+las nprobe listas más cercanas y puntúa los códigos con tablas de búsqueda;
+solo los k * rescore_multiplier mejores candidatos se re-puntúan de forma
+exacta con sus vectores completos (float16 en disco, leídos del memory map),
+como la lista corta de FlatVectorStore cuantizado.
+
+El entrenamiento (k-means y codebooks PQ, con NumPy) se hace sobre una
+muestra del corpus la primera vez que se compacta con al menos
+min_train_size vectores. Hasta entonces los vectores se guardan completos y
+la búsqueda es exacta, como en FlatVectorStore; al entrenar se codifican y
+los vectores completos se conservan solo en la precisión de rescoring (o se
+descartan con rescore_dtype=None).
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from greenpeace_rag.utils.config import (VECTOR_RESCORE_DTYPES,
+                                         VECTOR_STORE_CONFIG)
+
+from .flat_store import FlatVectorStore, _Segment
+
+_COARSE_FILE = "ivfpq_coarse.npy"
+_CODEBOOKS_FILE = "ivfpq_codebooks.npy"
+_PQ_CODES_FILE = "pq_codes.npy"
+_LISTS_FILE = "lists.npy"
+_RESCORE_FILE = "rescore.npy"
+# Centroides PQ por subespacio (códigos de 1 byte)
+PQ_CENTROIDS = 256
+# Mínimo de vectores de entrenamiento por centroide
+MIN_POINTS_PER_CENTROID = 39
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray, block_rows: int = 65536) -> np.ndarray:
+    """Centroide más cercano (L2) de cada fila, por bloques."""
+    half_norms = 0.5 * (centroids * centroids).sum(axis=1)
+    assignments = np.empty(data.shape[0], dtype=np.int32)
+    for start in range(0, data.shape[0], block_rows):
+        block = data[start:start + block_rows]
+        assignments[start:start + block_rows] = np.argmax(block @ centroids.T - half_norms, axis=1)
+    return assignments
+
+
+def kmeans(data: np.ndarray, n_clusters: int, n_iter: int, seed: int = 0) -> np.ndarray:
+    """
+    k-means de Lloyd con NumPy.
+
+    Args:
+        data: Vectores de entrenamiento (n x d)
+        n_clusters: Cantidad de centroides (como mucho n)
+        n_iter: Iteraciones
+        seed: Semilla de la inicialización
+
+    Returns:
+        Centroides (n_clusters x d)
+    """
+    rng = np.random.default_rng(seed)
+    data = np.asarray(data, dtype=np.float32)
+    centroids = data[rng.choice(data.shape[0], size=n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignments = _assign(data, centroids)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        # Los centroides vacíos se reinician en puntos al azar
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = data[rng.choice(data.shape[0], size=len(empty), replace=False)]
+    return centroids
+
+
+class IVFPQVectorStore(FlatVectorStore):
+    """
+    Vector store con índice invertido y cuantización por producto.
+
+    Cumple el mismo contrato que FlatVectorStore: distancias L2 al cuadrado
+    entre vectores normalizados (2 - 2 * similitud), exactas para la lista
+    corta re-puntuada con los vectores completos (aproximadas a partir de
+    los códigos PQ si el índice no los guarda).
+    """
+
+    def __init__(
+        self,
+        embedding_function: Embeddings,
+        persist_directory: str,
+        nlist: int = VECTOR_STORE_CONFIG["ivfpq_nlist"],
+        nprobe: int = VECTOR_STORE_CONFIG["ivfpq_nprobe"],
+        m: int = VECTOR_STORE_CONFIG["ivfpq_m"],
+        train_size: int = VECTOR_STORE_CONFIG["ivfpq_train_size"],
+        min_train_size: int = VECTOR_STORE_CONFIG["ivfpq_min_train_size"],
+        kmeans_iterations: int = VECTOR_STORE_CONFIG["ivfpq_kmeans_iterations"],
+        rescore_dtype: Optional[str] = VECTOR_STORE_CONFIG["ivfpq_rescore_dtype"],
+        rescore_multiplier: int = VECTOR_STORE_CONFIG["ivfpq_rescore_multiplier"],
+        max_segments: int = VECTOR_STORE_CONFIG["flat_max_segments"],
+        block_rows: int = VECTOR_STORE_CONFIG["flat_block_rows"],
+    ):
+        """
+        Abre (o crea) el vector store.
+
+        Args:
+            embedding_function: Función de embeddings para textos y consultas
+            persist_directory: Directorio del vector store
+            nlist: Listas invertidas (centroides del k-means grueso)
+            nprobe: Listas recorridas por consulta
+            m: Subcuantizadores PQ (bytes por vector)
+            train_size: Vectores muestreados para entrenar
+            min_train_size: Vectores necesarios para entrenar el índice
+            kmeans_iterations: Iteraciones de k-means
+            rescore_dtype: Precisión de los vectores completos con los que se
+                re-puntúa la lista corta ("float32" o "float16"; None = sin re-puntuar)
+            rescore_multiplier: Candidatos PQ a re-puntuar = k * multiplicador
+            max_segments: Segmentos a partir de los cuales se compacta automáticamente
+            block_rows: Filas por bloque en la búsqueda exacta y la compactación
+        """
+        if rescore_dtype is not None and rescore_dtype not in VECTOR_RESCORE_DTYPES:
+            raise ValueError(f"Precisión de rescoring no válida: {rescore_dtype}")
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.m = m
+        self.train_size = train_size
+        self.min_train_size = max(min_train_size, PQ_CENTROIDS)
+        self.kmeans_iterations = kmeans_iterations
+        self.pq_rescore_dtype = rescore_dtype
+        self._coarse: Optional[np.ndarray] = None
+        self._codebooks: Optional[np.ndarray] = None
+        # Segmento -> (orden de filas por lista, offsets de cada lista en ese orden)
+        self._list_index: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        super().__init__(embedding_function, persist_directory, max_segments=max_segments, block_rows=block_rows,
+                         rescore_multiplier=rescore_multiplier)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._coarse is not None
+
+    # ---------- Persistencia ----------
+
+    def _load(self) -> None:
+        super()._load()
+        self._list_index = {}
+        self._coarse = self._codebooks = None
+        if (self.directory / _COARSE_FILE).exists() and (self.directory / _CODEBOOKS_FILE).exists():
+            self._coarse = np.load(self.directory / _COARSE_FILE)
+            self._codebooks = np.load(self.directory / _CODEBOOKS_FILE)
+            if self._codebooks.shape[0] != self.m:
+                print(f"⚠️  El índice IVF-PQ se entrenó con m={self._codebooks.shape[0]}; "
+                      f"se usa ese valor hasta reconstruirlo")
+                self.m = self._codebooks.shape[0]
+
+    def _save_training(self) -> None:
+        """Guarda centroides y codebooks de forma atómica, antes de registrar segmentos codificados."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for file_name, array in ((_COARSE_FILE, self._coarse), (_CODEBOOKS_FILE, self._codebooks)):
+            tmp_path = self.directory / f"{file_name}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.directory / file_name)
+
+    def _dimension(self) -> Optional[int]:
+        if self.is_trained:
+            return self._coarse.shape[1]
+        return super()._dimension()
+
+    def _write_arrays(self, directory: Path, vectors: np.ndarray) -> None:
+        """Sin entrenar guarda los vectores completos; entrenado, lista, códigos PQ y vectores de rescoring."""
+        if not self.is_trained:
+            np.save(directory / "vectors.npy", vectors.astype(np.float32))
+            return
+        lists, codes = self._encode(vectors)
+        np.save(directory / _LISTS_FILE, lists)
+        np.save(directory / _PQ_CODES_FILE, codes)
+        if self.pq_rescore_dtype is not None:
+            np.save(directory / _RESCORE_FILE, vectors.astype(self.pq_rescore_dtype))
+
+    def delete_collection(self) -> None:
+        with self._lock:
+            super().delete_collection()
+            self._coarse = self._codebooks = None
+            self._list_index = {}
+
+    # ---------- Entrenamiento y codificación ----------
+
+    def _pad(self, vectors: np.ndarray) -> np.ndarray:
+        """Completa con ceros hasta m * dsub columnas (la dimensión no tiene que ser múltiplo de m)."""
+        dsub = self._codebooks.shape[2] if self._codebooks is not None else -(-vectors.shape[1] // self.m)
+        padding = self.m * dsub - vectors.shape[1]
+        return np.pad(vectors, ((0, 0), (0, padding))) if padding else vectors
+
+    def train(self, sample: np.ndarray) -> None:
+        """
+        Entrena el k-means grueso y los codebooks PQ sobre una muestra.
+
+        El número de listas se reduce si la muestra no alcanza para nlist
+        centroides (MIN_POINTS_PER_CENTROID vectores por centroide).
+
+        Args:
+            sample: Vectores normalizados (n x d)
+        """
+        sample = np.asarray(sample, dtype=np.float32)
+        n_lists = max(1, min(self.nlist, sample.shape[0] // MIN_POINTS_PER_CENTROID))
+        coarse = kmeans(sample, n_lists, self.kmeans_iterations)
+        residuals = self._pad(sample - coarse[_assign(sample, coarse)])
+        dsub = residuals.shape[1] // self.m
+        n_centroids = min(PQ_CENTROIDS, sample.shape[0])
+        codebooks = np.stack([
+            kmeans(residuals[:, j * dsub:(j + 1) * dsub], n_centroids, self.kmeans_iterations, seed=j)
+            for j in range(self.m)
+        ])
+        self._coarse, self._codebooks = coarse, codebooks
+        self._save_training()
+        print(f"🧭 Índice IVF-PQ entrenado: {n_lists} listas, {self.m} subcuantizadores, "
+              f"{sample.shape[0]} vectores de muestra")
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Lista (int32) y códigos PQ (uint8, n x m) de vectores normalizados."""
+        lists = _assign(vectors, self._coarse)
+        residuals = self._pad(vectors - self._coarse[lists])
+        dsub = self._codebooks.shape[2]
+        codes = np.empty((vectors.shape[0], self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = _assign(residuals[:, j * dsub:(j + 1) * dsub], self._codebooks[j])
+        return lists, codes
+
+    def _live_rows(self, segments: List[_Segment]) -> Iterable[Tuple[_Segment, np.ndarray]]:
+        """Filas vigentes de cada segmento, por bloques."""
+        for segment in segments:
+            rows = np.flatnonzero(segment.live)
+            for block_start in range(0, len(rows), self.block_rows):
+                yield segment, rows[block_start:block_start + self.block_rows]
+
+    def _training_sample(self) -> np.ndarray:
+        """Muestra uniforme de las filas vigentes (todas con vectores completos: aún sin entrenar)."""
+        live_rows = [np.flatnonzero(segment.live) for segment in self._segments]
+        bounds = np.cumsum([0] + [len(rows) for rows in live_rows])
+        rng = np.random.default_rng(0)
+        picked = np.sort(rng.choice(bounds[-1], size=min(self.train_size, bounds[-1]), replace=False))
+        blocks = []
+        for segment, rows, low, high in zip(self._segments, live_rows, bounds[:-1], bounds[1:]):
+            chosen = picked[(picked >= low) & (picked < high)] - low
+            if len(chosen):
+                blocks.append(np.asarray(segment.vectors[rows[chosen]], dtype=np.float32))
+        return np.concatenate(blocks)
+
+    def compact(self) -> None:
+        """
+        Reescribe las filas vigentes en un único segmento ordenado por lista.
+
+        Si el índice no está entrenado y ya hay min_train_size vectores, lo
+        entrena primero; los segmentos con vectores completos se codifican
+        al reescribirse.
+        """
+        with self._lock:
+            if not self.is_trained and len(self._locations) >= self.min_train_size:
+                self.train(self._training_sample())
+            if not self.is_trained:
+                super().compact()
+                return
+            has_raw = any(segment.vectors is not None for segment in self._segments)
+            if len(self._segments) <= 1 and not self._deleted and not has_raw:
+                return
+
+            old_segments = self._segments
+            total = len(self._locations)
+            # Lista de cada fila vigente (en memoria: 4 bytes por vector) para ordenar por lista
+            lists = np.concatenate([
+                self._segment_lists(segment, rows) for segment, rows in self._live_rows(old_segments)
+            ] or [np.empty(0, dtype=np.int32)])
+            order = np.argsort(lists, kind="stable")
+            positions = np.empty_like(order)
+            positions[order] = np.arange(total)
+
+            if total == 0:
+                self._segments = []
+            else:
+                directory = self._new_segment_directory()
+                np.save(directory / _LISTS_FILE, lists[order])
+                output = np.lib.format.open_memmap(
+                    directory / _PQ_CODES_FILE, mode="w+", dtype=np.uint8, shape=(total, self.m)
+                )
+                start = 0
+                for segment, rows in self._live_rows(old_segments):
+                    output[positions[start:start + len(rows)]] = self._segment_codes(segment, rows)
+                    start += len(rows)
+                output.flush()
+                del output
+                self._write_rescore(directory / _RESCORE_FILE, old_segments, positions, total)
+
+                live = [(segment, int(row)) for segment in old_segments for row in np.flatnonzero(segment.live)]
+                ids = [live[index][0].ids[live[index][1]] for index in order]
+
+                def sorted_records() -> Iterable[Dict[str, Any]]:
+                    for index in order:
+                        segment, row = live[index]
+                        yield segment.records[row]
+
+                self._segments = [self._write_segment(directory, ids, sorted_records())]
+
+            self._locations = {chunk_id: (0, row) for row, chunk_id in enumerate(self._segments[0].ids)} \
+                if self._segments else {}
+            self._deleted = set()
+            self._list_index = {}
+            self._save_state()
+            for segment in old_segments:
+                segment.close()
+                shutil.rmtree(self.directory / segment.name, ignore_errors=True)
+            print(f"🗜️  Vector store compactado: {total} documentos en {len(self._segments)} segmento(s)")
+
+    def _write_rescore(self, path: Path, segments: List[_Segment], positions: np.ndarray, total: int) -> None:
+        """Copia los vectores completos de las filas vigentes al segmento compactado (si todos los tienen)."""
+        if self.pq_rescore_dtype is None:
+            return
+        if not all(segment.vectors is not None or "rescore" in segment.arrays for segment in segments):
+            print("⚠️  Hay segmentos IVF-PQ sin vectores completos: la búsqueda no re-puntúa hasta reconstruir")
+            return
+        output = np.lib.format.open_memmap(
+            path, mode="w+", dtype=self.pq_rescore_dtype, shape=(total, self._coarse.shape[1])
+        )
+        start = 0
+        for segment, rows in self._live_rows(segments):
+            output[positions[start:start + len(rows)]] = self._row_vectors(segment, rows)
+            start += len(rows)
+        output.flush()
+        del output
+
+    def _segment_lists(self, segment: _Segment, rows: np.ndarray) -> np.ndarray:
+        if segment.vectors is None:
+            return np.asarray(segment.arrays["lists"][rows], dtype=np.int32)
+        return _assign(np.asarray(segment.vectors[rows], dtype=np.float32), self._coarse)
+
+    def _segment_codes(self, segment: _Segment, rows: np.ndarray) -> np.ndarray:
+        if segment.vectors is None:
+            return np.asarray(segment.arrays["pq_codes"][rows])
+        return self._encode(np.asarray(segment.vectors[rows], dtype=np.float32))[1]
+
+    # ---------- Lectura ----------
+
+    def _row_vectors(self, segment: _Segment, rows: np.ndarray) -> np.ndarray:
+        """
+        Vectores de filas de un segmento: los completos si el segmento los
+        guarda; si no, reconstruidos (centroide + residuo PQ).
+        """
+        if segment.vectors is not None:
+            return super()._row_vectors(segment, rows)
+        if "rescore" in segment.arrays:
+            return np.asarray(segment.arrays["rescore"][rows], dtype=np.float32)
+        codes = np.asarray(segment.arrays["pq_codes"][rows])
+        residuals = self._codebooks[np.arange(self.m), codes].reshape(len(rows), -1)
+        return self._coarse[np.asarray(segment.arrays["lists"][rows])] + residuals[:, :self._coarse.shape[1]]
+
+    def _segment_list_index(self, segment: _Segment) -> Tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        Orden de filas por lista y offsets de cada lista de un segmento codificado.
+
+        Los segmentos compactados ya están ordenados por lista: su orden es
+        None y cada lista es un rango contiguo de filas.
+        """
+        if segment.name not in self._list_index:
+            lists = np.asarray(segment.arrays["lists"])
+            order = None if np.all(lists[1:] >= lists[:-1]) else np.argsort(lists, kind="stable")
+            sorted_lists = lists if order is None else lists[order]
+            offsets = np.searchsorted(sorted_lists, np.arange(self._coarse.shape[0] + 1))
+            self._list_index[segment.name] = (order, offsets)
+        return self._list_index[segment.name]
+
+    def _search_refs(
+        self, queries: np.ndarray, k: int, exact: bool = False, rescore: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidatos ordenados por consulta: búsqueda exacta en los segmentos con
+        vectores completos y tablas de distancia PQ sobre las nprobe listas más
+        cercanas en los codificados. Con rescore, los k * rescore_multiplier
+        mejores candidatos PQ se re-puntúan con los vectores de rescoring.
+
+        Returns:
+            Tupla (similitudes m x k, referencias m x k x 2 con (segmento, fila)),
+            ordenadas de mayor a menor; las posiciones sin candidato valen -inf
+        """
+        if exact and self.is_trained:
+            raise ValueError("IVFPQVectorStore no conserva los vectores completos para la búsqueda exacta")
+        if not self.is_trained:
+            return super()._search_refs(queries, k, exact=True)
+
+        n_queries = queries.shape[0]
+        best_scores = np.empty((n_queries, 0), dtype=np.float32)
+        best_refs = np.empty((n_queries, 0, 2), dtype=np.int64)
+
+        def merge(scores: np.ndarray, refs: np.ndarray) -> None:
+            nonlocal best_scores, best_refs
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_refs = np.concatenate([best_refs, refs], axis=1)
+
+        # Segmentos todavía sin codificar (escritos antes de compactar): exactos
+        for position, segment in enumerate(self._segments):
+            if segment.vectors is None:
+                continue
+            for start in range(0, len(segment.ids), self.block_rows):
+                live = segment.live[start:start + self.block_rows]
+                if not live.any():
+                    continue
+                scores = self._block_scores(segment, start, queries, exact=True)
+                scores[:, ~live] = -np.inf
+                top = min(k, scores.shape[1])
+                rows = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+                merge(
+                    np.take_along_axis(scores, rows, axis=1),
+                    np.stack([np.full_like(rows, position), rows + start], axis=2),
+                )
+
+        # Segmentos codificados: similitud ≈ q·centroide + Σ_j q_j·codebook_j[código_j]
+        coarse_scores = queries @ self._coarse.T
+        nprobe = min(self.nprobe, self._coarse.shape[0])
+        probes = np.argpartition(-coarse_scores, nprobe - 1, axis=1)[:, :nprobe]
+        padded = self._pad(queries)
+        dsub = self._codebooks.shape[2]
+        subspaces = np.arange(self.m)
+        encoded = [(position, segment) for position, segment in enumerate(self._segments) if segment.vectors is None]
+        rescore = rescore and any("rescore" in segment.arrays for _, segment in encoded)
+        n_candidates = k * max(1, self.rescore_multiplier) if rescore else k
+        if encoded:
+            encoded_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+            encoded_refs = np.zeros((n_queries, k, 2), dtype=np.int64)
+            for query_index in range(n_queries):
+                # Tabla m x 256: producto de la consulta con cada centroide PQ de cada subespacio
+                tables = np.einsum("jcd,jd->jc", self._codebooks, padded[query_index].reshape(self.m, dsub))
+                scores_parts = []
+                refs_parts = []
+                for position, segment in encoded:
+                    order, offsets = self._segment_list_index(segment)
+                    for list_id in probes[query_index]:
+                        low, high = offsets[list_id], offsets[list_id + 1]
+                        if low == high:
+                            continue
+                        if order is None:
+                            rows = np.arange(low, high)
+                            codes = segment.arrays["pq_codes"][low:high]
+                        else:
+                            rows = order[low:high]
+                            codes = segment.arrays["pq_codes"][rows]
+                        scores = coarse_scores[query_index, list_id] + tables[subspaces, codes].sum(axis=1)
+                        scores[~segment.live[rows]] = -np.inf
+                        scores_parts.append(scores.astype(np.float32))
+                        refs_parts.append(np.stack([np.full_like(rows, position), rows], axis=1))
+                if not scores_parts:
+                    continue
+                scores = np.concatenate(scores_parts)
+                top = min(n_candidates, len(scores))
+                picked = np.argpartition(-scores, top - 1)[:top]
+                scores, refs = scores[picked], np.concatenate(refs_parts)[picked]
+                if rescore:
+                    scores = self._rescore(queries[query_index], scores, refs)
+                top = min(k, len(scores))
+                picked = np.argpartition(-scores, top - 1)[:top]
+                encoded_scores[query_index, :top] = scores[picked]
+                encoded_refs[query_index, :top] = refs[picked]
+            merge(encoded_scores, encoded_refs)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_refs, order[:, :, None], axis=1)
+
+    def _rescore(self, query: np.ndarray, scores: np.ndarray, refs: np.ndarray) -> np.ndarray:
+        """Similitud exacta de los candidatos cuyos segmentos guardan vectores de rescoring."""
+        scores = scores.copy()
+        for position in np.unique(refs[:, 0]):
+            segment = self._segments[int(position)]
+            if "rescore" not in segment.arrays:
+                continue
+            selected = np.flatnonzero((refs[:, 0] == position) & np.isfinite(scores))
+            if len(selected):
+                vectors = np.asarray(segment.arrays["rescore"][refs[selected, 1]], dtype=np.float32)
+                scores[selected] = vectors @ query
+        return scores
+
+    def set_nprobe(self, nprobe: int) -> None:
+        """Ajusta las listas recorridas por consulta (recall vs. latencia) sin reconstruir."""
+        self.nprobe = nprobe
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """
+        Tamaño del índice frente a los vectores float32 completos.
+
+        Returns:
+            Diccionario con vectores, bytes del índice que recorre la búsqueda
+            (códigos, listas y los vectores aún sin codificar), bytes de los
+            vectores de rescoring (en disco, solo se leen para la lista corta),
+            bytes de centroides y codebooks y el ahorro del índice frente a float32
+        """
+        with self._lock:
+            n_vectors = sum(len(segment.ids) for segment in self._segments)
+            dimension = self._dimension() or 0
+            rescore_bytes = sum(segment.arrays["rescore"].nbytes
+                                for segment in self._segments if "rescore" in segment.arrays)
+            index_bytes = sum(array.nbytes for segment in self._segments
+                              for array in segment.arrays.values()) - rescore_bytes
+            training_bytes = sum(array.nbytes for array in (self._coarse, self._codebooks) if array is not None)
+        float32_bytes = n_vectors * dimension * 4
+        return {
+            "trained": self.is_trained,
+            "n_vectors": n_vectors,
+            "dimension": dimension,
+            "float32_bytes": float32_bytes,
+            "index_bytes": index_bytes,
+            "rescore_bytes": rescore_bytes,
+            "training_bytes": training_bytes,
+            "saved_ratio": round(1 - index_bytes / float32_bytes, 4) if float32_bytes else 0.0,
+        }
@@ -41,6 +41,7 @@ class RAGEvaluator:
         self.relevance_score = 0.0
         self.groundness_score = 0.0
         self.retrieval_relevance_score = 0.0
+        self.quantization_report: Dict[str, Any] = {}
 
     def set_vector_store(self, vector_store: Any) -> None:
         self.vector_store = vector_store
@@ -50,7 +51,7 @@ class RAGEvaluator:
         """Genera preguntas sintéticas a partir de chunks."""
         self.synthetic_questions = []
 
-        chunks = self.rag.generate_chunks()
+        chunks = self.rag.get_chunks()
         if not chunks:
             return
 
@@ -187,13 +188,107 @@ class RAGEvaluator:
     # ---------- Pipeline de evaluación ----------
     def generate_llm_answers(self, similarity_score: int = 3) -> None:
         print(f"🔹 Generating {len(self.synthetic_questions)} LLM answers...")
-        for index, question_item in tqdm(enumerate(self.synthetic_questions)):
-            question = question_item["question"]
-            answer, context, docs_with_scores = self.rag.generate_answers(question, similarity_score)
+        questions = [question_item["question"] for question_item in self.synthetic_questions]
+        answers = self.rag.generate_answers_batch(questions, similarity_score)
+        for index, (answer, context, docs_with_scores) in enumerate(answers):
             self.synthetic_questions[index]["llm_answer"] = answer
             self.synthetic_questions[index]["llm_answer_context"] = context
             self.synthetic_questions[index]["llm_answer_docs_with_scores"] = docs_with_scores
 
+    def prefill_answer_cache(self, similarity_score: int = 3) -> int:
+        """
+        Precarga el cache semántico del RAG con las preguntas sintéticas.
+
+        Reutiliza las respuestas ya generadas por generate_llm_answers; las
+        preguntas sin respuesta se responden con el RAG (que las cachea).
+
+        Args:
+            similarity_score: Número de documentos a recuperar
+
+        Returns:
+            Cantidad de preguntas cargadas en el cache
+        """
+        if not self.synthetic_questions:
+            self.get_evaluation_context()
+
+        answered = [q for q in self.synthetic_questions if q.get("llm_answer")]
+        pending = [q for q in self.synthetic_questions if not q.get("llm_answer")]
+
+        loaded = self.rag.warm_answer_cache(
+            [
+                {
+                    "question": q["question"],
+                    "answer": q["llm_answer"],
+                    "context": q.get("llm_answer_context", ""),
+                    "docs_with_scores": q.get("llm_answer_docs_with_scores", []),
+                }
+                for q in answered
+            ],
+            similarity_score=similarity_score,
+        )
+
+        print(f"🔹 Answering {len(pending)} synthetic questions to prefill the cache...")
+        if pending:
+            self.rag.generate_answers_batch([q["question"] for q in pending], similarity_score)
+        if pending:
+            self.rag.answer_cache.save()
+
+        return loaded + len(pending)
+
+    def evaluate_vector_quantization(self, k: int = 10) -> Dict[str, Any]:
+        """
+        Recall@k del vector store cuantizado frente a la búsqueda sin cuantizar.
+
+        Usa las preguntas sintéticas como consultas; requiere el backend
+        "flat" (ver VECTOR_STORE_CONFIG["flat_quantization"]).
+
+        Args:
+            k: Número de documentos por consulta
+
+        Returns:
+            Reporte con memoria ahorrada, recall@k y latencias
+        """
+        if not self.synthetic_questions:
+            self.get_evaluation_context()
+        if not self.rag.vector_store:
+            self.rag.generate_vector_store()
+        vector_store = self.rag.vector_store
+        if not hasattr(vector_store, "evaluate_quantization"):
+            raise ValueError("La evaluación de cuantización requiere el backend de vector store 'flat'")
+
+        questions = [question_item["question"] for question_item in self.synthetic_questions]
+        query_vectors = vector_store.embeddings.embed_documents(questions)
+        self.quantization_report = vector_store.evaluate_quantization(query_vectors, k=k)
+
+        report = self.quantization_report
+        print(f"🔹 Cuantización {report['quantization']} (rescoring {report['rescore_dtype']}), "
+              f"{report['n_queries']} preguntas, k={k}")
+        print(f"   - Memoria primera pasada: {report['first_pass_bytes'] / 2**20:.1f} MiB "
+              f"vs {report['float32_bytes'] / 2**20:.1f} MiB float32 "
+              f"({report['first_pass_saved_ratio']:.0%} ahorrado)")
+        print(f"   - Recall@{k} primera pasada: {report['recall_first_pass']:.3f} "
+              f"({report['latency_first_pass_ms']} ms/consulta)")
+        print(f"   - Recall@{k} con rescoring: {report['recall_rescored']:.3f} "
+              f"({report['latency_rescored_ms']} ms/consulta, exacta {report['latency_exact_ms']} ms)")
+        return self.quantization_report
+
+    def benchmark_vector_engines(self, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Benchmark de motores vectoriales con las preguntas sintéticas como consultas.
+
+        Args:
+            k: Número de documentos por consulta
+
+        Returns:
+            Una fila por motor (ver GreenpeaceRAG.benchmark_vector_engines)
+        """
+        if not self.synthetic_questions:
+            self.get_evaluation_context()
+        if not self.rag.vector_store:
+            self.rag.generate_vector_store()
+        questions = [question_item["question"] for question_item in self.synthetic_questions]
+        return self.rag.benchmark_vector_engines(questions=questions, k=k)
+
     def generate_evaluation_context(self, amount: int = 75) -> None:
         self.generate_synthetic_questions(amount)
         self.generate_evaluation_answers()
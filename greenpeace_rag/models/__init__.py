@@ -4,10 +4,13 @@ Models module.
 Contiene configuraciones para modelos LLM y de embedding.
 """
 
-from .embedding_models import EmbeddingManager
+from .embedding_models import (EmbeddingManager, EmbeddingModelRegistry,
+                               SharedSentenceTransformerEmbeddings)
 from .llm_models import LLMManager
 
 __all__ = [
     "LLMManager",
     "EmbeddingManager",
+    "EmbeddingModelRegistry",
+    "SharedSentenceTransformerEmbeddings",
 ]
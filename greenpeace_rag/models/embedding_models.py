@@ -1,26 +1,241 @@
 """
 Gestión de modelos de embeddings para Greenpeace RAG.
+
+Los modelos de sentence-transformers se cargan una sola vez por proceso en
+EmbeddingModelRegistry, indexados por (modelo, dispositivo, precisión); el
+dispositivo "auto" deja que sentence-transformers lo detecte. La
+misma instancia sirve al encode manual y a la función de embeddings que usa
+LangChain/Chroma.
 """
 
-from typing import Any
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
+from langchain_core.embeddings import Embeddings
 
-class EmbeddingManager:
-    """Factory/Manager para instanciar funciones y modelos de embeddings."""
+from ..utils.config import EMBEDDING_CONFIG, EMBEDDING_PRECISIONS
 
-    @staticmethod
-    def embedding_function(model_name: str) -> Any:
-        """Devuelve la función de embeddings compatible con LangChain-Chroma."""
-        from langchain_community.embeddings import \
-            SentenceTransformerEmbeddings
 
-        return SentenceTransformerEmbeddings(model_name=model_name)
+def _resident_memory_mb() -> Optional[float]:
+    """Memoria residente del proceso en MB (None si no se puede medir)."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class SharedSentenceTransformerEmbeddings(Embeddings):
+    """Función de embeddings de LangChain sobre un SentenceTransformer ya cargado."""
+
+    def __init__(
+        self,
+        model_name: str,
+        client: Any,
+        batch_size: int = EMBEDDING_CONFIG["batch_size"],
+        normalize_embeddings: bool = EMBEDDING_CONFIG["normalize_embeddings"],
+    ):
+        """
+        Inicializa la función de embeddings.
+
+        Args:
+            model_name: Nombre del modelo (informativo)
+            client: Instancia de SentenceTransformer compartida
+            batch_size: Tamaño de lote para encode
+            normalize_embeddings: Si True, normaliza los vectores a norma 1
+        """
+        self.model_name = model_name
+        self.client = client
+        self.batch_size = batch_size
+        self.normalize_embeddings = normalize_embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = [text.replace("\n", " ") for text in texts]
+        vectors = self.client.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=self.normalize_embeddings,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class EmbeddingModelRegistry:
+    """
+    Registro de modelos de embeddings a nivel de proceso.
+
+    Cada combinación (modelo, dispositivo, precisión) se carga una única vez;
+    las llamadas siguientes devuelven la misma instancia. Guarda el tiempo de
+    carga y la memoria residente agregada por cada modelo.
+    """
+
+    _models: Dict[Tuple[str, str, str], Any] = {}
+    _stats: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    _lock = threading.Lock()
 
     @staticmethod
-    def sentence_transformer(model_name: str):
-        """Devuelve una instancia de SentenceTransformer para encode manual."""
+    def _key(model_name: str, device: Optional[str], precision: Optional[str]) -> Tuple[str, str, str]:
+        device = device or EMBEDDING_CONFIG["device"] or "auto"
+        precision = precision or EMBEDDING_CONFIG["precision"]
+        if precision not in EMBEDDING_PRECISIONS:
+            raise ValueError(f"Precisión de embeddings no válida: {precision}")
+        return model_name, device, precision
+
+    @classmethod
+    def get_model(cls, model_name: str, device: Optional[str] = None, precision: Optional[str] = None) -> Any:
+        """
+        Devuelve el SentenceTransformer compartido, cargándolo si hace falta.
+
+        Args:
+            model_name: Modelo de sentence-transformers
+            device: Dispositivo de inferencia (por defecto EMBEDDING_CONFIG; None
+                en ambos = detección automática)
+            precision: "float32", "float16" o "bfloat16" (por defecto EMBEDDING_CONFIG)
+
+        Returns:
+            Instancia de SentenceTransformer
+        """
+        key = cls._key(model_name, device, precision)
+        model = cls._models.get(key)
+        if model is not None:
+            return model
+
+        with cls._lock:
+            if key not in cls._models:
+                cls._models[key] = cls._load(*key)
+            return cls._models[key]
+
+    @classmethod
+    def _load(cls, model_name: str, device: str, precision: str) -> Any:
         from sentence_transformers import SentenceTransformer
 
-        return SentenceTransformer(model_name)
+        print(f"🔢 Cargando modelo de embeddings {model_name} ({device}, {precision})...")
+        memory_before = _resident_memory_mb()
+        started_at = time.perf_counter()
 
+        # El dispositivo solo se pasa si se configuró: si no, sentence-transformers lo detecta
+        model = SentenceTransformer(model_name, **({"device": device} if device != "auto" else {}))
+        if precision == "float16":
+            model = model.half()
+        elif precision == "bfloat16":
+            import torch
 
+            model = model.to(torch.bfloat16)
+
+        load_time = time.perf_counter() - started_at
+        memory_after = _resident_memory_mb()
+        cls._stats[(model_name, device, precision)] = {
+            "load_time": load_time,
+            "resident_memory_mb": memory_after,
+            "memory_delta_mb": (
+                memory_after - memory_before if memory_after is not None and memory_before is not None else None
+            ),
+            "warm_up_time": None,
+        }
+        print(f"✅ Modelo de embeddings cargado en {load_time:.2f}s")
+        return model
+
+    @classmethod
+    def get_embeddings(
+        cls,
+        model_name: str,
+        device: Optional[str] = None,
+        precision: Optional[str] = None,
+        batch_size: int = EMBEDDING_CONFIG["batch_size"],
+        normalize_embeddings: bool = EMBEDDING_CONFIG["normalize_embeddings"],
+    ) -> SharedSentenceTransformerEmbeddings:
+        """
+        Devuelve una función de embeddings de LangChain sobre el modelo compartido.
+
+        Args:
+            model_name: Modelo de sentence-transformers
+            device: Dispositivo de inferencia
+            precision: Precisión de los pesos
+            batch_size: Tamaño de lote para encode
+            normalize_embeddings: Si True, normaliza los vectores a norma 1
+
+        Returns:
+            Función de embeddings compatible con LangChain-Chroma
+        """
+        model = cls.get_model(model_name, device, precision)
+        return SharedSentenceTransformerEmbeddings(
+            model_name, model, batch_size=batch_size, normalize_embeddings=normalize_embeddings
+        )
+
+    @classmethod
+    def warm_up(cls, model_name: str, device: Optional[str] = None, precision: Optional[str] = None) -> float:
+        """
+        Carga el modelo (si hace falta) y ejecuta un encode de prueba.
+
+        Args:
+            model_name: Modelo de sentence-transformers
+            device: Dispositivo de inferencia
+            precision: Precisión de los pesos
+
+        Returns:
+            Tiempo del encode de prueba en segundos
+        """
+        key = cls._key(model_name, device, precision)
+        model = cls.get_model(*key)
+
+        started_at = time.perf_counter()
+        model.encode(["warm-up"], show_progress_bar=False)
+        warm_up_time = time.perf_counter() - started_at
+
+        cls._stats[key]["warm_up_time"] = warm_up_time
+        print(f"🔥 Modelo de embeddings {model_name} listo (warm-up {warm_up_time:.2f}s)")
+        return warm_up_time
+
+    @classmethod
+    def get_model_stats(
+        cls, model_name: str, device: Optional[str] = None, precision: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Tiempo de carga, warm-up y memoria residente de un modelo cargado."""
+        return dict(cls._stats[cls._key(model_name, device, precision)])
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """Tiempo de carga, warm-up y memoria residente de cada modelo cargado."""
+        return {"|".join(key): dict(stats) for key, stats in cls._stats.items()}
+
+    @classmethod
+    def clear(cls) -> None:
+        """Libera todos los modelos cargados."""
+        with cls._lock:
+            cls._models.clear()
+            cls._stats.clear()
+
+
+class EmbeddingManager:
+    """Factory/Manager para instanciar funciones y modelos de embeddings."""
+
+    @staticmethod
+    def embedding_function(
+        model_name: str,
+        device: Optional[str] = None,
+        precision: Optional[str] = None,
+        batch_size: int = EMBEDDING_CONFIG["batch_size"],
+        normalize_embeddings: bool = EMBEDDING_CONFIG["normalize_embeddings"],
+    ) -> Any:
+        """Devuelve la función de embeddings compatible con LangChain-Chroma (modelo compartido)."""
+        return EmbeddingModelRegistry.get_embeddings(
+            model_name, device, precision, batch_size=batch_size, normalize_embeddings=normalize_embeddings
+        )
+
+    @staticmethod
+    def sentence_transformer(model_name: str, device: Optional[str] = None, precision: Optional[str] = None):
+        """Devuelve la instancia compartida de SentenceTransformer para encode manual."""
+        return EmbeddingModelRegistry.get_model(model_name, device, precision)
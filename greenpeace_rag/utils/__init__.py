@@ -4,25 +4,64 @@ Utils module.
 Contiene utilidades compartidas y configuraciones.
 """
 
-from .config import (CHUNKING_STRATEGIES, DEFAULT_CONFIG, DEFAULT_LLM_CONFIG,
-                     EVALUATION_CONFIG, RECOMMENDED_EMBEDDING_MODELS,
+from .async_utils import run_coroutine_sync
+from .chunk_ids import get_chunk_id, get_origin_file, make_chunk_id
+from .config import (CHUNKING_CONFIG, CHUNKING_STRATEGIES,
+                     CONTEXT_PACKING_CONFIG, DEFAULT_CONFIG, DEDUP_CONFIG, DEFAULT_LLM_CONFIG,
+                     EMBEDDING_CONFIG, EMBEDDING_PRECISIONS,
+                     EVALUATION_CONFIG, EXACT_CACHE_CONFIG, FILTER_CONFIG,
+                     HNSW_SPACES, HNSW_TUNING_CONFIG,
+                     INDEX_POLICIES, INGESTION_CONFIG, NEIGHBOR_MODES,
+                     PREFILTER_CONFIG,
+                     RECOMMENDED_EMBEDDING_MODELS,
+                     RERANK_CONFIG,
+                     RETRIEVAL_CONFIG, RETRIEVAL_MODES, SEMANTIC_CACHE_CONFIG,
+                     VECTOR_BENCHMARK_ENGINES, VECTOR_QUANTIZATIONS,
+                     VECTOR_RESCORE_DTYPES,
+                     VECTOR_STORE_BACKENDS, VECTOR_STORE_CONFIG,
                      get_chunking_params, get_default_config,
-                     validate_chunking_strategy, validate_embedding_model)
+                     get_index_artifact_path, validate_chunking_strategy,
+                     validate_embedding_model)
 from .file_handlers import (ensure_directory_exists, get_file_info, load_json,
                             load_pickle, read_text_files, save_json,
                             save_pickle)
+from .record_store import RecordStore, write_records
+from .text import STOPWORDS, normalize_text, tokenize
 
 __all__ = [
     # Config
     "DEFAULT_CONFIG",
+    "CHUNKING_CONFIG",
     "CHUNKING_STRATEGIES", 
+    "CONTEXT_PACKING_CONFIG",
     "RECOMMENDED_EMBEDDING_MODELS",
     "DEFAULT_LLM_CONFIG",
+    "DEDUP_CONFIG",
+    "EMBEDDING_CONFIG",
+    "EMBEDDING_PRECISIONS",
     "EVALUATION_CONFIG",
+    "EXACT_CACHE_CONFIG",
+    "FILTER_CONFIG",
+    "HNSW_SPACES",
+    "HNSW_TUNING_CONFIG",
+    "INDEX_POLICIES",
+    "INGESTION_CONFIG",
+    "NEIGHBOR_MODES",
+    "PREFILTER_CONFIG",
+    "RERANK_CONFIG",
+    "RETRIEVAL_CONFIG",
+    "RETRIEVAL_MODES",
+    "SEMANTIC_CACHE_CONFIG",
+    "VECTOR_BENCHMARK_ENGINES",
+    "VECTOR_QUANTIZATIONS",
+    "VECTOR_RESCORE_DTYPES",
+    "VECTOR_STORE_BACKENDS",
+    "VECTOR_STORE_CONFIG",
     "get_default_config",
     "validate_chunking_strategy",
     "validate_embedding_model",
     "get_chunking_params",
+    "get_index_artifact_path",
     # File handlers
     "read_text_files",
     "save_pickle",
@@ -30,5 +69,18 @@ __all__ = [
     "save_json",
     "load_json",
     "ensure_directory_exists",
-    "get_file_info"
+    "get_file_info",
+    # Chunk ids
+    "make_chunk_id",
+    "get_chunk_id",
+    "get_origin_file",
+    # Registros indexados por offsets
+    "RecordStore",
+    "write_records",
+    # Texto
+    "STOPWORDS",
+    "normalize_text",
+    "tokenize",
+    # Async
+    "run_coroutine_sync",
 ]
@@ -0,0 +1,47 @@
+"""
+Utilidades para ejecutar código asíncrono desde APIs síncronas.
+
+Permite reutilizar implementaciones basadas en asyncio (p.ej. llamadas
+concurrentes al LLM) desde métodos síncronos, incluso cuando ya existe un
+event loop corriendo (Jupyter, servidores async).
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable
+
+
+def run_coroutine_sync(coro: Awaitable[Any]) -> Any:
+    """
+    Ejecuta una corrutina y devuelve su resultado de forma bloqueante.
+
+    Si no hay un event loop corriendo en el hilo actual se usa asyncio.run;
+    en caso contrario la corrutina se ejecuta en un hilo auxiliar con su
+    propio event loop para no bloquear ni reentrar el loop existente.
+
+    Args:
+        coro: Corrutina a ejecutar
+
+    Returns:
+        Resultado de la corrutina
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result: dict = {}
+
+    def _runner() -> None:
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:  # noqa: BLE001 - se re-lanza en el hilo llamador
+            result["error"] = e
+
+    thread = threading.Thread(target=_runner, daemon=True)
+    thread.start()
+    thread.join()
+
+    if "error" in result:
+        raise result["error"]
+    return result.get("value")
@@ -0,0 +1,65 @@
+"""
+Identificadores estables para chunks.
+
+Los identificadores se derivan del contenido y de la fuente del chunk, por lo
+que son reproducibles entre ejecuciones y procesos (a diferencia de
+hash(page_content), que depende de PYTHONHASHSEED, o de los UUID aleatorios
+que asigna Chroma).
+"""
+
+import hashlib
+from typing import Any
+
+
+def make_chunk_id(source: str, content: str) -> str:
+    """
+    Genera un identificador determinístico para un chunk.
+
+    Args:
+        source: Fuente del chunk (p.ej. nombre del archivo)
+        content: Contenido del chunk
+
+    Returns:
+        Identificador hexadecimal de 32 caracteres
+    """
+    digest = hashlib.sha1(f"{source}\x00{content}".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def get_chunk_id(doc: Any) -> str:
+    """
+    Obtiene el identificador estable de un Document.
+
+    Usa metadata["chunk_id"] si existe; si no, lo deriva del nombre de archivo
+    y del contenido.
+
+    Args:
+        doc: Document de LangChain
+
+    Returns:
+        Identificador del chunk
+    """
+    chunk_id = doc.metadata.get("chunk_id") if doc.metadata else None
+    if chunk_id:
+        return str(chunk_id)
+    source = doc.metadata.get("file_name", "") if doc.metadata else ""
+    return make_chunk_id(source, doc.page_content)
+
+
+def get_origin_file(metadata: Any) -> str:
+    """
+    Archivo del que salió un chunk, al que se refieren sus offsets.
+
+    La deduplicación puede pasar un chunk canónico a otro archivo dueño
+    (metadata["file_name"]); metadata["origin_file"] no cambia, así que
+    start_index y chunk_index siguen siendo posiciones en ese archivo.
+
+    Args:
+        metadata: Metadata del chunk
+
+    Returns:
+        Nombre del archivo de origen ("" si no se conoce)
+    """
+    if not metadata:
+        return ""
+    return metadata.get("origin_file") or metadata.get("file_name", "")
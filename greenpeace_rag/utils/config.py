@@ -19,9 +19,23 @@ DEFAULT_CONFIG = {
     "chunk_params": {
         "chunk_char_size": 700,
         "chunk_overlap": 200
-    }
+    },
+    # Qué hacer si la colección ya existe: "reuse", "incremental" o "rebuild"
+    "index_policy": "incremental",
+    # Índice HNSW de la colección de Chroma (ver HNSW_SPACES y HNSWTuner).
+    # space, M y construction_ef se fijan al crear la colección (cambiarlos
+    # reconstruye el índice); search_ef se puede ajustar sobre una colección existente.
+    "hnsw_config": {
+        "space": "l2",
+        "M": 16,
+        "construction_ef": 100,
+        "search_ef": 100,
+    },
 }
 
+# Políticas de indexación disponibles
+INDEX_POLICIES = ["reuse", "incremental", "rebuild"]
+
 # Estrategias de chunking disponibles
 CHUNKING_STRATEGIES = [
     "characters",
@@ -43,6 +57,250 @@ DEFAULT_LLM_CONFIG = {
     "num_ctx": 4096
 }
 
+# Configuración del filtrado de documentos por relevancia (LLM)
+FILTER_CONFIG = {
+    # "sequential": una llamada al LLM por chunk, en orden
+    # "concurrent": llamadas concurrentes con límite de concurrencia
+    # "cascade": corte por distancia + cross-encoder, LLM solo para los dudosos (ver RERANK_CONFIG)
+    "filter_mode": "sequential",
+    "max_concurrency": 4,
+    # Cortar apenas se confirman N chunks relevantes en orden de score (None = evaluar todos)
+    "min_relevant": None,
+    # Timeout en segundos por chunk evaluado (None = sin timeout)
+    "chunk_timeout": 30.0,
+}
+
+# Configuración del reranking en cascada (filter_mode="cascade")
+RERANK_CONFIG = {
+    # Etapa 1: distancia máxima del vector store (None = sin corte)
+    "max_distance": None,
+    # Etapa 2: cross-encoder local multilingüe
+    "cross_encoder_model": "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1",
+    "device": "cpu",
+    "batch_size": 32,
+    "max_length": 512,
+    # Activación fija que lleva la salida cruda (logit) del modelo a [0, 1]:
+    # "sigmoid" para cross-encoders de un logit (mmarco, ms-marco) o
+    # "identity" si el modelo ya devuelve probabilidades
+    "activation": "sigmoid",
+    # Score >= accept_threshold: relevante sin consultar al LLM
+    "accept_threshold": 0.8,
+    # Score < reject_threshold: descartado sin consultar al LLM
+    "reject_threshold": 0.2,
+    # Etapa 3: modo de filtrado por LLM para los candidatos dudosos
+    "llm_filter_mode": "concurrent",
+}
+
+# Configuración de la recuperación de documentos
+RETRIEVAL_CONFIG = {
+    # "dense": solo búsqueda semántica; "hybrid": BM25 + semántica fusionadas con RRF
+    "retrieval_mode": "dense",
+    # Cantidad de reformulaciones generadas en la búsqueda multi-consulta
+    "ranking_questions_amount": "five",
+    # Documentos mínimos a recuperar por cada consulta antes de fusionar
+    "k_per_ranking_question": 5,
+    # Constante k de Reciprocal Rank Fusion: 1 / (k + rank)
+    "rrf_k": 60,
+    # Máximo de preguntas cuyas reformulaciones se mantienen en cache
+    "ranking_cache_size": 256,
+    # Parámetros de BM25
+    "bm25_k1": 1.5,
+    "bm25_b": 0.75,
+    # En modo híbrido, cada recuperador aporta k * multiplicador candidatos
+    "hybrid_candidate_multiplier": 3,
+    "dense_weight": 1.0,
+    "lexical_weight": 1.0,
+    # Chunks vecinos de los candidatos (ver NEIGHBOR_MODES y NeighborIndex):
+    # None = sin cambios, "merge" = une los candidatos consecutivos del mismo
+    # archivo, "expand" = además agrega neighbor_window vecinos por lado
+    "neighbor_mode": None,
+    "neighbor_window": 1,
+}
+
+# Ejecución del chunking (no afecta a los chunks generados)
+CHUNKING_CONFIG = {
+    # Procesos para fragmentar archivos en paralelo (None = os.cpu_count(), 1 = sin pool)
+    "workers": None,
+    # Archivos en vuelo por proceso (acota la memoria de los resultados pendientes)
+    "max_pending_per_worker": 2,
+}
+
+# Pipeline de ingesta en streaming (lectura -> chunking -> embeddings -> upsert)
+INGESTION_CONFIG = {
+    # Lotes en vuelo entre etapas (backpressure: una etapa lenta frena a las anteriores)
+    "queue_size": 4,
+    # Chunks por lote de encode/upsert (acotado por el máximo que informa Chroma)
+    "embed_batch_size": 256,
+}
+
+# Eliminación de chunks casi duplicados en la ingesta (MinHash + LSH)
+DEDUP_CONFIG = {
+    "enabled": False,
+    # Permutaciones MinHash por chunk y bandas LSH (num_perm debe ser múltiplo de bands)
+    "num_perm": 64,
+    "bands": 16,
+    # Similitud de Jaccard estimada mínima para descartar un chunk como duplicado
+    "threshold": 0.85,
+    # Caracteres por shingle
+    "shingle_size": 5,
+    "seed": 42,
+}
+
+# Pre-filtro de candidatos por términos y metadata antes del scoring vectorial
+PREFILTER_CONFIG = {
+    "enabled": False,
+    # Acotar también por keywords de la pregunta (chunks que contienen alguna).
+    # Puede perder chunks relevantes que no comparten términos: medir antes con
+    # DocumentRetriever.evaluate_keyword_narrowing. El filtro de metadata
+    # (set_metadata_filter) se aplica siempre, con o sin keywords.
+    "keyword_narrowing": False,
+    # Keywords de la pregunta (extraídas localmente, sin LLM)
+    "max_keywords": 3,
+    # Términos presentes en más de esta fracción de chunks no se usan como keywords
+    "max_df_ratio": 0.05,
+    # Las keywords solo acotan la búsqueda si dejan como mucho esta fracción del corpus...
+    "max_candidate_ratio": 0.2,
+    # ...y al menos esta cantidad de candidatos (si no, búsqueda sin acotar por keywords)
+    "min_keyword_candidates": 200,
+    # Tipo de documento inferido del nombre de archivo si la metadata no trae doc_type
+    "doc_types": {
+        "informe": ["informe", "report"],
+        "comunicado": ["comunicado", "prensa", "press"],
+        "campaña": ["campana", "campaign"],
+    },
+}
+
+# Armado del contexto del prompt dentro del presupuesto de tokens del LLM
+CONTEXT_PACKING_CONFIG = {
+    # Ventana de contexto del LLM (num_ctx de Ollama)
+    "num_ctx": DEFAULT_LLM_CONFIG["num_ctx"],
+    # Tokens reservados para la respuesta
+    "answer_tokens": 512,
+    # Margen para los tokens del chat template (roles, separadores de mensajes)
+    "template_tokens": 32,
+    # Tokenizer del LLM (nombre de Hugging Face, paquete tokenizers; p.ej. el
+    # repo HF del modelo de Ollama). None = estimación por caracteres
+    "tokenizer": None,
+    # Estimación conservadora: Llama 3 promedia ~4 caracteres por token en
+    # español; con 3.0 y el margen se sobreestiman los tokens y el prompt no
+    # pasa de num_ctx aunque el texto tenga muchos números, siglas o nombres
+    "chars_per_token": 3.0,
+    # Fracción extra de tokens sumada a la estimación por caracteres
+    "estimate_margin": 0.1,
+    # Superposición mínima (caracteres) para detectar solapamiento entre chunks sin offsets
+    "min_overlap_chars": 20,
+    # Un chunk que no entra se recorta si quedan al menos estos tokens; si no, se descarta
+    "min_fragment_tokens": 64,
+    "separator": "\n---\n",
+}
+
+# Modos de recuperación disponibles
+RETRIEVAL_MODES = ["dense", "hybrid"]
+
+# Modos de uso de la tabla de chunks vecinos (RETRIEVAL_CONFIG["neighbor_mode"])
+NEIGHBOR_MODES = ["merge", "expand"]
+
+# Backend del vector store
+VECTOR_STORE_CONFIG = {
+    # "chroma": ChromaDB (HNSW); "flat": búsqueda exacta sobre una matriz NumPy en memory mapping;
+    # "ivfpq": índice invertido con códigos PQ (corpus de millones de chunks);
+    # "hnswlib": grafo HNSW local de hnswlib (paquete opcional)
+    "backend": "chroma",
+    # Backends "flat", "ivfpq" y "hnswlib": segmentos (uno por lote escrito) antes de compactarlos en uno solo
+    "flat_max_segments": 16,
+    # Backend "flat": filas por bloque del producto matricial en cada búsqueda
+    "flat_block_rows": 65536,
+    # Backend "flat": primera pasada sobre códigos "int8" o "binary" (None = float completo)
+    "flat_quantization": None,
+    # Backend "flat": precisión de los vectores completos ("float32" o "float16")
+    "flat_rescore_dtype": "float32",
+    # Backend "flat" cuantizado: candidatos re-puntuados con los vectores completos = k * multiplicador
+    "flat_rescore_multiplier": 4,
+    # Backend "ivfpq": centroides gruesos (listas invertidas)
+    "ivfpq_nlist": 1024,
+    # Backend "ivfpq": listas recorridas por consulta (recall vs. latencia, se puede cambiar sin reconstruir)
+    "ivfpq_nprobe": 16,
+    # Backend "ivfpq": subcuantizadores PQ (bytes por vector)
+    "ivfpq_m": 16,
+    # Backend "ivfpq": vectores muestreados para entrenar k-means y PQ
+    "ivfpq_train_size": 100000,
+    # Backend "ivfpq": vectores necesarios para entrenar; por debajo se busca de forma exacta
+    "ivfpq_min_train_size": 10000,
+    # Backend "ivfpq": iteraciones de k-means
+    "ivfpq_kmeans_iterations": 20,
+    # Backend "ivfpq": precisión de los vectores completos guardados (en disco, memory mapping)
+    # para re-puntuar la lista corta ("float32" o "float16"; None = sin re-puntuar)
+    "ivfpq_rescore_dtype": "float16",
+    # Backend "ivfpq": candidatos PQ re-puntuados con los vectores completos = k * multiplicador
+    "ivfpq_rescore_multiplier": 10,
+    # Backend "hnswlib": hilos para construir el grafo y para consultas en lote (-1 = todos los núcleos)
+    "hnswlib_num_threads": -1,
+}
+
+# Backends de vector store disponibles
+VECTOR_STORE_BACKENDS = ["chroma", "flat", "ivfpq", "hnswlib"]
+
+# Cuantizaciones y precisiones de rescoring del backend "flat"
+VECTOR_QUANTIZATIONS = ["int8", "binary"]
+VECTOR_RESCORE_DTYPES = ["float32", "float16"]
+
+# Motores comparados en el benchmark de vector stores (ver VectorEngineBenchmark)
+VECTOR_BENCHMARK_ENGINES = ["exact", "chroma", "hnswlib"]
+
+# Espacios de distancia del índice HNSW de Chroma
+HNSW_SPACES = ["l2", "cosine", "ip"]
+
+# Barrido de parámetros HNSW (recall@k contra búsqueda exacta vs. latencia)
+HNSW_TUNING_CONFIG = {
+    "M": [8, 16, 32],
+    "construction_ef": [100, 200],
+    "search_ef": [10, 50, 100, 200],
+    "k": 10,
+    # Consultas del barrido (si no se pasan preguntas, se muestrean embeddings del índice)
+    "n_queries": 200,
+    "seed": 42,
+}
+
+# Configuración del cache semántico de respuestas
+SEMANTIC_CACHE_CONFIG = {
+    "enabled": False,
+    # Similitud coseno mínima entre preguntas para reutilizar una respuesta
+    "similarity_threshold": 0.92,
+    "max_entries": 1000,
+    # Vida máxima de una entrada en segundos (None = sin TTL)
+    "ttl_seconds": 24 * 60 * 60,
+    # Persistir el cache junto al vector store
+    "persist": False,
+    # Con persist: guardar cada N respuestas nuevas (1 = en cada una); las
+    # pendientes se guardan al terminar el proceso
+    "save_every": 10,
+}
+
+# Configuración de los caches exactos (recuperación, veredictos del filtro, respuestas)
+EXACT_CACHE_CONFIG = {
+    "enabled": False,
+    "retrieval_max_entries": 2048,
+    "filter_max_entries": 20000,
+    "answer_max_entries": 1024,
+    # Tier en disco (SQLite) junto al vector store
+    "sqlite": False,
+}
+
+# Configuración del modelo de embeddings (compartido vía EmbeddingModelRegistry)
+EMBEDDING_CONFIG = {
+    # None = el que elige sentence-transformers (cuda, mps o cpu, según disponibilidad)
+    "device": None,
+    # "float32", "float16" o "bfloat16"
+    "precision": "float32",
+    "batch_size": 32,
+    "normalize_embeddings": False,
+    # Cargar y ejecutar un encode de prueba al construir GreenpeaceRAG
+    "warm_up": False,
+}
+
+# Precisiones soportadas para el modelo de embeddings
+EMBEDDING_PRECISIONS = ["float32", "float16", "bfloat16"]
+
 # Configuración de evaluación
 EVALUATION_CONFIG = {
     "default_question_amount": 75,
@@ -59,6 +317,21 @@ DEFAULT_PATHS = {
 }
 
 
+def get_index_artifact_path(chroma_db_path: str, collection_name: str, artifact: str) -> str:
+    """
+    Ruta de un artefacto de índice auxiliar (p.ej. BM25) guardado junto al vector store.
+
+    Args:
+        chroma_db_path: Directorio de persistencia de ChromaDB
+        collection_name: Nombre de la colección
+        artifact: Nombre del artefacto (p.ej. "bm25")
+
+    Returns:
+        Ruta del artefacto
+    """
+    return str(Path(chroma_db_path) / f"{collection_name}_{artifact}")
+
+
 def get_default_config() -> Dict[str, Any]:
     """Obtiene la configuración por defecto del sistema."""
     return DEFAULT_CONFIG.copy()
@@ -0,0 +1,87 @@
+"""
+Almacenamiento de registros indexado por offsets.
+
+Guarda registros JSON (uno por línea) junto con un array de offsets en bytes,
+de modo que cualquier registro se puede leer por posición sin cargar el
+archivo completo en memoria (el archivo se abre con memory mapping).
+"""
+
+import json
+import mmap
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+RECORDS_FILE = "records.jsonl"
+OFFSETS_FILE = "records_offsets.npy"
+
+
+def write_records(directory: str, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Escribe registros en formato JSONL con su índice de offsets.
+
+    Args:
+        directory: Directorio destino (se crea si no existe)
+        records: Registros serializables a JSON
+
+    Returns:
+        Cantidad de registros escritos
+    """
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+
+    offsets = [0]
+    with open(path / RECORDS_FILE, "wb") as f:
+        for record in records:
+            line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+
+    np.save(path / OFFSETS_FILE, np.asarray(offsets, dtype=np.int64))
+    return len(offsets) - 1
+
+
+class RecordStore:
+    """Lector de registros JSONL con acceso aleatorio por posición."""
+
+    def __init__(self, directory: str):
+        """
+        Abre un almacenamiento de registros escrito con write_records.
+
+        Args:
+            directory: Directorio que contiene los registros
+        """
+        path = Path(directory)
+        self.offsets = np.load(path / OFFSETS_FILE, mmap_mode="r")
+        self._file = open(path / RECORDS_FILE, "rb")
+        # mmap no admite archivos vacíos
+        self._data = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(self) > 0 else b""
+        )
+
+    def __len__(self) -> int:
+        return int(self.offsets.shape[0]) - 1
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Registro fuera de rango: {index}")
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return json.loads(self._data[start:end])
+
+    def get_many(self, indices: Sequence[int]) -> List[Dict[str, Any]]:
+        """Obtiene varios registros por posición, en el orden pedido."""
+        return [self[int(i)] for i in indices]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self) -> None:
+        """Libera el memory map y el archivo subyacente."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
@@ -0,0 +1,56 @@
+"""
+Utilidades de procesamiento de texto.
+
+Normalización y tokenización livianas (sin dependencias externas) usadas por
+los índices léxicos del sistema.
+"""
+
+import re
+import unicodedata
+from typing import List
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_][a-z0-9]+)*")
+
+# Stopwords frecuentes en español e inglés (el corpus mezcla ambos idiomas)
+STOPWORDS = frozenset("""
+a al algo algunas algunos ante antes como con contra cual cuales cuando de del desde donde
+durante e el ella ellas ellos en entre era eran es esa esas ese eso esos esta estan estas
+este esto estos fue fueron ha han hasta hay la las le les lo los mas me mi mientras muy
+nos o os otra otras otro otros para pero poco por porque que quien quienes se sea ser si
+sin sobre son su sus tambien tanto te tiene tienen todo todos tu un una unas uno unos y ya
+the of and to in is are was were be been for on with as by at from that this these those
+it its or an not but which who what when where how why do does did has have had will would
+""".split())
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza un texto: minúsculas y sin acentos/diacríticos.
+
+    Args:
+        text: Texto a normalizar
+
+    Returns:
+        Texto normalizado
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str, remove_stopwords: bool = True) -> List[str]:
+    """
+    Tokeniza un texto en términos normalizados.
+
+    Conserva siglas y términos compuestos con guiones (p.ej. "co2", "ue-mercosur").
+
+    Args:
+        text: Texto a tokenizar
+        remove_stopwords: Si True, descarta stopwords
+
+    Returns:
+        Lista de tokens
+    """
+    tokens = _TOKEN_PATTERN.findall(normalize_text(text))
+    if remove_stopwords:
+        return [token for token in tokens if token not in STOPWORDS]
+    return tokens
@@ -0,0 +1,139 @@
+"""
+Fixtures compartidas de los tests.
+
+Los tests no descargan modelos ni llaman a Ollama: los embeddings son
+determinísticos (un vector pseudoaleatorio por texto) y el LLM es un chat
+model falso que responde siempre lo mismo y evalúa relevancia con una regla.
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+
+from greenpeace_rag.schemas.pydantic_models import RankingQuestions, RelevanceGrade
+
+EMBEDDING_SIZE = 16
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Embeddings determinísticos que cuentan los textos codificados con embed_documents."""
+
+    calls: int = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += len(texts)
+        return super().embed_documents(texts)
+
+
+class FakeLLM(FakeListChatModel):
+    """
+    Chat model falso.
+
+    Las respuestas rotan sobre responses. Con salida estructurada, un chunk es
+    relevante salvo que contenga irrelevant_marker, y las reformulaciones son
+    ranking_questions. graded guarda los prompts evaluados por el filtro.
+    """
+
+    responses: List[str] = ["Respuesta de prueba."]
+    irrelevant_marker: str = "irrelevante"
+    ranking_questions: List[str] = ["¿Qué hizo Greenpeace?", "¿Qué campañas hubo?"]
+    grade_sleep: float = 0.0
+    graded: List[str] = []
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> RunnableLambda:
+        def grade(messages: List[str]) -> Any:
+            prompt = str(messages[0])
+            if schema is RankingQuestions:
+                return RankingQuestions(questions=set(self.ranking_questions))
+            if self.grade_sleep:
+                time.sleep(self.grade_sleep)
+            self.graded.append(prompt)
+            context = prompt.split("<context>")[-1].split("</context>")[0]
+            return RelevanceGrade(explanation="regla de prueba", is_relevant=self.irrelevant_marker not in context)
+
+        return RunnableLambda(grade)
+
+
+@pytest.fixture
+def embeddings() -> CountingEmbeddings:
+    return CountingEmbeddings(size=EMBEDDING_SIZE)
+
+
+@pytest.fixture
+def llm() -> FakeLLM:
+    return FakeLLM(graded=[])
+
+
+@pytest.fixture
+def rag_factory(tmp_path: Path, embeddings: CountingEmbeddings, llm: FakeLLM, monkeypatch: pytest.MonkeyPatch):
+    """
+    Construye GreenpeaceRAG sobre tmp_path/corpus y tmp_path/db con el LLM y los embeddings falsos.
+
+    Los kwargs pisan los argumentos por defecto (p.ej. retrieval_config).
+    """
+    from greenpeace_rag import GreenpeaceRAG
+    from greenpeace_rag.models import EmbeddingManager, LLMManager
+
+    monkeypatch.setattr(LLMManager, "create", staticmethod(lambda **kwargs: llm))
+    monkeypatch.setattr(EmbeddingManager, "embedding_function", staticmethod(lambda *args, **kwargs: embeddings))
+    (tmp_path / "corpus").mkdir(exist_ok=True)
+
+    def make(**kwargs: Any) -> "GreenpeaceRAG":
+        return GreenpeaceRAG(**{
+            "txt_dir": str(tmp_path / "corpus"),
+            "chroma_db_path": str(tmp_path / "db"),
+            "chunk_params": {"chunk_char_size": 200, "chunk_overlap": 0},
+            **kwargs,
+        })
+
+    return make
+
+
+@pytest.fixture
+def write_corpus(tmp_path: Path) -> Callable[..., List[Path]]:
+    """Escribe archivos nombre.txt en tmp_path/corpus y devuelve las rutas del corpus, ordenadas."""
+    corpus = tmp_path / "corpus"
+    corpus.mkdir(exist_ok=True)
+
+    def write(**files: str) -> List[Path]:
+        for name, content in files.items():
+            (corpus / f"{name}.txt").write_text(content, encoding="utf-8")
+        return sorted(corpus.glob("*.txt"))
+
+    return write
+
+
+@pytest.fixture
+def random_text() -> Callable[[int], str]:
+    """Textos de palabras al azar: dos textos distintos casi no comparten shingles."""
+    rng = np.random.default_rng(0)
+
+    def make(n_words: int) -> str:
+        return " ".join(f"w{index}" for index in rng.integers(0, 3000, n_words))
+
+    return make
+
+
+@pytest.fixture
+def clustered_vectors() -> Callable[..., Tuple[np.ndarray, np.ndarray]]:
+    """Vectores y consultas agrupados alrededor de centros al azar (con estructura, como los embeddings)."""
+
+    def make(n_vectors: int, n_queries: int, dimension: int, n_clusters: int,
+             noise: float) -> Tuple[np.ndarray, np.ndarray]:
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(n_clusters, dimension))
+
+        def sample(n: int) -> np.ndarray:
+            return (centers[rng.integers(0, n_clusters, n)] + noise * rng.normal(size=(n, dimension))).astype(
+                np.float32
+            )
+
+        return sample(n_vectors), sample(n_queries)
+
+    return make
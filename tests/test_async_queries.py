@@ -0,0 +1,90 @@
+"""Tests del camino asyncio: mismos resultados que el camino sync, caches compartidos y concurrencia acotada."""
+
+import asyncio
+
+import pytest
+
+from greenpeace_rag.utils.chunk_ids import get_chunk_id
+
+
+@pytest.fixture
+def rag(rag_factory, write_corpus, random_text, llm):
+    write_corpus(**{f"doc{index}": random_text(300) for index in range(4)},
+                 ruido=f"{llm.irrelevant_marker} " + random_text(300))
+    rag = rag_factory(
+        semantic_cache_config={"enabled": True},
+        exact_cache_config={"enabled": True, "sqlite": True},
+        filter_config={"filter_mode": "concurrent"},
+    )
+    rag.rag_setup()
+    return rag
+
+
+def _ids(docs_with_scores):
+    return [get_chunk_id(doc) for doc, _ in docs_with_scores]
+
+
+def test_async_retrieval_matches_sync(rag, llm):
+    question = "¿Qué campañas hizo Greenpeace?"
+    expected = rag.get_relevant_documents(question, similarity_score=5)
+
+    found = asyncio.run(rag.aget_relevant_documents(question, similarity_score=5))
+
+    assert _ids(found) == _ids(expected)
+    assert all(llm.irrelevant_marker not in doc.page_content for doc, _ in found)
+
+
+def test_concurrent_async_queries_share_the_answer_caches(rag):
+    questions = [f"¿Pregunta número {index}?" for index in range(6)] * 4
+
+    async def ask_all():
+        return await asyncio.gather(*(rag.agenerate_answers(question) for question in questions))
+
+    results = asyncio.run(ask_all())
+
+    assert [answer for answer, _, _ in results] == ["Respuesta de prueba."] * len(questions)
+    # Las preguntas repetidas que se generaron en paralelo reemplazan su entrada, no la duplican
+    assert len(rag.answer_cache) == 6
+    cache = rag.answer_cache
+    assert sorted(list(cache._entries) + cache._free_slots) == list(range(cache.max_entries))
+    for question in set(questions):
+        assert rag._lookup_cached_answer(question, 3) is not None
+
+
+def test_max_concurrent_queries_bounds_queries_in_flight(rag, monkeypatch):
+    rag.max_concurrent_queries = 3
+    in_flight, peak = 0, 0
+    retrieve = rag.retriever.aget_relevant_documents
+
+    async def tracked(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        try:
+            return await retrieve(*args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(rag.retriever, "aget_relevant_documents", tracked)
+
+    async def ask_all():
+        return await asyncio.gather(*(rag.agenerate_answers(f"pregunta {index}", use_cache=False)
+                                      for index in range(10)))
+
+    assert len(asyncio.run(ask_all())) == 10
+    assert peak == 3
+
+
+def test_astream_answers_streams_and_caches_the_answer(rag):
+    async def stream(question):
+        answer_stream = await rag.astream_answers(question)
+        tokens = [token async for token in answer_stream]
+        return answer_stream, tokens
+
+    answer_stream, tokens = asyncio.run(stream("¿Qué hizo Greenpeace?"))
+
+    assert "".join(tokens) == "Respuesta de prueba."
+    assert answer_stream.docs_with_scores
+    assert rag.stream_metrics[-1]["time_to_first_token"] >= 0
+    assert rag._lookup_cached_answer("¿Qué hizo Greenpeace?", 3)[0] == "Respuesta de prueba."
@@ -0,0 +1,61 @@
+"""Tests de generate_answers_batch: mismos resultados que el camino por pregunta, un solo encode y caches."""
+
+import pytest
+
+from greenpeace_rag.utils.chunk_ids import get_chunk_id
+
+QUESTIONS = ["¿Qué hizo Greenpeace?", "¿Dónde están las ballenas?", "¿Qué pasó en 2019?"]
+
+
+@pytest.fixture
+def rag(rag_factory, write_corpus, random_text, llm):
+    write_corpus(**{f"doc{index}": random_text(100) for index in range(3)},
+                 ruido=f"{llm.irrelevant_marker} " + random_text(30))
+    rag = rag_factory(semantic_cache_config={"enabled": True}, exact_cache_config={"enabled": True})
+    rag.rag_setup()
+    return rag
+
+
+def _summary(results):
+    return [(answer, context, [get_chunk_id(doc) for doc, _ in docs]) for answer, context, docs in results]
+
+
+def test_batch_matches_answering_one_by_one(rag):
+    expected = [rag.generate_answers(question, use_cache=False) for question in QUESTIONS]
+
+    results = rag.generate_answers_batch(QUESTIONS, use_cache=False)
+
+    assert _summary(results) == _summary(expected)
+
+
+def test_batch_encodes_all_questions_at_once(rag, embeddings, monkeypatch):
+    encoded = []
+    embed_documents = type(embeddings).embed_documents
+
+    def tracking_embed_documents(self, texts):
+        encoded.append(list(texts))
+        return embed_documents(self, texts)
+
+    def no_embed_query(self, text):
+        raise AssertionError("el batch no debería codificar preguntas de a una")
+
+    monkeypatch.setattr(type(embeddings), "embed_documents", tracking_embed_documents)
+    monkeypatch.setattr(type(embeddings), "embed_query", no_embed_query)
+
+    rag.generate_answers_batch(QUESTIONS, use_cache=False)
+
+    assert encoded == [QUESTIONS]
+
+
+def test_batch_reuses_and_fills_the_answer_caches(rag, llm):
+    cached = rag.generate_answers(QUESTIONS[0])
+    graded = len(llm.graded)
+
+    results = rag.generate_answers_batch(QUESTIONS)
+
+    assert results[0] == cached
+    # Solo las preguntas no cacheadas pasan por el filtro
+    assert graded < len(llm.graded) <= graded + 2 * 3
+    graded = len(llm.graded)
+    assert rag.generate_answers_batch(list(reversed(QUESTIONS))) == list(reversed(results))
+    assert len(llm.graded) == graded
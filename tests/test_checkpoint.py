@@ -0,0 +1,98 @@
+"""Tests de IngestionCheckpoint: retomar una ingesta interrumpida sin reescribir lo ya confirmado."""
+
+import json
+
+import pytest
+
+from greenpeace_rag.core.chunking import RecursiveCharacterChunker
+from greenpeace_rag.core.indexing import IncrementalIndexer, IndexManifest, IngestionCheckpoint
+from greenpeace_rag.core.vectorstores import FlatVectorStore
+
+SETTINGS = {"chunking": "recursive_characters", "chunk_char_size": 200}
+
+
+def _sync(directory, embeddings, txt_files, store=None):
+    store = store or FlatVectorStore(embeddings, str(directory / "db"))
+    indexer = IncrementalIndexer(
+        store,
+        RecursiveCharacterChunker({"chunk_char_size": 200, "chunk_overlap": 0}, workers=1),
+        IndexManifest.load(str(directory / "manifest.json")),
+        batch_size=4,
+        checkpoint=IngestionCheckpoint.load(str(directory / "checkpoint.jsonl"), SETTINGS),
+    )
+    indexer.sync(txt_files)
+    return store, indexer
+
+
+def test_interrupted_sync_resumes_from_last_committed_batch(tmp_path, embeddings, write_corpus, random_text):
+    txt_files = write_corpus(**{name: random_text(150) for name in ("a", "b", "c")})
+    reference, _ = _sync(tmp_path / "reference", embeddings, txt_files)
+    total = reference.count()
+    assert total > 8
+
+    store = FlatVectorStore(embeddings, str(tmp_path / "db"))
+    upsert = store.upsert_vectors
+    written = []
+
+    def crash_on_third_batch(ids, **kwargs):
+        if len(written) == 2:
+            raise RuntimeError("proceso terminado")
+        written.append(list(ids))
+        upsert(ids, **kwargs)
+
+    store.upsert_vectors = crash_on_third_batch
+    with pytest.raises(RuntimeError):
+        _sync(tmp_path, embeddings, txt_files, store=store)
+    assert (tmp_path / "checkpoint.jsonl").exists()
+    assert store.count() == 8
+
+    store.upsert_vectors = upsert
+    embeddings.calls = 0
+    store, indexer = _sync(tmp_path, embeddings, txt_files, store=store)
+
+    # Solo se embeben los chunks que no llegaron a confirmarse
+    assert embeddings.calls == total - 8
+    assert indexer.last_report["chunks_added"] == total - 8
+    assert set(store.get()["ids"]) == set(reference.get()["ids"])
+    assert set(indexer.manifest.chunk_ids()) == set(reference.get()["ids"])
+    assert not (tmp_path / "checkpoint.jsonl").exists()
+
+
+def test_completed_sync_leaves_nothing_to_resume(tmp_path, embeddings, write_corpus, random_text):
+    txt_files = write_corpus(a=random_text(100), b=random_text(100))
+    store, _ = _sync(tmp_path, embeddings, txt_files)
+
+    embeddings.calls = 0
+    _, indexer = _sync(tmp_path, embeddings, txt_files, store=store)
+    assert embeddings.calls == 0
+    assert indexer.last_report["files_unchanged"] == 2
+
+
+def test_checkpoint_ignores_truncated_last_line(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    checkpoint = IngestionCheckpoint(path, SETTINGS)
+    checkpoint.start({"a.txt": "h1", "b.txt": "h2"})
+    checkpoint.record_batch({"a.txt": ["id1", "id2"]}, done=["a.txt"])
+    checkpoint.record_batch({"b.txt": ["id3"]})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"batch": 3, "chunk_ids": {"b.txt": ["id4"]}})[:20])
+
+    loaded = IngestionCheckpoint.load(path, SETTINGS)
+    assert loaded.is_done("a.txt")
+    assert not loaded.is_done("b.txt")
+    assert loaded.committed_ids("b.txt") == ["id3"]
+    assert loaded.batches == 2
+
+
+def test_checkpoint_discards_progress_of_other_settings_or_changed_files(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    checkpoint = IngestionCheckpoint(path, SETTINGS)
+    checkpoint.start({"a.txt": "h1", "b.txt": "h2"})
+    checkpoint.record_batch({"a.txt": ["id1"], "b.txt": ["id2"]})
+
+    assert len(IngestionCheckpoint.load(path, {**SETTINGS, "chunk_char_size": 500})) == 0
+
+    resumed = IngestionCheckpoint.load(path, SETTINGS)
+    resumed.start({"a.txt": "h1", "b.txt": "otro hash"})
+    assert resumed.committed_ids("a.txt") == ["id1"]
+    assert resumed.committed_ids("b.txt") == []
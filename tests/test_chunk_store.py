@@ -0,0 +1,65 @@
+"""Tests de los chunks persistidos: arrancar sobre un índice existente sin volver a fragmentar el corpus."""
+
+import shutil
+
+import pytest
+
+from greenpeace_rag.core.chunking import ChunkerFactory
+from greenpeace_rag.core.indexing import IndexManifest
+
+
+@pytest.fixture
+def indexed(rag_factory, write_corpus, random_text):
+    txt_files = write_corpus(a=random_text(150), b=random_text(150))
+    rag = rag_factory()
+    rag.rag_setup()
+    return rag, txt_files
+
+
+def _no_chunking(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("no debería fragmentar el corpus")
+
+    monkeypatch.setattr(ChunkerFactory, "create_chunker", staticmethod(fail))
+
+
+def test_reuse_startup_does_not_read_the_corpus(indexed, rag_factory, embeddings, monkeypatch):
+    rag, txt_files = indexed
+    n_chunks = len(rag.chunks)
+    shutil.rmtree(txt_files[0].parent)
+    _no_chunking(monkeypatch)
+    embeddings.calls = 0
+
+    reused = rag_factory(index_policy="reuse")
+    reused.rag_setup()
+
+    assert reused.chunks == []
+    assert len(reused.get_chunks()) == n_chunks
+    assert embeddings.calls == 0
+
+
+def test_persisted_chunks_are_loaded_instead_of_rechunked(indexed, rag_factory, monkeypatch):
+    rag, _ = indexed
+    _no_chunking(monkeypatch)
+
+    chunks = rag_factory(index_policy="reuse").generate_chunks()
+
+    assert [chunk.page_content for chunk in chunks] == [chunk.page_content for chunk in rag.chunks]
+
+
+def test_incremental_startup_only_hashes_changed_files(indexed, rag_factory, monkeypatch):
+    _, txt_files = indexed
+    hashed = []
+    hash_file = IndexManifest.hash_file
+
+    def counting_hash(file_path):
+        hashed.append(file_path.name)
+        return hash_file(file_path)
+
+    monkeypatch.setattr(IndexManifest, "hash_file", staticmethod(counting_hash))
+    rag_factory().rag_setup()
+    assert hashed == []
+
+    txt_files[1].write_text(txt_files[1].read_text(encoding="utf-8") + " final", encoding="utf-8")
+    rag_factory().rag_setup()
+    assert hashed == ["b.txt"]
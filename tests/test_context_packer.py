@@ -0,0 +1,134 @@
+"""Tests de ContextPacker: presupuesto de tokens del prompt y eliminación del overlap entre chunks."""
+
+import math
+
+import pytest
+from langchain_core.documents import Document
+
+from greenpeace_rag.core.generation.context_packer import ContextPacker
+from greenpeace_rag.prompts.rag_prompts import RAG_SYSTEM_PROMPT
+
+
+def _doc(text, file_name="a.txt", start_index=None):
+    metadata = {"file_name": file_name, "origin_file": file_name}
+    if start_index is not None:
+        metadata["start_index"] = start_index
+    return Document(page_content=text, metadata=metadata)
+
+
+def _packer(**config):
+    return ContextPacker({"num_ctx": 2048, "answer_tokens": 256, "template_tokens": 32, **config})
+
+
+def test_character_estimate_is_conservative():
+    packer = _packer()
+    text = "Greenpeace denunció la pesca ilegal de ballenas en 2019."
+    assert packer.count_tokens(text) == math.ceil(len(text) * 1.1 / 3.0)
+    # Llama 3 promedia ~4 caracteres por token: la estimación no debe quedarse corta
+    assert packer.count_tokens(text) >= len(text) / 4
+
+
+def test_budget_reserves_prompt_question_and_answer():
+    packer = _packer()
+    question = "¿Qué campañas hizo Greenpeace sobre los océanos?"
+    expected = (2048 - packer.count_tokens(RAG_SYSTEM_PROMPT.format(context=""))
+                - packer.count_tokens(question) - 32 - 256)
+    assert packer.budget(question) == expected
+    assert packer.budget("palabra " * 5000) == 0
+
+
+def test_packed_context_never_exceeds_budget(random_text):
+    packer = _packer(num_ctx=1024)
+    docs = [(_doc(random_text(80), file_name=f"f{index}.txt"), 0.0) for index in range(30)]
+
+    context, report = packer.pack("pregunta", docs)
+
+    assert report["context_tokens"] <= report["budget_tokens"]
+    assert packer.count_tokens(context) <= report["budget_tokens"]
+    assert report["packed_docs"] + report["dropped_docs"] + report["duplicate_docs"] == len(docs)
+    assert report["dropped_docs"] > 0
+    assert report["saved_tokens"] == report["naive_tokens"] - report["context_tokens"]
+
+
+def test_last_document_is_truncated_when_enough_budget_remains(random_text):
+    packer = _packer(num_ctx=1024, min_fragment_tokens=16)
+    docs = [(_doc(random_text(60), file_name=f"f{index}.txt"), 0.0) for index in range(10)]
+
+    context, report = packer.pack("pregunta", docs)
+
+    assert report["truncated"]
+    blocks = context.split(packer.config["separator"])
+    assert docs[len(blocks) - 1][0].page_content.startswith(blocks[-1])
+    assert len(blocks[-1]) < len(docs[len(blocks) - 1][0].page_content)
+    assert report["dropped_docs"] == len(docs) - len(blocks)
+
+
+def test_document_that_does_not_fit_is_skipped_for_a_smaller_one(random_text):
+    packer = _packer(num_ctx=1024, min_fragment_tokens=10_000)
+    budget = packer.budget("pregunta")
+    large = _doc(random_text(400), file_name="grande.txt")
+    small = _doc(random_text(10), file_name="chico.txt")
+    assert packer.count_tokens(large.page_content) > budget
+
+    context, report = packer.pack("pregunta", [(large, 0.0), (small, 0.0)])
+
+    assert context == small.page_content
+    assert report["dropped_docs"] == 1
+    assert not report["truncated"]
+
+
+def test_overlap_between_chunks_of_same_file_is_removed():
+    content = "alfa beta gamma delta epsilon zeta eta theta iota kappa"
+    first = _doc(content[0:29], start_index=0)
+    second = _doc(content[16:44], start_index=16)
+    contained = _doc(content[5:21], start_index=5)
+    other_file = _doc(content[16:44], file_name="b.txt", start_index=16)
+
+    docs = [(first, 0.0), (second, 0.0), (contained, 0.0), (other_file, 0.0)]
+    context, report = _packer().pack("pregunta", docs)
+
+    blocks = context.split("\n---\n")
+    assert blocks[:2] == ["alfa beta gamma delta epsilon", "zeta eta theta"]
+    assert blocks[2] == other_file.page_content
+    assert report["duplicate_docs"] == 1
+    assert report["overlap_chars_removed"] == (
+        len(second.page_content) - len(blocks[1]) + len(contained.page_content)
+    )
+
+
+def test_overlap_is_keyed_on_origin_file_not_owner():
+    content = "uno dos tres cuatro cinco seis siete ocho nueve diez once doce"
+    first = _doc(content[0:30], start_index=0)
+    # Canónico transferido por la deduplicación: file_name cambió pero los offsets son de a.txt
+    second = _doc(content[20:52], start_index=20)
+    second.metadata["file_name"] = "b.txt"
+
+    context, _ = _packer().pack("pregunta", [(first, 0.0), (second, 0.0)])
+
+    assert context.split("\n---\n") == ["uno dos tres cuatro cinco seis", "siete ocho nueve diez"]
+
+
+def test_overlap_without_offsets_uses_text_match():
+    packer = _packer(min_overlap_chars=10)
+    first = _doc("la campaña contra la deforestación del Amazonas")
+    second = _doc("deforestación del Amazonas avanzó en 2020")
+
+    context, report = packer.pack("pregunta", [(first, 0.0), (second, 0.0)])
+
+    assert context.split("\n---\n") == [first.page_content, "avanzó en 2020"]
+    assert report["overlap_chars_removed"] == len(second.page_content) - len("avanzó en 2020")
+
+
+@pytest.mark.parametrize("num_ctx", [600, 1024, 4096])
+def test_report_counts_match_context(random_text, num_ctx):
+    packer = _packer(num_ctx=num_ctx, min_fragment_tokens=16)
+    docs = [(_doc(random_text(50), file_name=f"f{index}.txt"), 0.0) for index in range(20)]
+
+    context, report = packer.pack("pregunta", docs)
+
+    blocks = context.split(packer.config["separator"]) if context else []
+    expected = sum(packer.count_tokens(block) for block in blocks) + packer.count_tokens("\n---\n") * max(
+        0, len(blocks) - 1
+    )
+    assert report["context_tokens"] == expected
+    assert report["context_tokens"] <= report["budget_tokens"]
@@ -0,0 +1,80 @@
+"""Tests de NearDuplicateIndex: casi duplicados entre archivos y transferencia del chunk canónico."""
+
+from greenpeace_rag.core.chunking import RecursiveCharacterChunker
+from greenpeace_rag.core.indexing import IncrementalIndexer, IndexManifest, NearDuplicateIndex
+from greenpeace_rag.core.vectorstores import FlatVectorStore
+
+
+def _sync(directory, store, txt_files):
+    indexer = IncrementalIndexer(
+        store,
+        RecursiveCharacterChunker({"chunk_char_size": 800, "chunk_overlap": 0}, workers=1),
+        IndexManifest.load(str(directory / "manifest.json")),
+        deduplicator=NearDuplicateIndex.load(str(directory / "dedup")),
+    )
+    indexer.sync(txt_files)
+    return indexer
+
+
+def _stored(store):
+    stored = store.get()
+    return dict(zip(stored["ids"], stored["metadatas"]))
+
+
+def test_near_duplicate_is_stored_once_with_all_sources(tmp_path, embeddings, write_corpus, random_text):
+    shared = random_text(120)
+    reprint = shared.replace(shared.split()[10], "bosque", 1)
+    txt_files = write_corpus(a=f"{shared}\n\n{random_text(120)}", b=f"{reprint}\n\n{random_text(120)}")
+    store = FlatVectorStore(embeddings, str(tmp_path / "db"))
+
+    indexer = _sync(tmp_path, store, txt_files)
+
+    assert store.count() == 3
+    assert indexer.last_report["chunks_deduplicated"] == 1
+    canonical = [metadata for metadata in _stored(store).values() if len(metadata["sources"]) == 2]
+    assert len(canonical) == 1
+    assert canonical[0]["file_name"] == "a.txt"
+    assert canonical[0]["sources"] == ["a.txt", "b.txt"]
+
+
+def test_removing_owner_transfers_canonical_to_remaining_source(tmp_path, embeddings, write_corpus, random_text):
+    shared = random_text(120)
+    txt_files = write_corpus(a=f"{shared}\n\n{random_text(120)}", b=f"{random_text(120)}\n\n{shared}")
+    store = FlatVectorStore(embeddings, str(tmp_path / "db"))
+    _sync(tmp_path, store, txt_files)
+    shared_id = next(chunk_id for chunk_id, metadata in _stored(store).items() if len(metadata["sources"]) == 2)
+
+    txt_files[0].unlink()
+    indexer = _sync(tmp_path, store, txt_files[1:])
+
+    stored = _stored(store)
+    assert store.count() == 2
+    assert shared_id in stored
+    assert stored[shared_id]["file_name"] == "b.txt"
+    assert stored[shared_id]["sources"] == ["b.txt"]
+    # Los offsets siguen refiriéndose al archivo del que salió el chunk
+    assert stored[shared_id]["origin_file"] == "a.txt"
+    assert shared_id in indexer.manifest.files["b.txt"]["chunk_ids"]
+    assert set(indexer.manifest.chunk_ids()) == set(stored)
+
+    txt_files[1].unlink()
+    indexer = _sync(tmp_path, store, [])
+    assert store.count() == 0
+    assert indexer.manifest.chunk_ids() == []
+
+
+def test_modified_owner_keeps_canonical_shared_with_other_file(tmp_path, embeddings, write_corpus, random_text):
+    shared = random_text(120)
+    txt_files = write_corpus(a=f"{shared}\n\n{random_text(120)}", b=f"{shared}\n\n{random_text(120)}")
+    store = FlatVectorStore(embeddings, str(tmp_path / "db"))
+    _sync(tmp_path, store, txt_files)
+    shared_id = next(chunk_id for chunk_id, metadata in _stored(store).items() if len(metadata["sources"]) == 2)
+
+    txt_files = write_corpus(a=random_text(120))
+    indexer = _sync(tmp_path, store, txt_files)
+
+    stored = _stored(store)
+    assert stored[shared_id]["file_name"] == "b.txt"
+    assert stored[shared_id]["sources"] == ["b.txt"]
+    assert set(indexer.manifest.chunk_ids()) == set(stored)
+    assert store.count() == 3
@@ -0,0 +1,88 @@
+"""Tests de EmbeddingModelRegistry: un modelo por proceso compartido por encode manual y Chroma."""
+
+import numpy as np
+import pytest
+
+from greenpeace_rag import GreenpeaceRAG
+from greenpeace_rag.models import EmbeddingManager, EmbeddingModelRegistry, LLMManager
+
+
+class FakeSentenceTransformer:
+    """Registra cada carga y cada encode en lugar de descargar un modelo."""
+
+    loads = []
+
+    def __init__(self, model_name, **kwargs):
+        self.loads.append((model_name, kwargs))
+        self.encoded = []
+        self.half_precision = False
+
+    def half(self):
+        self.half_precision = True
+        return self
+
+    def encode(self, texts, **kwargs):
+        self.encoded.append((list(texts), kwargs))
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+@pytest.fixture(autouse=True)
+def fake_sentence_transformer(monkeypatch):
+    monkeypatch.setattr("sentence_transformers.SentenceTransformer", FakeSentenceTransformer)
+    FakeSentenceTransformer.loads = []
+    EmbeddingModelRegistry.clear()
+    yield
+    EmbeddingModelRegistry.clear()
+
+
+def test_model_is_loaded_once_and_shared_by_both_paths():
+    embeddings = EmbeddingManager.embedding_function("modelo")
+    model = EmbeddingManager.sentence_transformer("modelo")
+
+    assert embeddings.client is model
+    assert EmbeddingManager.embedding_function("modelo").client is model
+    assert FakeSentenceTransformer.loads == [("modelo", {})]
+
+
+def test_device_and_precision_select_separate_instances():
+    auto = EmbeddingModelRegistry.get_model("modelo")
+    cpu_half = EmbeddingModelRegistry.get_model("modelo", device="cpu", precision="float16")
+
+    assert cpu_half is not auto and cpu_half.half_precision
+    # Sin dispositivo configurado, sentence-transformers elige cuda/mps/cpu
+    assert FakeSentenceTransformer.loads == [("modelo", {}), ("modelo", {"device": "cpu"})]
+    with pytest.raises(ValueError):
+        EmbeddingModelRegistry.get_model("modelo", precision="int4")
+
+
+def test_warm_up_and_load_stats_are_recorded():
+    EmbeddingModelRegistry.warm_up("modelo")
+
+    stats = EmbeddingModelRegistry.get_model_stats("modelo")
+    assert stats["load_time"] >= 0 and stats["warm_up_time"] >= 0
+    assert EmbeddingModelRegistry.get_model("modelo").encoded[0][0] == ["warm-up"]
+    assert list(EmbeddingModelRegistry.get_stats()) == ["modelo|auto|float32"]
+
+
+def test_langchain_embeddings_encode_in_batches_through_the_shared_model():
+    embeddings = EmbeddingManager.embedding_function("modelo", batch_size=8, normalize_embeddings=True)
+
+    vectors = embeddings.embed_documents(["uno\ndos", "tres"])
+
+    assert np.array(vectors).shape == (2, 4)
+    texts, kwargs = embeddings.client.encoded[-1]
+    assert texts == ["uno dos", "tres"]
+    assert kwargs["batch_size"] == 8 and kwargs["normalize_embeddings"] is True
+    assert len(embeddings.embed_query("pregunta")) == 4
+
+
+def test_rag_encodes_chunks_and_queries_with_a_single_model(tmp_path, write_corpus, random_text, llm, monkeypatch):
+    monkeypatch.setattr(LLMManager, "create", staticmethod(lambda **kwargs: llm))
+    write_corpus(a=random_text(100))
+    rag = GreenpeaceRAG(txt_dir=str(tmp_path / "corpus"), chroma_db_path=str(tmp_path / "db"),
+                        chunk_params={"chunk_char_size": 200, "chunk_overlap": 0})
+    rag.rag_setup()
+    rag.generate_embeddings()
+    rag.get_relevant_documents("pregunta")
+
+    assert len(FakeSentenceTransformer.loads) == 1
@@ -0,0 +1,86 @@
+"""Tests de los caches exactos: LRU, tier SQLite, invalidación por versión y uso desde GreenpeaceRAG."""
+
+import asyncio
+
+import pytest
+
+from greenpeace_rag.core.caching import ExactCache, ExactCacheLayer
+
+
+def test_lru_eviction_and_hit_counters():
+    cache = ExactCache("prueba", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.get_stats()
+    assert (stats["memory_hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(0.75)
+
+
+def test_keys_are_stable_and_order_sensitive():
+    assert ExactCache.make_key("pregunta", 3, "v1") == ExactCache.make_key("pregunta", 3, "v1")
+    assert ExactCache.make_key("pregunta", 3, "v1") != ExactCache.make_key("pregunta", 3, "v2")
+    assert ExactCache.make_key("pregunta", 3) != ExactCache.make_key(3, "pregunta")
+
+
+def test_sqlite_tier_is_shared_across_instances_and_namespaces(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    ExactCache("answers", sqlite_path=path).set("clave", ("respuesta", [1, 2]))
+
+    reopened = ExactCache("answers", sqlite_path=path)
+    assert reopened.get("clave") == ("respuesta", [1, 2])
+    assert reopened.stats["disk_hits"] == 1
+    assert reopened.get("clave") == ("respuesta", [1, 2])
+    assert reopened.stats["memory_hits"] == 1
+    assert ExactCache("retrieval", sqlite_path=path).get("clave") is None
+    assert asyncio.run(reopened.aget("otra", "default")) == "default"
+
+
+def test_new_index_version_clears_version_dependent_caches():
+    layer = ExactCacheLayer()
+    layer.set_index_version("v1")
+    for cache in (layer.retrieval, layer.filter_verdicts, layer.answers):
+        cache.set("clave", "valor")
+
+    layer.set_index_version("v1")
+    assert len(layer.retrieval) == len(layer.answers) == 1
+    layer.set_index_version("v2")
+
+    assert len(layer.retrieval) == len(layer.answers) == 0
+    # Los veredictos dependen solo del contenido del chunk
+    assert layer.filter_verdicts.get("clave") == "valor"
+
+
+@pytest.fixture
+def rag(rag_factory, write_corpus, random_text):
+    write_corpus(**{f"doc{index}": random_text(100) for index in range(3)})
+    rag = rag_factory(exact_cache_config={"enabled": True, "sqlite": True})
+    rag.rag_setup()
+    return rag
+
+
+def test_repeated_retrieval_reuses_candidates_and_verdicts(rag, llm):
+    first = rag.get_relevant_documents("¿Qué hizo Greenpeace?", similarity_score=3)
+    graded = len(llm.graded)
+    assert graded == 3
+
+    assert rag.get_relevant_documents("  ¿qué hizo Greenpeace? ", similarity_score=3) == first
+    assert len(llm.graded) == graded
+    assert rag.exact_cache.retrieval.stats["memory_hits"] == 1
+
+    # Con otro k la búsqueda cambia, pero los chunks ya evaluados no vuelven al LLM
+    rag.get_relevant_documents("¿Qué hizo Greenpeace?", similarity_score=5)
+    assert len(llm.graded) == graded + 2
+
+
+def test_repeated_question_reuses_the_answer(rag, llm):
+    answer = rag.generate_answers("¿Qué hizo Greenpeace?")
+    graded = len(llm.graded)
+
+    assert rag.generate_answers("¿Qué hizo Greenpeace?") == answer
+    assert len(llm.graded) == graded
+    assert rag.exact_cache.answers.stats["memory_hits"] == 1
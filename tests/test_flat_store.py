@@ -0,0 +1,100 @@
+"""Tests de FlatVectorStore: búsqueda exacta, segmentos persistidos, compactación y backend en GreenpeaceRAG."""
+
+import numpy as np
+import pytest
+
+from greenpeace_rag.core.vectorstores import FlatVectorStore
+
+
+def _brute_force(vectors, queries, k):
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    similarities = queries @ vectors.T
+    order = np.argsort(-similarities, axis=1, kind="stable")[:, :k]
+    return order, 2.0 - 2.0 * np.take_along_axis(similarities, order, axis=1)
+
+
+def _upsert(store, vectors, offset=0, text="texto"):
+    ids = [f"d{offset + index}" for index in range(len(vectors))]
+    store.upsert_vectors(ids, vectors, [f"{text} {chunk_id}" for chunk_id in ids], [{"n": offset + index}
+                                                                                   for index in range(len(ids))])
+
+
+def _segments(directory):
+    return sorted(path.name for path in directory.glob("segment_*"))
+
+
+@pytest.fixture
+def data(clustered_vectors):
+    return clustered_vectors(1000, 20, 32, n_clusters=20, noise=0.5)
+
+
+def test_blocked_search_is_exact(tmp_path, embeddings, data):
+    vectors, queries = data
+    store = FlatVectorStore(embeddings, str(tmp_path / "flat"), block_rows=128)
+    for start in range(0, len(vectors), 300):
+        _upsert(store, vectors[start:start + 300], offset=start)
+
+    expected_rows, expected_distances = _brute_force(vectors, queries, 10)
+    results = store.search_vectors(queries, 10)
+
+    for found, rows, distances in zip(results, expected_rows, expected_distances):
+        assert [doc.id for doc, _ in found] == [f"d{row}" for row in rows]
+        assert [distance for _, distance in found] == pytest.approx(distances, abs=1e-5)
+    single = store.search_vectors(queries[:1], 10)[0]
+    assert [doc.id for doc, _ in single] == [doc.id for doc, _ in results[0]]
+    assert [distance for _, distance in single] == pytest.approx([distance for _, distance in results[0]], abs=1e-5)
+
+
+def test_segments_persist_and_compact_into_one(tmp_path, embeddings, data):
+    vectors, queries = data
+    directory = tmp_path / "flat"
+    store = FlatVectorStore(embeddings, str(directory), max_segments=8)
+    _upsert(store, vectors[:500])
+    _upsert(store, vectors[500:], offset=500)
+    # Reescribir d0 y borrar d1: las filas anteriores quedan enmascaradas
+    store.upsert_vectors(["d0"], vectors[999:1000], ["reemplazo"], [{"n": 0}])
+    store.delete(ids=["d1"])
+    before = store.search_vectors(queries, 5)
+    assert store.count() == 999 and len(_segments(directory)) == 3
+
+    reopened = FlatVectorStore(embeddings, str(directory), max_segments=8)
+    assert reopened.count() == 999
+    assert reopened.search_vectors(queries, 5) == before
+    assert reopened.get(ids=["d0", "d1"])["documents"] == ["reemplazo"]
+
+    reopened.compact()
+
+    assert len(_segments(directory)) == 1
+    assert FlatVectorStore(embeddings, str(directory)).search_vectors(queries, 5) == before
+
+
+def test_too_many_segments_trigger_compaction(tmp_path, embeddings, data):
+    vectors, _ = data
+    directory = tmp_path / "flat"
+    store = FlatVectorStore(embeddings, str(directory), max_segments=3)
+
+    for start in range(0, 400, 100):
+        _upsert(store, vectors[start:start + 100], offset=start)
+
+    assert len(_segments(directory)) == 1
+    assert store.count() == 400
+
+
+def test_rag_with_flat_backend_answers_and_switching_backend_rebuilds(rag_factory, write_corpus, random_text,
+                                                                       embeddings):
+    write_corpus(a=random_text(100), b=random_text(100))
+    flat = rag_factory(vector_store_config={"backend": "flat"})
+    flat.rag_setup()
+    assert isinstance(flat.vector_store, FlatVectorStore)
+    count = flat.vector_store.count()
+
+    docs = flat.get_relevant_documents("¿Qué hizo Greenpeace?", similarity_score=3)
+    assert len(docs) == 3
+    assert [score for _, score in docs] == sorted(score for _, score in docs)
+
+    embeddings.calls = 0
+    chroma = rag_factory()
+    chroma.rag_setup()
+    assert not isinstance(chroma.vector_store, FlatVectorStore)
+    assert embeddings.calls == count == chroma.vector_store.count()
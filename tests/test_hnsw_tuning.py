@@ -0,0 +1,61 @@
+"""Tests de los parámetros HNSW de Chroma: barrido recall/latencia y search_ef persistido."""
+
+import pytest
+
+from greenpeace_rag.core.vectorstores import ChromaVectorStore, HNSWTuner, VectorStoreFactory
+
+GRID = {"M": [8, 16], "construction_ef": [100], "search_ef": [10, 100]}
+
+
+def _chroma(directory, embeddings, **kwargs):
+    return ChromaVectorStore(collection_name="docs", embedding_function=embeddings,
+                             persist_directory=str(directory), **kwargs)
+
+
+@pytest.fixture
+def store(tmp_path, embeddings, clustered_vectors):
+    vectors, _ = clustered_vectors(500, 0, 16, n_clusters=10, noise=0.3)
+    store = _chroma(tmp_path / "db", embeddings)
+    store.upsert_vectors([f"d{index}" for index in range(len(vectors))], vectors.tolist(),
+                         [f"texto {index}" for index in range(len(vectors))], [None] * len(vectors))
+    return store
+
+
+def test_sweep_measures_every_combination_against_exact_search(store):
+    tuner = HNSWTuner.from_vector_store(store)
+    results = tuner.sweep(grid=GRID, k=5, n_queries=20)
+
+    assert results[0]["method"] == "exact" and results[0]["recall"] == 1.0
+    assert len(results) == 1 + 4
+    assert all(0.0 <= row["recall"] <= 1.0 for row in results)
+    best = tuner.best(min_recall=0.0, M=16)
+    assert best["M"] == 16 and best["search_ef"] in GRID["search_ef"]
+    assert tuner.best(min_recall=1.01) is None
+
+
+def test_tuned_search_ef_survives_reopen(tmp_path, store, embeddings):
+    store.set_search_ef(37)
+
+    reopened = VectorStoreFactory.create_vector_store(embeddings, str(tmp_path / "db"), "docs")
+    assert reopened.get_hnsw_params()["search_ef"] == 37
+    assert reopened.hnsw_config["search_ef"] == 37
+
+    # Un search_ef explícito sí pisa el guardado
+    overridden = _chroma(tmp_path / "db", embeddings, hnsw_config={"search_ef": 50})
+    assert overridden.get_hnsw_params()["search_ef"] == 50
+
+
+def test_tune_hnsw_apply_is_kept_by_the_next_rag(rag_factory, write_corpus, random_text):
+    write_corpus(**{f"doc{index}": random_text(300) for index in range(4)})
+    rag = rag_factory()
+    rag.rag_setup()
+
+    rag.tune_hnsw(grid={"M": [16], "construction_ef": [100], "search_ef": [10, 20]},
+                  k=3, n_queries=10, min_recall=0.0, apply=True)
+    tuned = rag.vector_store.get_hnsw_params()["search_ef"]
+    assert tuned in (10, 20)
+
+    reopened = rag_factory(index_policy="reuse")
+    reopened.rag_setup()
+    assert reopened.vector_store.get_hnsw_params()["search_ef"] == tuned
+    assert reopened.hnsw_config["search_ef"] == tuned
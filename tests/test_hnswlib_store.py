@@ -0,0 +1,94 @@
+"""Tests del backend hnswlib y del benchmark de motores vectoriales."""
+
+import pytest
+
+from greenpeace_rag.core.vectorstores import FlatVectorStore, HNSWLibVectorStore, VectorEngineBenchmark
+
+pytest.importorskip("hnswlib")
+
+HNSW_CONFIG = {"M": 16, "construction_ef": 100, "search_ef": 100}
+
+
+def _upsert(store, vectors, offset=0):
+    ids = [f"d{offset + index}" for index in range(len(vectors))]
+    store.upsert_vectors(ids, vectors, [f"texto {chunk_id}" for chunk_id in ids], [{} for _ in ids])
+
+
+def _ids(results):
+    return [[doc.id for doc, _ in docs] for docs in results]
+
+
+def _recall(found, expected):
+    return sum(len(set(a) & set(b)) for a, b in zip(found, expected)) / sum(len(b) for b in expected)
+
+
+@pytest.fixture
+def data(clustered_vectors):
+    return clustered_vectors(2000, 50, 32, n_clusters=40, noise=0.4)
+
+
+def test_recall_against_exact_search(tmp_path, embeddings, data):
+    vectors, queries = data
+    exact = FlatVectorStore(embeddings, str(tmp_path / "flat"))
+    graph = HNSWLibVectorStore(embeddings, str(tmp_path / "hnsw"), hnsw_config=HNSW_CONFIG)
+    for start in range(0, len(vectors), 500):
+        _upsert(exact, vectors[start:start + 500], offset=start)
+        _upsert(graph, vectors[start:start + 500], offset=start)
+
+    found = graph.search_vectors(queries, 10)
+
+    assert _recall(_ids(found), _ids(exact.search_vectors(queries, 10))) >= 0.95
+    # Mismo contrato de distancias que el store exacto
+    assert all(0.0 <= distance <= 4.0 for docs in found for _, distance in docs)
+
+
+def test_graph_survives_compaction_reopen_and_updates(tmp_path, embeddings, data):
+    vectors, queries = data
+    directory = str(tmp_path / "hnsw")
+    store = HNSWLibVectorStore(embeddings, directory, hnsw_config=HNSW_CONFIG, max_segments=16)
+    _upsert(store, vectors[:1000])
+    _upsert(store, vectors[1000:1500], offset=1000)
+    store.compact()
+    before = _ids(store.search_vectors(queries, 5))
+
+    reopened = HNSWLibVectorStore(embeddings, directory, hnsw_config=HNSW_CONFIG)
+    assert _ids(reopened.search_vectors(queries, 5)) == before
+
+    # Filas agregadas y eliminadas después de guardar el grafo
+    _upsert(reopened, vectors[1500:], offset=1500)
+    deleted = before[0][0]
+    reopened.delete(ids=[deleted])
+    again = HNSWLibVectorStore(embeddings, directory, hnsw_config=HNSW_CONFIG)
+
+    assert again.count() == 1999
+    results = _ids(again.search_vectors(queries, 5))
+    assert all(deleted not in ids for ids in results)
+    assert _ids(again.search_vectors(vectors[1900:1901], 1)) == [["d1900"]]
+
+
+def test_benchmark_reports_every_engine(data):
+    vectors, queries = data
+
+    results = VectorEngineBenchmark(vectors[:500]).run(queries[:10], k=5, hnsw_config=HNSW_CONFIG)
+
+    assert [row["engine"] for row in results] == ["exact", "chroma", "hnswlib"]
+    by_engine = {row["engine"]: row for row in results}
+    assert by_engine["exact"]["recall"] == 1.0
+    assert by_engine["chroma"]["recall"] >= 0.9 and by_engine["hnswlib"]["recall"] >= 0.9
+    for row in results:
+        assert {"build_seconds", "index_bytes", "p50_ms", "p99_ms", "batch_ms_per_query"} <= set(row)
+        assert row["p50_ms"] <= row["p99_ms"]
+    with pytest.raises(ValueError):
+        VectorEngineBenchmark(vectors[:500]).run(queries[:10], engines=["faiss"])
+
+
+def test_rag_with_hnswlib_backend_and_benchmark(rag_factory, write_corpus, random_text):
+    write_corpus(a=random_text(200), b=random_text(200))
+    rag = rag_factory(vector_store_config={"backend": "hnswlib"})
+    rag.rag_setup()
+
+    assert isinstance(rag.vector_store, HNSWLibVectorStore)
+    assert len(rag.get_relevant_documents("¿Qué hizo Greenpeace?", similarity_score=3)) == 3
+    results = rag.benchmark_vector_engines(questions=["¿Qué hizo Greenpeace?", "ballenas"], k=3,
+                                           engines=["exact", "hnswlib"])
+    assert [row["engine"] for row in results] == ["exact", "hnswlib"]
@@ -0,0 +1,82 @@
+"""Tests de la recuperación híbrida: índice BM25 persistido y fusión con la búsqueda densa."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from greenpeace_rag.core.retrieval import BM25Index, HybridRetriever
+from greenpeace_rag.utils.config import get_index_artifact_path
+
+
+def _chunks():
+    texts = [
+        "Greenpeace protestó contra la caza de ballenas en el Antártico.",
+        "La pesca de krill amenaza a las ballenas y a los pingüinos.",
+        "Campaña contra la deforestación en la Amazonía.",
+        "El krill es la base de la cadena alimentaria antártica; krill y más krill.",
+    ]
+    return [Document(page_content=text, metadata={"file_name": f"f{index}.txt"}) for index, text in enumerate(texts)]
+
+
+def _contents(docs_with_scores):
+    return [doc.page_content for doc, _ in docs_with_scores]
+
+
+def test_bm25_ranks_exact_term_matches_and_skips_non_matching_chunks():
+    chunks = _chunks()
+    index = BM25Index.build(chunks)
+
+    results = index.search("krill", k=5)
+
+    # El chunk que repite el término gana; los que no lo contienen no aparecen
+    assert _contents(results) == [chunks[3].page_content, chunks[1].page_content]
+    assert results[0][1] > results[1][1] > 0
+    assert index.search("término inexistente", k=5) == []
+
+
+def test_bm25_index_round_trips_through_disk(tmp_path):
+    built = BM25Index.build(_chunks())
+    built.save(str(tmp_path / "bm25"))
+
+    loaded = BM25Index.load(str(tmp_path / "bm25"), mmap=True)
+
+    assert BM25Index.exists(str(tmp_path / "bm25"))
+    assert isinstance(loaded.postings_docs, np.memmap)
+    for query in ("krill", "ballenas antártico", "deforestación"):
+        expected = built.search(query, k=3)
+        found = loaded.search(query, k=3)
+        assert _contents(found) == _contents(expected)
+        assert [score for _, score in found] == pytest.approx([score for _, score in expected])
+        assert [doc.metadata for doc, _ in found] == [doc.metadata for doc, _ in expected]
+
+
+@pytest.fixture
+def hybrid_rag(rag_factory, write_corpus, random_text):
+    write_corpus(**{f"doc{index}": random_text(25) for index in range(6)},
+                 ballenas="krill " + random_text(20))
+    rag = rag_factory(retrieval_config={"retrieval_mode": "hybrid"})
+    rag.rag_setup()
+    return rag
+
+
+def test_hybrid_search_surfaces_the_exact_keyword_match(hybrid_rag):
+    assert isinstance(hybrid_rag.retriever, HybridRetriever)
+    assert BM25Index.exists(get_index_artifact_path(hybrid_rag.chroma_db_path, hybrid_rag.collection_name, "bm25"))
+
+    results = hybrid_rag.retriever.search("krill", k=3)
+
+    assert results[0][0].metadata["file_name"] == "ballenas.txt"
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+def test_multi_query_search_uses_the_hybrid_candidates(hybrid_rag, llm):
+    llm.ranking_questions = ["krill antártico", "consumo de krill"]
+
+    results = hybrid_rag.retriever.multi_query_search("krill", k=3)
+
+    assert results[0][0].metadata["file_name"] == "ballenas.txt"
+
+
+def test_unknown_retrieval_mode_is_rejected(rag_factory):
+    with pytest.raises(ValueError):
+        rag_factory(retrieval_config={"retrieval_mode": "lexico"})
@@ -0,0 +1,87 @@
+"""Tests de la reindexación incremental guiada por el manifest de hashes por archivo."""
+
+import os
+
+import pytest
+
+from greenpeace_rag.utils.config import get_index_artifact_path
+
+
+@pytest.fixture
+def corpus(write_corpus, random_text):
+    return write_corpus(a=random_text(150), b=random_text(150), c=random_text(150))
+
+
+def _files_in_store(rag):
+    return sorted({metadata["file_name"] for metadata in rag.vector_store.get(include=["metadatas"])["metadatas"]})
+
+
+def _count(rag):
+    return len(rag.vector_store.get()["ids"])
+
+
+def test_unchanged_corpus_is_not_reembedded(rag_factory, corpus, embeddings):
+    rag = rag_factory()
+    rag.rag_setup()
+    count = _count(rag)
+    assert count > 0 and embeddings.calls == count
+
+    embeddings.calls = 0
+    reopened = rag_factory()
+    reopened.rag_setup()
+
+    assert embeddings.calls == 0
+    assert _count(reopened) == count
+
+
+def test_only_new_and_modified_files_are_reindexed(rag_factory, corpus, embeddings, write_corpus, random_text):
+    rag = rag_factory()
+    rag.rag_setup()
+    before = {name: len(rag.vector_store.get(where={"file_name": name})["ids"]) for name in ("a.txt", "b.txt")}
+
+    write_corpus(b=random_text(300), d=random_text(150))
+    os.remove(corpus[2])
+    embeddings.calls = 0
+    reopened = rag_factory()
+    reopened.rag_setup()
+
+    store = reopened.vector_store
+    new_chunks = {name: len(store.get(where={"file_name": name})["ids"]) for name in ("b.txt", "d.txt")}
+    assert _files_in_store(reopened) == ["a.txt", "b.txt", "d.txt"]
+    assert embeddings.calls == sum(new_chunks.values())
+    assert new_chunks["b.txt"] > before["b.txt"]
+    assert len(store.get(where={"file_name": "a.txt"})["ids"]) == before["a.txt"]
+
+
+def test_chunking_change_rebuilds_the_collection(rag_factory, corpus, embeddings):
+    rag = rag_factory()
+    rag.rag_setup()
+    count = _count(rag)
+
+    embeddings.calls = 0
+    rechunked = rag_factory(chunk_params={"chunk_char_size": 400, "chunk_overlap": 0})
+    rechunked.rag_setup()
+
+    assert _count(rechunked) < count
+    assert embeddings.calls == _count(rechunked)
+
+
+def test_collection_without_manifest_is_reused_with_a_warning(rag_factory, corpus, embeddings, capsys):
+    rag = rag_factory()
+    rag.rag_setup()
+    count = _count(rag)
+    # Colección creada antes del manifest
+    os.remove(get_index_artifact_path(rag.chroma_db_path, rag.collection_name, "manifest.json"))
+
+    embeddings.calls = 0
+    legacy = rag_factory()
+    legacy.rag_setup()
+
+    assert "no tiene manifest" in capsys.readouterr().out
+    assert _count(legacy) == count
+    assert embeddings.calls == 0
+    assert legacy.retriever is not None
+
+    rebuilt = rag_factory(index_policy="rebuild")
+    rebuilt.rag_setup()
+    assert os.path.exists(get_index_artifact_path(rag.chroma_db_path, rag.collection_name, "manifest.json"))
@@ -0,0 +1,89 @@
+"""Tests del pipeline de ingesta en streaming: mismo índice que el camino por lotes, backpressure y fallas."""
+
+import time
+
+import pytest
+
+from greenpeace_rag.core.chunking import ChunkerFactory
+from greenpeace_rag.core.indexing import IngestionPipeline
+
+CHUNK_PARAMS = {"chunk_char_size": 200, "chunk_overlap": 0}
+
+
+def _ids(vector_store):
+    return sorted(vector_store.get()["ids"])
+
+
+@pytest.fixture
+def empty_store(rag_factory, write_corpus, random_text):
+    """Vector store de un índice ya creado, vaciado para ingresar de nuevo."""
+    txt_files = write_corpus(**{f"doc{index}": random_text(80) for index in range(6)})
+    rag = rag_factory()
+    rag.rag_setup()
+    ids = _ids(rag.vector_store)
+    rag.vector_store.delete(ids=ids)
+    return rag.vector_store, txt_files, ids
+
+
+def _pipeline(vector_store, **kwargs):
+    chunker = ChunkerFactory.create_chunker("recursive_characters", CHUNK_PARAMS, workers=1)
+    return IngestionPipeline(vector_store, chunker, **kwargs)
+
+
+def test_streaming_ingestion_builds_the_same_index(rag_factory, write_corpus, random_text, tmp_path):
+    write_corpus(**{f"doc{index}": random_text(80) for index in range(6)})
+    batch = rag_factory()
+    batch.rag_setup()
+
+    streamed = rag_factory(chroma_db_path=str(tmp_path / "streamed"))
+    stats = streamed.ingest_corpus()
+
+    assert _ids(streamed.vector_store) == _ids(batch.vector_store)
+    assert stats["read"]["items"] == 6
+    assert stats["chunk"]["items"] == stats["embed"]["items"] == stats["upsert"]["items"] == len(batch.chunks)
+    assert streamed.retriever is not None
+
+
+def test_slow_stage_applies_backpressure(empty_store, embeddings, monkeypatch):
+    vector_store, txt_files, ids = empty_store
+    embed_documents = type(embeddings).embed_documents
+
+    def slow_embed_documents(self, texts):
+        time.sleep(0.02)
+        return embed_documents(self, texts)
+
+    monkeypatch.setattr(type(embeddings), "embed_documents", slow_embed_documents)
+    pipeline = _pipeline(vector_store, queue_size=1, embed_batch_size=1)
+
+    pipeline.run(txt_files)
+
+    assert _ids(vector_store) == ids
+    # El chunking espera lugar en la cola llena en vez de acumular chunks en memoria
+    assert pipeline.stats["chunk"]["blocked_seconds"] > 0
+    assert pipeline.stats["embed"]["items"] == len(ids)
+
+
+def test_unreadable_file_is_skipped_and_reported(empty_store, tmp_path):
+    vector_store, txt_files, _ = empty_store
+    broken = tmp_path / "corpus" / "roto.txt"
+    broken.write_bytes(b"\xff\xfe texto en otra codificacion \xff")
+    pipeline = _pipeline(vector_store)
+
+    chunk_ids_by_file = pipeline.run(txt_files + [broken])
+
+    assert pipeline.failed_files == {"roto.txt"}
+    assert sorted(chunk_ids_by_file) == sorted(path.name for path in txt_files)
+    assert pipeline.stats["failed_files"] == 1
+
+
+def test_stage_error_stops_the_pipeline(empty_store, embeddings, monkeypatch):
+    vector_store, txt_files, _ = empty_store
+
+    def failing_embed_documents(self, texts):
+        raise RuntimeError("modelo caído")
+
+    monkeypatch.setattr(type(embeddings), "embed_documents", failing_embed_documents)
+
+    with pytest.raises(RuntimeError, match="modelo caído"):
+        _pipeline(vector_store, queue_size=1, embed_batch_size=1).run(txt_files)
+    assert _ids(vector_store) == []
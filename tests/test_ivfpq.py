@@ -0,0 +1,100 @@
+"""Tests de IVFPQVectorStore: recall frente a la búsqueda exacta, con y sin rescoring."""
+
+import numpy as np
+import pytest
+
+from greenpeace_rag.core.vectorstores import FlatVectorStore, IVFPQVectorStore
+
+IVFPQ_PARAMS = {"nlist": 16, "nprobe": 4, "m": 8, "min_train_size": 2000, "kmeans_iterations": 8}
+
+
+@pytest.fixture
+def data(clustered_vectors):
+    return clustered_vectors(4000, 30, 32, n_clusters=40, noise=0.4)
+
+
+def _upsert(store, vectors, start, end):
+    store.upsert_vectors([f"d{index}" for index in range(start, end)], vectors[start:end],
+                         [f"texto {index}" for index in range(start, end)],
+                         [{"row": index} for index in range(start, end)])
+
+
+def _build(directory, embeddings, vectors, **kwargs):
+    store = IVFPQVectorStore(embeddings, str(directory), **{**IVFPQ_PARAMS, **kwargs})
+    for start in range(0, len(vectors), 1000):
+        _upsert(store, vectors, start, min(start + 1000, len(vectors)))
+    store.compact()
+    return store
+
+
+def _recall(store, exact, queries, k=10):
+    found = store.search_vectors(queries, k)
+    expected = exact.search_vectors(queries, k)
+    return np.mean([
+        len({doc.id for doc, _ in a} & {doc.id for doc, _ in b}) / k for a, b in zip(found, expected)
+    ])
+
+
+@pytest.fixture
+def exact(tmp_path, embeddings, data):
+    vectors, _ = data
+    store = FlatVectorStore(embeddings, str(tmp_path / "exact"))
+    for start in range(0, len(vectors), 1000):
+        _upsert(store, vectors, start, min(start + 1000, len(vectors)))
+    return store
+
+
+def test_untrained_store_is_exact(tmp_path, embeddings, data):
+    vectors, queries = data
+    store = IVFPQVectorStore(embeddings, str(tmp_path / "ivfpq"), **IVFPQ_PARAMS)
+    _upsert(store, vectors, 0, 1000)
+    store.compact()
+    assert not store.is_trained
+
+    small_exact = FlatVectorStore(embeddings, str(tmp_path / "small"))
+    _upsert(small_exact, vectors, 0, 1000)
+    assert _recall(store, small_exact, queries) == 1.0
+
+
+def test_rescoring_recovers_recall_lost_to_pq(tmp_path, embeddings, data, exact):
+    vectors, queries = data
+    rescored = _build(tmp_path / "rescored", embeddings, vectors)
+    codes_only = _build(tmp_path / "codes", embeddings, vectors, rescore_dtype=None)
+    assert rescored.is_trained and codes_only.is_trained
+
+    rescored_recall = _recall(rescored, exact, queries)
+    assert rescored_recall >= 0.95
+    assert rescored_recall > _recall(codes_only, exact, queries)
+    assert rescored.get_memory_stats()["rescore_bytes"] > 0
+
+
+def test_recall_grows_with_nprobe(tmp_path, embeddings, data, exact):
+    vectors, queries = data
+    store = _build(tmp_path / "ivfpq", embeddings, vectors)
+    recalls = []
+    for nprobe in (1, 4, 16):
+        store.set_nprobe(nprobe)
+        recalls.append(_recall(store, exact, queries))
+    assert recalls == sorted(recalls)
+    assert recalls[-1] >= 0.99
+
+
+def test_writes_after_training_and_reopen(tmp_path, embeddings, data, exact):
+    vectors, queries = data
+    directory = tmp_path / "ivfpq"
+    store = _build(directory, embeddings, vectors[:3000])
+    _upsert(store, vectors, 3000, 4000)
+    store.delete(["d0", "d3500"])
+    exact.delete(["d0", "d3500"])
+
+    reopened = IVFPQVectorStore(embeddings, str(directory), **IVFPQ_PARAMS)
+    assert reopened.is_trained
+    assert reopened.count() == 3998
+    for searched in (store, reopened):
+        results = searched.search_vectors(queries, 10)
+        assert not {"d0", "d3500"} & {doc.id for docs in results for doc, _ in docs}
+        assert _recall(searched, exact, queries) >= 0.95
+
+    reopened.compact()
+    assert _recall(reopened, exact, queries) >= 0.95
+    assert reopened.get(ids=["d3999"])["documents"] == ["texto 3999"]
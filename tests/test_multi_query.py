@@ -0,0 +1,84 @@
+"""Tests de la búsqueda multi-consulta: RRF, ids estables de chunks y reformulaciones cacheadas."""
+
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from greenpeace_rag.core.retrieval import DocumentRetriever
+from greenpeace_rag.core.retrieval.fusion import reciprocal_rank_fusion
+from greenpeace_rag.utils.chunk_ids import get_chunk_id, make_chunk_id
+
+
+def _doc(text, file_name="a.txt"):
+    return Document(page_content=text, metadata={"file_name": file_name})
+
+
+def _contents(docs_with_scores):
+    return [doc.page_content for doc, _ in docs_with_scores]
+
+
+@pytest.fixture
+def retriever(tmp_path, embeddings, llm, random_text):
+    store = Chroma(collection_name="docs", embedding_function=embeddings, persist_directory=str(tmp_path / "db"))
+    store.add_documents([_doc(random_text(30), f"f{index}.txt") for index in range(20)])
+    return DocumentRetriever(store, llm)
+
+
+def test_chunk_ids_are_deterministic_and_depend_on_the_source():
+    assert make_chunk_id("a.txt", "texto") == make_chunk_id("a.txt", "texto")
+    assert make_chunk_id("a.txt", "texto") != make_chunk_id("b.txt", "texto")
+    assert get_chunk_id(_doc("texto")) == make_chunk_id("a.txt", "texto")
+    assert get_chunk_id(Document(page_content="texto", metadata={"chunk_id": "fijo"})) == "fijo"
+
+
+def test_rrf_rewards_documents_found_by_several_queries():
+    a, b, c = _doc("a"), _doc("b"), _doc("c")
+
+    fused = reciprocal_rank_fusion([[(a, 0.1), (b, 0.2)], [(c, 0.1), (_doc("b"), 0.3)]], rrf_k=60)
+
+    # b aparece en las dos listas (como copias distintas del mismo chunk) y se cuenta una sola vez
+    assert _contents(fused) == ["b", "a", "c"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 62)
+    assert fused[1][1] == pytest.approx(1 / 61)
+
+
+def test_rrf_weights_scale_each_list():
+    a, b = _doc("a"), _doc("b")
+
+    fused = reciprocal_rank_fusion([[(a, 0.1)], [(b, 0.1)]], rrf_k=60, weights=[1.0, 2.0])
+
+    assert _contents(fused) == ["b", "a"]
+    assert fused[0][1] == pytest.approx(2 / 61)
+
+
+def test_multi_query_search_fuses_the_question_and_its_reformulations(retriever, llm):
+    question = "¿Qué hizo Greenpeace?"
+    llm.ranking_questions = [question, "¿Qué campañas hubo?", "¿Dónde actuó?"]
+    queries = [question, "¿Dónde actuó?", "¿Qué campañas hubo?"]
+    k_per_query = retriever.retrieval_config["k_per_ranking_question"]
+    expected = reciprocal_rank_fusion(
+        [retriever.vector_store.similarity_search_with_score(query, k=k_per_query) for query in queries]
+    )
+
+    fused = retriever.multi_query_search(question, k=4)
+
+    assert [get_chunk_id(doc) for doc, _ in fused] == [get_chunk_id(doc) for doc, _ in expected[:4]]
+    assert [score for _, score in fused] == pytest.approx([score for _, score in expected[:4]])
+
+
+def test_reformulations_are_cached_per_question(retriever, llm):
+    first = retriever.generate_ranking_questions("¿Qué hizo Greenpeace?")
+    llm.ranking_questions = ["otra reformulación"]
+
+    assert retriever.generate_ranking_questions("  ¿qué hizo   Greenpeace? ") == first
+    assert retriever.generate_ranking_questions("Otra pregunta") == ["otra reformulación"]
+
+
+def test_relevance_filter_grades_against_the_original_question(retriever, llm):
+    llm.ranking_questions = ["reformulación uno", "reformulación dos"]
+
+    docs = retriever.get_relevant_documents("pregunta original", k=3, ranking_questions=True)
+
+    assert len(docs) == 3
+    assert llm.graded and all("pregunta original" in prompt for prompt in llm.graded)
+    assert not any("reformulación" in prompt for prompt in llm.graded)
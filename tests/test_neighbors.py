@@ -0,0 +1,112 @@
+"""Tests de NeighborIndex: unión de candidatos consecutivos y ampliación con vecinos."""
+
+import pytest
+from langchain_core.documents import Document
+
+from greenpeace_rag.core.chunking import RecursiveCharacterChunker, add_chunk_positions
+from greenpeace_rag.core.indexing import IncrementalIndexer
+from greenpeace_rag.core.retrieval import NeighborIndex
+
+
+@pytest.fixture
+def corpus(random_text):
+    chunker = RecursiveCharacterChunker({"chunk_char_size": 200, "chunk_overlap": 50}, workers=1)
+    contents = {"a.txt": random_text(300), "b.txt": random_text(300)}
+    chunks = {
+        name: IncrementalIndexer.assign_chunk_ids(chunker.chunk_text(content, {"file_name": name}))
+        for name, content in contents.items()
+    }
+    return contents, chunks
+
+
+def _span(content, chunks):
+    start = chunks[0].metadata["start_index"]
+    end = max(chunk.metadata["start_index"] + len(chunk.page_content) for chunk in chunks)
+    return content[start:end]
+
+
+def test_consecutive_candidates_merge_without_repeating_overlap(corpus):
+    contents, chunks = corpus
+    a, b = chunks["a.txt"], chunks["b.txt"]
+    # Los chunks consecutivos se solapan: concatenarlos enteros repetiría texto
+    assert a[4].metadata["start_index"] < a[3].metadata["start_index"] + len(a[3].page_content)
+    index = NeighborIndex.build(a + b)
+
+    candidates = [(a[4], 0.1), (b[2], 0.2), (a[3], 0.3), (a[5], 0.4), (a[8], 0.5)]
+    blocks = index.apply(candidates, mode="merge")
+
+    assert len(blocks) == 3
+    merged, score = blocks[0]
+    assert score == 0.1
+    assert merged.page_content == _span(contents["a.txt"], a[3:6])
+    assert merged.metadata["chunk_ids"] == [chunk.metadata["chunk_id"] for chunk in a[3:6]]
+    assert merged.metadata["start_index"] == a[3].metadata["start_index"]
+    assert blocks[1] == (b[2], 0.2)
+    assert blocks[2] == (a[8], 0.5)
+
+
+def test_expand_adds_window_neighbours(corpus):
+    contents, chunks = corpus
+    a = chunks["a.txt"]
+    index = NeighborIndex.build(a + chunks["b.txt"])
+
+    blocks = index.apply([(a[7], 0.1), (a[0], 0.2)], mode="expand", window=2)
+
+    assert [block.page_content for block, _ in blocks] == [
+        _span(contents["a.txt"], a[5:10]),
+        _span(contents["a.txt"], a[0:3]),
+    ]
+
+
+def test_chunks_from_other_files_are_not_merged(corpus):
+    _, chunks = corpus
+    a, b = chunks["a.txt"], chunks["b.txt"]
+    index = NeighborIndex.build(a + b)
+    assert index.apply([(a[-1], 0.1), (b[0], 0.2)], mode="merge") == [(a[-1], 0.1), (b[0], 0.2)]
+
+
+def test_transferred_canonical_stays_linked_to_its_origin_file(corpus):
+    contents, chunks = corpus
+    a = chunks["a.txt"]
+    # La deduplicación pasó el chunk a otro archivo dueño: sus offsets siguen siendo de a.txt
+    a[4].metadata.update({"file_name": "b.txt", "sources": ["b.txt"]})
+    index = NeighborIndex.build(a + chunks["b.txt"])
+
+    blocks = index.apply([(a[3], 0.1), (a[4], 0.2)], mode="merge")
+    assert [block.page_content for block, _ in blocks] == [_span(contents["a.txt"], a[3:5])]
+
+
+def test_unknown_candidates_pass_through_and_gaps_split_runs(corpus):
+    _, chunks = corpus
+    a = chunks["a.txt"]
+    # a[2] no está en la tabla (p.ej. descartado por la deduplicación): a[1] y a[3] no son contiguos
+    index = NeighborIndex.build(a[:2] + a[3:])
+    outsider = Document(page_content="texto sin indexar", metadata={"file_name": "c.txt"})
+
+    blocks = index.apply([(outsider, 0.1), (a[1], 0.2), (a[3], 0.3)], mode="merge")
+    assert blocks == [(outsider, 0.1), (a[1], 0.2), (a[3], 0.3)]
+
+
+def test_saved_table_merges_the_same(tmp_path, corpus):
+    _, chunks = corpus
+    a = chunks["a.txt"]
+    index = NeighborIndex.build(a + chunks["b.txt"])
+    index.save(str(tmp_path / "neighbors"))
+    loaded = NeighborIndex.load(str(tmp_path / "neighbors"))
+
+    candidates = [(a[6], 0.1), (a[7], 0.2)]
+    assert [block.page_content for block, _ in loaded.apply(candidates)] == [
+        block.page_content for block, _ in index.apply(candidates)
+    ]
+
+
+def test_chunks_without_offsets_are_concatenated_whole():
+    content = "uno dos tres cuatro cinco seis"
+    chunks = add_chunk_positions(content, [
+        Document(page_content="uno dos tres", metadata={"file_name": "a.txt"}),
+        Document(page_content="tres cuatro", metadata={"file_name": "a.txt"}),
+    ])
+    for chunk in chunks:
+        chunk.metadata["start_index"] = -1
+    blocks = NeighborIndex.build(chunks).apply([(chunks[0], 0.1), (chunks[1], 0.2)])
+    assert blocks[0][0].page_content == "uno dos tres\ntres cuatro"
@@ -0,0 +1,75 @@
+"""Tests del chunking en paralelo: orden de archivos, generación perezosa y archivos que fallan."""
+
+from greenpeace_rag.core.chunking import ChunkerFactory
+from greenpeace_rag.core.indexing import IndexManifest
+from greenpeace_rag.utils.config import get_index_artifact_path
+
+CHUNK_PARAMS = {"chunk_char_size": 200, "chunk_overlap": 0}
+
+
+def _chunker(workers):
+    return ChunkerFactory.create_chunker("recursive_characters", CHUNK_PARAMS, workers=workers)
+
+
+def _summary(chunks):
+    return [(chunk.metadata["file_name"], chunk.page_content) for chunk in chunks]
+
+
+def test_parallel_chunking_matches_sequential_in_file_order(write_corpus, random_text):
+    txt_files = write_corpus(**{f"doc{index:02d}": random_text(60 + 10 * index) for index in range(12)})
+
+    sequential = _chunker(1).chunk_files(txt_files)
+    parallel = _chunker(3).chunk_files(txt_files)
+
+    assert _summary(parallel) == _summary(sequential)
+    assert [name for name, _ in _summary(parallel)] == sorted(name for name, _ in _summary(parallel))
+
+
+def test_iter_chunks_yields_before_reading_the_whole_corpus(write_corpus, random_text, monkeypatch):
+    txt_files = write_corpus(a=random_text(50), b=random_text(50), c=random_text(50))
+    chunker = _chunker(1)
+    read = []
+    chunk_file = chunker.chunk_file
+
+    def tracking_chunk_file(file_path):
+        read.append(file_path.name)
+        return chunk_file(file_path)
+
+    monkeypatch.setattr(chunker, "chunk_file", tracking_chunk_file)
+
+    first = next(chunker.iter_chunks(txt_files))
+
+    assert first.metadata["file_name"] == "a.txt"
+    assert read == ["a.txt"]
+
+
+def test_unreadable_file_is_reported_and_skipped(write_corpus, random_text, tmp_path):
+    txt_files = write_corpus(a=random_text(50), c=random_text(50))
+    broken = tmp_path / "corpus" / "b.txt"
+    broken.write_bytes(b"\xff\xfe texto en otra codificacion \xff")
+    chunker = _chunker(2)
+
+    chunks = chunker.chunk_files(sorted(txt_files + [broken]))
+
+    assert {chunk.metadata["file_name"] for chunk in chunks} == {"a.txt", "c.txt"}
+    assert [failure["file"] for failure in chunker.failures] == [str(broken)]
+    assert "UnicodeDecodeError" in chunker.failures[0]["error"]
+
+
+def test_failed_files_are_retried_on_the_next_run(rag_factory, write_corpus, random_text, tmp_path):
+    write_corpus(a=random_text(50), c=random_text(50))
+    broken = tmp_path / "corpus" / "b.txt"
+    broken.write_bytes(b"\xff\xfe texto en otra codificacion \xff")
+    rag = rag_factory()
+    rag.rag_setup()
+
+    manifest_path = get_index_artifact_path(rag.chroma_db_path, rag.collection_name, "manifest.json")
+    assert sorted(IndexManifest.load(manifest_path).files) == ["a.txt", "c.txt"]
+    assert [failure["file"] for failure in rag.chunk_failures] == [str(broken)]
+
+    broken.write_text(random_text(50), encoding="utf-8")
+    fixed = rag_factory()
+    fixed.rag_setup()
+
+    assert sorted(IndexManifest.load(manifest_path).files) == ["a.txt", "b.txt", "c.txt"]
+    assert fixed.vector_store.get(where={"file_name": "b.txt"})["ids"]
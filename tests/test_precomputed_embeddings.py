@@ -0,0 +1,69 @@
+"""Tests de la ingesta con embeddings precalculados, ids determinísticos y upsert por lotes."""
+
+import numpy as np
+
+from greenpeace_rag.core.indexing import IncrementalIndexer, IndexManifest
+from greenpeace_rag.utils.chunk_ids import make_chunk_id
+
+
+def _stored(vector_store):
+    stored = vector_store.get(include=["documents", "metadatas", "embeddings"])
+    order = np.argsort(stored["ids"])
+    return [stored["ids"][index] for index in order], np.asarray(stored["embeddings"])[order], stored
+
+
+def test_precomputed_embeddings_are_written_without_encoding_twice(rag_factory, write_corpus, random_text,
+                                                                   embeddings):
+    write_corpus(a=random_text(100), b=random_text(100))
+    rag = rag_factory()
+    chunks = rag.generate_chunks()
+    rag.generate_embeddings()
+    assert embeddings.calls == len(chunks)
+
+    rag.rag_setup()
+
+    assert embeddings.calls == len(chunks)
+    ids, vectors, _ = _stored(rag.vector_store)
+    expected = {chunk.metadata["chunk_id"]: row for chunk, row in zip(chunks, rag.embeddings)}
+    assert ids == sorted(expected)
+    assert np.allclose(vectors, [expected[chunk_id] for chunk_id in ids])
+
+
+def test_chunk_ids_are_derived_from_file_and_content(rag_factory, write_corpus, random_text, tmp_path):
+    write_corpus(a=random_text(100), b=random_text(100))
+    first = rag_factory()
+    first.rag_setup()
+    second = rag_factory(chroma_db_path=str(tmp_path / "otra_db"))
+    second.rag_setup()
+
+    ids, _, stored = _stored(first.vector_store)
+    assert ids == _stored(second.vector_store)[0]
+    assert sorted(ids) == sorted(
+        make_chunk_id(metadata["file_name"], text) for text, metadata in zip(stored["documents"], stored["metadatas"])
+    )
+
+
+def test_encoded_batches_are_upserted_idempotently(rag_factory, write_corpus, random_text, embeddings, tmp_path):
+    txt_files = write_corpus(a=random_text(100), b=random_text(100))
+    rag = rag_factory()
+    rag.rag_setup()
+    store, chunks = rag.vector_store, rag.chunks
+    store.delete(ids=store.get()["ids"])
+    embeddings.calls = 0
+
+    report = IncrementalIndexer(store, None, IndexManifest(str(tmp_path / "m1.json")), batch_size=2).sync(
+        txt_files, chunks=chunks
+    )
+
+    # Sin embeddings precalculados, cada lote se codifica una sola vez
+    assert report["chunks_added"] == len(chunks) == len(store.get()["ids"])
+    assert embeddings.calls == len(chunks)
+    ids, vectors, stored = _stored(store)
+    texts = dict(zip(stored["ids"], stored["documents"]))
+    assert np.allclose(vectors, embeddings.embed_documents([texts[chunk_id] for chunk_id in ids]))
+
+    # Volver a ingresar los mismos chunks (manifest nuevo) no duplica nada
+    IncrementalIndexer(store, None, IndexManifest(str(tmp_path / "m2.json")), batch_size=2).sync(
+        txt_files, chunks=chunks
+    )
+    assert _stored(store)[0] == ids
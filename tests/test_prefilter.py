@@ -0,0 +1,161 @@
+"""Tests de PrefilterIndex y del filtro de metadata en todos los caminos de búsqueda."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from greenpeace_rag.core.retrieval import BM25Index, DocumentRetriever, HybridRetriever, PrefilterIndex
+from greenpeace_rag.core.retrieval.prefilter import metadata_values
+from greenpeace_rag.core.vectorstores import FlatVectorStore
+from greenpeace_rag.utils.chunk_ids import get_chunk_id
+from greenpeace_rag.utils.config import PREFILTER_CONFIG
+from greenpeace_rag.utils.text import tokenize
+
+FILES = ["informe_2019.txt", "comunicado_prensa.txt", "campana_bosques.txt"]
+
+
+@pytest.fixture
+def chunks():
+    rng = np.random.default_rng(1)
+    chunks = []
+    for index in range(300):
+        text = " ".join(f"w{word}" for word in rng.integers(0, 2000, 20))
+        if index % 7 == 0:
+            text += " en 2021"
+        metadata = {"file_name": FILES[index % 3]}
+        if index % 10 == 0:
+            # Canónico deduplicado: también pertenece a otro archivo
+            metadata["sources"] = [FILES[index % 3], FILES[(index + 1) % 3]]
+        chunks.append(Document(page_content=text, metadata=metadata))
+    return chunks
+
+
+@pytest.fixture
+def store(tmp_path, embeddings, chunks):
+    store = FlatVectorStore(embeddings, str(tmp_path / "db"))
+    texts = [chunk.page_content for chunk in chunks]
+    store.upsert_vectors([get_chunk_id(chunk) for chunk in chunks], embeddings.embed_documents(texts),
+                         texts, [chunk.metadata for chunk in chunks])
+    return store
+
+
+def _expected_ids(chunks, where=None, keywords=None):
+    expected = []
+    for chunk in chunks:
+        values = metadata_values(chunk, PREFILTER_CONFIG["doc_types"])
+        if where and not all(
+            values[field] & {str(value) for value in (wanted if isinstance(wanted, list) else [wanted])}
+            for field, wanted in where.items()
+        ):
+            continue
+        if keywords and not set(keywords) & set(tokenize(chunk.page_content)):
+            continue
+        expected.append(get_chunk_id(chunk))
+    return expected
+
+
+@pytest.mark.parametrize("where", [
+    {"file_name": "comunicado_prensa.txt"},
+    {"file_name": ["informe_2019.txt", "campana_bosques.txt"]},
+    {"doc_type": "informe"},
+    {"year": 2021},
+    {"year": "2019", "doc_type": ["informe", "campaña"]},
+    {"file_name": "campana_bosques.txt", "year": 2021},
+])
+def test_metadata_ids_match_brute_force(chunks, where):
+    index = PrefilterIndex.build(chunks)
+    assert sorted(index.metadata_ids(where)) == sorted(_expected_ids(chunks, where=where))
+
+
+def test_keyword_candidates_contain_a_keyword(chunks):
+    index = PrefilterIndex.build(chunks)
+    keywords = index.extract_keywords(chunks[5].page_content)
+    assert keywords
+    rows = index.candidate_rows(keywords=keywords, where={"file_name": FILES[2]})
+    assert sorted(index.ids[row] for row in rows) == sorted(
+        _expected_ids(chunks, where={"file_name": FILES[2]}, keywords=keywords)
+    )
+
+
+def test_saved_index_gives_same_candidates(tmp_path, chunks):
+    index = PrefilterIndex.build(chunks)
+    index.save(str(tmp_path / "prefilter"))
+    loaded = PrefilterIndex.load(str(tmp_path / "prefilter"))
+    where = {"doc_type": "comunicado", "year": 2021}
+    assert loaded.metadata_ids(where) == index.metadata_ids(where)
+    question = chunks[0].page_content
+    assert loaded.extract_keywords(question) == index.extract_keywords(question)
+
+
+def test_unknown_metadata_field_is_rejected(chunks):
+    with pytest.raises(ValueError):
+        PrefilterIndex.build(chunks).metadata_ids({"author": "greenpeace"})
+
+
+@pytest.mark.parametrize("retriever_class", [DocumentRetriever, HybridRetriever])
+def test_metadata_filter_applies_on_every_search_path(store, chunks, retriever_class):
+    index = PrefilterIndex.build(chunks)
+    if retriever_class is HybridRetriever:
+        retriever = HybridRetriever(store, None, BM25Index.build(chunks), prefilter_index=index)
+    else:
+        retriever = DocumentRetriever(store, None, prefilter_index=index)
+    where = {"file_name": FILES[1]}
+    allowed = set(_expected_ids(chunks, where=where))
+    retriever.set_metadata_filter(where)
+
+    results = [retriever.search(chunks[0].page_content, k=10)]
+    results += retriever.search_batch([chunks[1].page_content, chunks[2].page_content], k=10)
+    results += retriever.similarity_search_batch_with_score(["w1 w2", "w3"], k=10)
+    for docs_with_scores in results:
+        assert len(docs_with_scores) == 10
+        assert {get_chunk_id(doc) for doc, _ in docs_with_scores} <= allowed
+
+    retriever.set_metadata_filter(None)
+    unfiltered = {get_chunk_id(doc) for doc, _ in retriever.search(chunks[0].page_content, k=10)}
+    assert not unfiltered <= allowed
+
+
+def test_filtered_dense_search_is_exact_within_filter(store, chunks, embeddings):
+    retriever = DocumentRetriever(store, None, prefilter_index=PrefilterIndex.build(chunks))
+    where = {"year": 2021}
+    allowed = set(_expected_ids(chunks, where=where))
+    retriever.set_metadata_filter(where)
+    question = chunks[14].page_content
+
+    ranking = store.search_vectors(np.asarray([embeddings.embed_query(question)]), k=len(chunks))[0]
+    expected = [get_chunk_id(doc) for doc, _ in ranking if get_chunk_id(doc) in allowed][:5]
+    assert [get_chunk_id(doc) for doc, _ in retriever.search(question, k=5)] == expected
+
+
+def test_keyword_narrowing_is_opt_in(store, chunks):
+    question = chunks[3].page_content
+    exact = [get_chunk_id(doc) for doc, _ in store.similarity_search_with_score(question, k=5)]
+
+    retriever = DocumentRetriever(store, None, prefilter_index=PrefilterIndex.build(chunks))
+    assert [get_chunk_id(doc) for doc, _ in retriever.search(question, k=5)] == exact
+
+    index = PrefilterIndex.build(chunks, {"keyword_narrowing": True, "min_keyword_candidates": 1})
+    narrowed = DocumentRetriever(store, None, prefilter_index=index)
+    # Una palabra de cada uno de tres chunks: las keywords dejan al menos k=3 candidatos
+    question = " ".join(chunk.page_content.split()[0] for chunk in chunks[3:6])
+    keywords = set(index.extract_keywords(question))
+    candidates = index.keyword_ids(question, k=3)
+    assert candidates is not None and len(candidates) < len(chunks)
+    found = narrowed.search(question, k=3)
+    assert len(found) == 3
+    for doc, _ in found:
+        assert get_chunk_id(doc) in candidates
+        assert keywords & set(tokenize(doc.page_content))
+
+
+def test_evaluate_keyword_narrowing_reports_candidate_ratio(store, chunks):
+    index = PrefilterIndex.build(chunks, {"keyword_narrowing": True, "min_keyword_candidates": 1})
+    retriever = DocumentRetriever(store, None, prefilter_index=index)
+    narrowed = " ".join(chunk.page_content.split()[0] for chunk in chunks[3:6])
+
+    report = retriever.evaluate_keyword_narrowing([narrowed, chunks[0].page_content], k=3)
+
+    assert report["n_questions"] == 2
+    assert report["narrowed_questions"] >= 1
+    assert 0 < report["mean_candidate_ratio"] < 1
+    assert 0 <= report["recall"] <= 1
@@ -0,0 +1,85 @@
+"""Tests de FlatVectorStore con cuantización int8/binaria y rescoring con los vectores completos."""
+
+import numpy as np
+import pytest
+
+from greenpeace_rag.core.vectorstores import FlatVectorStore
+from greenpeace_rag.core.vectorstores.flat_store import _POPCOUNT_TABLE, _popcount, quantize_int8
+
+
+def _build(directory, embeddings, vectors, **kwargs):
+    store = FlatVectorStore(embeddings, str(directory), max_segments=3, block_rows=500, **kwargs)
+    ids = [f"d{index}" for index in range(len(vectors))]
+    for start in range(0, len(vectors), 600):
+        end = start + 600
+        store.upsert_vectors(ids[start:end], vectors[start:end], ["texto"] * len(ids[start:end]),
+                             [{"row": row} for row in range(start, min(end, len(vectors)))])
+    return store
+
+
+@pytest.fixture
+def data(clustered_vectors):
+    return clustered_vectors(3000, 100, 64, n_clusters=50, noise=0.3)
+
+
+@pytest.mark.parametrize("quantization, rescore_dtype, min_recall", [
+    (None, "float32", 1.0),
+    ("int8", "float32", 0.98),
+    ("int8", "float16", 0.98),
+    ("binary", "float32", 0.75),
+])
+def test_rescored_recall_against_exact_search(tmp_path, embeddings, data, quantization, rescore_dtype, min_recall):
+    vectors, queries = data
+    store = _build(tmp_path, embeddings, vectors, quantization=quantization, rescore_dtype=rescore_dtype)
+
+    report = store.evaluate_quantization(queries, k=10)
+
+    assert report["recall_rescored"] >= min_recall
+    assert report["recall_rescored"] >= report["recall_first_pass"]
+
+
+def test_first_pass_memory_is_reduced(tmp_path, embeddings, data):
+    vectors, _ = data
+    int8 = _build(tmp_path / "int8", embeddings, vectors, quantization="int8").get_memory_stats()
+    binary = _build(tmp_path / "binary", embeddings, vectors, quantization="binary").get_memory_stats()
+
+    assert int8["first_pass_saved_ratio"] > 0.7
+    assert binary["first_pass_saved_ratio"] > 0.95
+    # En disco los códigos se suman a los vectores de rescoring
+    assert int8["disk_bytes"] == int8["float32_bytes"] + int8["disk_extra_bytes"]
+    assert int8["disk_extra_bytes"] > 0
+
+
+def test_distances_are_from_full_vectors(tmp_path, embeddings, data):
+    vectors, queries = data
+    exact = _build(tmp_path / "exact", embeddings, vectors)
+    quantized = _build(tmp_path / "int8", embeddings, vectors, quantization="int8")
+
+    for (doc, distance), (exact_doc, exact_distance) in zip(quantized.search_vectors(queries[:1], 5)[0],
+                                                            exact.search_vectors(queries[:1], 5)[0]):
+        assert doc.id == exact_doc.id
+        assert distance == pytest.approx(exact_distance, abs=1e-5)
+
+
+def test_reopened_store_keeps_its_format(tmp_path, embeddings, data):
+    vectors, queries = data
+    store = _build(tmp_path, embeddings, vectors, quantization="binary", rescore_dtype="float16")
+    expected = [doc.id for doc, _ in store.search_vectors(queries[:3], 5)[0]]
+
+    reopened = FlatVectorStore(embeddings, str(tmp_path), quantization=None)
+    assert (reopened.quantization, reopened.rescore_dtype) == ("binary", "float16")
+    assert [doc.id for doc, _ in reopened.search_vectors(queries[:3], 5)[0]] == expected
+
+
+def test_int8_codes_reconstruct_vectors(data):
+    vectors, _ = data
+    codes, scales = quantize_int8(vectors)
+    error = np.abs(codes * scales[:, None] - vectors).max(axis=1)
+    assert np.all(error <= scales / 2 + 1e-6)
+
+
+def test_popcount_table_matches_bit_count():
+    codes = np.arange(256, dtype=np.uint8)
+    expected = np.unpackbits(codes[:, None], axis=1).sum(axis=1)
+    assert np.array_equal(_POPCOUNT_TABLE[codes], expected)
+    assert np.array_equal(_popcount(codes), expected)
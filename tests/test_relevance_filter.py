@@ -0,0 +1,74 @@
+"""Tests del filtro de relevancia con LLM: modo concurrente, corte temprano y timeout por chunk."""
+
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+
+from greenpeace_rag.core.retrieval import DocumentRetriever
+from greenpeace_rag.utils.async_utils import run_coroutine_sync
+
+
+def _docs(llm, relevant):
+    return [
+        (Document(page_content=f"chunk {index}" + ("" if is_relevant else f" {llm.irrelevant_marker}"),
+                  metadata={"file_name": f"f{index}.txt"}), 0.1 * index)
+        for index, is_relevant in enumerate(relevant)
+    ]
+
+
+def _contents(verdicts):
+    return [doc.page_content for doc, *_ in verdicts]
+
+
+def test_concurrent_filter_matches_sequential(llm):
+    docs = _docs(llm, [True, False, True, True, False, True])
+    retriever = DocumentRetriever(None, llm, filter_config={"max_concurrency": 3})
+
+    sequential = retriever.filter_relevant_documents("pregunta", docs, filter_mode="sequential")
+    concurrent = retriever.filter_relevant_documents("pregunta", docs, filter_mode="concurrent")
+
+    assert _contents(concurrent) == _contents(sequential) == _contents([docs[index] for index in (0, 2, 3, 5)])
+    assert [score for _, score in concurrent] == [score for _, score in sequential]
+
+
+def test_grading_stops_once_enough_relevant_chunks_are_confirmed(llm):
+    llm.grade_sleep = 0.05
+    docs = _docs(llm, [False, True, True, True, True, True, True, True])
+    retriever = DocumentRetriever(None, llm, filter_config={"max_concurrency": 2, "min_relevant": 2})
+
+    verdicts = asyncio.run(retriever.afilter_documents_concurrently("pregunta", docs))
+
+    # El corte respeta el orden de score: el primer chunk (irrelevante) también se reporta
+    assert _contents(verdicts) == _contents(docs[:3])
+    assert [relevant for _, _, relevant, _ in verdicts] == [False, True, True]
+    assert len(llm.graded) < len(docs)
+
+
+def test_slow_chunk_times_out_as_not_relevant(llm):
+    llm.grade_sleep = 0.5
+    docs = _docs(llm, [True, True])
+    retriever = DocumentRetriever(None, llm, filter_config={"chunk_timeout": 0.05})
+
+    verdicts = asyncio.run(retriever.afilter_documents_concurrently("pregunta", docs))
+
+    assert [relevant for _, _, relevant, _ in verdicts] == [False, False]
+    assert all("Timeout" in explanation for *_, explanation in verdicts)
+
+
+def test_run_coroutine_sync_works_inside_a_running_loop():
+    async def value():
+        await asyncio.sleep(0)
+        return 42
+
+    async def caller():
+        # Desde código sync llamado dentro de un event loop (p.ej. Jupyter)
+        return run_coroutine_sync(value())
+
+    assert run_coroutine_sync(value()) == 42
+    assert asyncio.run(caller()) == 42
+
+
+def test_unknown_filter_mode_is_rejected(llm):
+    with pytest.raises(ValueError):
+        DocumentRetriever(None, llm, filter_config={"filter_mode": "paralelo"})
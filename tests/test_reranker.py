@@ -0,0 +1,75 @@
+"""Tests del reranking en cascada: distancia -> cross-encoder -> LLM solo para los dudosos."""
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from greenpeace_rag.core.retrieval import CrossEncoderReranker, DocumentRetriever, RerankingCascade
+
+
+class FakeCrossEncoderModel:
+    """Devuelve como logit el número que sigue a "logit=" en el chunk."""
+
+    def predict(self, pairs, **kwargs):
+        return np.array([float(text.split("logit=")[1].split()[0]) for _, text in pairs])
+
+
+def _sigmoid(value):
+    return 1.0 / (1.0 + np.exp(-value))
+
+
+@pytest.fixture(autouse=True)
+def fake_model(monkeypatch):
+    monkeypatch.setattr(CrossEncoderReranker, "model", property(lambda self: FakeCrossEncoderModel()))
+    monkeypatch.setattr(CrossEncoderReranker, "_raw_output", lambda self: {})
+
+
+def _candidate(name, logit, distance, marker=""):
+    return (Document(page_content=f"{name} logit={logit} {marker}".strip(), metadata={"file_name": f"{name}.txt"}),
+            distance)
+
+
+def test_cross_encoder_activation_does_not_depend_on_the_batch():
+    reranker = CrossEncoderReranker()
+    doc = Document(page_content="chunk logit=0.5")
+
+    alone = reranker.score("pregunta", [doc])
+    with_outlier = reranker.score("pregunta", [doc, Document(page_content="otro logit=4.0")])
+
+    assert alone[0] == pytest.approx(_sigmoid(0.5))
+    assert with_outlier[0] == pytest.approx(alone[0])
+
+
+def test_cascade_only_sends_borderline_candidates_to_the_llm(llm):
+    retriever = DocumentRetriever(None, llm, filter_config={"filter_mode": "cascade"},
+                                  rerank_config={"max_distance": 1.0, "llm_filter_mode": "sequential"})
+    docs = [
+        _candidate("aceptado", 3.0, 0.2),
+        _candidate("dudoso", 0.0, 0.3),
+        _candidate("dudoso_irrelevante", 0.5, 0.4, marker=llm.irrelevant_marker),
+        _candidate("rechazado", -3.0, 0.5),
+        _candidate("lejano", 5.0, 1.5),
+    ]
+
+    relevant = retriever.filter_relevant_documents("pregunta", docs)
+
+    assert [doc.metadata["file_name"] for doc, _ in relevant] == ["aceptado.txt", "dudoso.txt"]
+    # Se conserva el score del vector store y el del cross-encoder se anota en una copia
+    assert [score for _, score in relevant] == [0.2, 0.3]
+    assert relevant[0][0].metadata["rerank_score"] == pytest.approx(_sigmoid(3.0))
+    assert all("rerank_score" not in doc.metadata for doc, _ in docs)
+    assert len(llm.graded) == 2 and all("dudoso" in prompt for prompt in llm.graded)
+    assert retriever.reranking_cascade.last_report == {
+        "input": 5,
+        "removed_by_distance": 1,
+        "removed_by_cross_encoder": 1,
+        "accepted_by_cross_encoder": 1,
+        "sent_to_llm": 2,
+        "removed_by_llm": 1,
+        "output": 2,
+    }
+
+
+def test_reject_threshold_above_accept_threshold_is_rejected():
+    with pytest.raises(ValueError):
+        RerankingCascade({"reject_threshold": 0.9, "accept_threshold": 0.5}, cross_encoder=CrossEncoderReranker())
@@ -0,0 +1,133 @@
+"""Tests de SemanticAnswerCache: umbral, scopes, desalojo, persistencia y acceso concurrente."""
+
+import re
+import sys
+import threading
+import zlib
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from greenpeace_rag.core.caching import SemanticAnswerCache
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    """Bolsa de palabras hasheada: dos preguntas con las mismas palabras tienen similitud 1."""
+
+    def embed_documents(self, texts):
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % 64] += 1.0
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def _cache(**kwargs):
+    return SemanticAnswerCache(BagOfWordsEmbeddings(), **{"similarity_threshold": 0.9, **kwargs})
+
+
+def test_paraphrase_hits_and_other_question_misses():
+    cache = _cache()
+    cache.put("¿Qué hizo Greenpeace en 2019?", "respuesta", "contexto", [], scope="k=3")
+
+    hit = cache.lookup("qué hizo greenpeace en 2019", scope="k=3")
+    assert hit["answer"] == "respuesta" and hit["similarity"] == pytest.approx(1.0)
+    assert cache.lookup("¿Dónde están las ballenas?", scope="k=3") is None
+    # Otra configuración de la consulta no reutiliza la respuesta
+    assert cache.lookup("¿Qué hizo Greenpeace en 2019?", scope="k=5") is None
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 2
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = _cache(max_entries=2, ttl_seconds=60)
+    now = [1000.0]
+    monkeypatch.setattr("greenpeace_rag.core.caching.semantic_cache.time.time", lambda: now[0])
+    cache.put("pregunta uno", "a1", "", [])
+    cache.put("pregunta dos", "a2", "", [])
+    assert cache.lookup("pregunta uno")["answer"] == "a1"
+    cache.put("pregunta tres", "a3", "", [])
+
+    # "dos" era la menos usada
+    assert cache.lookup("pregunta dos") is None
+    assert len(cache) == 2 and cache.stats["evictions"] == 1
+
+    now[0] += 61
+    assert cache.lookup("pregunta uno") is None
+    assert len(cache) == 0 and cache.stats["expirations"] == 2
+
+
+def test_new_index_version_invalidates_entries():
+    cache = _cache()
+    cache.ensure_index_version("v1")
+    cache.put("pregunta", "respuesta", "", [])
+    cache.ensure_index_version("v1")
+    assert len(cache) == 1
+    cache.ensure_index_version("v2")
+    assert len(cache) == 0 and cache.stats["invalidations"] == 1
+
+
+def test_persisted_cache_saves_every_n_inserts_and_reloads(tmp_path):
+    path = str(tmp_path / "semantic_cache.pkl")
+    cache = _cache(persist_path=path, save_every=2)
+    cache.ensure_index_version("v1")
+    cache.put("pregunta uno", "a1", "", [])
+    assert not (tmp_path / "semantic_cache.pkl").exists()
+    cache.put("pregunta dos", "a2", "", [])
+    cache.put("pregunta tres", "a3", "", [])
+    assert len(_cache(persist_path=path)) == 2
+
+    assert cache.flush()
+    reloaded = _cache(persist_path=path)
+    assert reloaded.index_version == "v1"
+    assert reloaded.lookup("pregunta tres")["answer"] == "a3"
+    assert not reloaded.flush()
+
+
+def test_concurrent_puts_and_lookups_keep_slots_consistent(tmp_path):
+    cache = _cache(max_entries=32, persist_path=str(tmp_path / "cache.pkl"), save_every=5)
+    errors = []
+
+    def worker(thread):
+        try:
+            for index in range(200):
+                cache.put(f"pregunta {thread} numero {index}", f"{thread}-{index}", "", [])
+                cache.lookup(f"pregunta {thread} numero {index // 2}")
+                if index % 10 == 0:
+                    cache.flush()
+        except Exception as error:  # pragma: no cover - el test falla abajo
+            errors.append(error)
+
+    # Cambios de hilo muy frecuentes para que las carreras aparezcan sin el lock
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=worker, args=(thread,)) for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert not errors
+    assert len(cache) == 32
+    # Cada slot pertenece a una única entrada y conserva el vector de su pregunta
+    assert sorted(list(cache._entries) + cache._free_slots) == list(range(32))
+    for slot, entry in cache._entries.items():
+        assert np.allclose(cache._vectors[slot], cache._embed([entry["question"]])[0])
+
+
+def test_generate_answers_reuses_cached_answer(rag_factory, write_corpus, random_text, llm):
+    write_corpus(a=random_text(200), b=f"{llm.irrelevant_marker} " + random_text(200))
+    rag = rag_factory(semantic_cache_config={"enabled": True})
+    rag.rag_setup()
+
+    answer, context, docs = rag.generate_answers("¿Qué hizo Greenpeace?")
+    graded = len(llm.graded)
+    assert rag.generate_answers("¿Qué hizo Greenpeace?") == (answer, context, docs)
+    assert len(llm.graded) == graded
+    assert rag.answer_cache.stats["hits"] == 1
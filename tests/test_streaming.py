@@ -0,0 +1,66 @@
+"""Tests de las respuestas en streaming: tokens incrementales, métricas de TTFT y caches de respuestas."""
+
+from langchain_core.messages import AIMessageChunk
+
+from greenpeace_rag.core.generation import AnswerStream
+from greenpeace_rag.core.rag_system import NO_INFORMATION_ANSWER
+
+
+def test_answer_stream_measures_ttft_and_uses_reported_token_counts():
+    completed = []
+    chunks = [AIMessageChunk(content="Hola"), AIMessageChunk(content=" mundo"),
+              AIMessageChunk(content="", usage_metadata={"input_tokens": 5, "output_tokens": 7, "total_tokens": 12})]
+    stream = AnswerStream([], "contexto", iter(chunks), started_at=0.0,
+                          on_complete=lambda metrics, answer: completed.append((metrics, answer)))
+
+    assert list(stream) == ["Hola", " mundo"]
+
+    assert stream.answer == "Hola mundo"
+    assert completed == [(stream.metrics, "Hola mundo")]
+    metrics = stream.metrics
+    assert metrics["output_tokens"] == 7
+    assert 0 < metrics["time_to_first_token"] <= metrics["total_time"]
+    assert metrics["total_time"] >= metrics["retrieval_time"] + metrics["generation_time"] - 1e-9
+
+
+def test_stream_answers_yields_tokens_incrementally(rag_factory, write_corpus, random_text, llm):
+    write_corpus(a=random_text(100), b=random_text(100))
+    rag = rag_factory()
+    rag.rag_setup()
+
+    stream = rag.stream_answers("¿Qué hizo Greenpeace?")
+    # Los documentos y el contexto están disponibles antes de generar
+    assert stream.docs_with_scores and stream.context
+    tokens = list(stream)
+
+    assert len(tokens) > 1
+    assert "".join(tokens) == llm.responses[0] == stream.answer
+    assert rag.stream_metrics[-1] is stream.metrics
+    assert stream.metrics["output_tokens"] == len(tokens)
+
+
+def test_stream_without_relevant_documents_answers_no_information(rag_factory, write_corpus, random_text, llm):
+    write_corpus(a=f"{llm.irrelevant_marker} " + random_text(30))
+    rag = rag_factory()
+    rag.rag_setup()
+
+    stream = rag.stream_answers("¿Qué hizo Greenpeace?")
+
+    assert "".join(stream) == NO_INFORMATION_ANSWER
+    assert stream.docs_with_scores == []
+
+
+def test_streamed_answer_is_cached_for_the_next_request(rag_factory, write_corpus, random_text, llm):
+    write_corpus(a=random_text(100), b=random_text(100))
+    rag = rag_factory(exact_cache_config={"enabled": True})
+    rag.rag_setup()
+    first = rag.stream_answers("¿Qué hizo Greenpeace?")
+    list(first)
+    graded = len(llm.graded)
+
+    second = rag.stream_answers("¿Qué hizo Greenpeace?")
+
+    assert list(second) == [first.answer]
+    assert len(llm.graded) == graded
+    assert second.docs_with_scores == first.docs_with_scores
+    assert rag.generate_answers("¿Qué hizo Greenpeace?")[0] == first.answer